@@ -0,0 +1,128 @@
+"""Benchmark scaling of the data parallel training with number of workers"""
+
+import argparse
+import json
+import logging
+import os
+
+import numpy as np
+
+from slice_lid.args    import join_dicts
+from slice_lid.consts  import ROOT_OUTDIR
+from slice_lid.presets import PRESETS_TRAIN
+from slice_lid.train   import train_distributed
+from lstm_ee.utils     import setup_logging
+
+def make_config(epochs, steps_per_epoch):
+    # pylint: disable=missing-function-docstring
+    return join_dicts(
+        PRESETS_TRAIN['standard'],
+        {
+        # Config
+            'batch_size'      : 1024,
+            'class_weights'   : 'equal',
+            'dataset'         : 'prod4/fd_fhc/dataset_slice_lid_fd_fhc_alt.csv.xz',
+            'early_stop'      : None,
+            'epochs'          : epochs,
+            'max_prongs'      : None,
+            'model'           : {
+                'name'   : 'standard',
+                'kwargs' : {
+                    'batchnorm'   : True,
+                    'layers_pre'  : [ 128, 128, 128 ],
+                    'lstm_units'  : 32,
+                    'layers_post' : [ 128, 128, 128 ],
+                    'n_resblocks' : 0,
+                },
+            },
+            'optimizer'       : {
+                'name'   : 'RMSprop',
+                'kwargs' : { 'lr' : 0.001 },
+            },
+            'regularizer'     : None,
+            'schedule'        : None,
+            'seed'            : 0,
+            'steps_per_epoch' : steps_per_epoch,
+            'target_pdg_iscc_list' : [ (12, 1), (14, 1), (16, 1), (0, 0) ],
+            'test_size'       : 200000,
+            'val_size'        : 20000,
+        # Args
+            'outdir'          : 'bench/distributed',
+            'cache'           : False,
+            'disk_cache'      : False,
+        }
+    )
+
+def parse_cmdargs():
+    # pylint: disable=missing-function-docstring
+    parser = argparse.ArgumentParser(
+        "Benchmark epoch time of the data parallel training"
+    )
+
+    parser.add_argument(
+        '-w', '--workers',
+        default = [ 1, 2, 4, 8 ],
+        dest    = 'workers',
+        help    = 'Numbers of workers to benchmark',
+        nargs   = '+',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '-e', '--epochs',
+        default = 4,
+        dest    = 'epochs',
+        help    = 'Number of epochs to train',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '-s', '--steps',
+        default = 100,
+        dest    = 'steps',
+        help    = 'Number of steps per epoch',
+        type    = int,
+    )
+
+    return parser.parse_args()
+
+def main():
+    # pylint: disable=missing-function-docstring
+    cmdargs = parse_cmdargs()
+    config  = make_config(cmdargs.epochs, cmdargs.steps)
+    outdir  = os.path.join(ROOT_OUTDIR, config['outdir'])
+
+    setup_logging(logging.INFO, os.path.join(outdir, "bench.log"))
+
+    results = {}
+
+    for n_workers in cmdargs.workers:
+        stats = train_distributed(
+            n_workers, **join_dicts(
+                config, { 'outdir' : 'bench/distributed/w%d' % n_workers }
+            )
+        )
+
+        # Skip first epoch, that includes graph construction and warm up
+        times = stats['epoch_times'][1:] or stats['epoch_times']
+
+        results[n_workers] = {
+            'epoch_time'  : float(np.median(times)),
+            'epoch_times' : stats['epoch_times'],
+            'val_loss'    : stats['val_loss'],
+        }
+
+    base = results[cmdargs.workers[0]]['epoch_time']
+
+    print("%8s %15s %10s" % ("Workers", "Epoch Time [s]", "Speedup"))
+    for n_workers, result in results.items():
+        print("%8d %15.2f %10.2f" % (
+            n_workers, result['epoch_time'], base / result['epoch_time']
+        ))
+
+    with open(os.path.join(outdir, "scaling.json"), "wt") as f:
+        json.dump(results, f, indent = 4, sort_keys = True)
+
+if __name__ == '__main__':
+    main()
+
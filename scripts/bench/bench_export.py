@@ -0,0 +1,138 @@
+"""Benchmark latency and throughput of the exported TF model artifacts"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from slice_lid.data.data        import load_data
+from slice_lid.eval.predictor   import SliceLIDPredictor
+from slice_lid.export.tf_export import (
+    TFLITE_FNAME, TFLITE_QUANTIZATIONS,
+    load_frozen_graph_function, load_saved_model_function,
+    load_tflite_function
+)
+
+def parse_cmdargs():
+    # pylint: disable=missing-function-docstring
+    parser = argparse.ArgumentParser(
+        "Benchmark exported TF model artifacts against keras"
+    )
+
+    parser.add_argument(
+        'outdir',
+        help    = 'Directory with saved model exported to TF formats',
+        metavar = 'OUTDIR',
+        type    = str,
+    )
+
+    parser.add_argument(
+        '-b', '--batch-size',
+        default = 1024,
+        dest    = 'batch_size',
+        help    = 'Batch size of the throughput measurement',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '-n', '--n-batches',
+        default = 20,
+        dest    = 'n_batches',
+        help    = 'Number of batches to measure throughput on',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '-l', '--n-latency',
+        default = 200,
+        dest    = 'n_latency',
+        help    = 'Number of single sample calls to measure latency on',
+        type    = int,
+    )
+
+    return parser.parse_args()
+
+def load_artifacts(predictor, outdir_tf):
+    """Load prediction functions of `keras` model and exported artifacts"""
+    result = {
+        'keras'        : lambda x : np.asarray(
+            predictor.model.predict_on_batch(x)
+        ),
+        'saved_model'  : load_saved_model_function(outdir_tf),
+        'frozen_graph' : load_frozen_graph_function(outdir_tf),
+    }
+
+    for quantization in TFLITE_QUANTIZATIONS:
+        if os.path.exists(os.path.join(outdir_tf, TFLITE_FNAME % quantization)):
+            result['tflite_' + quantization] = load_tflite_function(
+                outdir_tf, quantization
+            )
+
+    return result
+
+def measure(func, batches):
+    """Measure median call time of `func` over `batches` after a warm up"""
+    func(batches[0])
+    times = []
+
+    for batch in batches:
+        start = time.perf_counter()
+        func(batch)
+        times.append(time.perf_counter() - start)
+
+    return float(np.median(times))
+
+def main():
+    # pylint: disable=missing-function-docstring
+    cmdargs   = parse_cmdargs()
+    outdir_tf = os.path.join(cmdargs.outdir, "tf")
+
+    predictor  = SliceLIDPredictor.from_savedir(cmdargs.outdir)
+    args       = predictor.args
+    args.cache = False
+    _, dgen    = load_data(args)
+
+    data_loader = dgen.data_loader
+    batch_size  = cmdargs.batch_size
+    n_batches   = min(cmdargs.n_batches, len(data_loader) // batch_size)
+
+    batches = [
+        predictor.make_inputs(
+            data_loader, np.arange(i * batch_size, (i + 1) * batch_size)
+        )
+            for i in range(n_batches)
+    ]
+    singles = [
+        predictor.make_inputs(data_loader, [ i ])
+            for i in range(min(cmdargs.n_latency, len(data_loader)))
+    ]
+
+    artifacts = load_artifacts(predictor, outdir_tf)
+    reference = artifacts['keras'](batches[0])
+    results   = {}
+
+    for (name, func) in artifacts.items():
+        results[name] = {
+            'latency'      : measure(func, singles),
+            'throughput'   : batch_size / measure(func, batches),
+            'max_abs_diff' : float(np.max(np.abs(
+                func(batches[0]) - reference
+            ))),
+        }
+
+    print("%15s %15s %15s %15s" % (
+        "Artifact", "Latency [ms]", "Throughput [1/s]", "Max Abs Diff"
+    ))
+    for (name, result) in results.items():
+        print("%15s %15.3f %15.0f %15.3e" % (
+            name, 1000 * result['latency'], result['throughput'],
+            result['max_abs_diff']
+        ))
+
+    with open(os.path.join(outdir_tf, "bench.json"), "wt") as f:
+        json.dump(results, f, indent = 4, sort_keys = True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+"""Measure import time of `slice_lid` and startup time of its CLI tools"""
+
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__)
+)))
+
+# Modules that must not be imported before they are actually used
+HEAVY_MODULES = [ 'keras', 'matplotlib', 'sklearn', 'tensorflow' ]
+
+DEF_SCRIPTS = sorted(glob.glob(os.path.join(ROOT, 'scripts', 'eval', '*.py')))
+
+def parse_cmdargs():
+    # pylint: disable=missing-function-docstring
+    parser = argparse.ArgumentParser(
+        "Measure import time of slice_lid and its CLI tools"
+    )
+
+    parser.add_argument(
+        'scripts',
+        default = DEF_SCRIPTS,
+        help    = 'CLI scripts to measure `--help` startup time of',
+        metavar = 'SCRIPT',
+        nargs   = '*',
+        type    = str,
+    )
+
+    parser.add_argument(
+        '--package-budget',
+        default = 200,
+        dest    = 'package_budget',
+        help    = 'Budget [ms] of `import slice_lid`',
+        type    = float,
+    )
+
+    parser.add_argument(
+        '--cli-budget',
+        default = 1000,
+        dest    = 'cli_budget',
+        help    = 'Budget [ms] of the import time of each CLI `--help`',
+        type    = float,
+    )
+
+    parser.add_argument(
+        '-r', '--repeats',
+        default = 3,
+        dest    = 'repeats',
+        help    = 'Number of repetitions of each measurement',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '-o', '--output',
+        default = None,
+        dest    = 'output',
+        help    = 'Save results into a JSON file',
+        type    = str,
+    )
+
+    return parser.parse_args()
+
+def parse_importtime(stderr):
+    """Parse `python -X importtime` output.
+
+    Returns
+    -------
+    dict
+        Dictionary { MODULE : (SELF_US, CUMULATIVE_US, DEPTH) } of imported
+        modules, where DEPTH is the nesting level of the import.
+    """
+    result = {}
+
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3:
+            continue
+
+        try:
+            self_us, cumulative_us = int(fields[0]), int(fields[1])
+        except ValueError:
+            # Header line
+            continue
+
+        name  = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+
+        result[name.strip()] = (self_us, cumulative_us, depth)
+
+    return result
+
+def measure_import_time(cmd, repeats):
+    """Measure total import time [ms] of command `cmd` and imported modules"""
+    times   = []
+    modules = {}
+    error   = None
+    env     = dict(os.environ)
+
+    # Scripts are run from their own directory, make the package importable
+    env['PYTHONPATH'] = os.pathsep.join(
+        x for x in [ ROOT, env.get('PYTHONPATH') ] if x
+    )
+
+    for _ in range(repeats):
+        proc = subprocess.run(
+            [ sys.executable, '-X', 'importtime' ] + cmd,
+            stdout = subprocess.DEVNULL, stderr = subprocess.PIPE,
+            universal_newlines = True, check = False, cwd = ROOT, env = env,
+        )
+
+        modules = parse_importtime(proc.stderr)
+        times.append(sum(x[0] for x in modules.values()) / 1000)
+
+        if proc.returncode != 0:
+            # Import time of a failed command is meaningless
+            lines = [
+                x for x in proc.stderr.splitlines()
+                    if not x.startswith('import time:')
+            ]
+            error = lines[-1] if lines else "Exit code %d" % proc.returncode
+            break
+
+    heavy = [ x for x in HEAVY_MODULES if x in modules ]
+    top   = sorted(
+        (
+            (name, cumulative / 1000)
+                for (name, (_, cumulative, depth)) in modules.items()
+                if depth == 0
+        ),
+        key = lambda x : x[1], reverse = True
+    )
+
+    return {
+        'time'  : float(np.min(times)),
+        'heavy' : heavy,
+        'top'   : top[:5],
+        'error' : error,
+    }
+
+def main():
+    # pylint: disable=missing-function-docstring
+    cmdargs = parse_cmdargs()
+
+    targets = [ ('import slice_lid', [ '-c', 'import slice_lid' ], None) ]
+
+    for script in cmdargs.scripts:
+        targets.append((
+            os.path.relpath(script, ROOT), [ script, '--help' ], script
+        ))
+
+    results = {}
+    failed  = False
+
+    print("%-40s %10s %10s  %s" % ("Target", "Time [ms]", "Budget", "Heavy"))
+
+    for (name, cmd, script) in targets:
+        budget = (
+            cmdargs.package_budget if script is None else cmdargs.cli_budget
+        )
+
+        result = measure_import_time(cmd, cmdargs.repeats)
+        result['budget'] = budget
+        result['passed'] = (
+                (result['error'] is None)
+            and (result['time'] <= budget)
+            and (not result['heavy'])
+        )
+
+        failed = failed or (not result['passed'])
+        results[name] = result
+
+        print("%-40s %10.1f %10.0f  %s%s" % (
+            name, result['time'], budget, ",".join(result['heavy']) or '-',
+            "" if result['passed'] else "  FAILED"
+        ))
+
+        if result['error'] is not None:
+            print("    %s" % (result['error']))
+
+    if cmdargs.output is not None:
+        with open(cmdargs.output, 'wt') as f:
+            json.dump(results, f, indent = 4, sort_keys = True)
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
+
@@ -0,0 +1,204 @@
+"""Compare throughput and accuracy of the LSTM and DeepSets networks"""
+
+import argparse
+import json
+import logging
+import os
+import time
+
+import numpy as np
+
+from slice_lid.args              import join_dicts
+from slice_lid.consts            import ROOT_OUTDIR
+from slice_lid.data.data         import load_data
+from slice_lid.eval.error_matrix import (
+    calc_error_matrix, normalize_error_matrix
+)
+from slice_lid.eval.predictor    import SliceLIDPredictor
+from slice_lid.presets           import PRESETS_TRAIN
+from slice_lid.train             import create_and_train_model
+from lstm_ee.utils               import setup_logging
+
+MODELS = {
+    'standard' : {
+        'name'   : 'standard',
+        'kwargs' : {
+            'layers_pre'  : [ 128, 128, 128 ],
+            'lstm_units'  : 32,
+        },
+    },
+    'stack_lstm' : {
+        'name'   : 'stack_lstm',
+        'kwargs' : {
+            'layers_pre'  : [ 128, 128, 128 ],
+            'lstm_spec'   : [ (32, 'bidirectional'), (32, 'forward') ],
+        },
+    },
+    'lstm_packed' : {
+        'name'   : 'lstm_packed',
+        'kwargs' : {
+            'layers_pre'  : [ 128, 128, 128 ],
+            'lstm_units'  : 32,
+        },
+    },
+    'deepsets' : {
+        'name'   : 'deepsets',
+        'kwargs' : {
+            'layers_pre'  : [ 128, 128, 128 ],
+            'pooling'     : [ 'sum', 'mean', 'max' ],
+        },
+    },
+    'deepsets_attention' : {
+        'name'   : 'deepsets',
+        'kwargs' : {
+            'layers_pre'  : [ 128, 128, 64 ],
+            'pooling'     : [ 'sum', 'mean', 'max' ],
+            'attention'   : { 'blocks' : 1, 'heads' : 4, 'key_dim' : 16 },
+        },
+    },
+    'pooled_dense' : {
+        'name'   : 'pooled_dense',
+        'kwargs' : {
+            'pooling'     : [ 'mean', 'max' ],
+            'layers_post' : [ 64, 64 ],
+        },
+    },
+}
+
+def make_config(epochs, steps_per_epoch, model):
+    # pylint: disable=missing-function-docstring
+    model = {
+        'name'   : model['name'],
+        'kwargs' : {
+            'batchnorm'   : True,
+            'layers_post' : [ 128, 128, 128 ],
+            'n_resblocks' : 0,
+            **model['kwargs']
+        },
+    }
+
+    return join_dicts(
+        PRESETS_TRAIN['standard'],
+        {
+        # Config
+            'batch_size'      : 1024,
+            'class_weights'   : 'equal',
+            'dataset'         : 'prod4/fd_fhc/dataset_slice_lid_fd_fhc_alt.csv.xz',
+            'early_stop'      : None,
+            'epochs'          : epochs,
+            'max_prongs'      : None,
+            'model'           : model,
+            'optimizer'       : {
+                'name'   : 'RMSprop',
+                'kwargs' : { 'lr' : 0.001 },
+            },
+            'regularizer'     : None,
+            'schedule'        : None,
+            'seed'            : 0,
+            'steps_per_epoch' : steps_per_epoch,
+            'target_pdg_iscc_list' : [ (12, 1), (14, 1), (16, 1), (0, 0) ],
+            'test_size'       : 200000,
+            'val_size'        : 20000,
+        # Args
+            'outdir'          : 'bench/models',
+            'cache'           : False,
+            'disk_cache'      : False,
+        }
+    )
+
+def parse_cmdargs():
+    # pylint: disable=missing-function-docstring
+    parser = argparse.ArgumentParser(
+        "Compare throughput and accuracy of slice_lid networks"
+    )
+
+    parser.add_argument(
+        '-m', '--models',
+        choices = list(MODELS.keys()),
+        default = list(MODELS.keys()),
+        dest    = 'models',
+        help    = 'Models to compare',
+        nargs   = '+',
+    )
+
+    parser.add_argument(
+        '-e', '--epochs',
+        default = 10,
+        dest    = 'epochs',
+        help    = 'Number of epochs to train',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '-s', '--steps',
+        default = 500,
+        dest    = 'steps',
+        help    = 'Number of steps per epoch',
+        type    = int,
+    )
+
+    return parser.parse_args()
+
+def eval_model(savedir):
+    """Evaluate inference throughput and error matrix on the test sample"""
+    predictor  = SliceLIDPredictor.from_savedir(savedir)
+    args       = predictor.args
+    args.cache = False
+    _, dgen    = load_data(args)
+
+    data_loader = dgen.data_loader
+
+    start   = time.perf_counter()
+    preds   = predictor.predict_data_loader(data_loader)
+    elapsed = time.perf_counter() - start
+
+    truth   = predictor.calc_truth(data_loader)
+    err_mat = calc_error_matrix(truth, preds, predictor.n_targets)
+
+    return {
+        'throughput'   : len(data_loader) / elapsed,
+        'err_mat_diag' : np.diag(normalize_error_matrix(err_mat)).tolist(),
+        'n_params'     : predictor.model.count_params(),
+    }
+
+def main():
+    # pylint: disable=missing-function-docstring
+    cmdargs = parse_cmdargs()
+    outdir  = os.path.join(ROOT_OUTDIR, 'bench/models')
+
+    setup_logging(logging.INFO, os.path.join(outdir, "bench.log"))
+
+    results = {}
+
+    for name in cmdargs.models:
+        stats = create_and_train_model(**make_config(
+            cmdargs.epochs, cmdargs.steps, MODELS[name]
+        ))
+
+        # Skip first epoch, that includes graph construction and warm up
+        times = stats['epoch_times'][1:] or stats['epoch_times']
+
+        results[name] = {
+            'epoch_time'  : float(np.median(times)),
+            'epoch_times' : stats['epoch_times'],
+            'val_loss'    : stats['val_loss'],
+            **eval_model(stats['savedir']),
+        }
+
+    print("%20s %10s %15s %15s %10s  %s" % (
+        "Model", "Params", "Epoch Time [s]", "Inference [1/s]", "Val Loss",
+        "Err. Mat. Diag"
+    ))
+    for name, result in results.items():
+        print("%20s %10d %15.2f %15.0f %10.4f  %s" % (
+            name, result['n_params'], result['epoch_time'],
+            result['throughput'], result['val_loss'],
+            " ".join("%.4f" % x for x in result['err_mat_diag'])
+        ))
+
+    with open(os.path.join(outdir, "models.json"), "wt") as f:
+        json.dump(results, f, indent = 4, sort_keys = True)
+
+if __name__ == '__main__':
+    main()
+
@@ -0,0 +1,150 @@
+"""Benchmark pure NumPy inference backend against `keras` predict"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from slice_lid.data.data         import load_data
+from slice_lid.eval.predictor    import NUMPY_SUBDIR, SliceLIDPredictor
+
+# Code to measure time to first prediction of each backend
+STARTUP_CODE = {
+    'keras' : (
+        "from slice_lid.eval.predictor import SliceLIDPredictor;"
+        "SliceLIDPredictor.from_savedir(%r)"
+    ),
+    'numpy' : (
+        "from slice_lid.eval.predictor import SliceLIDPredictor;"
+        "SliceLIDPredictor.from_numpy_savedir(%r)"
+    ),
+}
+
+def parse_cmdargs():
+    # pylint: disable=missing-function-docstring
+    parser = argparse.ArgumentParser(
+        "Benchmark NumPy inference backend against keras"
+    )
+
+    parser.add_argument(
+        'outdir',
+        help    = 'Directory with saved model exported to NumPy format',
+        metavar = 'OUTDIR',
+        type    = str,
+    )
+
+    parser.add_argument(
+        '-b', '--batch-size',
+        default = 8192,
+        dest    = 'batch_size',
+        help    = 'Batch size',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '-r', '--repeats',
+        default = 3,
+        dest    = 'repeats',
+        help    = 'Number of repetitions of each measurement',
+        type    = int,
+    )
+
+    return parser.parse_args()
+
+def measure_startup(outdir, repeats):
+    """Measure time to import backend and load model in a fresh process"""
+    result = {}
+
+    for (name, code) in STARTUP_CODE.items():
+        times = []
+
+        for _ in range(repeats):
+            start = time.perf_counter()
+            subprocess.run(
+                [ sys.executable, '-c', code % (outdir,) ], check = True
+            )
+            times.append(time.perf_counter() - start)
+
+        result[name] = float(np.min(times))
+
+    return result
+
+def measure_throughput(func, n_samples, repeats):
+    """Measure number of samples `func` processes per second"""
+    func()
+    times = []
+
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    return n_samples / np.min(times)
+
+def main():
+    # pylint: disable=missing-function-docstring
+    cmdargs = parse_cmdargs()
+
+    predictor_keras = SliceLIDPredictor.from_savedir(
+        cmdargs.outdir, batch_size = cmdargs.batch_size
+    )
+    predictor_numpy = SliceLIDPredictor.from_numpy_savedir(
+        cmdargs.outdir, batch_size = cmdargs.batch_size
+    )
+
+    args       = predictor_keras.args
+    args.cache = False
+    _, dgen    = load_data(args)
+
+    data_loader = dgen.data_loader
+    n_samples   = len(data_loader)
+    inputs      = predictor_keras.make_inputs(
+        data_loader, np.arange(n_samples)
+    )
+
+    preds_keras = predictor_keras.model.predict(
+        inputs, batch_size = cmdargs.batch_size
+    )
+    preds_numpy = predictor_numpy.predict_data_loader(data_loader)
+
+    results = {
+        'startup'    : measure_startup(cmdargs.outdir, cmdargs.repeats),
+        'throughput' : {
+            'keras_predict' : measure_throughput(
+                lambda : predictor_keras.model.predict(
+                    inputs, batch_size = cmdargs.batch_size
+                ),
+                n_samples, cmdargs.repeats
+            ),
+            'keras' : measure_throughput(
+                lambda : predictor_keras.predict_data_loader(data_loader),
+                n_samples, cmdargs.repeats
+            ),
+            'numpy' : measure_throughput(
+                lambda : predictor_numpy.predict_data_loader(data_loader),
+                n_samples, cmdargs.repeats
+            ),
+        },
+        'max_abs_diff' : float(np.max(np.abs(preds_keras - preds_numpy))),
+    }
+
+    print("Startup [s]: keras %.2f, numpy %.2f" % (
+        results['startup']['keras'], results['startup']['numpy']
+    ))
+    print("Throughput [1/s]: keras predict %.0f, keras %.0f, numpy %.0f" % (
+        results['throughput']['keras_predict'],
+        results['throughput']['keras'],
+        results['throughput']['numpy'],
+    ))
+    print("Max abs difference: %.3e" % results['max_abs_diff'])
+
+    outdir = os.path.join(cmdargs.outdir, NUMPY_SUBDIR)
+    with open(os.path.join(outdir, "bench.json"), "wt") as f:
+        json.dump(results, f, indent = 4, sort_keys = True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""Benchmark LSTM over packed prongs against the masked padding LSTM"""
+
+import argparse
+import json
+import logging
+import os
+
+import numpy as np
+
+from slice_lid.args              import join_dicts
+from slice_lid.consts            import ROOT_OUTDIR
+from slice_lid.data.data         import load_data
+from slice_lid.eval.error_matrix import (
+    make_error_matrix, normalize_error_matrix
+)
+from slice_lid.eval.predictor    import SliceLIDPredictor
+from slice_lid.presets           import PRESETS_TRAIN
+from slice_lid.train             import create_and_train_model
+from lstm_ee.utils               import setup_logging
+
+# { NAME : (MODEL_NAME, BUCKET_WINDOW) }
+OPTIONS = {
+    'standard'        : ('standard',    None),
+    'packed'          : ('lstm_packed', None),
+    'packed_bucketed' : ('lstm_packed', 64 * 1024),
+}
+
+def make_config(epochs, steps_per_epoch, model_name, bucket_window):
+    # pylint: disable=missing-function-docstring
+    return join_dicts(
+        PRESETS_TRAIN['standard'],
+        {
+        # Config
+            'batch_size'      : 1024,
+            'bucket_window'   : bucket_window,
+            'class_weights'   : 'equal',
+            'dataset'         : 'prod4/fd_fhc/dataset_slice_lid_fd_fhc_alt.csv.xz',
+            'early_stop'      : None,
+            'epochs'          : epochs,
+            'max_prongs'      : None,
+            'model'           : {
+                'name'   : model_name,
+                'kwargs' : {
+                    'batchnorm'   : True,
+                    'layers_pre'  : [ 128, 128, 128 ],
+                    'lstm_units'  : 32,
+                    'layers_post' : [ 128, 128, 128 ],
+                    'n_resblocks' : 0,
+                },
+            },
+            'optimizer'       : {
+                'name'   : 'RMSprop',
+                'kwargs' : { 'lr' : 0.001 },
+            },
+            'regularizer'     : None,
+            'schedule'        : None,
+            'seed'            : 0,
+            'steps_per_epoch' : steps_per_epoch,
+            'target_pdg_iscc_list' : [ (12, 1), (14, 1), (16, 1), (0, 0) ],
+            'test_size'       : 200000,
+            'val_size'        : 20000,
+        # Args
+            'outdir'          : 'bench/packed',
+            'cache'           : False,
+            'disk_cache'      : False,
+        }
+    )
+
+def parse_cmdargs():
+    # pylint: disable=missing-function-docstring
+    parser = argparse.ArgumentParser(
+        "Benchmark training of the LSTM over packed prongs"
+    )
+
+    parser.add_argument(
+        '-m', '--models',
+        choices = list(OPTIONS.keys()),
+        default = list(OPTIONS.keys()),
+        dest    = 'models',
+        help    = 'Models to benchmark',
+        nargs   = '+',
+    )
+
+    parser.add_argument(
+        '-e', '--epochs',
+        default = 4,
+        dest    = 'epochs',
+        help    = 'Number of epochs to train',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '-s', '--steps',
+        default = 100,
+        dest    = 'steps',
+        help    = 'Number of steps per epoch',
+        type    = int,
+    )
+
+    return parser.parse_args()
+
+def eval_error_matrix_diag(savedir):
+    """Evaluate diagonal of the normalized error matrix on the test sample"""
+    predictor = SliceLIDPredictor.from_savedir(savedir)
+    args      = predictor.args
+    _, dgen   = load_data(args)
+
+    err_mat = make_error_matrix(
+        dgen, predictor, args.config.target_pdg_iscc_list
+    )
+    return np.diag(normalize_error_matrix(err_mat)).tolist()
+
+def main():
+    # pylint: disable=missing-function-docstring
+    cmdargs = parse_cmdargs()
+    outdir  = os.path.join(ROOT_OUTDIR, 'bench/packed')
+
+    setup_logging(logging.INFO, os.path.join(outdir, "bench.log"))
+
+    results = {}
+
+    for name in cmdargs.models:
+        stats = create_and_train_model(**make_config(
+            cmdargs.epochs, cmdargs.steps, *OPTIONS[name]
+        ))
+
+        # Skip first epoch, that includes graph construction and warm up
+        times = stats['epoch_times'][1:] or stats['epoch_times']
+
+        results[name] = {
+            'epoch_time'   : float(np.median(times)),
+            'epoch_times'  : stats['epoch_times'],
+            'val_loss'     : stats['val_loss'],
+            'err_mat_diag' : eval_error_matrix_diag(stats['savedir']),
+        }
+
+    base = results[cmdargs.models[0]]['epoch_time']
+
+    print("%16s %15s %10s %10s  %s" % (
+        "Model", "Epoch Time [s]", "Speedup", "Val Loss", "Err. Mat. Diag"
+    ))
+    for name, result in results.items():
+        print("%16s %15.2f %10.2f %10.4f  %s" % (
+            name, result['epoch_time'], base / result['epoch_time'],
+            result['val_loss'],
+            " ".join("%.4f" % x for x in result['err_mat_diag'])
+        ))
+
+    with open(os.path.join(outdir, "packed.json"), "wt") as f:
+        json.dump(results, f, indent = 4, sort_keys = True)
+
+if __name__ == '__main__':
+    main()
+
@@ -0,0 +1,155 @@
+"""Benchmark mixed precision and XLA compilation options of the training"""
+
+import argparse
+import json
+import logging
+import os
+
+import numpy as np
+
+from slice_lid.args              import join_dicts
+from slice_lid.consts            import ROOT_OUTDIR
+from slice_lid.data.data         import load_data
+from slice_lid.eval.error_matrix import (
+    make_error_matrix, normalize_error_matrix
+)
+from slice_lid.eval.predictor    import SliceLIDPredictor
+from slice_lid.presets           import PRESETS_TRAIN
+from slice_lid.train             import create_and_train_model
+from lstm_ee.utils               import setup_logging
+
+BF16 = 'mixed_bfloat16'
+
+OPTIONS = {
+    'baseline' : { 'mixed_precision' : None,   'jit_compile' : None },
+    'auto'     : { 'mixed_precision' : 'auto', 'jit_compile' : None },
+    'bf16'     : { 'mixed_precision' : BF16,   'jit_compile' : None },
+    'jit'      : { 'mixed_precision' : None,   'jit_compile' : True },
+    'bf16_jit' : { 'mixed_precision' : BF16,   'jit_compile' : True },
+}
+
+def make_config(epochs, steps_per_epoch):
+    # pylint: disable=missing-function-docstring
+    return join_dicts(
+        PRESETS_TRAIN['standard'],
+        {
+        # Config
+            'batch_size'      : 1024,
+            'class_weights'   : 'equal',
+            'dataset'         : 'prod4/fd_fhc/dataset_slice_lid_fd_fhc_alt.csv.xz',
+            'early_stop'      : None,
+            'epochs'          : epochs,
+            'max_prongs'      : None,
+            'model'           : {
+                'name'   : 'standard',
+                'kwargs' : {
+                    'batchnorm'   : True,
+                    'layers_pre'  : [ 128, 128, 128 ],
+                    'lstm_units'  : 32,
+                    'layers_post' : [ 128, 128, 128 ],
+                    'n_resblocks' : 0,
+                },
+            },
+            'optimizer'       : {
+                'name'   : 'RMSprop',
+                'kwargs' : { 'lr' : 0.001 },
+            },
+            'regularizer'     : None,
+            'schedule'        : None,
+            'seed'            : 0,
+            'steps_per_epoch' : steps_per_epoch,
+            'target_pdg_iscc_list' : [ (12, 1), (14, 1), (16, 1), (0, 0) ],
+            'test_size'       : 200000,
+            'val_size'        : 20000,
+        # Args
+            'outdir'          : 'bench/precision',
+            'cache'           : False,
+            'disk_cache'      : False,
+        }
+    )
+
+def parse_cmdargs():
+    # pylint: disable=missing-function-docstring
+    parser = argparse.ArgumentParser(
+        "Benchmark mixed precision and XLA compilation of the training"
+    )
+
+    parser.add_argument(
+        '-o', '--options',
+        choices = list(OPTIONS.keys()),
+        default = list(OPTIONS.keys()),
+        dest    = 'options',
+        help    = 'Option sets to benchmark',
+        nargs   = '+',
+    )
+
+    parser.add_argument(
+        '-e', '--epochs',
+        default = 4,
+        dest    = 'epochs',
+        help    = 'Number of epochs to train',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '-s', '--steps',
+        default = 100,
+        dest    = 'steps',
+        help    = 'Number of steps per epoch',
+        type    = int,
+    )
+
+    return parser.parse_args()
+
+def eval_error_matrix_diag(savedir):
+    """Evaluate diagonal of the normalized error matrix on the test sample"""
+    predictor = SliceLIDPredictor.from_savedir(savedir)
+    args      = predictor.args
+    _, dgen   = load_data(args)
+
+    err_mat = make_error_matrix(
+        dgen, predictor, args.config.target_pdg_iscc_list
+    )
+    return np.diag(normalize_error_matrix(err_mat)).tolist()
+
+def main():
+    # pylint: disable=missing-function-docstring
+    cmdargs = parse_cmdargs()
+    config  = make_config(cmdargs.epochs, cmdargs.steps)
+    outdir  = os.path.join(ROOT_OUTDIR, config['outdir'])
+
+    setup_logging(logging.INFO, os.path.join(outdir, "bench.log"))
+
+    results = {}
+
+    for name in cmdargs.options:
+        stats = create_and_train_model(**join_dicts(config, OPTIONS[name]))
+
+        # Skip first epoch, that includes graph construction and warm up
+        times = stats['epoch_times'][1:] or stats['epoch_times']
+
+        results[name] = {
+            'epoch_time'   : float(np.median(times)),
+            'epoch_times'  : stats['epoch_times'],
+            'val_loss'     : stats['val_loss'],
+            'err_mat_diag' : eval_error_matrix_diag(stats['savedir']),
+        }
+
+    base = results[cmdargs.options[0]]['epoch_time']
+
+    print("%10s %15s %10s %10s  %s" % (
+        "Options", "Epoch Time [s]", "Speedup", "Val Loss", "Err. Mat. Diag"
+    ))
+    for name, result in results.items():
+        print("%10s %15.2f %10.2f %10.4f  %s" % (
+            name, result['epoch_time'], base / result['epoch_time'],
+            result['val_loss'],
+            " ".join("%.4f" % x for x in result['err_mat_diag'])
+        ))
+
+    with open(os.path.join(outdir, "precision.json"), "wt") as f:
+        json.dump(results, f, indent = 4, sort_keys = True)
+
+if __name__ == '__main__':
+    main()
+
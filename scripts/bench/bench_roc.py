@@ -0,0 +1,153 @@
+"""Benchmark exact sort based FOMs against the histogram based ones"""
+
+import argparse
+import json
+import time
+import tracemalloc
+
+import numpy as np
+
+from slice_lid.eval.fom import (
+    calc_foms, calc_sgn_bkg_cumsums, find_best_cut, FOM_SPEC_DICT
+)
+from slice_lid.eval.roc import calc_exact_curves
+
+def parse_cmdargs():
+    # pylint: disable=missing-function-docstring
+    parser = argparse.ArgumentParser(
+        "Benchmark exact FOMs against the histogram based ones"
+    )
+
+    parser.add_argument(
+        '-n', '--samples',
+        default = 5000000,
+        dest    = 'samples',
+        help    = 'Number of synthetic samples',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '-t', '--targets',
+        default = 5,
+        dest    = 'targets',
+        help    = 'Number of targets',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '-b', '--bins',
+        default = [ 50, 1000 ],
+        dest    = 'bins',
+        help    = 'Numbers of bins of the histogram based FOMs',
+        nargs   = '+',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '-o', '--output',
+        default = None,
+        dest    = 'output',
+        help    = 'Save results into a JSON file',
+        type    = str,
+    )
+
+    return parser.parse_args()
+
+def make_preds(n_samples, n_targets, seed = 0):
+    """Make synthetic softmax scores correlated with the true targets"""
+    prg = np.random.default_rng(seed)
+
+    truth  = prg.integers(0, n_targets, size = n_samples)
+    logits = prg.normal(size = (n_samples, n_targets)).astype(np.float32)
+    logits[np.arange(n_samples), truth] += 1.5
+
+    preds  = np.exp(logits)
+    preds /= preds.sum(axis = 1, keepdims = True)
+
+    weights = prg.uniform(0.5, 1.5, size = n_samples)
+
+    return (truth, preds, weights)
+
+def measure(func):
+    """Measure run time [s] and peak traced memory [MiB] of `func()`"""
+    tracemalloc.start()
+    start = time.perf_counter()
+
+    result = func()
+
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return (result, elapsed, peak / 2**20)
+
+def calc_hist_best_foms(truth, preds, weights, bins):
+    """Find best selection FOM of each target using histograms"""
+    sgn_bkg_cumsums = calc_sgn_bkg_cumsums(truth, preds, weights, bins)
+    rhist_foms      = calc_foms(sgn_bkg_cumsums, FOM_SPEC_DICT['selection'])
+
+    return [ find_best_cut(x) for x in rhist_foms ]
+
+def calc_exact_best_foms(truth, preds, weights):
+    """Find best selection FOM and AUC of each target using sorting"""
+    return [
+        curves.find_best_cut('selection') + (curves.calc_auc(),)
+            for curves in calc_exact_curves(truth, preds, weights)
+    ]
+
+def main():
+    # pylint: disable=missing-function-docstring
+    cmdargs = parse_cmdargs()
+
+    truth, preds, weights = make_preds(cmdargs.samples, cmdargs.targets)
+
+    exact, exact_time, exact_mem = measure(
+        lambda : calc_exact_best_foms(truth, preds, weights)
+    )
+
+    results = {
+        'exact' : {
+            'time'   : exact_time,
+            'memory' : exact_mem,
+            'cuts'   : [ x[0] for x in exact ],
+            'foms'   : [ x[1] for x in exact ],
+            'aucs'   : [ x[2] for x in exact ],
+        },
+    }
+
+    print("%-12s %10s %12s %14s" % (
+        "Method", "Time [s]", "Memory [MiB]", "FOM loss [%]"
+    ))
+    print("%-12s %10.2f %12.1f %14s" % ("exact", exact_time, exact_mem, '-'))
+
+    for bins in cmdargs.bins:
+        hist, hist_time, hist_mem = measure(
+            lambda bins = bins : calc_hist_best_foms(
+                truth, preds, weights, bins
+            )
+        )
+
+        # Relative loss of the best FOM due to the binning
+        loss = float(np.max([
+            100 * (1 - h[1] / e[1]) for (h, e) in zip(hist, exact)
+        ]))
+
+        results['hist(%d)' % bins] = {
+            'time'   : hist_time,
+            'memory' : hist_mem,
+            'cuts'   : [ x[0] for x in hist ],
+            'foms'   : [ x[1] for x in hist ],
+            'loss'   : loss,
+        }
+
+        print("%-12s %10.2f %12.1f %14.4f" % (
+            'hist(%d)' % bins, hist_time, hist_mem, loss
+        ))
+
+    if cmdargs.output is not None:
+        with open(cmdargs.output, 'wt') as f:
+            json.dump(results, f, indent = 4, sort_keys = True)
+
+if __name__ == '__main__':
+    main()
+
@@ -0,0 +1,177 @@
+"""Benchmark running inference server by concurrent single slice requests"""
+
+import argparse
+import json
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from slice_lid.args      import Args
+from slice_lid.data.data import load_data
+from slice_lid.serve     import SliceLIDClient
+
+def parse_cmdargs():
+    # pylint: disable=missing-function-docstring
+    parser = argparse.ArgumentParser("Benchmark running inference server")
+
+    parser.add_argument(
+        'outdir',
+        help    = 'Directory with saved model to take test samples from',
+        metavar = 'OUTDIR',
+        type    = str,
+    )
+
+    parser.add_argument(
+        '--host',
+        default = '127.0.0.1',
+        dest    = 'host',
+        help    = 'Host of the server',
+        type    = str,
+    )
+
+    parser.add_argument(
+        '-p', '--port',
+        default = 8080,
+        dest    = 'port',
+        help    = 'TCP port of the server',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '-s', '--socket',
+        default = None,
+        dest    = 'socket',
+        help    = 'Unix socket of the server',
+        type    = str,
+    )
+
+    parser.add_argument(
+        '-c', '--concurrency',
+        default = 32,
+        dest    = 'concurrency',
+        help    = 'Number of concurrent clients',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '-n', '--requests',
+        default = 10000,
+        dest    = 'requests',
+        help    = 'Total number of requests',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--samples',
+        default = 1,
+        dest    = 'samples',
+        help    = 'Number of samples per request',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--binary',
+        action  = 'store_true',
+        dest    = 'binary',
+        help    = 'Use binary requests instead of JSON',
+    )
+
+    return parser.parse_args()
+
+def make_requests(data_loader, args, n_requests, n_samples):
+    """Make dicts of column arrays of `n_requests` requests"""
+    variables = (
+        list(args.vars_input_slice or []) + list(args.vars_input_png3d or [])
+    )
+    result = []
+
+    for idx in range(n_requests):
+        index = np.arange(idx * n_samples, (idx + 1) * n_samples)
+        index = index % len(data_loader)
+
+        result.append({
+            vname : data_loader.get(vname, index) for vname in variables
+        })
+
+    return result
+
+def run_client(cmdargs, args, requests):
+    """Send `requests` sequentially and return their latencies"""
+    client = SliceLIDClient(
+        host             = cmdargs.host,
+        port             = cmdargs.port,
+        path             = cmdargs.socket,
+        binary           = cmdargs.binary,
+        vars_input_png3d = args.vars_input_png3d,
+    )
+
+    latencies = []
+
+    try:
+        for columns in requests:
+            start = time.perf_counter()
+            client.predict(columns)
+            latencies.append(time.perf_counter() - start)
+    finally:
+        client.close()
+
+    return latencies
+
+def main():
+    # pylint: disable=missing-function-docstring
+    cmdargs = parse_cmdargs()
+
+    args       = Args.load(cmdargs.outdir)
+    args.cache = False
+    _, dgen    = load_data(args)
+
+    requests = make_requests(
+        dgen.data_loader, args, cmdargs.requests, cmdargs.samples
+    )
+    chunks   = [
+        requests[idx::cmdargs.concurrency]
+            for idx in range(cmdargs.concurrency)
+    ]
+
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(cmdargs.concurrency) as executor:
+        latencies = np.concatenate(list(executor.map(
+            lambda x : run_client(cmdargs, args, x), chunks
+        )))
+
+    elapsed = time.perf_counter() - start
+
+    client = SliceLIDClient(
+        host = cmdargs.host, port = cmdargs.port, path = cmdargs.socket
+    )
+
+    result = {
+        'client' : {
+            'requests'   : cmdargs.requests,
+            'samples'    : cmdargs.requests * cmdargs.samples,
+            'throughput' : cmdargs.requests * cmdargs.samples / elapsed,
+            'latency'    : {
+                'p%d' % p : float(np.percentile(latencies, p))
+                    for p in [ 50, 90, 99 ]
+            },
+        },
+        'server' : client.metrics(),
+    }
+
+    client.close()
+
+    print("Throughput [1/s]: %.0f" % result['client']['throughput'])
+    print("Latency [ms]: p50 %.2f, p90 %.2f, p99 %.2f" % tuple(
+        1000 * result['client']['latency'][x] for x in [ 'p50', 'p90', 'p99' ]
+    ))
+    print("Server mean batch size: %.1f" % (
+        result['server']['mean_batch_size']
+    ))
+    print(json.dumps(result, indent = 4, sort_keys = True))
+
+if __name__ == '__main__':
+    main()
+
@@ -0,0 +1,151 @@
+"""Evaluate model by all standard metrics in a single inference pass"""
+
+import argparse
+import json
+import os
+
+from lstm_ee.utils         import setup_logging
+from lstm_ee.utils.parsers import add_concurrency_parser
+
+from slice_lid.eval.accumulators import (
+    evaluate_accumulators, feed_accumulators, finalize_accumulators,
+    DistributionAccumulator, ErrorMatrixAccumulator, FOMAccumulator,
+    RecoAccumulator, TSNEAccumulator
+)
+from slice_lid.utils.parsers import add_basic_eval_args, add_pred_cache_parser
+from slice_lid.utils.eval    import (
+    cached_eval_prologue, standard_eval_prologue
+)
+
+METRICS     = [ 'err_mat', 'distrib', 'fom', 'tsne', 'reco' ]
+DEF_METRICS = [ 'err_mat', 'distrib', 'fom', 'tsne' ]
+
+def parse_cmdargs():
+    # pylint: disable=missing-function-docstring
+    parser = argparse.ArgumentParser(
+        "Evaluate model by all standard metrics in a single inference pass"
+    )
+
+    parser.add_argument(
+        '-m', '--metrics',
+        choices = METRICS,
+        default = DEF_METRICS,
+        dest    = 'metrics',
+        help    = 'Metrics to evaluate',
+        nargs   = '+',
+        type    = str,
+    )
+
+    parser.add_argument(
+        '-b', '--bins',
+        dest    = 'bins',
+        default = 50,
+        help    = 'Number of bins in distribution and FOM plots',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--chunk-size',
+        dest    = 'chunk_size',
+        default = 100000,
+        help    = 'Number of samples scored at once',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--tsne-bins',
+        dest    = 'tsne_bins',
+        default = 100,
+        help    = 'Number of bins for the t-SNE density plot',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--tsne-number',
+        dest    = 'tsne_limit',
+        default = 2000,
+        help    = 'Number of points for the t-SNE embedding',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--tsne-dimensions',
+        dest    = 'tsne_dims',
+        default = 2,
+        choices = [ 2, 3 ],
+        help    = 'Number of dimensions of embedding manifold',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--tsne-perplexity',
+        dest    = 'tsne_perplexity',
+        default = 30,
+        help    = 'Perplexity value for the t-SNE embedding',
+        type    = float,
+    )
+
+    add_basic_eval_args   (parser)
+    add_concurrency_parser(parser)
+    add_pred_cache_parser (parser)
+
+    return parser.parse_args()
+
+def make_accumulators(cmdargs, args):
+    """Construct accumulators of the metrics `cmdargs.metrics`"""
+    n_targets = len(args.target_pdg_iscc_list) + 1
+    result    = []
+
+    for metric in cmdargs.metrics:
+        if metric == 'err_mat':
+            accumulator = ErrorMatrixAccumulator(n_targets)
+        elif metric == 'distrib':
+            accumulator = DistributionAccumulator(n_targets, cmdargs.bins)
+        elif metric == 'fom':
+            accumulator = FOMAccumulator(n_targets, cmdargs.bins)
+        elif metric == 'tsne':
+            accumulator = TSNEAccumulator(
+                cmdargs.tsne_limit, cmdargs.tsne_perplexity,
+                cmdargs.tsne_dims, cmdargs.tsne_bins
+            )
+        else:
+            accumulator = RecoAccumulator(args)
+
+        result.append(accumulator)
+
+    return result
+
+def main():
+    # pylint: disable=missing-function-docstring
+    setup_logging()
+    cmdargs = parse_cmdargs()
+
+    result = {}
+
+    if 'reco' in cmdargs.metrics:
+        # Reco comparison needs the dataset samples, predictions can not be
+        # taken from the cache
+        dgen, args, predictor, outdir, plotdir = \
+            standard_eval_prologue(cmdargs)
+
+        accumulators      = make_accumulators(cmdargs, args)
+        result['scoring'] = evaluate_accumulators(
+            predictor, dgen.data_loader, dgen.weights, accumulators,
+            cmdargs.chunk_size
+        )
+    else:
+        preds_cache, args, outdir, plotdir = cached_eval_prologue(cmdargs)
+
+        accumulators = make_accumulators(cmdargs, args)
+        feed_accumulators(preds_cache, accumulators, cmdargs.chunk_size)
+
+    result.update(
+        finalize_accumulators(accumulators, args, outdir, plotdir, cmdargs.ext)
+    )
+
+    with open(os.path.join(outdir, 'eval_all.json'), 'wt') as f:
+        json.dump(result, f, indent = 4, sort_keys = True)
+
+if __name__ == '__main__':
+    main()
+
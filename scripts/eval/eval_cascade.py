@@ -0,0 +1,97 @@
+"""Select threshold of a two-stage cascade and report its speed and accuracy"""
+
+import argparse
+import json
+import os
+
+from lstm_ee.utils         import setup_logging
+from lstm_ee.utils.parsers import add_concurrency_parser
+
+from slice_lid.data           import load_data
+from slice_lid.eval.cascade   import evaluate_cascade, format_cascade_report
+from slice_lid.eval.predictor import SliceLIDPredictor
+from slice_lid.utils.eval     import standard_eval_prologue
+from slice_lid.utils.parsers  import add_basic_eval_args
+
+def parse_cmdargs():
+    # pylint: disable=missing-function-docstring
+    parser = argparse.ArgumentParser(
+        "Select threshold of a two-stage cascade classifier"
+    )
+
+    parser.add_argument(
+        'stage1',
+        help    = 'Directory of the cheap first-stage model',
+        metavar = 'STAGE1',
+        type    = str,
+    )
+
+    parser.add_argument(
+        '--max-delta',
+        default = 0.005,
+        dest    = 'max_delta',
+        help    = 'Maximum allowed change of the normalized error matrix',
+        type    = float,
+    )
+
+    parser.add_argument(
+        '--val-size',
+        default = 0.5,
+        dest    = 'val_size',
+        help    = (
+            'Size of the stratified subsample of the test dataset to select'
+            ' threshold on. The rest of the test dataset is used to report'
+            ' the cascade performance'
+        ),
+        type    = float,
+    )
+
+    parser.add_argument(
+        '--steps',
+        default = 100,
+        dest    = 'steps',
+        help    = 'Number of threshold scan steps',
+        type    = int,
+    )
+
+    # Full second-stage model is the standard OUTDIR argument
+    add_basic_eval_args(parser)
+    add_concurrency_parser(parser)
+
+    return parser.parse_args()
+
+def main():
+    # pylint: disable=missing-function-docstring
+    setup_logging()
+    cmdargs = parse_cmdargs()
+
+    _dgen, args, stage2, outdir, _plotdir = standard_eval_prologue(cmdargs)
+
+    stage1 = SliceLIDPredictor.from_savedir(
+        cmdargs.stage1, workers = args.workers
+    )
+
+    # Select threshold on a subsample of the test dataset and report the
+    # cascade performance on the disjoint rest of it
+    args.config.val_size = cmdargs.val_size
+    dgen_val = load_data(args, val = True)[2]
+
+    data_loader_val  = dgen_val.data_loader
+    data_loader_test = data_loader_val.get_complement()
+
+    _cascade, report = evaluate_cascade(
+        stage1, stage2, data_loader_val, data_loader_test,
+        cmdargs.max_delta, cmdargs.steps
+    )
+
+    report['stage1']           = cmdargs.stage1
+    report['max_delta_target'] = cmdargs.max_delta
+
+    print(format_cascade_report(report))
+
+    with open(os.path.join(outdir, "cascade.json"), "wt") as f:
+        json.dump(report, f, indent = 4, sort_keys = True)
+
+if __name__ == '__main__':
+    main()
+
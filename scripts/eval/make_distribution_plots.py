@@ -5,11 +5,12 @@ import argparse
 from lstm_ee.utils         import setup_logging
 from lstm_ee.utils.parsers import add_concurrency_parser
 
-from slice_lid.eval.distribution import get_truth_preds_arrays
 from slice_lid.plot.labels       import convert_targets_to_labels
 from slice_lid.plot.distribution import plot_distributions
-from slice_lid.utils.parsers     import add_basic_eval_args
-from slice_lid.utils.eval        import standard_eval_prologue
+from slice_lid.utils.parsers     import (
+    add_basic_eval_args, add_pred_cache_parser
+)
+from slice_lid.utils.eval        import cached_eval_prologue
 
 def parse_cmdargs():
     # pylint: disable=missing-function-docstring
@@ -25,6 +26,7 @@ def parse_cmdargs():
     )
     add_basic_eval_args(parser)
     add_concurrency_parser(parser)
+    add_pred_cache_parser(parser)
 
     return parser.parse_args()
 
@@ -33,14 +35,12 @@ def main():
     setup_logging()
     cmdargs = parse_cmdargs()
 
-    dgen, args, model, _outdir, plotdir = standard_eval_prologue(cmdargs)
-
-    truth_array, preds_array = get_truth_preds_arrays(dgen, model)
+    preds_cache, args, _outdir, plotdir = cached_eval_prologue(cmdargs)
     labels = convert_targets_to_labels(args.target_pdg_iscc_list)
 
     plot_distributions(
-        truth_array, preds_array, dgen.weights, cmdargs.bins, labels,
-        plotdir, cmdargs.ext
+        preds_cache.truth, preds_cache.preds, preds_cache.weights,
+        cmdargs.bins, labels, plotdir, cmdargs.ext
     )
 
 if __name__ == '__main__':
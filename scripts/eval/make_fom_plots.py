@@ -1,19 +1,22 @@
 """Make plots of various Figures Of Merits"""
 
 import argparse
+import json
+import os
 
 from lstm_ee.utils         import setup_logging
 from lstm_ee.utils.parsers import add_concurrency_parser
 
-from slice_lid.eval.distribution import get_truth_preds_arrays
 from slice_lid.eval.fom          import (
     calc_sgn_bkg_cumsums, calc_foms, FOM_SPEC_DICT
 )
+from slice_lid.eval.roc          import calc_exact_curves, EXACT_FOM_SPEC_DICT
 
 from slice_lid.plot.fom      import plot_separate_foms, plot_overlayed_foms
 from slice_lid.plot.labels   import convert_targets_to_labels
-from slice_lid.utils.parsers import add_basic_eval_args
-from slice_lid.utils.eval    import standard_eval_prologue
+from slice_lid.plot.roc      import plot_exact_foms, plot_roc_curves
+from slice_lid.utils.parsers import add_basic_eval_args, add_pred_cache_parser
+from slice_lid.utils.eval    import cached_eval_prologue
 
 def parse_cmdargs():
     # pylint: disable=missing-function-docstring
@@ -26,21 +29,36 @@ def parse_cmdargs():
         help    = 'Number of bins in distribution plots',
         type    = int,
     )
+
+    parser.add_argument(
+        '--exact',
+        action  = 'store_true',
+        dest    = 'exact',
+        help    = (
+            'Evaluate FOMs at every distinct score without binning'
+            ' and make ROC curves'
+        ),
+    )
+
+    parser.add_argument(
+        '--points',
+        dest    = 'points',
+        default = 1000,
+        help    = 'Maximum number of points of the exact FOM curves plots',
+        type    = int,
+    )
+
     add_basic_eval_args(parser)
     add_concurrency_parser(parser)
+    add_pred_cache_parser(parser)
 
     return parser.parse_args()
 
-def main():
+def make_binned_fom_plots(cmdargs, preds_cache, labels, plotdir):
     # pylint: disable=missing-function-docstring
-    setup_logging()
-    cmdargs = parse_cmdargs()
-
-    dgen, args, model, _outdir, plotdir = standard_eval_prologue(cmdargs)
-
-    truth_array, preds_array = get_truth_preds_arrays(dgen, model)
-    sgn_bkg_cumsums          = calc_sgn_bkg_cumsums(
-        truth_array, preds_array, dgen.weights, cmdargs.bins
+    sgn_bkg_cumsums = calc_sgn_bkg_cumsums(
+        preds_cache.truth, preds_cache.preds, preds_cache.weights,
+        cmdargs.bins
     )
 
     fom_dict = {
@@ -48,8 +66,6 @@ def main():
             for k, func in FOM_SPEC_DICT.items()
     }
 
-    labels = convert_targets_to_labels(args.target_pdg_iscc_list)
-
     for fom_label, rhist_fom_list in fom_dict.items():
         plot_separate_foms(
             rhist_fom_list, labels, fom_label, plotdir, cmdargs.ext
@@ -60,6 +76,49 @@ def main():
         labels, plotdir, cmdargs.ext
     )
 
+def make_exact_fom_plots(cmdargs, preds_cache, labels, outdir, plotdir):
+    # pylint: disable=missing-function-docstring
+    curves_list = calc_exact_curves(
+        preds_cache.truth, preds_cache.preds, preds_cache.weights
+    )
+
+    for fom_label in EXACT_FOM_SPEC_DICT:
+        plot_exact_foms(
+            curves_list, labels, fom_label, plotdir, cmdargs.ext,
+            cmdargs.points
+        )
+
+    plot_roc_curves(curves_list, labels, plotdir, cmdargs.ext, cmdargs.points)
+
+    result = {
+        label : {
+            'auc'  : curves.calc_auc(),
+            'cuts' : {
+                fom_label : dict(
+                    zip(('cut', 'fom'), curves.find_best_cut(fom_label))
+                )
+                    for fom_label in EXACT_FOM_SPEC_DICT
+            },
+        }
+            for (label, curves) in zip(labels, curves_list)
+    }
+
+    with open(os.path.join(outdir, 'fom_exact.json'), 'wt') as f:
+        json.dump(result, f, indent = 4, sort_keys = True)
+
+def main():
+    # pylint: disable=missing-function-docstring
+    setup_logging()
+    cmdargs = parse_cmdargs()
+
+    preds_cache, args, outdir, plotdir = cached_eval_prologue(cmdargs)
+    labels = convert_targets_to_labels(args.target_pdg_iscc_list)
+
+    if cmdargs.exact:
+        make_exact_fom_plots(cmdargs, preds_cache, labels, outdir, plotdir)
+    else:
+        make_binned_fom_plots(cmdargs, preds_cache, labels, plotdir)
+
 if __name__ == '__main__':
     main()
 
@@ -0,0 +1,166 @@
+"""Quantize model to TFLite and report impact on the accuracy and speed"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from lstm_ee.utils         import setup_logging
+from lstm_ee.utils.parsers import add_concurrency_parser
+
+from slice_lid.eval.error_matrix import (
+    calc_error_matrix, normalize_error_matrix
+)
+from slice_lid.eval.fom          import (
+    calc_foms, calc_sgn_bkg_cumsums, find_best_cut, FOM_SPEC_DICT
+)
+from slice_lid.eval.predictor    import SliceLIDPredictor
+from slice_lid.export.tf_export  import (
+    TFLITE_FNAME, TFLITE_QUANTIZATIONS, convert_tflite, fold_batchnorm
+)
+from slice_lid.export.tflite_model import TFLiteModel
+from slice_lid.utils.eval          import standard_eval_prologue
+from slice_lid.utils.parsers       import add_basic_eval_args
+
+def parse_cmdargs():
+    # pylint: disable=missing-function-docstring
+    parser = argparse.ArgumentParser(
+        "Quantize model and report impact on the accuracy and speed"
+    )
+
+    parser.add_argument(
+        '-q', '--quantizations',
+        choices = TFLITE_QUANTIZATIONS,
+        default = [ 'float16', 'int8' ],
+        dest    = 'quantizations',
+        help    = 'TFLite quantizations to evaluate',
+        nargs   = '+',
+    )
+
+    parser.add_argument(
+        '-b', '--bins',
+        dest    = 'bins',
+        default = 100,
+        help    = 'Number of bins in FOM histograms',
+        type    = int,
+    )
+
+    add_basic_eval_args(parser)
+    add_concurrency_parser(parser)
+
+    return parser.parse_args()
+
+def evaluate(predictor, dgen, truth, bins):
+    """Score test sample and calculate error matrix and FOM curves"""
+    start   = time.perf_counter()
+    preds   = predictor.predict_data_loader(dgen.data_loader)
+    elapsed = time.perf_counter() - start
+
+    err_mat = calc_error_matrix(truth, preds, predictor.n_targets)
+    sgn_bkg_cumsums = calc_sgn_bkg_cumsums(truth, preds, dgen.weights, bins)
+
+    return {
+        'time'    : elapsed,
+        'err_mat' : normalize_error_matrix(err_mat),
+        'foms'    : {
+            name : calc_foms(sgn_bkg_cumsums, func)
+                for (name, func) in FOM_SPEC_DICT.items()
+        },
+    }
+
+def compare(result, reference, n_samples):
+    """Compare quantized model evaluation `result` against the `reference`"""
+    foms = {}
+
+    for name in FOM_SPEC_DICT:
+        foms[name] = {
+            'best_cut'     : [
+                find_best_cut(x) for x in result['foms'][name]
+            ],
+            'best_delta'   : [
+                find_best_cut(x)[1] - find_best_cut(y)[1]
+                    for (x, y) in zip(
+                        result['foms'][name], reference['foms'][name]
+                    )
+            ],
+            'max_abs_diff' : [
+                float(np.max(np.abs(
+                    np.nan_to_num(x.hist) - np.nan_to_num(y.hist)
+                )))
+                    for (x, y) in zip(
+                        result['foms'][name], reference['foms'][name]
+                    )
+            ],
+        }
+
+    return {
+        'throughput'     : n_samples / result['time'],
+        'err_mat'        : result['err_mat'].tolist(),
+        'err_mat_delta'  : (result['err_mat'] - reference['err_mat']).tolist(),
+        'err_mat_max_abs_delta' : float(
+            np.max(np.abs(result['err_mat'] - reference['err_mat']))
+        ),
+        'foms'           : foms,
+    }
+
+def print_report(report):
+    # pylint: disable=missing-function-docstring
+    print("%10s %12s %15s %20s  %s" % (
+        "Model", "Size [kB]", "Throughput [1/s]", "Max Err. Mat. Delta",
+        "Best Selection FOM Delta"
+    ))
+
+    for (name, result) in report.items():
+        print("%10s %12.1f %15.0f %20.5f  %s" % (
+            name, result['size'] / 1024, result['throughput'],
+            result['err_mat_max_abs_delta'],
+            " ".join(
+                "%+.4f" % x for x in result['foms']['selection']['best_delta']
+            )
+        ))
+
+def main():
+    # pylint: disable=missing-function-docstring
+    setup_logging()
+    cmdargs = parse_cmdargs()
+
+    dgen, args, predictor, outdir, _plotdir = standard_eval_prologue(cmdargs)
+
+    truth     = predictor.calc_truth(dgen.data_loader)
+    n_samples = len(dgen.data_loader)
+    model, _  = fold_batchnorm(predictor.model)
+
+    reference = evaluate(predictor, dgen, truth, cmdargs.bins)
+    report    = {
+        'keras' : {
+            'size' : os.path.getsize(os.path.join(cmdargs.outdir, 'model.h5')),
+            **compare(reference, reference, n_samples),
+        }
+    }
+
+    for quantization in cmdargs.quantizations:
+        fname = os.path.join(outdir, TFLITE_FNAME % quantization)
+
+        with open(fname, 'wb') as f:
+            f.write(convert_tflite(model, quantization))
+
+        # Same number of workers as the keras reference for a fair comparison
+        predictor_tflite = SliceLIDPredictor(
+            TFLiteModel(fname), args, workers = args.workers
+        )
+
+        result = evaluate(predictor_tflite, dgen, truth, cmdargs.bins)
+        report[quantization] = {
+            'size' : os.path.getsize(fname),
+            **compare(result, reference, n_samples),
+        }
+
+    print_report(report)
+
+    with open(os.path.join(outdir, "quantization.json"), "wt") as f:
+        json.dump(report, f, indent = 4, sort_keys = True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""Score large datasets in bounded memory and save per-slice scores"""
+
+import argparse
+import json
+import logging
+
+from lstm_ee.utils import setup_logging
+
+from slice_lid.eval.bulk      import make_score_writer, score_files
+from slice_lid.eval.predictor import SliceLIDPredictor
+
+def parse_cmdargs():
+    # pylint: disable=missing-function-docstring
+    parser = argparse.ArgumentParser(
+        "Score large datasets and save per-slice scores"
+    )
+
+    parser.add_argument(
+        'outdir',
+        help    = 'Directory with saved model',
+        metavar = 'OUTDIR',
+        type    = str,
+    )
+
+    parser.add_argument(
+        'inputs',
+        help    = 'Input CSV files (optionally compressed)',
+        metavar = 'INPUT',
+        nargs   = '+',
+        type    = str,
+    )
+
+    parser.add_argument(
+        '-o', '--output',
+        dest     = 'output',
+        help     = 'Output file (HDF5, or CSV if it ends with ".csv")',
+        required = True,
+        type     = str,
+    )
+
+    parser.add_argument(
+        '-i', '--id-vars',
+        default = [],
+        dest    = 'id_vars',
+        help    = 'Variables identifying events to copy to the output',
+        nargs   = '*',
+        type    = str,
+    )
+
+    parser.add_argument(
+        '-c', '--chunk-size',
+        default = 100000,
+        dest    = 'chunk_size',
+        help    = 'Number of rows to read at once',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '-b', '--batch-size',
+        default = 8192,
+        dest    = 'batch_size',
+        help    = 'Number of samples to score in a single model call',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '-w', '--workers',
+        default = None,
+        dest    = 'workers',
+        help    = 'Number of threads to parse chunks with',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--numpy',
+        action  = 'store_true',
+        dest    = 'numpy',
+        help    = 'Score with NumPy export of the model',
+    )
+
+    return parser.parse_args()
+
+def main():
+    # pylint: disable=missing-function-docstring
+    setup_logging(logging.INFO)
+    cmdargs = parse_cmdargs()
+
+    if cmdargs.numpy:
+        predictor = SliceLIDPredictor.from_numpy_savedir(
+            cmdargs.outdir, batch_size = cmdargs.batch_size
+        )
+    else:
+        predictor = SliceLIDPredictor.from_savedir(
+            cmdargs.outdir, batch_size = cmdargs.batch_size
+        )
+
+    writer = make_score_writer(cmdargs.output)
+
+    try:
+        summary = score_files(
+            predictor, cmdargs.inputs, writer,
+            id_vars    = cmdargs.id_vars,
+            chunk_size = cmdargs.chunk_size,
+            workers    = cmdargs.workers,
+        )
+    finally:
+        writer.close()
+
+    print(json.dumps(summary, indent = 4, sort_keys = True))
+
+if __name__ == '__main__':
+    main()
+
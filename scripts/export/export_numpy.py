@@ -0,0 +1,78 @@
+"""Export `keras` model to the pure NumPy format and verify its outputs"""
+
+import argparse
+import logging
+import os
+
+import numpy as np
+
+from slice_lid.data.data         import load_data
+from slice_lid.eval.predictor    import NUMPY_SUBDIR, SliceLIDPredictor
+from slice_lid.export            import NumpyModel, export_numpy_model
+from lstm_ee.utils               import setup_logging
+
+def create_parser():
+    """Create command line argument parser"""
+    parser = argparse.ArgumentParser("Export keras model to NumPy format")
+
+    parser.add_argument(
+        'outdir',
+        help    = 'Directory with saved models',
+        metavar = 'OUTDIR',
+        type    = str,
+    )
+
+    parser.add_argument(
+        '--no-fold',
+        action  = 'store_false',
+        dest    = 'fold',
+        help    = 'Do not fold batch normalization into Dense/LSTM layers',
+    )
+
+    parser.add_argument(
+        '-n', '--n-verify',
+        default = 10000,
+        dest    = 'n_verify',
+        help    = 'Number of test samples to verify exported model on',
+        type    = int,
+    )
+
+    return parser
+
+def verify_export(predictor_keras, predictor_numpy, n_samples):
+    """Compare predictions of `keras` and NumPy models on test samples"""
+    args       = predictor_keras.args
+    args.cache = False
+    _, dgen    = load_data(args)
+
+    data_loader = dgen.data_loader
+    index       = np.arange(min(n_samples, len(data_loader)))
+
+    inputs      = predictor_keras.make_inputs(data_loader, index)
+    preds_keras = np.asarray(predictor_keras.model.predict_on_batch(inputs))
+    preds_numpy = predictor_numpy.model.predict_on_batch(inputs)
+
+    return np.max(np.abs(preds_keras - preds_numpy))
+
+def main():
+    # pylint: disable=missing-function-docstring
+    cmdargs = create_parser().parse_args()
+    outdir  = os.path.join(cmdargs.outdir, NUMPY_SUBDIR)
+
+    setup_logging(logging.INFO, os.path.join(outdir, "export.log"))
+
+    predictor_keras = SliceLIDPredictor.from_savedir(cmdargs.outdir)
+    export_numpy_model(predictor_keras.model, outdir, fold = cmdargs.fold)
+
+    predictor_numpy = SliceLIDPredictor(
+        NumpyModel.load(outdir), predictor_keras.args
+    )
+
+    if cmdargs.n_verify > 0:
+        max_diff = verify_export(
+            predictor_keras, predictor_numpy, cmdargs.n_verify
+        )
+        print("Max abs difference between keras and NumPy: %.3e" % max_diff)
+
+if __name__ == '__main__':
+    main()
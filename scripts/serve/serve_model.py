@@ -0,0 +1,86 @@
+"""Serve a trained model over localhost HTTP or a Unix socket"""
+
+import argparse
+import logging
+
+from lstm_ee.utils   import setup_logging
+from slice_lid.serve import serve
+
+def parse_cmdargs():
+    # pylint: disable=missing-function-docstring
+    parser = argparse.ArgumentParser("Serve trained model")
+
+    parser.add_argument(
+        'outdir',
+        help    = 'Directory with saved model',
+        metavar = 'OUTDIR',
+        type    = str,
+    )
+
+    parser.add_argument(
+        '--host',
+        default = '127.0.0.1',
+        dest    = 'host',
+        help    = 'Host to listen on',
+        type    = str,
+    )
+
+    parser.add_argument(
+        '-p', '--port',
+        default = 8080,
+        dest    = 'port',
+        help    = 'TCP port to listen on',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '-s', '--socket',
+        default = None,
+        dest    = 'socket',
+        help    = 'Listen on a Unix socket instead of a TCP port',
+        type    = str,
+    )
+
+    parser.add_argument(
+        '-b', '--max-batch-size',
+        default = 1024,
+        dest    = 'max_batch_size',
+        help    = 'Maximum number of samples in a micro-batch',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '-l', '--max-latency',
+        default = 5,
+        dest    = 'max_latency',
+        help    = 'Maximum time [ms] a request waits to be batched',
+        type    = float,
+    )
+
+    parser.add_argument(
+        '--numpy',
+        action  = 'store_true',
+        dest    = 'numpy',
+        help    = 'Serve NumPy export of the model',
+    )
+
+    return parser.parse_args()
+
+def main():
+    # pylint: disable=missing-function-docstring
+    setup_logging(logging.INFO)
+    cmdargs = parse_cmdargs()
+
+    serve(
+        cmdargs.outdir,
+        host           = cmdargs.host,
+        port           = cmdargs.port,
+        path           = cmdargs.socket,
+        max_batch_size = cmdargs.max_batch_size,
+        max_latency    = cmdargs.max_latency / 1000,
+        numpy          = cmdargs.numpy,
+    )
+
+if __name__ == '__main__':
+    main()
+
@@ -0,0 +1,136 @@
+"""Prune trained model to various sparsities and plot accuracy and latency"""
+
+import argparse
+import json
+import logging
+import os
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+from cafplot.plot  import save_fig
+from lstm_ee.utils import setup_logging
+
+from slice_lid.args            import Args
+from slice_lid.data.data       import load_data
+from slice_lid.eval.predictor  import SliceLIDPredictor
+from slice_lid.train.distill   import evaluate_model
+from slice_lid.train.prune     import prune_and_finetune
+
+def parse_cmdargs():
+    # pylint: disable=missing-function-docstring
+    parser = argparse.ArgumentParser(
+        "Plot accuracy and latency of pruned models against sparsity"
+    )
+
+    parser.add_argument(
+        'outdir',
+        help    = 'Directory with saved model',
+        metavar = 'OUTDIR',
+        type    = str,
+    )
+
+    parser.add_argument(
+        '-s', '--sparsities',
+        default = [ 0.25, 0.5, 0.75, 0.9 ],
+        dest    = 'sparsities',
+        help    = 'Sparsities to prune model to',
+        nargs   = '+',
+        type    = float,
+    )
+
+    parser.add_argument(
+        '--epochs',
+        default = 10,
+        dest    = 'epochs',
+        help    = 'Number of finetuning epochs per pruning step',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '--steps',
+        default = 1,
+        dest    = 'steps',
+        help    = 'Number of pruning steps',
+        type    = int,
+    )
+
+    parser.add_argument(
+        '-e', '--ext',
+        help    = 'Plot file extension',
+        default = [ 'png' ],
+        dest    = 'ext',
+        nargs   = '+',
+    )
+
+    return parser.parse_args()
+
+def evaluate(savedir, data_loader):
+    """Evaluate model saved in `savedir` on the `data_loader` samples"""
+    result = evaluate_model(
+        SliceLIDPredictor.from_savedir(savedir), data_loader, n_latency = 200
+    )
+    result['accuracy'] = float(np.mean(np.diag(result['err_mat'])))
+
+    return result
+
+def plot_sweep(results, plotdir, ext):
+    """Plot balanced accuracy and latency against sparsity"""
+    sparsities = [ x['sparsity'] for x in results ]
+
+    f, ax = plt.subplots()
+    ax.plot(sparsities, [ x['accuracy'] for x in results ], 'o-')
+    ax.set_xlabel('Sparsity')
+    ax.set_ylabel('Mean Error Matrix Diagonal')
+    ax.grid(True, linestyle = 'dashed')
+    save_fig(f, os.path.join(plotdir, 'pruning_accuracy'), ext)
+
+    f, ax = plt.subplots()
+    ax.plot(sparsities, [ 1000 * x['latency'] for x in results ], 'o-')
+    ax.set_xlabel('Sparsity')
+    ax.set_ylabel('Latency [ms]')
+    ax.grid(True, linestyle = 'dashed')
+    save_fig(f, os.path.join(plotdir, 'pruning_latency'), ext)
+
+def main():
+    # pylint: disable=missing-function-docstring
+    cmdargs = parse_cmdargs()
+    plotdir = os.path.join(cmdargs.outdir, 'pruning')
+
+    os.makedirs(plotdir, exist_ok = True)
+    setup_logging(logging.INFO, os.path.join(plotdir, "pruning.log"))
+
+    args       = Args.load(cmdargs.outdir)
+    args.cache = False
+    _, dgen    = load_data(args)
+
+    results = [
+        { 'sparsity' : 0, **evaluate(cmdargs.outdir, dgen.data_loader) }
+    ]
+
+    for sparsity in cmdargs.sparsities:
+        summary = prune_and_finetune(
+            cmdargs.outdir, sparsity, cmdargs.epochs, cmdargs.steps
+        )
+
+        results.append({
+            'sparsity' : sparsity,
+            **evaluate(summary['savedir'], dgen.data_loader),
+        })
+
+    print("%10s %10s %10s %14s" % (
+        "Sparsity", "Params", "Accuracy", "Latency [ms]"
+    ))
+    for result in results:
+        print("%10.2f %10d %10.4f %14.3f" % (
+            result['sparsity'], result['n_params'], result['accuracy'],
+            1000 * result['latency']
+        ))
+
+    plot_sweep(results, plotdir, cmdargs.ext)
+
+    with open(os.path.join(plotdir, "pruning.json"), "wt") as f:
+        json.dump(results, f, indent = 4, sort_keys = True)
+
+if __name__ == '__main__':
+    main()
@@ -3,12 +3,10 @@
 import logging
 import os
 
-from speval import speval
-
 from slice_lid.args    import join_dicts
 from slice_lid.consts  import ROOT_OUTDIR
 from slice_lid.presets import PRESETS_TRAIN
-from slice_lid.train   import create_and_train_model
+from slice_lid.train   import run_search
 from lstm_ee.utils     import setup_logging, parse_concurrency_cmdargs
 
 config = join_dicts(
@@ -86,8 +84,8 @@ setup_logging(
     logging.DEBUG, os.path.join(ROOT_OUTDIR, config['outdir'], "train.log")
 )
 
-speval(
-    lambda x : create_and_train_model(**config, extra_kwargs = x),
+run_search(
+    config,
     search_space,
     os.path.join(ROOT_OUTDIR, config['outdir'], "trials.db"),
     timeout = 24 * 60 * 60
@@ -0,0 +1,168 @@
+"""Compare convergence of warm started and cold started input additions"""
+
+import json
+import logging
+import os
+
+from slice_lid.args    import join_dicts
+from slice_lid.consts  import ROOT_OUTDIR
+from slice_lid.presets import PRESETS_TRAIN
+from slice_lid.train   import create_and_train_model
+from lstm_ee.utils     import setup_logging, parse_concurrency_cmdargs
+
+# Convergence is reached when val_loss is within this fraction of the best
+# val_loss of the cold start training.
+CONVERGENCE_TOLERANCE = 0.01
+
+config = join_dicts(
+    PRESETS_TRAIN['standard'],
+    {
+    # Config
+        'batch_size'      : 1024,
+        'class_weights'   : 'equal',
+        'dataset'         : 'prod4/fd_fhc/dataset_slice_lid_fd_fhc_alt.csv.xz',
+        'data_mods'       : {
+            'keep_pdg_iscc_list'    : None,
+            'balance_pdg_iscc_list' : None,
+        },
+        'early_stop'   : {
+            'name'   : 'standard',
+            'kwargs' : {
+                'monitor'   : 'val_loss',
+                'min_delta' : 0,
+                'patience'  : 40,
+            },
+        },
+        'epochs'       : 200,
+        'max_prongs'   : None,
+        'model'        : {
+            'name'   : 'standard',
+            'kwargs' : {
+                'batchnorm'   : True,
+                'layers_pre'  : [ ],
+                'lstm_units'  : 32,
+                'layers_post' : [ ],
+                'n_resblocks' : 0,
+            },
+        },
+        'optimizer'      : {
+            'name'   : 'RMSprop',
+            'kwargs' : {
+                'lr'        : 0.001,
+                'clipnorm'  : 0.5,
+                'clipvalue' : 0.5,
+            },
+        },
+        'regularizer'    : {
+            'name'   : 'l1',
+            'kwargs' : { 'l' : 0.0001 },
+        },
+        'schedule'       : {
+            'name'   : 'standard',
+            'kwargs' : {
+                'monitor'  : 'val_loss',
+                'factor'   : 0.5,
+                'patience' : 5,
+                'cooldown' : 0
+            },
+        },
+        'seed'            : 0,
+        'steps_per_epoch' : 500,
+        'target_pdg_iscc_list' : [ (12, 1), (14, 1), (16, 1), (0, 0) ],
+        'test_size'       : 200000,
+    # Args
+        'outdir'          : 'prod4/03_input_studies/03_warm_start',
+    }
+)
+
+VARS_BPF = [
+    "png.bpf[0].energy",
+    "png.bpf[0].overlapE",
+    "png.bpf[0].momentum.x",
+    "png.bpf[0].momentum.y",
+    "png.bpf[0].momentum.z",
+    "png.bpf[1].energy",
+    "png.bpf[1].overlapE",
+    "png.bpf[1].momentum.x",
+    "png.bpf[1].momentum.y",
+    "png.bpf[1].momentum.z",
+    "png.bpf[2].energy",
+    "png.bpf[2].overlapE",
+    "png.bpf[2].momentum.x",
+    "png.bpf[2].momentum.y",
+    "png.bpf[2].momentum.z",
+]
+
+VARS_PNG3D = [
+    "png.dir.x",
+    "png.dir.y",
+    "png.dir.z",
+    "png.start.x",
+    "png.start.y",
+    "png.start.z",
+    "png.len",
+    "png.nhit",
+    "png.nhitx",
+    "png.nhity",
+    "png.nplane",
+    "png.weightedCalE",
+    "png.calE",
+]
+
+VARS_BASE = PRESETS_TRAIN['standard']['vars_input_png3d']
+
+additions = {
+    'bpf'   : VARS_BPF,
+    'png3d' : VARS_PNG3D,
+}
+
+def epochs_to_converge(val_loss_hist, target):
+    # pylint: disable=missing-function-docstring
+    for (idx, val_loss) in enumerate(val_loss_hist):
+        if val_loss <= target:
+            return idx + 1
+
+    return None
+
+parse_concurrency_cmdargs(config)
+
+setup_logging(
+    logging.DEBUG, os.path.join(ROOT_OUTDIR, config['outdir'], "train.log")
+)
+
+base_stats = create_and_train_model(**config)
+summary    = {}
+
+for label, vars_added in additions.items():
+    vars_input_png3d = VARS_BASE + vars_added
+
+    cold_stats = create_and_train_model(
+        **config, extra_kwargs = { 'vars_input_png3d' : vars_input_png3d }
+    )
+
+    warm_stats = create_and_train_model(
+        **config, extra_kwargs = {
+            'vars_input_png3d' : vars_input_png3d,
+            'warm_start'       : { 'savedir' : base_stats['savedir'] },
+        }
+    )
+
+    target = (1 + CONVERGENCE_TOLERANCE) * min(cold_stats['val_loss_hist'])
+
+    summary[label] = {
+        name : {
+            'savedir'       : stats['savedir'],
+            'best_val_loss' : min(stats['val_loss_hist']),
+            'epochs'        : len(stats['val_loss_hist']),
+            'epochs_to_converge' :
+                epochs_to_converge(stats['val_loss_hist'], target),
+        }
+        for (name, stats) in [ ('cold', cold_stats), ('warm', warm_stats) ]
+    }
+
+    logging.info("Warm vs cold start for '%s': %s", label, summary[label])
+
+with open(
+    os.path.join(ROOT_OUTDIR, config['outdir'], "summary.json"), "wt"
+) as f:
+    json.dump(summary, f, indent = 4, sort_keys = True)
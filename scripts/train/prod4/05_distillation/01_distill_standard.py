@@ -0,0 +1,113 @@
+"""Distill a trained standard model into a small fast student network"""
+
+import argparse
+import json
+import logging
+import os
+
+from slice_lid.args          import join_dicts
+from slice_lid.consts        import ROOT_OUTDIR
+from slice_lid.plot.labels   import convert_targets_to_labels
+from slice_lid.presets       import PRESETS_TRAIN
+from slice_lid.train         import distill_model
+from slice_lid.train.distill import (
+    evaluate_distillation, format_distillation_report
+)
+from lstm_ee.utils           import setup_logging
+
+config = join_dicts(
+    PRESETS_TRAIN['standard'],
+    {
+    # Config
+        'batch_size'      : 1024,
+        'class_weights'   : 'equal',
+        'dataset'         : 'prod4/fd_fhc/dataset_slice_lid_fd_fhc_alt.csv.xz',
+        'data_mods'       : {
+            'keep_pdg_iscc_list'    : None,
+            'balance_pdg_iscc_list' : None,
+        },
+        'early_stop'   : {
+            'name'   : 'standard',
+            'kwargs' : {
+                'monitor'   : 'val_loss',
+                'min_delta' : 0,
+                'patience'  : 40,
+            },
+        },
+        'epochs'       : 200,
+        'max_prongs'   : None,
+        'model'        : {
+            'name'   : 'standard',
+            'kwargs' : {
+                'batchnorm'   : True,
+                'layers_pre'  : [ 32 ],
+                'lstm_units'  : 16,
+                'layers_post' : [ 32 ],
+                'n_resblocks' : 0,
+            },
+        },
+        'optimizer'      : {
+            'name'   : 'RMSprop',
+            'kwargs' : {
+                'lr'        : 0.001,
+                'clipnorm'  : 0.5,
+                'clipvalue' : 0.5,
+            },
+        },
+        'regularizer'    : None,
+        'schedule'       : {
+            'name'   : 'standard',
+            'kwargs' : {
+                'monitor'  : 'val_loss',
+                'factor'   : 0.5,
+                'patience' : 5,
+                'cooldown' : 0
+            },
+        },
+        'seed'            : 0,
+        'steps_per_epoch' : 500,
+        'target_pdg_iscc_list' : [ (12, 1), (14, 1), (16, 1), (0, 0) ],
+    # Args
+        'outdir'          : 'prod4/05_distillation/01_standard',
+    }
+)
+
+def parse_cmdargs():
+    # pylint: disable=missing-function-docstring
+    parser = argparse.ArgumentParser("Distill trained model into a student")
+
+    parser.add_argument(
+        'teacher',
+        help    = 'Directory of the trained teacher model',
+        metavar = 'TEACHER',
+        type    = str,
+    )
+
+    parser.add_argument(
+        '-a', '--alpha',
+        default = 0.5,
+        dest    = 'alpha',
+        help    = 'Weight of the teacher soft targets',
+        type    = float,
+    )
+
+    return parser.parse_args()
+
+cmdargs = parse_cmdargs()
+
+setup_logging(
+    logging.DEBUG, os.path.join(ROOT_OUTDIR, config['outdir'], "train.log")
+)
+
+stats = distill_model(cmdargs.teacher, cmdargs.alpha, **config)
+
+report = evaluate_distillation(
+    os.path.join(ROOT_OUTDIR, cmdargs.teacher), stats['savedir']
+)
+
+print(format_distillation_report(
+    report, convert_targets_to_labels(config['target_pdg_iscc_list'])
+))
+
+with open(os.path.join(stats['savedir'], "distillation.json"), "wt") as f:
+    json.dump(report, f, indent = 4, sort_keys = True)
@@ -14,6 +14,12 @@ class Config:
     ----------
     batch_size : int
         Training batch size.
+    bucket_window : int or None, optional
+        If not None, then the training samples will be sorted by their
+        number of 3D prongs within consecutive windows of `bucket_window`
+        samples. This makes batches consist of samples of similar lengths
+        and reduces the amount of padding the LSTM has to step through.
+        C.f. `slice_lid.data.data_loader.LengthBucketing`. Default: None.
     class_weights : { 'equal',  None }, optional
         Name of the class weights to use.
         If 'equal' then the weights that make targets equally represented
@@ -51,17 +57,56 @@ class Config:
             - The detailed rules on selecting the subsample are defined at
               `slice_lid.data.data_loader.BalancedSampler`.
         If `data_mods` is None, no data transformations will be applied.
+    distillation : dict or None, optional
+        If not None, then the network will be trained by distilling
+        knowledge of a previously trained teacher network. The
+        `distillation` dict is expected to have the following form:
+        { 'teacher' : SAVEDIR, 'alpha' : ALPHA }, where SAVEDIR is a
+        directory of the trained teacher (relative to "${SLICE_LID_OUTDIR}").
+        The training targets are replaced by a blend
+        (1 - ALPHA) * TARGET + ALPHA * SOFT_TARGET, where SOFT_TARGET are
+        teacher predictions. ALPHA defaults to 0.5. Soft targets are
+        calculated once and cached in the teacher directory. Validation
+        targets are not modified.
+        C.f. `slice_lid.data.data_generator.DataSoftTargets`. Default: None.
     early_stop : dict or None, optional
         Early stopping configuration.
         C.f. `lstm_ee.train.setup.get_early_stop` for available configurations.
         If None, no early stopping will be used. Default: None.
+    ensemble_seeds : list of int or None, optional
+        If not None, then an ensemble of len(`ensemble_seeds`) replicas of
+        the network will be trained on a single stream of data batches.
+        The replicas are trained as parallel towers of a single `keras`
+        model, where i-th tower is initialized with a seed
+        `ensemble_seeds`[i]. After the training, each replica is saved into
+        its own subdirectory "seed_SEED" of the model directory, and the
+        model directory holds a network that averages replica predictions.
+        C.f. `slice_lid.train.ensemble`. Default: None.
     epochs : int
         Number of epochs training will be run.
+    jit_compile : bool or None, optional
+        If True, then the training step will be compiled by XLA.
+        Default: None.
+    kfold : dict or None, optional
+        If not None, then the k-fold split of the dataset will be used
+        instead of the `test_size` split. `kfold` is expected to have the
+        form { 'k' : K, 'fold' : FOLD }, where the dataset is split into K
+        folds and the fold with index FOLD is used as the validation set.
+        C.f. `slice_lid.data.data.kfold_split` and
+        `slice_lid.train.kfold.run_kfold`. Default: None.
     max_prongs : int or None, optional
         Limit number of 3D prongs to `max_prongs`. In other words, if the
         number of 3D prongs is greater than `max_prongs` the remaining prongs
         will be discarded. If None no prong limit will be applied.
         Default: None.
+    mixed_precision : { None, 'auto', 'mixed_bfloat16', 'mixed_float16' }
+        Mixed precision policy to use for training. If 'auto', then
+        'mixed_bfloat16' policy will be used if the CPU supports bfloat16
+        arithmetics natively, otherwise no mixed precision will be used.
+        Output layers are always kept in float32. If None, all computations
+        are performed in float32.
+        C.f. `slice_lid.train.setup.get_mixed_precision_policy`.
+        Default: None.
     model : dict
         Network configuration. The `model` dict is expected to have the
         following form: { 'name' : NAME, 'kwargs' : KWARGS_DICT }.
@@ -112,6 +157,26 @@ class Config:
         If `test_size` is float and `test_size` < 1, then a fraction
         `test_size` of the `dataset` will be held as validation sample
         (also sampled uniformly at random).
+    val_freq : int or None, optional
+        Run validation pass only every `val_freq` epochs. The first and the
+        last epochs are always validated. The patience (and cooldown) of the
+        `early_stop` and `schedule` are counted in epochs and are rescaled
+        accordingly. If None, validation will be run every epoch.
+        Default: None.
+    val_size : int or float or None, optional
+        If not None, then the validation passes during the training will be
+        run on a fixed stratified subsample of the validation set of size
+        `val_size` (c.f. `test_size` for the interpretation of the values).
+        A full validation pass is run once the training ends (either
+        because of the early stopping or after `epochs` epochs) and its
+        results are saved to "val_full.json". Unless `val_freq` is also
+        set, the early stopping, schedule and checkpointing decisions are
+        made on the subsample metrics. If `val_freq` is set, then the
+        subsample is validated every epoch and its metrics are logged as
+        'val_subsample_*', while a full validation pass is run every
+        `val_freq` epochs and the decisions are made on its metrics only.
+        If None, then the entire validation set will be used.
+        Default: None.
     vars_input_slice : list of str or None, optional
         Names of slice level input variables. If None then no slice level
         inputs will be used. Default: None.
@@ -123,16 +188,32 @@ class Config:
     var_target_iscc : str
         Name of the variable that specifies whether given event was a Charged
         Current event.
+    warm_start : dict or None, optional
+        If not None, then the network weights will be initialized from a
+        previously trained model. The `warm_start` dict is expected to have
+        the following form: { 'savedir' : SAVEDIR, 'match' : MATCH }, where
+        SAVEDIR is a directory of the trained model (relative to
+        "${SLICE_LID_OUTDIR}"), and MATCH is a layer matching strategy
+        { 'name', 'order' } (default 'name'). Layers whose weight shapes
+        differ from the trained model (e.g. input dependent layers) are left
+        randomly initialized.
+        C.f. `slice_lid.train.setup.apply_warm_start`. Default: None.
     """
 
     __slots__ = (
         'batch_size',
+        'bucket_window',
         'class_weights',
         'dataset',
         'data_mods',
+        'distillation',
         'early_stop',
+        'ensemble_seeds',
         'epochs',
+        'jit_compile',
+        'kfold',
         'max_prongs',
+        'mixed_precision',
         'model',
         'optimizer',
         'regularizer',
@@ -141,10 +222,28 @@ class Config:
         'steps_per_epoch',
         'target_pdg_iscc_list',
         'test_size',
+        'val_freq',
+        'val_size',
         'vars_input_slice',
         'vars_input_png3d',
         'var_target_pdg',
         'var_target_iscc',
+        'warm_start',
+    )
+
+    # Options that are omitted from the saved and printed configuration when
+    # they are not set. This keeps the string representation (and therefore
+    # the savedir hash) of the configurations that do not use them intact.
+    OPTIONAL_SLOTS = (
+        'bucket_window',
+        'distillation',
+        'ensemble_seeds',
+        'jit_compile',
+        'kfold',
+        'mixed_precision',
+        'val_freq',
+        'val_size',
+        'warm_start',
     )
 
     def __init__(self, **kwargs):
@@ -156,9 +255,19 @@ class Config:
             if k in self.__slots__:
                 setattr(self, k, v)
 
+    def _get_kwargs(self):
+        """Get dict of the options, skipping unset `OPTIONAL_SLOTS`"""
+        return {
+            x : getattr(self, x) for x in self.__slots__
+                if (
+                       (x not in self.OPTIONAL_SLOTS)
+                    or (getattr(self, x) is not None)
+                )
+        }
+
     def save(self, savedir):
         """Save configuration to `savedir`/config.json"""
-        kwargs = { x : getattr(self, x) for x in self.__slots__ }
+        kwargs = self._get_kwargs()
 
         with open("%s/config.json" % (savedir), 'wt') as f:
             json.dump(kwargs, f, sort_keys = True, indent = 4)
@@ -172,12 +281,10 @@ class Config:
         return Config(**kwargs)
 
     def __str__(self):
-        kwargs = { x : getattr(self, x) for x in self.__slots__ }
-        return json.dumps(kwargs, sort_keys = True)
+        return json.dumps(self._get_kwargs(), sort_keys = True)
 
     def pprint(self):
         """Pretty print configuration"""
-        kwargs = { x : getattr(self, x) for x in self.__slots__ }
-        return json.dumps(kwargs, sort_keys = True, indent = 4)
+        return json.dumps(self._get_kwargs(), sort_keys = True, indent = 4)
 
 
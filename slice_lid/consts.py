@@ -7,6 +7,15 @@ import os
 DEF_SEED  = 1337
 DEF_MASK  = 0.
 
+# Name template of the outputs of the towers of an ensemble model
+ENSEMBLE_TARGET = 'target_%d'
+
+# Models that take number of 3D prongs as an explicit 'input_png3d_len' input
+MODELS_WITH_PRONG_LENGTHS = [ 'deepsets', 'lstm_packed', 'pooled_dense' ]
+
+# Name of the virtual variable holding indices of the dataset rows
+VAR_ROW_ID = '__row_id__'
+
 if 'SLICE_LID_DATADIR' in os.environ:
     ROOT_DATADIR = os.environ['SLICE_LID_DATADIR']
 else:
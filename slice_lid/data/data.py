@@ -2,22 +2,203 @@
 A collection of routines to simplify data handling.
 """
 
+import json
 import logging
 import os
 
+import numpy as np
+
 from lstm_ee.data.data        import guess_data_loader, train_test_split
 from lstm_ee.data.data_loader import DataShuffle
+from lstm_ee.data.data_loader.data_slice import DataSlice
+
+from slice_lid.consts import DEF_SEED, MODELS_WITH_PRONG_LENGTHS, ROOT_DATADIR
 
-from .data_loader    import BalancedSampler, DataFilter
+from .data_loader    import (
+    BalancedSampler, DataFilter, DataRowId, LengthBucketing, StratifiedSampler
+)
 from .data_generator import (
-    DataCache, DataClassWeights, DataDiskCache, DataGenerator, DataNANMask,
-    MultiprocessedCache, MultithreadedCache
+    DataCache, DataClassWeights, DataDiskCache, DataEpochCursor,
+    DataGenerator, DataNANMask, DataSoftTargets, MultiprocessedCache,
+    MultithreadedCache
 )
 
 LOGGER = logging.getLogger('slice_lid.data')
 
+# Datasets that were already loaded by this process: { path : IDataLoader }
+DATA_LOADER_CACHE = {}
+
+# Transformed and shuffled datasets: { (path, seed, ...) : IDataLoader }
+SHUFFLED_DATA_LOADER_CACHE = {}
+
+# Configuration options that define the transformed and shuffled dataset
+SHUFFLED_DATASET_OPTIONS = (
+    'data_mods', 'dataset', 'root_datadir', 'seed', 'var_target_iscc',
+    'var_target_pdg',
+)
+
+def load_data_loader(fname):
+    """Load dataset from `fname` reusing an already loaded copy if possible.
+
+    Parsing of a large dataset may take a substantial amount of time. This
+    function keeps every loaded dataset in the `DATA_LOADER_CACHE`, such that
+    subsequent trainings in the same process (or in processes forked from it)
+    can reuse it instead of loading the dataset again.
+
+    Parameters
+    ----------
+    fname : str
+        File path from which dataset will be loaded.
+
+    Returns
+    -------
+    IDataLoader
+        DataLoader of the dataset.
+
+    See Also
+    --------
+    preload_dataset
+    """
+
+    key = os.path.realpath(fname)
+
+    if key not in DATA_LOADER_CACHE:
+        DATA_LOADER_CACHE[key] = guess_data_loader(fname)
+    else:
+        LOGGER.debug("Reusing already loaded dataset %s", fname)
+
+    return DATA_LOADER_CACHE[key]
+
+def preload_dataset(fname):
+    """Load dataset `fname` into the `DATA_LOADER_CACHE`.
+
+    This function is intended to be called before forking training processes,
+    so that all of them share a single copy-on-write copy of the dataset.
+    """
+    LOGGER.info("Preloading dataset %s", fname)
+    load_data_loader(fname)
+
+def clear_data_loader_cache():
+    """Drop all datasets held in the data loader caches"""
+    DATA_LOADER_CACHE.clear()
+    SHUFFLED_DATA_LOADER_CACHE.clear()
+
+def load_shuffled_data_loader(fname, seed, data_mods, var_pdg, var_iscc):
+    """Load dataset, apply `data_mods` transformations and shuffle it.
+
+    Calculation of the transformed and shuffled index of a large dataset
+    takes a noticeable amount of time. This function memoizes the resulting
+    DataLoader in the `SHUFFLED_DATA_LOADER_CACHE`, so that multiple
+    trainings (e.g. folds of the k-fold cross-validation) that differ only
+    by the train/test split can reuse it.
+
+    The loaded dataset is decorated by `DataRowId`, such that the original
+    dataset rows of the samples can be recovered from the `VAR_ROW_ID`
+    variable.
+
+    Parameters
+    ----------
+    C.f. `construct_data_loader`.
+
+    Returns
+    -------
+    IDataLoader
+        Transformed and shuffled DataLoader.
+    """
+
+    key = (
+        os.path.realpath(fname), seed,
+        json.dumps(data_mods, sort_keys = True), var_pdg, var_iscc
+    )
+
+    if key not in SHUFFLED_DATA_LOADER_CACHE:
+        data_loader = DataRowId(load_data_loader(fname))
+        data_loader = add_data_modifiers(
+            data_loader, data_mods, seed, var_pdg, var_iscc
+        )
+        SHUFFLED_DATA_LOADER_CACHE[key] = DataShuffle(data_loader, seed)
+
+    return SHUFFLED_DATA_LOADER_CACHE[key]
+
+def preload_search_dataset(config, search_space):
+    """Load dataset of the `search_space` trainings once, before forking them.
+
+    The dataset is always loaded into the `DATA_LOADER_CACHE`. If none of the
+    `search_space` entries modifies `SHUFFLED_DATASET_OPTIONS`, then the
+    transformed and shuffled dataset is built once in the
+    `SHUFFLED_DATA_LOADER_CACHE` as well, such that the forked trainings do
+    not need to rebuild it.
+
+    Parameters
+    ----------
+    config : dict
+        Base training configuration.
+    search_space : list of dict
+        List of extra kwargs of each training.
+
+    See Also
+    --------
+    preload_dataset
+    load_shuffled_data_loader
+    """
+
+    datadir = config.get('root_datadir', None) or ROOT_DATADIR
+    fname   = os.path.join(datadir, config['dataset'])
+
+    preload_dataset(fname)
+
+    if any(
+        (k in extra_kwargs)
+            for extra_kwargs in search_space
+            for k in SHUFFLED_DATASET_OPTIONS
+    ):
+        return
+
+    seed = config.get('seed', None)
+
+    LOGGER.info("Preloading shuffled dataset %s", fname)
+    load_shuffled_data_loader(
+        fname, DEF_SEED if seed is None else seed,
+        config.get('data_mods', None),
+        config['var_target_pdg'], config['var_target_iscc']
+    )
+
+def kfold_split(data_loader, k, fold):
+    """Split `data_loader` into train/test parts of the k-fold validation.
+
+    `data_loader` is split into `k` contiguous folds of (almost) equal size.
+    The fold with index `fold` becomes the test part, and the remaining folds
+    form the train part.
+
+    Parameters
+    ----------
+    data_loader : IDataLoader
+        DataLoader to be split.
+    k : int
+        Number of folds.
+    fold : int
+        Index of the test fold. 0 <= `fold` < `k`.
+
+    Returns
+    -------
+    [ IDataLoader, IDataLoader ]
+        A list of train and test DataLoaders.
+    """
+
+    if not 0 <= fold < k:
+        raise ValueError("Fold index %d is out of range [0, %d)" % (fold, k))
+
+    folds = np.array_split(np.arange(len(data_loader)), k)
+
+    train_index = np.concatenate(folds[:fold] + folds[fold+1:])
+    test_index  = folds[fold]
+
+    return [
+        DataSlice(data_loader, train_index), DataSlice(data_loader, test_index)
+    ]
+
 def construct_data_loader(
-    fname, seed, test_size, data_mods, var_pdg, var_iscc
+    fname, seed, test_size, data_mods, var_pdg, var_iscc, kfold = None
 ):
     """Load dataset, transform/shuffle it and split into train/test parts.
 
@@ -39,6 +220,10 @@ def construct_data_loader(
     var_iscc : str
         Name of the variable in `data_loader` that indicates whether event
         is Charged Current Event.
+    kfold : dict or None, optional
+        If not None, then the dataset will be split into train/test parts
+        according to the k-fold specification { 'k' : K, 'fold' : FOLD }
+        and `test_size` will be ignored. C.f. `kfold_split`. Default: None.
 
     Returns
     -------
@@ -47,17 +232,20 @@ def construct_data_loader(
 
     See Also
     --------
+    load_shuffled_data_loader
     add_data_modifiers
     train_test_split
+    kfold_split
     slice_lid.args.Config
     DataShuffle
     """
 
-    data_loader = guess_data_loader(fname)
-    data_loader = add_data_modifiers(
-        data_loader, data_mods, seed, var_pdg, var_iscc
+    data_loader = load_shuffled_data_loader(
+        fname, seed, data_mods, var_pdg, var_iscc
     )
-    data_loader = DataShuffle(data_loader, seed)
+
+    if kfold is not None:
+        return kfold_split(data_loader, kfold['k'], kfold['fold'])
 
     return train_test_split(data_loader, test_size)
 
@@ -201,6 +389,80 @@ def add_disk_cache_decorators(dgen_list, disk_cache, **kwargs):
             for idx,dgen in enumerate(dgen_list)
     ]
 
+def add_class_weights_decorators(dgen_list, class_weights):
+    """Add class weights decorators to the DataGenerators from `dgen_list`.
+
+    Parameters
+    ----------
+    dgen_list : list of IDataGenerator
+        A list of DataGenerators to be decorated.
+    class_weights : { 'equal', None }
+        Name of the class weights to use. If None, this function will
+        return `dgen_list` unmodified.
+
+    Returns
+    -------
+    list of IDataGenerator
+        DataGenerators from `dgen_list` decorated by `DataClassWeights`
+        decorators.
+
+    Notes
+    -----
+    `DataClassWeights` finds sample classes from the batch targets. Hence,
+    it must be applied before the decorators that modify targets, e.g.
+    `DataSoftTargets`, such that the class weights are calculated from the
+    true targets.
+
+    See Also
+    --------
+    DataClassWeights
+    """
+
+    if class_weights is None:
+        return dgen_list
+
+    return [ DataClassWeights(dgen, class_weights) for dgen in dgen_list ]
+
+def add_soft_targets_decorator(dgen, distillation, batch_size, **kwargs):
+    """Blend targets of the train DataGenerator `dgen` with soft targets.
+
+    Parameters
+    ----------
+    dgen : IDataGenerator
+        Train DataGenerator to be decorated.
+    distillation : dict or None
+        Distillation configuration. C.f. `slice_lid.args.Config`.
+        If None, this function will return `dgen` unmodified.
+    batch_size : int
+        Batch size of `dgen`.
+    **kwargs : dict
+        Dictionary that uniquely specifies samples of `dgen`.
+        C.f. `slice_lid.eval.soft_targets.load_soft_targets`.
+
+    Returns
+    -------
+    IDataGenerator
+        `dgen` decorated by the `DataSoftTargets` decorator.
+
+    See Also
+    --------
+    DataSoftTargets
+    """
+
+    if distillation is None:
+        return dgen
+
+    # pylint: disable=import-outside-toplevel
+    from slice_lid.eval.soft_targets import load_soft_targets
+
+    soft_targets = load_soft_targets(
+        distillation['teacher'], dgen.data_loader, **kwargs
+    )
+
+    return DataSoftTargets(
+        dgen, soft_targets, distillation.get('alpha', 0.5), batch_size
+    )
+
 def create_basic_data_generators(
     datadir              = None,
     dataset              = None,
@@ -215,6 +477,12 @@ def create_basic_data_generators(
     var_target_pdg       = None,
     var_target_iscc      = None,
     disk_cache           = True,
+    val_size             = None,
+    kfold                = None,
+    bucket_window        = None,
+    prong_lengths        = False,
+    distillation         = None,
+    class_weights        = None,
 ):
     """
     Load dataset, shuffle, and create train/test DataGenerators.
@@ -255,24 +523,53 @@ def create_basic_data_generators(
     var_target_iscc : str
         Name of the variable that specifies whether given event was a Charged
         Current event.
+    disk_cache : bool
+        Specifies whether to cache train/test batches on disk.
+        C.f. `add_disk_cache_decorators`.
+    val_size : int or float or None, optional
+        If not None, then an additional validation DataGenerator will be
+        created from a stratified subsample of the test part of size
+        `val_size`. C.f. `StratifiedSampler`. Default: None.
+    kfold : dict or None, optional
+        k-fold split specification. C.f. `construct_data_loader`.
+        Default: None.
+    bucket_window : int or None, optional
+        If not None, then the train samples will be sorted by their number
+        of 3D prongs within windows of `bucket_window` samples.
+        C.f. `LengthBucketing`. Default: None.
+    prong_lengths : bool, optional
+        Whether to generate numbers of 3D prongs as an additional input.
+        C.f. `DataGenerator`. Default: False.
+    distillation : dict or None, optional
+        If not None, then targets of the train DataGenerator will be blended
+        with soft targets of a teacher network. C.f. `slice_lid.args.Config`
+        and `add_soft_targets_decorator`. Default: None.
+    class_weights : { 'equal',  None }, optional
+        Name of the class weights to use. C.f. `slice_lid.args.Config` and
+        `add_class_weights_decorators`. Default: None.
 
     Returns
     -------
-    [ DataGenerator, DataGenerator ]
-        Train and test DataGenerators.
+    [ DataGenerator, DataGenerator ] or
+    [ DataGenerator, DataGenerator, DataGenerator ]
+        Train and test DataGenerators, followed by the validation
+        DataGenerator if `val_size` is not None.
 
     See Also
     --------
     slice_lid.args.Config
     construct_data_loader
     DataGenerator
+    LengthBucketing
+    StratifiedSampler
     add_disk_cache_decorators
     """
 
     LOGGER.info("Loading %s dataset from %s.", dataset, datadir)
     path = os.path.join(datadir, dataset)
     data_loader_list = construct_data_loader(
-        path, seed, test_size, data_mods, var_target_pdg, var_target_iscc
+        path, seed, test_size, data_mods, var_target_pdg, var_target_iscc,
+        kfold
     )
 
     LOGGER.info(
@@ -281,32 +578,67 @@ def create_basic_data_generators(
         + "    max prongs   : %s\n" % (max_prongs)
         + "    seed         : %s\n" % (seed)
         + "    test size    : %s\n" % (test_size)
+        + "    k-fold       : %s\n" % (kfold)
+        + "    bucket size  : %s\n" % (bucket_window)
     )
 
+    if val_size is not None:
+        LOGGER.info("Selecting validation subsample of size %s", val_size)
+        data_loader_list.append(StratifiedSampler(
+            data_loader_list[1], var_target_pdg, var_target_iscc,
+            target_pdg_iscc_list, val_size, seed
+        ))
+
+    if (bucket_window is not None) and (vars_input_png3d is not None):
+        data_loader_list[0] = LengthBucketing(
+            data_loader_list[0], vars_input_png3d[0], bucket_window
+        )
+
     dgen_list = [
         DataGenerator(
             x, batch_size, max_prongs, target_pdg_iscc_list,
             vars_input_slice, vars_input_png3d,
-            var_target_pdg, var_target_iscc
+            var_target_pdg, var_target_iscc, prong_lengths
         )
         for x in data_loader_list
     ]
 
-    return add_disk_cache_decorators(
-        dgen_list, disk_cache,
-        datadir              = datadir,
-        dataset              = dataset,
-        batch_size           = batch_size,
-        max_prongs           = max_prongs,
-        seed                 = seed,
-        test_size            = test_size,
-        target_pdg_iscc_list = target_pdg_iscc_list,
-        vars_input_slice     = vars_input_slice,
-        vars_input_png3d     = vars_input_png3d,
-        var_target_pdg       = var_target_pdg,
-        var_target_iscc      = var_target_iscc,
+    disk_cache_kwargs = {
+        'datadir'              : datadir,
+        'dataset'              : dataset,
+        'batch_size'           : batch_size,
+        'max_prongs'           : max_prongs,
+        'seed'                 : seed,
+        'test_size'            : test_size,
+        'target_pdg_iscc_list' : target_pdg_iscc_list,
+        'vars_input_slice'     : vars_input_slice,
+        'vars_input_png3d'     : vars_input_png3d,
+        'var_target_pdg'       : var_target_pdg,
+        'var_target_iscc'      : var_target_iscc,
+    }
+
+    if kfold is not None:
+        disk_cache_kwargs['kfold'] = kfold
+
+    if bucket_window is not None:
+        disk_cache_kwargs['bucket_window'] = bucket_window
+
+    if prong_lengths:
+        disk_cache_kwargs['prong_lengths'] = prong_lengths
+
+    dgen_list[:2] = add_disk_cache_decorators(
+        dgen_list[:2], disk_cache, **disk_cache_kwargs
+    )
+
+    dgen_list = add_class_weights_decorators(dgen_list, class_weights)
+
+    dgen_list[0] = add_soft_targets_decorator(
+        dgen_list[0], distillation, part = 0, data_mods = data_mods,
+        **disk_cache_kwargs
     )
 
+    return dgen_list
+
 def create_data_generators(
     datadir              = None,
     dataset              = None,
@@ -325,6 +657,12 @@ def create_data_generators(
     disk_cache           = True,
     concurrency          = None,
     workers              = 1,
+    val_size             = None,
+    steps_per_epoch      = None,
+    kfold                = None,
+    bucket_window        = None,
+    prong_lengths        = False,
+    distillation         = None,
 ):
     """
     Construct train/test DataGenerators from a dataset.
@@ -378,11 +716,35 @@ def create_data_generators(
     workers : int or None
         Number of parallel threads/processes to use for precomputing batches.
         C.f. `add_cache_decorators`.
+    val_size : int or float or None, optional
+        If not None, then an additional validation DataGenerator over a
+        stratified subsample of the test part will be created.
+        C.f. `create_basic_data_generators`. Default: None.
+    steps_per_epoch : int or None, optional
+        If not None, then the train DataGenerator will be limited to
+        `steps_per_epoch` batches per epoch, and consecutive epochs will
+        continue iteration over batches where the previous epoch stopped.
+        C.f. `DataEpochCursor`. Default: None.
+    kfold : dict or None, optional
+        k-fold split specification. C.f. `construct_data_loader`.
+        Default: None.
+    bucket_window : int or None, optional
+        Size of the window to sort train samples by number of 3D prongs in.
+        C.f. `create_basic_data_generators`. Default: None.
+    prong_lengths : bool, optional
+        Whether to generate numbers of 3D prongs as an additional input.
+        C.f. `DataGenerator`. Default: False.
+    distillation : dict or None, optional
+        If not None, then targets of the train DataGenerator will be blended
+        with soft targets of a teacher network. C.f. `slice_lid.args.Config`
+        and `add_soft_targets_decorator`. Default: None.
 
     Returns
     -------
-    [ DataGenerator, DataGenerator ]
-        Train and test DataGenerators.
+    [ DataGenerator, DataGenerator ] or
+    [ DataGenerator, DataGenerator, DataGenerator ]
+        Train and test DataGenerators, followed by the validation
+        DataGenerator if `val_size` is not None.
 
     See Also
     --------
@@ -394,15 +756,15 @@ def create_data_generators(
     dgen_list = create_basic_data_generators(
         datadir, dataset, data_mods, batch_size, max_prongs, seed, test_size,
         target_pdg_iscc_list, vars_input_slice, vars_input_png3d,
-        var_target_pdg, var_target_iscc, disk_cache
+        var_target_pdg, var_target_iscc, disk_cache, val_size, kfold,
+        bucket_window, prong_lengths, distillation, class_weights
     )
 
-    if class_weights is not None:
-        dgen_list = [
-            DataClassWeights(dgen, class_weights) for dgen in dgen_list
-        ]
-
     dgen_list = add_cache_decorators(dgen_list, cache, concurrency, workers)
+
+    if steps_per_epoch is not None:
+        dgen_list[0] = DataEpochCursor(dgen_list[0], steps_per_epoch, seed)
+
     dgen_list = [ DataNANMask(x) for x in dgen_list ]
 
     # pylint: disable = import-outside-toplevel
@@ -411,12 +773,31 @@ def create_data_generators(
 
     return dgen_list
 
-def load_data(args):
+def get_distillation(args):
+    """Get distillation configuration with the resolved teacher directory"""
+    if args.distillation is None:
+        return None
+
+    return {
+        **args.distillation,
+        'teacher' : os.path.join(
+            args.root_outdir, args.distillation['teacher']
+        ),
+    }
+
+def load_data(args, val = False):
     """
     Wrapper around `create_data_generators` that unpacks arguments from `args`.
+
+    If `val` is True, then a list [ train, test, val ] of DataGenerators will
+    be returned, where val is a DataGenerator over a stratified subsample of
+    the test part of size `args.val_size` (or the test DataGenerator itself if
+    `args.val_size` is None). Otherwise, a list [ train, test ] is returned.
     """
 
-    return create_data_generators(
+    val_size = args.val_size if val else None
+
+    dgen_list = create_data_generators(
         datadir              = args.root_datadir,
         dataset              = args.dataset,
         data_mods            = args.data_mods,
@@ -434,5 +815,18 @@ def load_data(args):
         disk_cache           = args.disk_cache,
         concurrency          = args.concurrency,
         workers              = args.workers,
+        val_size             = val_size,
+        steps_per_epoch      = args.steps_per_epoch,
+        kfold                = args.kfold,
+        bucket_window        = args.bucket_window,
+        prong_lengths        = (
+            args.model['name'] in MODELS_WITH_PRONG_LENGTHS
+        ),
+        distillation         = get_distillation(args),
     )
 
+    if val and (val_size is None):
+        dgen_list.append(dgen_list[1])
+
+    return dgen_list
+
@@ -8,16 +8,20 @@ This module also defines a number of transformations that modify data batches
 produced by the `DataGenerator` (following the Decorator Pattern).
 """
 
-from .data_cache           import DataCache
-from .data_disk_cache      import DataDiskCache
-from .data_generator       import DataGenerator
-from .data_nan_mask        import DataNANMask
-from .data_class_weights   import DataClassWeights
-from .multiprocessed_cache import MultiprocessedCache
-from .multithreaded_cache  import MultithreadedCache
+from .data_cache            import DataCache
+from .data_disk_cache       import DataDiskCache
+from .data_ensemble_targets import DataEnsembleTargets
+from .data_epoch_cursor     import DataEpochCursor
+from .data_generator        import DataGenerator
+from .data_nan_mask         import DataNANMask
+from .data_shard            import DataShard
+from .data_soft_targets     import DataSoftTargets
+from .data_class_weights    import DataClassWeights
+from .multiprocessed_cache  import MultiprocessedCache
+from .multithreaded_cache   import MultithreadedCache
 
 __all__ = [
-    'DataCache', 'DataDiskCache', 'DataGenerator', 'DataClassWeights',
-    'MultiprocessedCache', 'MultithreadedCache', 'DataNANMask'
+    'DataCache', 'DataDiskCache', 'DataEnsembleTargets', 'DataEpochCursor',
+    'DataGenerator', 'DataClassWeights', 'MultiprocessedCache',
+    'MultithreadedCache', 'DataNANMask', 'DataShard', 'DataSoftTargets'
 ]
-
@@ -0,0 +1,39 @@
+"""
+A definition of a decorator that replicates targets for an ensemble model.
+"""
+
+from slice_lid.consts import ENSEMBLE_TARGET
+from .idata_decorator import IDataDecorator
+
+class DataEnsembleTargets(IDataDecorator):
+    """A decorator around `IDataGenerator` that replicates targets.
+
+    An ensemble model has a separate output for each of its towers named
+    according to the `ENSEMBLE_TARGET` template. This decorator replaces the
+    'target' entry of the target batches (and the corresponding weights) by
+    `n_towers` copies of it, one for each tower output.
+
+    Parameters
+    ----------
+    dgen : IDataGenerator
+        `IDataGenerator` to be decorated.
+    n_towers : int
+        Number of towers in the ensemble model.
+    """
+
+    def __init__(self, dgen, n_towers):
+        super(DataEnsembleTargets, self).__init__(dgen)
+        self._n_towers = n_towers
+
+    def __getitem__(self, index):
+        inputs, targets, weights = self._dgen[index]
+
+        target = targets['target']
+        weight = weights[0]
+
+        targets = {
+            ENSEMBLE_TARGET % i : target for i in range(self._n_towers)
+        }
+
+        return (inputs, targets, [ weight ] * self._n_towers)
+
@@ -0,0 +1,80 @@
+"""
+A definition of a decorator that continues batch iteration across epochs.
+"""
+
+import numpy as np
+
+from .idata_decorator import IDataDecorator
+
+class DataEpochCursor(IDataDecorator):
+    """A decorator around `IDataGenerator` that spans epochs with a cursor.
+
+    When a training epoch is limited to `steps_per_epoch` batches, `keras`
+    restarts iteration from the first batch at each epoch. Therefore, the
+    first `steps_per_epoch` batches are visited over and over again, while
+    the rest of the batches are never used.
+
+    `DataEpochCursor` exposes only `steps_per_epoch` batches per epoch, but
+    maps them onto a cursor that continues from where the previous epoch has
+    stopped. The first pass goes over the batches in their original order.
+    Once the cursor passes over all batches of the decorated object it wraps
+    around and continues with a fresh random permutation of batches.
+    Hence, every batch of the decorated object is used evenly.
+
+    Parameters
+    ----------
+    dgen : IDataGenerator
+        `IDataGenerator` to be decorated.
+    steps_per_epoch : int
+        Number of batches in a single epoch.
+    seed : int or None, optional
+        Seed used to generate batch permutations. Default: None.
+
+    Notes
+    -----
+    The cursor is advanced by the `on_epoch_end` callback, that is called by
+    `keras` at the end of each epoch.
+    """
+
+    def __init__(self, dgen, steps_per_epoch, seed = None):
+        super(DataEpochCursor, self).__init__(dgen)
+
+        self._steps = max(1, min(steps_per_epoch, len(dgen)))
+        self._seed  = 0 if seed is None else seed
+        self._epoch = 0
+        self._perms = {}
+
+    @property
+    def epoch(self):
+        """Index of the current epoch"""
+        return self._epoch
+
+    def _get_permutation(self, cycle):
+        """Return permutation of batch indices for a pass `cycle`"""
+        if cycle == 0:
+            return np.arange(len(self._dgen))
+
+        if cycle not in self._perms:
+            prg = np.random.RandomState((self._seed, cycle))
+            self._perms = {
+                k : v for (k, v) in self._perms.items() if k >= cycle - 1
+            }
+            self._perms[cycle] = prg.permutation(len(self._dgen))
+
+        return self._perms[cycle]
+
+    def on_epoch_end(self):
+        self._epoch += 1
+        super(DataEpochCursor, self).on_epoch_end()
+
+    def __len__(self):
+        return self._steps
+
+    def __getitem__(self, index):
+        n_batches = len(self._dgen)
+        position  = self._epoch * self._steps + index
+
+        cycle, pos = divmod(position, n_batches)
+
+        return self._dgen[int(self._get_permutation(cycle)[pos])]
+
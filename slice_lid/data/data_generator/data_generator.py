@@ -7,6 +7,7 @@ import numpy as np
 
 from lstm_ee.data.data_generator.funcs.funcs_varr import unpack_varr_arrays
 
+from .funcs_packed    import pack_varr_arrays, pad_packed_arrays
 from .idata_generator import IDataGenerator
 
 class DataGenerator(IDataGenerator):
@@ -42,6 +43,9 @@ class DataGenerator(IDataGenerator):
     var_target_iscc : str
         Name of the variable that specifies whether given event was a Charged
         Current event.
+    prong_lengths : bool, optional
+        If True, then the number of 3D prongs of each sample will be
+        generated as an additional 'input_png3d_len' input. Default: False.
 
     See Also
     --------
@@ -59,6 +63,7 @@ class DataGenerator(IDataGenerator):
         vars_input_png3d     = None,
         var_target_pdg       = None,
         var_target_iscc      = None,
+        prong_lengths        = False,
     ):
         super(DataGenerator, self).__init__()
 
@@ -71,6 +76,7 @@ class DataGenerator(IDataGenerator):
         self._vars_input_slice     = vars_input_slice
         self._var_target_pdg       = var_target_pdg
         self._var_target_iscc      = var_target_iscc
+        self._prong_lengths        = prong_lengths
 
         self._weights = np.ones(len(self._data_loader))
 
@@ -134,6 +140,31 @@ class DataGenerator(IDataGenerator):
 
         return result
 
+    def get_packed_varr_data(self, variables, index, max_prongs = None):
+        """Generate batch of variable length arrays data with their lengths.
+
+        Parameters
+        ----------
+        C.f. `DataGenerator.get_varr_data`.
+
+        Returns
+        -------
+        (ndarray, ndarray)
+            Pair of a padded batch of shape (N_SAMPLE, N_VARR, len(variables))
+            like the one returned by `get_varr_data`, and the lengths of the
+            variable length arrays of shape (N_SAMPLE, 1).
+
+        See Also
+        --------
+        pack_varr_arrays
+        pad_packed_arrays
+        """
+        values, lengths = pack_varr_arrays(
+            self._data_loader, variables, index, max_prongs
+        )
+
+        return (pad_packed_arrays(values, lengths), lengths.reshape((-1, 1)))
+
     def get_target_data(self, index):
         """Generate batch of targets according to self.target_pdg_iscc_list
 
@@ -197,9 +228,15 @@ class DataGenerator(IDataGenerator):
             )
 
         if self._vars_input_png3d is not None:
-            inputs['input_png3d'] = self.get_varr_data(
-                self._vars_input_png3d, index, self._max_prongs
-            )
+            if self._prong_lengths:
+                inputs['input_png3d'], inputs['input_png3d_len'] = \
+                    self.get_packed_varr_data(
+                        self._vars_input_png3d, index, self._max_prongs
+                    )
+            else:
+                inputs['input_png3d'] = self.get_varr_data(
+                    self._vars_input_png3d, index, self._max_prongs
+                )
 
         targets['target'] = self.get_target_data(index)
 
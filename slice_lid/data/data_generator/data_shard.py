@@ -0,0 +1,42 @@
+"""
+A definition of a decorator that selects a disjoint shard of batches.
+"""
+
+from .idata_decorator import IDataDecorator
+
+class DataShard(IDataDecorator):
+    """A decorator around `IDataGenerator` that selects a shard of batches.
+
+    The batches of the decorated object are dealt out between `n_shards`
+    shards in a round-robin fashion, such that the shard `shard` consists of
+    batches [ shard, shard + n_shards, shard + 2 * n_shards, ... ].
+    All shards have equal length. Therefore, up to `n_shards` - 1 trailing
+    batches of the decorated object are not used by any shard.
+
+    Parameters
+    ----------
+    dgen : IDataGenerator
+        `IDataGenerator` to be decorated.
+    shard : int
+        Index of the shard to select. 0 <= `shard` < `n_shards`.
+    n_shards : int
+        Total number of shards.
+    """
+
+    def __init__(self, dgen, shard, n_shards):
+        super(DataShard, self).__init__(dgen)
+
+        if not 0 <= shard < n_shards:
+            raise ValueError(
+                "Shard index %d is out of range [0, %d)" % (shard, n_shards)
+            )
+
+        self._shard    = shard
+        self._n_shards = n_shards
+
+    def __len__(self):
+        return len(self._dgen) // self._n_shards
+
+    def __getitem__(self, index):
+        return self._dgen[index * self._n_shards + self._shard]
+
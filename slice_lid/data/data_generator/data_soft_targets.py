@@ -0,0 +1,50 @@
+"""
+A definition of a decorator that blends targets with teacher soft targets.
+"""
+
+from .idata_decorator import IDataDecorator
+
+class DataSoftTargets(IDataDecorator):
+    """A decorator around `IDataGenerator` that blends in soft targets.
+
+    This decorator replaces the 'target' batches by a blend
+        (1 - `alpha`) * TARGET + `alpha` * SOFT_TARGET,
+    where SOFT_TARGET are the target scores predicted by a teacher network.
+    Since the categorical cross-entropy is linear in targets, training on
+    the blended targets is equivalent to training on a weighted sum of the
+    hard and soft target losses.
+
+    Parameters
+    ----------
+    dgen : IDataGenerator
+        `IDataGenerator` to be decorated. Its i-th batch is expected to hold
+        samples [ i * `batch_size`, (i + 1) * `batch_size` ) of its
+        `data_loader`.
+    soft_targets : ndarray, shape (len(dgen.data_loader), N_TARGET)
+        Soft targets of `dgen.data_loader` samples.
+    alpha : float
+        Weight of the soft targets.
+    batch_size : int
+        Batch size of `dgen`.
+    """
+
+    def __init__(self, dgen, soft_targets, alpha, batch_size):
+        super(DataSoftTargets, self).__init__(dgen)
+
+        self._soft_targets = soft_targets
+        self._alpha        = alpha
+        self._batch_size   = batch_size
+
+    def __getitem__(self, index):
+        inputs, targets, weights = self._dgen[index]
+
+        start = index * self._batch_size
+        soft  = self._soft_targets[start:start + len(targets['target'])]
+
+        targets = dict(targets)
+        targets['target'] = (
+            (1 - self._alpha) * targets['target'] + self._alpha * soft
+        )
+
+        return (inputs, targets, weights)
+
@@ -0,0 +1,97 @@
+"""
+Functions to batch variable length arrays in a packed (CSR-like) form.
+
+A batch of variable length arrays is represented by a pair of arrays:
+`values` of shape (N_TOTAL, N_VARS) holding the elements of all samples
+concatenated together, and `lengths` of shape (N_SAMPLE,) holding the number
+of elements of each sample.
+"""
+
+import numpy as np
+
+def calc_varr_lengths(data_loader, var, index):
+    """Calculate lengths of the variable length arrays of `var`"""
+    values = data_loader.get(var, index)
+    return np.fromiter(
+        (len(x) for x in values), dtype = np.int32, count = len(values)
+    )
+
+def pack_varr_arrays(data_loader, variables, index, max_prongs = None):
+    """Pack variable length arrays of `variables` into a CSR-like form.
+
+    Parameters
+    ----------
+    data_loader : IDataLoader
+        DataLoader to retrieve values of `variables` from.
+    variables : list of str
+        Names of the variable length array variables to be packed.
+    index : int or list of int or None
+        Index that defines slice of values to be packed.
+    max_prongs : int or None, optional
+        If not None, then each sample will be truncated to its first
+        `max_prongs` elements. Default: None.
+
+    Returns
+    -------
+    (ndarray, ndarray)
+        Pair (values, lengths), where `values` has a shape
+        (N_TOTAL, len(variables)) and `lengths` has a shape (N_SAMPLE,).
+    """
+
+    lengths = calc_varr_lengths(data_loader, variables[0], index)
+    values  = np.empty((np.sum(lengths), len(variables)), dtype = np.float32)
+
+    if len(values) > 0:
+        for (idx, vname) in enumerate(variables):
+            values[:, idx] = np.concatenate(data_loader.get(vname, index))
+
+    if (max_prongs is not None) and np.any(lengths > max_prongs):
+        positions = calc_packed_positions(lengths)
+        values    = values[positions < max_prongs]
+        lengths   = np.minimum(lengths, max_prongs)
+
+    return (values, lengths)
+
+def calc_packed_positions(lengths):
+    """Calculate position of each packed element within its sample"""
+    offsets = np.cumsum(lengths) - lengths
+    return np.arange(np.sum(lengths)) - np.repeat(offsets, lengths)
+
+def pad_packed_arrays(
+    values, lengths, fill_value = np.nan, max_length = None
+):
+    """Convert packed arrays into a padded batch.
+
+    Parameters
+    ----------
+    values : ndarray, shape (N_TOTAL, N_VARS)
+        Packed values. C.f. `pack_varr_arrays`.
+    lengths : ndarray, shape (N_SAMPLE,)
+        Number of elements of each sample.
+    fill_value : float, optional
+        Value to pad samples with. Default: NaN.
+    max_length : int or None, optional
+        Length to pad samples to. It is expected to be not less than any of
+        `lengths`. If None, samples will be padded to the length of the
+        longest sample. Default: None.
+
+    Returns
+    -------
+    ndarray, shape (N_SAMPLE, max_length, N_VARS)
+        Padded batch, where the second dimension goes along the variable
+        length axis.
+    """
+
+    if max_length is None:
+        max_length = np.max(lengths) if len(lengths) > 0 else 0
+
+    result = np.full(
+        (len(lengths), max_length, values.shape[1]), fill_value,
+        dtype = values.dtype
+    )
+
+    rows = np.repeat(np.arange(len(lengths)), lengths)
+    result[rows, calc_packed_positions(lengths)] = values
+
+    return result
+
@@ -42,6 +42,9 @@ class IDataDecorator(IDataGenerator):
     def weights(self):
         return self._dgen.weights
 
+    def on_epoch_end(self):
+        self._dgen.on_epoch_end()
+
     def __len__(self):
         return len(self._dgen)
 
@@ -74,6 +74,9 @@ class IDataGenerator:
         """`np.ndarray` of sample weights, shape (len(self.data_loader),)"""
         return self._weights
 
+    def on_epoch_end(self):
+        """Notify `IDataGenerator` that a training epoch has ended"""
+
     def __len__(self):
         """Number of batches this `IDataGenerator` is capable of generating"""
         raise NotImplementedError
@@ -1,7 +1,13 @@
 """A collection of data transformations"""
 
-from .balanced_sampler import BalancedSampler
-from .data_filter      import DataFilter
+from .balanced_sampler   import BalancedSampler
+from .data_filter        import DataFilter
+from .data_row_id        import DataRowId
+from .length_bucketing   import LengthBucketing
+from .stratified_sampler import StratifiedSampler
 
-__all__ = [ 'BalancedSampler', 'DataFilter' ]
+__all__ = [
+    'BalancedSampler', 'DataFilter', 'DataRowId', 'LengthBucketing',
+    'StratifiedSampler'
+]
 
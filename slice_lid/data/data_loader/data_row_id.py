@@ -0,0 +1,40 @@
+"""Definition of a decorator that exposes indices of the dataset rows"""
+
+import numpy as np
+
+from lstm_ee.data.data_loader.data_slice import DataSlice
+
+from slice_lid.consts import VAR_ROW_ID
+
+class DataRowId(DataSlice):
+    """Decorator around `IDataLoader` that adds a row index variable.
+
+    `DataRowId` passes all the variables of the decorated object through
+    unmodified and adds a virtual variable `VAR_ROW_ID` that holds the index
+    of each sample in the decorated object. When `DataRowId` is applied
+    directly to the loaded dataset, the `VAR_ROW_ID` values survive any
+    subsequent filtering, shuffling and splitting and identify the original
+    dataset rows of the samples.
+
+    Parameters
+    ----------
+    data_loader : IDataLoader
+        DataLoader to decorate.
+    """
+
+    def __init__(self, data_loader):
+        self._data_loader = data_loader
+        self._row_ids     = np.arange(len(data_loader), dtype = np.int64)
+
+        super(DataRowId, self).__init__(data_loader, self._row_ids)
+
+    def get(self, var, index = None):
+        if var == VAR_ROW_ID:
+            if index is None:
+                return self._row_ids
+
+            return self._row_ids[index]
+
+        # Avoid a needless copy of the identity slice
+        return self._data_loader.get(var, index)
+
@@ -0,0 +1,51 @@
+"""Definition of a data reordering that groups samples of similar lengths"""
+
+import numpy as np
+
+from lstm_ee.data.data_loader.data_slice import DataSlice
+
+from slice_lid.data.data_generator.funcs_packed import calc_varr_lengths
+
+class LengthBucketing(DataSlice):
+    """
+    Decorator around `IDataLoader` that sorts samples by length in windows.
+
+    `LengthBucketing` splits the decorated object into consecutive windows
+    of `window` samples and sorts samples inside each window by the length
+    of the variable length array variable `var`. Batches generated from the
+    consecutive samples will then consist of samples of similar lengths and
+    will need much less padding. Since samples are reordered only inside
+    the windows, the order of the data on a larger scale is preserved.
+
+    Parameters
+    ----------
+    data_loader : IDataLoader
+        DataLoader to decorate.
+    var : str
+        Name of the variable length array variable in `data_loader` to
+        sort samples by.
+    window : int
+        Size of the window. It is expected to be a multiple of the batch size.
+    """
+
+    def __init__(self, data_loader, var, window):
+        self._data_loader = data_loader
+        self._var         = var
+        self._window      = window
+
+        indices = self._calc_bucketed_index()
+
+        super(LengthBucketing, self).__init__(data_loader, indices)
+
+    def _calc_bucketed_index(self):
+        """Find permutation that sorts samples by length inside windows"""
+        lengths = calc_varr_lengths(self._data_loader, self._var, None)
+        indices = np.arange(len(lengths))
+
+        for start in range(0, len(lengths), self._window):
+            window = indices[start:start + self._window]
+            order  = np.argsort(lengths[window], kind = 'stable')
+            indices[start:start + self._window] = window[order]
+
+        return indices
+
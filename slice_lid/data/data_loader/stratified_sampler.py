@@ -0,0 +1,137 @@
+"""Definition of a data subsampler that preserves target proportions"""
+
+import logging
+import numpy as np
+
+from lstm_ee.data.data_loader.data_slice import DataSlice
+
+LOGGER = logging.getLogger('slice_lid.data.data_loader.stratified_sampler')
+
+class StratifiedSampler(DataSlice):
+    """
+    Decorator around `IDataLoader` that selects a stratified subsample.
+
+    `StratifiedSampler` randomly selects a subsample of size `size` from the
+    decorated object, such that the fractions of targets in the subsample
+    match the fractions of targets in the decorated object. The non-selected
+    part of the decorated object is discarded.
+
+    Parameters
+    ----------
+    data_loader : IDataLoader
+        DataLoader to decorate.
+    var_pdg : str
+        Name of the variable in `data_loader` that holds particle PDG values.
+    var_iscc : str
+        Name of the variable in `data_loader` that indicates whether
+        interaction is a charge current interaction.
+    pdg_iscc_list : list of (int, bool)
+        List of pairs of the form
+            [ (pdg_1, iscc_1), (pdg_2, iscc_2), ..., (pdg_N, iscc_N) ]
+        that define targets to be stratified by.
+        Samples are assigned to targets following the same rules as the ones
+        used by the `DataGenerator`, i.e. sample matches pair (pdg_i, iscc_i)
+        iff (abs(pdg) == pdg_i) and (iscc == iscc_i). Samples that do not match
+        any pair are assigned to a separate target.
+    size : int or float
+        Size of the subsample. If `size` is a float and `size` < 1, then it is
+        interpreted as a fraction of the `data_loader` size. If `size` exceeds
+        the size of `data_loader` then the entire `data_loader` will be used.
+    seed : int or None
+        Seed to initialize PRG for random sampling.
+
+    See Also
+    --------
+    BalancedSampler
+    """
+
+    def __init__(
+        self, data_loader, var_pdg, var_iscc, pdg_iscc_list, size, seed
+    ):
+        self._data_loader   = data_loader
+        self._var_pdg       = var_pdg
+        self._var_iscc      = var_iscc
+        self._pdg_iscc_list = pdg_iscc_list
+        self._size          = size
+        self._seed          = seed
+
+        self._resample_index = self._calc_resample_index()
+
+        super(StratifiedSampler, self).__init__(
+            data_loader, self._resample_index
+        )
+
+    def get_complement(self):
+        """Get `DataSlice` of the decorated object samples not selected.
+
+        The complement is disjoint from the subsample, e.g. it can serve as
+        a held-out set for the parameters tuned on the subsample.
+        """
+        mask = np.ones(len(self._data_loader), dtype = bool)
+        mask[self._resample_index] = False
+
+        return DataSlice(self._data_loader, np.flatnonzero(mask))
+
+    def _calc_target_labels(self):
+        """Assign integer target label to each sample"""
+        size   = len(self._data_loader)
+        labels = np.zeros(size, dtype = int)
+
+        if size == 0:
+            return labels
+
+        pdg  = np.abs(self._data_loader.get(self._var_pdg, None))
+        iscc = self._data_loader.get(self._var_iscc, None)
+
+        for idx,(pdg_value, iscc_value) in reversed(
+            list(enumerate(self._pdg_iscc_list))
+        ):
+            labels[(pdg == pdg_value) & (iscc == iscc_value)] = idx + 1
+
+        return labels
+
+    def _calc_target_sizes(self, counts):
+        """Distribute subsample size between targets proportionally"""
+        total = np.sum(counts)
+
+        if isinstance(self._size, float) and (self._size < 1):
+            size = int(round(self._size * total))
+        else:
+            size = int(min(self._size, total))
+
+        if total == 0:
+            return np.zeros_like(counts)
+
+        exact  = size * counts / total
+        result = np.floor(exact).astype(int)
+
+        # Distribute remainder by the largest fractional parts
+        remainder = size - np.sum(result)
+        if remainder > 0:
+            order = np.argsort(-(exact - result), kind = 'stable')
+            result[order[:remainder]] += 1
+
+        return result
+
+    def _calc_resample_index(self):
+        """Find slice of a decorated object with preserved target fractions"""
+        labels = self._calc_target_labels()
+        n_targets = len(self._pdg_iscc_list) + 1
+
+        counts = np.bincount(labels, minlength = n_targets)
+        sizes  = self._calc_target_sizes(counts)
+
+        LOGGER.debug(
+            "StratifiedSampler: Target counts: %s. Selected: %s",
+            counts.tolist(), sizes.tolist()
+        )
+
+        prg     = np.random.RandomState(self._seed)
+        indices = [
+            prg.choice(np.nonzero(labels == label)[0], size, replace = False)
+                for (label, size) in enumerate(sizes)
+        ]
+
+        indices = np.sort(np.concatenate(indices).astype(int))
+
+        return indices
@@ -0,0 +1,190 @@
+"""
+Bounded memory streaming of large datasets in chunks.
+
+Unlike `load_data_loader`, that parses a whole dataset into memory, the
+functions of this module read datasets chunk by chunk, such that datasets
+of arbitrary size can be processed in a constant memory.
+"""
+
+import logging
+import queue
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+LOGGER = logging.getLogger('slice_lid.data.stream')
+
+VARR_SEP = ','
+
+def parse_varr(value):
+    """Parse a CSV cell holding a variable length array.
+
+    Cells are expected to hold values separated by `VARR_SEP`, optionally
+    enclosed in square brackets. Empty (NaN) cells are parsed into empty
+    arrays.
+    """
+    if not isinstance(value, str):
+        return np.empty(0, dtype = np.float32)
+
+    value = value.strip().strip('[]')
+
+    if not value:
+        return np.empty(0, dtype = np.float32)
+
+    return np.array(value.split(VARR_SEP), dtype = np.float32)
+
+def parse_chunk(df, varr_columns):
+    """Convert a `pandas.DataFrame` chunk into a dict of column arrays.
+
+    Columns `varr_columns` are parsed into 1D object arrays of variable
+    length arrays. C.f. `parse_varr`.
+    """
+    result = {}
+
+    for column in df.columns:
+        if column in varr_columns:
+            values = np.empty(len(df), dtype = object)
+            values[:] = [ parse_varr(x) for x in df[column].values ]
+            result[column] = values
+        else:
+            result[column] = df[column].values
+
+    return result
+
+def iter_csv_chunks(fname, columns, chunk_size):
+    """Iterate over chunks of raw (unparsed) `columns` of a CSV file.
+
+    Compressed files (e.g. ".csv.xz") are decompressed on the fly.
+
+    Yields
+    ------
+    (int, pandas.DataFrame)
+        Index of the first row of the chunk in the file, and the chunk.
+    """
+    # pylint: disable=import-outside-toplevel
+    import pandas as pd
+
+    start = 0
+
+    with pd.read_csv(
+        fname, usecols = columns, chunksize = chunk_size,
+        compression = 'infer'
+    ) as reader:
+        for df in reader:
+            yield (start, df)
+            start += len(df)
+
+def prefetch(iterable, size):
+    """Iterate over `iterable` in a background thread.
+
+    At most `size` items are read ahead, such that the memory usage stays
+    bounded regardless of the consumer speed. Exceptions raised by
+    `iterable` are reraised in the consumer thread.
+    """
+    items    = queue.Queue(maxsize = size)
+    sentinel = object()
+    stop     = threading.Event()
+
+    def producer():
+        try:
+            for item in iterable:
+                if stop.is_set():
+                    return
+                items.put((item, None))
+        except Exception as e:                # pylint: disable=broad-except
+            items.put((sentinel, e))
+            return
+
+        items.put((sentinel, None))
+
+    thread = threading.Thread(target = producer, daemon = True)
+    thread.start()
+
+    try:
+        while True:
+            item, error = items.get()
+
+            if error is not None:
+                raise error
+
+            if item is sentinel:
+                break
+
+            yield item
+    finally:
+        stop.set()
+
+        # Unblock producer waiting on a full queue
+        while thread.is_alive():
+            try:
+                items.get_nowait()
+            except queue.Empty:
+                thread.join(0.1)
+
+def iter_parsed_chunks(
+    fnames, columns, varr_columns,
+    chunk_size    = 100000,
+    workers       = None,
+    prefetch_size = 2,
+):
+    """Iterate over parsed chunks of multiple CSV files in order.
+
+    Raw chunks are read by a background thread and parsed either serially
+    or by a pool of `workers` threads. At most `prefetch_size` raw chunks
+    and `workers` parsed chunks are kept in memory at any time.
+
+    Parameters
+    ----------
+    fnames : list of str
+        Paths of CSV files to read.
+    columns : list of str
+        Columns to read.
+    varr_columns : list of str
+        Columns holding variable length arrays. C.f. `parse_varr`.
+    chunk_size : int, optional
+        Number of rows per chunk. Default: 100000.
+    workers : int or None, optional
+        If not None and greater than 1, then chunks will be parsed by a pool
+        of `workers` threads. Default: None.
+    prefetch_size : int, optional
+        Number of raw chunks to read ahead. Default: 2.
+
+    Yields
+    ------
+    (int, int, dict)
+        Index of the file in `fnames`, index of the first row of the chunk
+        in the file, and a dict { COLUMN : ARRAY } of parsed chunk values.
+    """
+    def raw_chunks():
+        for (file_idx, fname) in enumerate(fnames):
+            LOGGER.info("Reading %s", fname)
+
+            for (start, df) in iter_csv_chunks(fname, columns, chunk_size):
+                yield (file_idx, start, df)
+
+    chunks = prefetch(raw_chunks(), prefetch_size)
+
+    if (workers is None) or (workers <= 1):
+        for (file_idx, start, df) in chunks:
+            yield (file_idx, start, parse_chunk(df, varr_columns))
+
+        return
+
+    with ThreadPoolExecutor(workers) as executor:
+        pending = []
+
+        for (file_idx, start, df) in chunks:
+            pending.append((
+                file_idx, start,
+                executor.submit(parse_chunk, df, varr_columns)
+            ))
+
+            if len(pending) >= workers:
+                file_idx, start, future = pending.pop(0)
+                yield (file_idx, start, future.result())
+
+        for (file_idx, start, future) in pending:
+            yield (file_idx, start, future.result())
+
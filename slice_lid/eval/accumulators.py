@@ -0,0 +1,357 @@
+"""
+Accumulators of evaluation metrics fed by a single inference pass.
+
+Each evaluation script scores the whole test dataset on its own, such that
+making all the standard evaluation outputs requires several identical
+inference passes. `evaluate_accumulators` scores the dataset once, chunk by
+chunk, and feeds the predictions to a list of accumulators, each of which
+produces its own outputs (error matrices, plots, etc) at the end.
+"""
+
+import json
+import logging
+import os
+import time
+
+import numpy as np
+
+from lstm_ee.data.data_loader.data_slice import DataSlice
+
+from slice_lid.plot.distribution import plot_hist_distributions
+from slice_lid.plot.error_matrix import plot_error_matrix
+from slice_lid.plot.fom          import plot_separate_foms, plot_overlayed_foms
+from slice_lid.plot.labels       import convert_targets_to_labels
+from slice_lid.plot.tsne         import plot_tsne
+from slice_lid.utils.eval        import calc_reco_preds, cafplot_funcs
+
+from .error_matrix import calc_error_matrix, save_error_matrix
+from .fom          import (
+    calc_sgn_bkg_cumsums_from_hist, calc_foms, find_best_cut, FOM_SPEC_DICT
+)
+from .hist         import ScoreHistogram
+
+LOGGER = logging.getLogger('slice_lid.eval.accumulators')
+
+class IAccumulator:
+    """Interface of the evaluation metric accumulators.
+
+    Accumulators receive predictions chunk by chunk via `update` and save
+    their outputs once all chunks are seen via `finalize`.
+    """
+
+    name = None
+
+    def update(self, data_loader, truth, preds, weights):
+        """Accumulate a chunk of predictions.
+
+        Parameters
+        ----------
+        data_loader : IDataLoader or None
+            DataLoader of the chunk samples. None, if predictions are taken
+            from the `PredictionCache`.
+        truth : ndarray, shape (N_SAMPLES,)
+            Array of true targets.
+        preds : ndarray, shape (N_SAMPLES, N_TARGETS)
+            Array of predicted target scores.
+        weights : ndarray, shape (N_SAMPLES,)
+            Sample weights.
+        """
+        raise NotImplementedError
+
+    def finalize(self, labels, outdir, plotdir, ext):
+        """Save accumulated results.
+
+        Parameters
+        ----------
+        labels : list of str, len(N_TARGETS)
+            List of labels for each target.
+        outdir : str
+            Directory where results will be saved.
+        plotdir : str
+            Directory where plots will be saved.
+        ext : str or list of str
+            Extension of the plots.
+
+        Returns
+        -------
+        dict or None
+            JSON serializable summary of the results.
+        """
+        raise NotImplementedError
+
+class ArrayAccumulator(IAccumulator):
+    """Base accumulator that keeps all truth, preds and weights in memory"""
+    # pylint: disable=abstract-method
+
+    def __init__(self):
+        self._truth   = []
+        self._preds   = []
+        self._weights = []
+
+    def update(self, data_loader, truth, preds, weights):
+        self._truth  .append(truth)
+        self._preds  .append(preds)
+        self._weights.append(weights)
+
+    def get_arrays(self):
+        """Get accumulated (truth, preds, weights) arrays"""
+        return (
+            np.concatenate(self._truth),
+            np.concatenate(self._preds),
+            np.concatenate(self._weights),
+        )
+
+class ErrorMatrixAccumulator(IAccumulator):
+    """Accumulator of the error matrix. C.f. `calc_error_matrix`"""
+
+    name = 'err_mat'
+
+    def __init__(self, n_targets):
+        self._err_mat = np.zeros((n_targets, n_targets))
+
+    def update(self, data_loader, truth, preds, weights):
+        self._err_mat += calc_error_matrix(truth, preds, len(self._err_mat))
+
+    @property
+    def err_mat(self):
+        """Accumulated error matrix"""
+        return self._err_mat
+
+    def finalize(self, labels, outdir, plotdir, ext):
+        save_error_matrix(outdir, self._err_mat)
+        plot_error_matrix(self._err_mat, labels, plotdir, ext)
+
+        n_total = self._err_mat.sum()
+
+        return {
+            'n_samples' : int(n_total),
+            'accuracy'  : float(np.trace(self._err_mat) / max(n_total, 1)),
+        }
+
+class ScoreHistAccumulator(IAccumulator):
+    """Base accumulator of the histograms of predicted scores.
+
+    Memory usage of the accumulator does not depend on the number of
+    samples. C.f. `ScoreHistogram`.
+    """
+    # pylint: disable=abstract-method
+
+    def __init__(self, n_targets, bins):
+        self._score_hist = ScoreHistogram(n_targets, bins)
+
+    def update(self, data_loader, truth, preds, weights):
+        self._score_hist.update(truth, preds, weights)
+
+    @property
+    def score_hist(self):
+        """Accumulated `ScoreHistogram`"""
+        return self._score_hist
+
+class DistributionAccumulator(ScoreHistAccumulator):
+    """Accumulator of the per class score distributions.
+
+    C.f. `plot_hist_distributions`.
+    """
+
+    name = 'distrib'
+
+    def finalize(self, labels, outdir, plotdir, ext):
+        plot_hist_distributions(self._score_hist, labels, plotdir, ext)
+        return None
+
+class FOMAccumulator(ScoreHistAccumulator):
+    """Accumulator of the figures of merit of cuts on the target scores.
+
+    Besides the FOM plots, it saves the best cut of each target for each
+    FOM into "fom.json".
+    """
+
+    name = 'fom'
+
+    def finalize(self, labels, outdir, plotdir, ext):
+        sgn_bkg_cumsums = calc_sgn_bkg_cumsums_from_hist(self._score_hist)
+
+        fom_dict = {
+            k : calc_foms(sgn_bkg_cumsums, func) \
+                for k, func in FOM_SPEC_DICT.items()
+        }
+
+        for fom_label, rhist_fom_list in fom_dict.items():
+            plot_separate_foms(
+                rhist_fom_list, labels, fom_label, plotdir, ext
+            )
+
+        plot_overlayed_foms(
+            fom_dict, [ 'efficiency', 'purity', 'selection' ],
+            labels, plotdir, ext
+        )
+
+        result = {
+            fom_label : {
+                label : dict(zip(('cut', 'fom'), find_best_cut(rhist_fom)))
+                    for (label, rhist_fom) in zip(labels, rhist_fom_list)
+            }
+            for fom_label, rhist_fom_list in fom_dict.items()
+        }
+
+        with open(os.path.join(outdir, 'fom.json'), 'wt') as f:
+            json.dump(result, f, indent = 4, sort_keys = True)
+
+        return result
+
+class TSNEAccumulator(ArrayAccumulator):
+    """Accumulator of the first `limit` samples for the t-SNE embedding.
+
+    C.f. `plot_tsne`.
+    """
+
+    name = 'tsne'
+
+    def __init__(self, limit, perplexity, dims, bins):
+        super().__init__()
+        self._limit      = limit
+        self._perplexity = perplexity
+        self._dims       = dims
+        self._bins       = bins
+        self._size       = 0
+
+    def update(self, data_loader, truth, preds, weights):
+        n = min(len(truth), self._limit - self._size)
+
+        if n > 0:
+            super().update(data_loader, truth[:n], preds[:n], weights[:n])
+            self._size += n
+
+    def finalize(self, labels, outdir, plotdir, ext):
+        truth, preds, _weights = self.get_arrays()
+        plot_tsne(
+            truth, preds, labels, self._limit, self._perplexity,
+            self._dims, self._bins, plotdir, ext
+        )
+
+        return None
+
+class RecoAccumulator(IAccumulator):
+    """Accumulator of the error matrix of the conventional reco PIDs.
+
+    Results are saved into the "reco(`reco_map`)" subdirectory of `outdir`,
+    like `reco_eval_prologue` does. C.f. `calc_reco_preds`.
+    """
+
+    name = 'reco'
+
+    def __init__(self, args, reco_map = None):
+        self._args     = args
+        self._reco_map = reco_map
+        self._err_mat  = ErrorMatrixAccumulator(
+            len(args.target_pdg_iscc_list) + 1
+        )
+
+    def update(self, data_loader, truth, preds, weights):
+        reco_preds = calc_reco_preds(self._args, data_loader, self._reco_map)
+        self._err_mat.update(data_loader, truth, reco_preds, weights)
+
+    def finalize(self, labels, outdir, plotdir, ext):
+        outdir  = os.path.join(outdir, 'reco(%s)' % (self._reco_map))
+        os.makedirs(outdir, exist_ok = True)
+        plotdir = cafplot_funcs.make_plotdir(outdir)
+
+        return self._err_mat.finalize(labels, outdir, plotdir, ext)
+
+def evaluate_accumulators(
+    predictor, data_loader, weights, accumulators, chunk_size = 100000
+):
+    """Score `data_loader` once and feed predictions to `accumulators`.
+
+    Parameters
+    ----------
+    predictor : SliceLIDPredictor
+        Predictor of the model to evaluate.
+    data_loader : IDataLoader
+        DataLoader of the evaluation dataset.
+    weights : ndarray, shape (len(data_loader),)
+        Sample weights.
+    accumulators : list of IAccumulator
+        Accumulators to feed.
+    chunk_size : int or None, optional
+        Number of samples scored at once. If None, then the whole dataset
+        will be scored at once. Default: 100000.
+
+    Returns
+    -------
+    dict
+        Scoring summary: number of samples 'n_samples', time [s] 'time' and
+        throughput [1/s] 'throughput'.
+    """
+    n_samples  = len(data_loader)
+    chunk_size = chunk_size or max(n_samples, 1)
+    start      = time.perf_counter()
+
+    for chunk_start in range(0, n_samples, chunk_size):
+        index = np.arange(chunk_start, min(chunk_start + chunk_size, n_samples))
+        chunk = DataSlice(data_loader, index)
+
+        truth = predictor.calc_truth(chunk)
+        preds = predictor.predict_data_loader(chunk)
+
+        for accumulator in accumulators:
+            accumulator.update(chunk, truth, preds, weights[index])
+
+        LOGGER.info("Evaluated %d / %d samples", index[-1] + 1, n_samples)
+
+    elapsed = time.perf_counter() - start
+
+    return {
+        'n_samples'  : n_samples,
+        'time'       : elapsed,
+        'throughput' : n_samples / max(elapsed, 1e-9),
+    }
+
+def feed_accumulators(preds_cache, accumulators, chunk_size = 100000):
+    """Feed predictions `preds_cache` to `accumulators` chunk by chunk.
+
+    Unlike `evaluate_accumulators`, this function needs neither
+    the model nor the dataset. Accumulators that require samples of the
+    dataset (e.g. `RecoAccumulator`) cannot be fed by it.
+
+    Parameters
+    ----------
+    preds_cache : PredictionCache
+        Cached model predictions.
+    accumulators : list of IAccumulator
+        Accumulators to feed.
+    chunk_size : int or None, optional
+        Number of samples fed at once. If None, then all samples will be fed
+        at once. Default: 100000.
+    """
+    n_samples  = len(preds_cache)
+    chunk_size = chunk_size or max(n_samples, 1)
+
+    for chunk_start in range(0, n_samples, chunk_size):
+        index = slice(chunk_start, chunk_start + chunk_size)
+
+        for accumulator in accumulators:
+            accumulator.update(
+                None, preds_cache.truth[index], preds_cache.preds[index],
+                preds_cache.weights[index]
+            )
+
+def finalize_accumulators(accumulators, args, outdir, plotdir, ext):
+    """Save results of `accumulators`.
+
+    Returns
+    -------
+    dict
+        Dictionary { NAME : SUMMARY } of the accumulator summaries.
+    """
+    labels = convert_targets_to_labels(args.target_pdg_iscc_list)
+    result = {}
+
+    for accumulator in accumulators:
+        LOGGER.info("Finalizing '%s'", accumulator.name)
+        result[accumulator.name] = accumulator.finalize(
+            labels, outdir, plotdir, ext
+        )
+
+    return result
+
@@ -0,0 +1,195 @@
+"""
+Bounded memory scoring of large datasets with a columnar output.
+"""
+
+import json
+import logging
+import time
+
+import numpy as np
+
+from slice_lid.data.stream import iter_parsed_chunks
+from slice_lid.plot.labels import convert_targets_to_labels
+
+LOGGER = logging.getLogger('slice_lid.eval.bulk')
+
+class HDF5ScoreWriter:
+    """Writer of scores into resizable HDF5 datasets, one per column.
+
+    Parameters
+    ----------
+    path : str
+        Path of the output HDF5 file.
+    chunk_size : int, optional
+        Size of the HDF5 dataset chunks. Default: 65536.
+    compression : str or None, optional
+        HDF5 compression filter. Default: 'gzip'.
+    """
+
+    def __init__(self, path, chunk_size = 65536, compression = 'gzip'):
+        # pylint: disable=import-outside-toplevel
+        import h5py
+
+        self._file        = h5py.File(path, 'w')
+        self._chunk_size  = chunk_size
+        self._compression = compression
+        self._size        = 0
+
+    def write(self, columns):
+        """Append dict of column arrays `columns` to the output"""
+        n = len(next(iter(columns.values())))
+
+        for (name, values) in columns.items():
+            values = np.asarray(values)
+
+            if name not in self._file:
+                self._file.create_dataset(
+                    name,
+                    shape       = (0,),
+                    maxshape    = (None,),
+                    dtype       = values.dtype,
+                    chunks      = (self._chunk_size,),
+                    compression = self._compression,
+                )
+
+            dataset = self._file[name]
+            dataset.resize((self._size + n,))
+            dataset[self._size:] = values
+
+        self._size += n
+
+    def set_attrs(self, attrs):
+        """Set attributes of the output file. Values are stored as JSON."""
+        for (k, v) in attrs.items():
+            self._file.attrs[k] = json.dumps(v)
+
+    def close(self):
+        """Close output file"""
+        self._file.close()
+
+class CSVScoreWriter:
+    """Writer of scores into a CSV file"""
+
+    def __init__(self, path):
+        self._file   = open(path, 'wt')
+        self._header = False
+
+    def write(self, columns):
+        """Append dict of column arrays `columns` to the output"""
+        if not self._header:
+            self._file.write(",".join(columns) + "\n")
+            self._header = True
+
+        rows = zip(*[ np.asarray(x).tolist() for x in columns.values() ])
+        self._file.writelines(
+            ",".join(str(x) for x in row) + "\n" for row in rows
+        )
+
+    def set_attrs(self, attrs):
+        # pylint: disable=missing-function-docstring
+        # pylint: disable=unused-argument
+        # CSV files have no place for attributes
+        pass
+
+    def close(self):
+        """Close output file"""
+        self._file.close()
+
+def make_score_writer(path):
+    """Create score writer guessing output format by the `path` extension"""
+    if path.endswith('.csv'):
+        return CSVScoreWriter(path)
+
+    return HDF5ScoreWriter(path)
+
+def make_score_columns(file_idx, start, chunk, scores, labels, id_vars):
+    """Make dict of output columns of a scored chunk"""
+    n_samples = len(scores)
+    result    = {
+        'file' : np.full(n_samples, file_idx, dtype = np.int32),
+        'row'  : np.arange(start, start + n_samples, dtype = np.int64),
+    }
+
+    for vname in id_vars:
+        result[vname] = chunk[vname]
+
+    for (idx, label) in enumerate(labels):
+        result['score_' + label] = scores[:, idx]
+
+    return result
+
+def score_files(
+    predictor, fnames, writer,
+    id_vars    = None,
+    chunk_size = 100000,
+    workers    = None,
+):
+    """Score samples of CSV files `fnames` and write scores by `writer`.
+
+    Files are read in chunks of `chunk_size` rows, such that the memory
+    usage does not depend on the size of files.
+
+    Parameters
+    ----------
+    predictor : SliceLIDPredictor
+        Predictor of the model to score samples with.
+    fnames : list of str
+        Paths of the CSV files to score.
+    writer : HDF5ScoreWriter or CSVScoreWriter
+        Output writer.
+    id_vars : list of str or None, optional
+        Variables of the input files that identify events. They are copied
+        to the output. Default: None.
+    chunk_size : int, optional
+        Number of rows per chunk. Default: 100000.
+    workers : int or None, optional
+        Number of threads to parse chunks with. Default: None.
+
+    Returns
+    -------
+    dict
+        Scoring summary: numbers of scored files 'n_files' and samples
+        'n_samples', time [s] 'time' and throughput [1/s] 'throughput'.
+
+    Notes
+    -----
+    The output has the following columns: index of the input file 'file',
+    index of the row in the input file 'row', event identifiers `id_vars`,
+    and score of each target 'score_LABEL'.
+    """
+    args      = predictor.args
+    id_vars   = list(id_vars or [])
+    varr_vars = list(args.vars_input_png3d or [])
+    columns   = list(dict.fromkeys(
+        list(args.vars_input_slice or []) + varr_vars + id_vars
+    ))
+
+    labels    = convert_targets_to_labels(args.target_pdg_iscc_list)
+    n_samples = 0
+    start     = time.perf_counter()
+
+    writer.set_attrs({
+        'files'   : [ str(x) for x in fnames ],
+        'targets' : labels,
+    })
+
+    for (file_idx, row, chunk) in iter_parsed_chunks(
+        fnames, columns, varr_vars, chunk_size, workers
+    ):
+        scores = predictor.predict_columns(chunk)
+        writer.write(
+            make_score_columns(file_idx, row, chunk, scores, labels, id_vars)
+        )
+
+        n_samples += len(scores)
+        LOGGER.info("Scored %d samples", n_samples)
+
+    elapsed = time.perf_counter() - start
+
+    return {
+        'n_files'    : len(fnames),
+        'n_samples'  : n_samples,
+        'time'       : elapsed,
+        'throughput' : n_samples / max(elapsed, 1e-9),
+    }
+
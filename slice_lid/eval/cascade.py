@@ -0,0 +1,364 @@
+"""
+Two-stage cascade of a cheap and a full `slice_lid` models.
+
+The first-stage (cheap) model scores every sample, and only the samples
+which first-stage confidence (the maximum predicted score) is below a
+threshold are rescored by the second-stage (full) model. When most samples
+are confidently classified by the first stage, the cascade is much faster
+than the full model alone, while keeping its error matrix nearly intact.
+"""
+
+import logging
+import time
+
+import numpy as np
+
+from lstm_ee.data.data_loader.data_slice import DataSlice
+
+from .error_matrix import calc_error_matrix, normalize_error_matrix
+from .predictor    import SliceLIDPredictor
+
+LOGGER = logging.getLogger('slice_lid.eval.cascade')
+
+def calc_confidence(preds):
+    """Calculate confidence (maximum score) of predicted scores `preds`"""
+    return np.max(preds, axis = 1)
+
+def combine_cascade_preds(preds1, preds2, threshold):
+    """Combine first and second stage predictions of a cascade.
+
+    Parameters
+    ----------
+    preds1 : ndarray, shape (N_SAMPLES, N_TARGETS)
+        First-stage predictions.
+    preds2 : ndarray, shape (N_SAMPLES, N_TARGETS)
+        Second-stage predictions.
+    threshold : float
+        Samples with the first-stage confidence below `threshold` are taken
+        from `preds2`.
+
+    Returns
+    -------
+    (ndarray, ndarray)
+        Combined predictions and a boolean mask of samples that are scored
+        by the second stage.
+    """
+    mask   = (calc_confidence(preds1) < threshold)
+    result = np.where(mask[:, np.newaxis], preds2, preds1)
+
+    return (result, mask)
+
+def calc_threshold_scan(preds1, preds2, truth, n_targets, n_steps = 100):
+    """Calculate cascade error matrix change for a range of thresholds.
+
+    Candidate thresholds are the quantiles of the first-stage confidence,
+    such that each step sends approximately the same number of additional
+    samples to the second stage. The last threshold sends all samples to
+    the second stage.
+
+    Parameters
+    ----------
+    preds1 : ndarray, shape (N_SAMPLES, N_TARGETS)
+        First-stage predictions.
+    preds2 : ndarray, shape (N_SAMPLES, N_TARGETS)
+        Second-stage predictions.
+    truth : ndarray, shape (N_SAMPLES,)
+        True target indices.
+    n_targets : int
+        Number of targets.
+    n_steps : int, optional
+        Number of quantile steps. Default: 100.
+
+    Returns
+    -------
+    dict
+        Dictionary with arrays of 'threshold', fraction of samples scored
+        by the second stage 'fraction_stage2', and maximum absolute
+        difference 'max_delta' between the cascade error matrix and the
+        second-stage error matrix (both normalized by truth).
+    """
+    err_mat_ref = normalize_error_matrix(
+        calc_error_matrix(truth, preds2, n_targets)
+    )
+
+    thresholds = np.unique(np.quantile(
+        calc_confidence(preds1), np.linspace(0, 1, n_steps + 1)
+    ))
+    # Scores do not exceed 1, so the last threshold routes every sample
+    thresholds = np.append(thresholds, np.nextafter(1, 2))
+
+    fraction  = np.zeros(len(thresholds))
+    max_delta = np.zeros(len(thresholds))
+
+    for (idx, threshold) in enumerate(thresholds):
+        preds, mask = combine_cascade_preds(preds1, preds2, threshold)
+        err_mat     = normalize_error_matrix(
+            calc_error_matrix(truth, preds, n_targets)
+        )
+
+        fraction[idx]  = np.mean(mask)
+        max_delta[idx] = np.max(np.abs(
+            np.nan_to_num(err_mat) - np.nan_to_num(err_mat_ref)
+        ))
+
+    return {
+        'threshold'       : thresholds,
+        'fraction_stage2' : fraction,
+        'max_delta'       : max_delta,
+    }
+
+def select_threshold(scan, max_delta):
+    """Select the lowest threshold with error matrix change below `max_delta`.
+
+    The change of the error matrix is not necessarily monotonic in the
+    threshold, therefore the selected threshold is the lowest one such that
+    it and all the higher thresholds satisfy the `max_delta` constraint.
+
+    Parameters
+    ----------
+    scan : dict
+        Threshold scan. C.f. `calc_threshold_scan`.
+    max_delta : float
+        Maximum allowed absolute change of any element of the normalized
+        error matrix.
+
+    Returns
+    -------
+    float
+        Selected threshold.
+    """
+    passed = (scan['max_delta'] <= max_delta)
+
+    # Index of the first threshold after the last failing one
+    failed = np.flatnonzero(~passed)
+    index  = 0 if len(failed) == 0 else (failed[-1] + 1)
+
+    return float(scan['threshold'][min(index, len(passed) - 1)])
+
+class CascadePredictor:
+    """Two-stage cascade of `SliceLIDPredictor` scorers.
+
+    `CascadePredictor` mimics the scoring interface of `SliceLIDPredictor`
+    (`predict_data_loader`, `calc_truth`, `n_targets`), so it can be used in
+    place of a single model predictor.
+
+    Parameters
+    ----------
+    stage1 : SliceLIDPredictor
+        Predictor of the cheap first-stage model that scores all samples.
+    stage2 : SliceLIDPredictor
+        Predictor of the full second-stage model that rescores samples with
+        a low first-stage confidence.
+    threshold : float
+        Samples with the first-stage confidence below `threshold` are
+        rescored by the second stage.
+
+    Raises
+    ------
+    ValueError
+        If the two stages predict different targets.
+    """
+
+    def __init__(self, stage1, stage2, threshold):
+        targets1 = [ tuple(x) for x in stage1.args.target_pdg_iscc_list ]
+        targets2 = [ tuple(x) for x in stage2.args.target_pdg_iscc_list ]
+
+        if targets1 != targets2:
+            raise ValueError(
+                "Cascade stages predict different targets: %s vs %s" % (
+                    targets1, targets2
+                )
+            )
+
+        self._stage1    = stage1
+        self._stage2    = stage2
+        self._threshold = threshold
+
+    @staticmethod
+    def from_savedirs(savedir1, savedir2, threshold, **kwargs):
+        """Load models saved under `savedir1` and `savedir2` into a cascade.
+
+        `kwargs` will be passed to the `SliceLIDPredictor` constructors.
+        """
+        return CascadePredictor(
+            SliceLIDPredictor.from_savedir(savedir1, **kwargs),
+            SliceLIDPredictor.from_savedir(savedir2, **kwargs),
+            threshold
+        )
+
+    @property
+    def stage1(self):
+        """Predictor of the first stage"""
+        return self._stage1
+
+    @property
+    def stage2(self):
+        """Predictor of the second stage"""
+        return self._stage2
+
+    @property
+    def threshold(self):
+        """First-stage confidence threshold"""
+        return self._threshold
+
+    @property
+    def args(self):
+        """Configuration of the second-stage model"""
+        return self._stage2.args
+
+    @property
+    def n_targets(self):
+        """Number of targets the cascade scores"""
+        return self._stage2.n_targets
+
+    def predict_stages(self, data_loader):
+        """Score samples of `data_loader` by the cascade.
+
+        Returns
+        -------
+        (ndarray, ndarray)
+            Predicted target scores of shape (len(data_loader), N_TARGETS)
+            and a boolean mask of samples scored by the second stage.
+        """
+        preds = self._stage1.predict_data_loader(data_loader)
+        mask  = (calc_confidence(preds) < self._threshold)
+        index = np.flatnonzero(mask)
+
+        if len(index) > 0:
+            preds[index] = self._stage2.predict_data_loader(
+                DataSlice(data_loader, index)
+            )
+
+        LOGGER.debug(
+            "Cascade second stage scored %d of %d samples",
+            len(index), len(data_loader)
+        )
+
+        return (preds, mask)
+
+    def predict_data_loader(self, data_loader):
+        """Score samples of `data_loader`. C.f. `predict_stages`"""
+        return self.predict_stages(data_loader)[0]
+
+    def calc_truth(self, data_loader):
+        """Calculate true target indices of `data_loader` samples"""
+        return self._stage2.calc_truth(data_loader)
+
+def _time_call(func, *args):
+    start  = time.perf_counter()
+    result = func(*args)
+
+    return (result, time.perf_counter() - start)
+
+def evaluate_cascade(
+    stage1, stage2, data_loader_val, data_loader_test, max_delta,
+    n_steps = 100
+):
+    """Select cascade threshold on one dataset and evaluate it on another.
+
+    The threshold is selected on `data_loader_val`, while the error matrices
+    and throughputs are reported on `data_loader_test`. To avoid optimistic
+    estimates of the cascade accuracy the two datasets should be disjoint.
+
+    Parameters
+    ----------
+    stage1 : SliceLIDPredictor
+        Predictor of the first-stage model.
+    stage2 : SliceLIDPredictor
+        Predictor of the second-stage model.
+    data_loader_val : IDataLoader
+        Dataset to select the threshold on.
+    data_loader_test : IDataLoader
+        Dataset to evaluate the cascade on.
+    max_delta : float
+        Target maximum change of the normalized error matrix.
+        C.f. `select_threshold`.
+    n_steps : int, optional
+        Number of threshold scan steps. Default: 100.
+
+    Returns
+    -------
+    (CascadePredictor, dict)
+        Cascade with the selected threshold and a report with the selected
+        'threshold', threshold 'scan' on `data_loader_val`, and the test
+        results: fractions of samples handled by each stage
+        'fraction_stage1' and 'fraction_stage2', 'throughput' [1/s] of
+        the 'stage1', 'stage2' and 'cascade' scorers, overall throughput
+        'gain' of the cascade relative to the second stage alone, error
+        matrices 'err_mat' of the second stage and the cascade, and their
+        maximum absolute difference 'max_delta'.
+    """
+    # pylint: disable=too-many-locals
+    scan = calc_threshold_scan(
+        stage1.predict_data_loader(data_loader_val),
+        stage2.predict_data_loader(data_loader_val),
+        stage2.calc_truth(data_loader_val),
+        stage2.n_targets, n_steps
+    )
+    threshold = select_threshold(scan, max_delta)
+    cascade   = CascadePredictor(stage1, stage2, threshold)
+
+    n_samples = len(data_loader_test)
+    truth     = stage2.calc_truth(data_loader_test)
+
+    _,      time1 = _time_call(stage1.predict_data_loader, data_loader_test)
+    preds2, time2 = _time_call(stage2.predict_data_loader, data_loader_test)
+
+    (preds, mask), time_cascade = _time_call(
+        cascade.predict_stages, data_loader_test
+    )
+
+    err_mat_stage2  = normalize_error_matrix(
+        calc_error_matrix(truth, preds2, stage2.n_targets)
+    )
+    err_mat_cascade = normalize_error_matrix(
+        calc_error_matrix(truth, preds, stage2.n_targets)
+    )
+
+    LOGGER.info(
+        "Selected cascade threshold %.4f: %.2f%% of samples go to stage 2",
+        threshold, 100 * np.mean(mask)
+    )
+
+    report = {
+        'threshold'       : threshold,
+        'scan'            : { k : v.tolist() for (k, v) in scan.items() },
+        'n_samples_val'   : len(data_loader_val),
+        'n_samples_test'  : n_samples,
+        'fraction_stage1' : float(1 - np.mean(mask)),
+        'fraction_stage2' : float(np.mean(mask)),
+        'throughput'      : {
+            'stage1'  : n_samples / time1,
+            'stage2'  : n_samples / time2,
+            'cascade' : n_samples / time_cascade,
+        },
+        'gain'            : time2 / time_cascade,
+        'err_mat'         : {
+            'stage2'  : err_mat_stage2.tolist(),
+            'cascade' : err_mat_cascade.tolist(),
+        },
+        'max_delta'       : float(np.max(np.abs(
+            np.nan_to_num(err_mat_cascade) - np.nan_to_num(err_mat_stage2)
+        ))),
+    }
+
+    return (cascade, report)
+
+def format_cascade_report(report):
+    """Format cascade evaluation report into a human readable summary"""
+    throughput = report['throughput']
+
+    return "\n".join([
+        "Samples val / test   : %d / %d" % (
+            report['n_samples_val'], report['n_samples_test']
+        ),
+        "Threshold            : %.4f" % (report['threshold']),
+        "Fraction stage 1     : %.4f" % (report['fraction_stage1']),
+        "Fraction stage 2     : %.4f" % (report['fraction_stage2']),
+        "Throughput [1/s]     : stage1 %.0f, stage2 %.0f, cascade %.0f" % (
+            throughput['stage1'], throughput['stage2'], throughput['cascade']
+        ),
+        "Throughput gain      : %.2f" % (report['gain']),
+        "Max Err. Mat. Delta  : %.5f" % (report['max_delta']),
+    ])
+
@@ -1,17 +1,16 @@
 """Functions to calculate PID distributions"""
 
-import numpy as np
 from cafplot.rhist import RHist1D
 
-def get_truth_preds_arrays(dgen, model):
+def get_truth_preds_arrays(dgen, predictor):
     """Get true and predicted targets.
 
     Parameters
     ----------
     dgen : IDataGenerator
-        Dataset.
-    Model : keras.Model
-        Network
+        Dataset. Only its `data_loader` is used, batches are not generated.
+    predictor : SliceLIDPredictor
+        Scorer of the network.
 
     Returns
     -------
@@ -21,20 +20,10 @@ def get_truth_preds_arrays(dgen, model):
         Array of predicted target scores.
     """
 
-    accum_truth = []
-    accum_preds = []
+    truth = predictor.calc_truth(dgen.data_loader)
+    preds = predictor.predict_data_loader(dgen.data_loader)
 
-    for batch in dgen:
-        inputs  = batch[0]
-        targets = batch[1]
-
-        preds = model.predict(inputs)
-        truth = targets['target'].argmax(axis = 1).ravel()
-
-        accum_truth.append(truth)
-        accum_preds.append(preds)
-
-    return (np.hstack(accum_truth), np.vstack(accum_preds))
+    return (truth, preds)
 
 def get_sgn_bkg_preds(truth, preds, weights, truth_idx, pred_idx, **kwargs):
     """Calculate Signal and Background histograms.
@@ -75,3 +64,46 @@ def get_sgn_bkg_preds(truth, preds, weights, truth_idx, pred_idx, **kwargs):
         RHist1D.from_data(preds_bkg, weights = w_bkg, **kwargs),
     )
 
+def get_score_rhist(score_hist, truth_idx, pred_idx):
+    """Get histogram of scores of `pred_idx` of samples of `truth_idx`.
+
+    Parameters
+    ----------
+    score_hist : ScoreHistogram
+        Histograms of predicted target scores.
+    truth_idx : int
+        True target of samples.
+    pred_idx : int
+        Index of the target to get histogram of scores of.
+
+    Returns
+    -------
+    RHist1D
+        Histogram of scores.
+    """
+    return RHist1D(
+        score_hist.bins,
+        score_hist.hist  [truth_idx, pred_idx],
+        score_hist.err_sq[truth_idx, pred_idx]
+    )
+
+def get_sgn_bkg_rhists(score_hist, truth_idx, pred_idx):
+    """Get Signal and Background histograms from `ScoreHistogram`.
+
+    Unlike `get_sgn_bkg_preds` this function does not need arrays of
+    predictions. C.f. `ScoreHistogram.get_sgn_bkg`.
+
+    Returns
+    -------
+    h_sgn : RHist1D
+        Histogram of signal values.
+    h_bkg : RHist1D
+        Histogram of background values.
+    """
+    sgn, bkg = score_hist.get_sgn_bkg(pred_idx, truth_idx)
+
+    return (
+        RHist1D(score_hist.bins, *sgn),
+        RHist1D(score_hist.bins, *bkg),
+    )
+
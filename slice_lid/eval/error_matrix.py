@@ -3,15 +3,15 @@
 import os
 import numpy as np
 
-def make_error_matrix(dgen, model, targets_pdg_iscc_list):
+def make_error_matrix(dgen, predictor, targets_pdg_iscc_list):
     """Calculate error matrix.
 
     Parameters
     ----------
     dgen : IDataGenerator
-        Dataset.
-    model : keras.Model
-        Network.
+        Dataset. Only its `data_loader` is used, batches are not generated.
+    predictor : SliceLIDPredictor
+        Scorer of the network.
     targets_pdg_iscc_list : list of (int, bool)
         List of targets. C.f. `Config.targets_pdg_iscc_list`.
 
@@ -23,17 +23,30 @@ def make_error_matrix(dgen, model, targets_pdg_iscc_list):
         N_TARGET = len(`targets_pdg_iscc_list`) + 1
     """
 
-    n_targets = len(targets_pdg_iscc_list) + 1
-    err_mat   = np.zeros((n_targets, n_targets))
+    truth = predictor.calc_truth(dgen.data_loader)
+    preds = predictor.predict_data_loader(dgen.data_loader)
 
-    for batch in dgen:
-        inputs  = batch[0]
-        targets = batch[1]
+    return calc_error_matrix(truth, preds, len(targets_pdg_iscc_list) + 1)
 
-        preds = model.predict(inputs).argmax(axis = 1)
-        truth = targets['target'].argmax(axis = 1)
+def calc_error_matrix(truth, preds, n_targets):
+    """Calculate error matrix from true targets and predicted scores.
 
-        np.add.at(err_mat, (truth, preds), 1)
+    Parameters
+    ----------
+    truth : ndarray, shape (N_SAMPLES,)
+        Array of true targets.
+    preds : ndarray, shape (N_SAMPLES, N_TARGETS)
+        Array of predicted target scores.
+    n_targets : int
+        Number of targets.
+
+    Returns
+    -------
+    ndarray, shape (N_TARGET, N_TARGET)
+        Error matrix. C.f. `make_error_matrix`.
+    """
+    err_mat = np.zeros((n_targets, n_targets))
+    np.add.at(err_mat, (truth, preds.argmax(axis = 1)), 1)
 
     return err_mat
 
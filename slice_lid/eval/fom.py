@@ -2,7 +2,8 @@
 
 import numpy as np
 from cafplot.rhist import RHist1D
-from .distribution import get_sgn_bkg_preds
+from .distribution import get_sgn_bkg_rhists
+from .hist         import ScoreHistogram
 
 def fom_efficiency(sgn_cumsum, _bkg_cumsum):
     """Efficiency"""
@@ -34,19 +35,25 @@ def rhist1d_cumsum(rhist, reverse = True):
 
     return RHist1D(rhist.bins, cum_hist, cum_err_sq)
 
-def calc_sgn_bkg_cumsums(truth, preds, weights, bins, reverse = True):
-    """Calculate signal/background cumulative sum histograms"""
+def calc_sgn_bkg_cumsums_from_hist(score_hist, reverse = True):
+    """Calculate signal/background cumulative sums from `ScoreHistogram`"""
     result = []
 
-    for pred_idx in range(preds.shape[1]):
-        rhist_list = get_sgn_bkg_preds(
-            truth, preds, weights, pred_idx, pred_idx, bins = bins
-        )
-
+    for pred_idx in range(score_hist.n_targets):
+        rhist_list = get_sgn_bkg_rhists(score_hist, pred_idx, pred_idx)
         result.append(tuple(rhist1d_cumsum(x, reverse) for x in rhist_list))
 
     return result
 
+def calc_sgn_bkg_cumsums(truth, preds, weights, bins, reverse = True):
+    """Calculate signal/background cumulative sum histograms.
+
+    Scores are histogrammed in `bins` bins of the (0, 1) range chunk by
+    chunk, c.f. `ScoreHistogram.from_arrays`.
+    """
+    score_hist = ScoreHistogram.from_arrays(truth, preds, weights, bins)
+    return calc_sgn_bkg_cumsums_from_hist(score_hist, reverse)
+
 def calc_fom_from_cumsums(rhist_sgn_cumsum, rhist_bkg_cumsum, fom_func):
     """Calculate FOM from signal/background cumulative sum histograms"""
     fom_hist   = fom_func(rhist_sgn_cumsum, rhist_bkg_cumsum)
@@ -67,3 +74,26 @@ def calc_foms(sgn_bkg_cumsums, fom_func):
 
     return result
 
+def find_best_cut(rhist_fom):
+    """Find cut on the predicted score that maximizes FOM.
+
+    Parameters
+    ----------
+    rhist_fom : RHist1D
+        FOM histogram calculated from the reversed cumulative sums, i.e.
+        i-th bin of the histogram holds FOM value of a selection
+        (score >= `rhist_fom.bins[i]`).
+
+    Returns
+    -------
+    cut : float
+        Value of the cut that maximizes FOM.
+    fom : float
+        Maximum value of FOM.
+    """
+
+    hist = np.nan_to_num(rhist_fom.hist)
+    idx  = int(np.argmax(hist))
+
+    return (float(rhist_fom.bins[idx]), float(hist[idx]))
+
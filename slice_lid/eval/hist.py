@@ -0,0 +1,162 @@
+"""
+Constant memory histograms of the predicted target scores.
+
+Distributions of the predicted scores and figures of merit of cuts on them
+require only the weighted histograms of scores split by the true target.
+`ScoreHistogram` accumulates such histograms batch by batch, such that the
+evaluation memory does not depend on the size of the evaluation dataset.
+"""
+
+import numpy as np
+
+class ScoreHistogram:
+    """Weighted histograms of predicted target scores split by true target.
+
+    Attributes
+    ----------
+    hist : ndarray, shape (N_TARGETS, N_TARGETS, N_BINS)
+        Sums of sample weights. hist[i, j, k] is a sum of weights of samples
+        of the true target i whose predicted score of the target j falls into
+        the k-th bin.
+    err_sq : ndarray, shape (N_TARGETS, N_TARGETS, N_BINS)
+        Sums of squared sample weights. C.f. `hist`.
+
+    Parameters
+    ----------
+    n_targets : int
+        Number of targets.
+    bins : int
+        Number of bins.
+    value_range : (float, float), optional
+        Range of the histogram bins. Similar to `numpy.histogram`, the last
+        bin is closed and scores outside of the range are ignored.
+        Default: (0, 1).
+    """
+
+    def __init__(self, n_targets, bins, value_range = (0, 1)):
+        self._n_targets = n_targets
+        self._edges     = np.linspace(*value_range, bins + 1)
+
+        self.hist   = np.zeros((n_targets, n_targets, bins))
+        self.err_sq = np.zeros((n_targets, n_targets, bins))
+
+    @staticmethod
+    def from_arrays(
+        truth, preds, weights, bins,
+        value_range = (0, 1),
+        chunk_size  = 100000
+    ):
+        """Construct `ScoreHistogram` from the arrays of predictions.
+
+        Arrays are histogrammed in chunks of `chunk_size` samples, such that
+        memory-mapped arrays are never entirely loaded into memory.
+        C.f. `update`.
+        """
+        result = ScoreHistogram(preds.shape[1], bins, value_range)
+
+        for start in range(0, len(truth), chunk_size):
+            index = slice(start, start + chunk_size)
+            result.update(truth[index], preds[index], weights[index])
+
+        return result
+
+    @property
+    def n_targets(self):
+        """Number of targets"""
+        return self._n_targets
+
+    @property
+    def bins(self):
+        """Bin edges, shape (N_BINS + 1,)"""
+        return self._edges
+
+    def _calc_bin_index(self, preds):
+        """Find bin indices of `preds` and mask of `preds` inside range"""
+        n_bins = len(self._edges) - 1
+        lo, hi = self._edges[0], self._edges[-1]
+
+        mask   = (preds >= lo) & (preds <= hi)
+        values = np.where(mask, preds, lo)
+        index  = np.floor((values - lo) * (n_bins / (hi - lo)))
+        index  = np.clip(index.astype(np.int64), 0, n_bins - 1)
+
+        # Fix rounding errors at the bin edges, like `numpy.histogram` does
+        index[values < self._edges[index]] -= 1
+        index[(values >= self._edges[index + 1]) & (index != n_bins - 1)] += 1
+
+        return (index, mask)
+
+    def update(self, truth, preds, weights):
+        """Add a batch of predictions to the histograms.
+
+        Parameters
+        ----------
+        truth : ndarray, shape (N_SAMPLES,)
+            Array of true targets.
+        preds : ndarray, shape (N_SAMPLES, N_TARGETS)
+            Array of predicted target scores.
+        weights : ndarray, shape (N_SAMPLES,)
+            Sample weights.
+        """
+        preds   = np.asarray(preds)
+        weights = np.asarray(weights, dtype = np.float64)
+
+        if len(preds) == 0:
+            return
+
+        n_bins      = self.hist.shape[2]
+        index, mask = self._calc_bin_index(preds)
+
+        # Flat index of (truth, pred_idx, bin) triplets
+        flat_index = (
+              np.asarray(truth)[:, np.newaxis] * (self._n_targets * n_bins)
+            + np.arange(self._n_targets)[np.newaxis, :] * n_bins
+            + index
+        )[mask]
+
+        weights = np.broadcast_to(weights[:, np.newaxis], preds.shape)[mask]
+        size    = self.hist.size
+
+        self.hist   += np.bincount(
+            flat_index, weights = weights, minlength = size
+        ).reshape(self.hist.shape)
+        self.err_sq += np.bincount(
+            flat_index, weights = weights**2, minlength = size
+        ).reshape(self.err_sq.shape)
+
+    def merge(self, other):
+        """Add histograms of another `ScoreHistogram` to this one"""
+        if not np.array_equal(self._edges, other.bins):
+            raise ValueError("Cannot merge histograms with different bins")
+
+        self.hist   += other.hist
+        self.err_sq += other.err_sq
+
+    def get_sgn_bkg(self, pred_idx, truth_idx = None):
+        """Get signal and background histograms of scores of `pred_idx`.
+
+        Parameters
+        ----------
+        pred_idx : int
+            Index of the target to get histograms of scores of.
+        truth_idx : int or None, optional
+            True target that indicates signal samples. If None, then it is
+            the same as `pred_idx`. Default: None.
+
+        Returns
+        -------
+        ((ndarray, ndarray), (ndarray, ndarray))
+            Pairs of (hist, err_sq) arrays of signal and background samples.
+        """
+        if truth_idx is None:
+            truth_idx = pred_idx
+
+        sgn_hist   = self.hist  [truth_idx, pred_idx]
+        sgn_err_sq = self.err_sq[truth_idx, pred_idx]
+
+        bkg_mask   = (np.arange(self._n_targets) != truth_idx)
+        bkg_hist   = self.hist  [bkg_mask, pred_idx].sum(axis = 0)
+        bkg_err_sq = self.err_sq[bkg_mask, pred_idx].sum(axis = 0)
+
+        return ((sgn_hist, sgn_err_sq), (bkg_hist, bkg_err_sq))
+
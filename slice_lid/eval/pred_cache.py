@@ -0,0 +1,142 @@
+"""
+Cache of the model predictions on the evaluation dataset.
+
+Scoring of the evaluation dataset dominates the run time of the evaluation
+scripts. `PredictionCache` saves the scoring results under the evaluation
+output directory, such that subsequent evaluations of the same model on the
+same data selection (e.g. re-plotting with a different binning) can load
+them as memory-mapped arrays instead of scoring the dataset again.
+"""
+
+import json
+import logging
+import os
+
+import numpy as np
+
+from slice_lid.consts import VAR_ROW_ID
+
+LOGGER = logging.getLogger('slice_lid.eval.pred_cache')
+
+CACHE_SUBDIR = 'pred_cache'
+CACHE_META   = 'meta.json'
+CACHE_ARRAYS = [ 'truth', 'preds', 'weights', 'row_ids' ]
+
+def make_pred_cache_key(model_hash, eval_config):
+    """Make key that identifies predictions of a model on a data selection.
+
+    Parameters
+    ----------
+    model_hash : str
+        Hash of the model file. C.f. `calc_model_hash`.
+    eval_config : EvalConfig
+        Evaluation configuration.
+
+    Returns
+    -------
+    dict
+        JSON serializable key of the predictions.
+    """
+    return {
+        'model_hash'  : model_hash,
+        'eval_subdir' : eval_config.get_eval_subdir(),
+    }
+
+class PredictionCache:
+    """Predictions of a model on the evaluation dataset.
+
+    Parameters
+    ----------
+    truth : ndarray, shape (N_SAMPLES,)
+        Array of true targets.
+    preds : ndarray, shape (N_SAMPLES, N_TARGETS)
+        Array of predicted target scores.
+    weights : ndarray, shape (N_SAMPLES,)
+        Sample weights.
+    row_ids : ndarray, shape (N_SAMPLES,)
+        Indices of the dataset rows of the samples. C.f. `DataRowId`.
+    """
+
+    def __init__(self, truth, preds, weights, row_ids):
+        self.truth   = truth
+        self.preds   = preds
+        self.weights = weights
+        self.row_ids = row_ids
+
+    def __len__(self):
+        return len(self.truth)
+
+    @staticmethod
+    def from_data_loader(data_loader, weights, predictor):
+        """Score samples of `data_loader` by `predictor`"""
+        return PredictionCache(
+            predictor.calc_truth(data_loader),
+            predictor.predict_data_loader(data_loader),
+            np.asarray(weights),
+            data_loader.get(VAR_ROW_ID),
+        )
+
+    def save(self, outdir, key):
+        """Save predictions under `outdir` marking them with the `key`.
+
+        The key is written last, such that a partially saved cache is never
+        considered valid.
+        """
+        path = os.path.join(outdir, CACHE_SUBDIR)
+        meta = os.path.join(path, CACHE_META)
+
+        os.makedirs(path, exist_ok = True)
+
+        if os.path.exists(meta):
+            os.remove(meta)
+
+        for name in CACHE_ARRAYS:
+            np.save(os.path.join(path, name + '.npy'), getattr(self, name))
+
+        with open(meta, 'wt') as f:
+            json.dump(
+                { 'key' : key, 'n_samples' : len(self) }, f,
+                indent = 4, sort_keys = True
+            )
+
+        LOGGER.info("Saved predictions of %d samples to %s", len(self), path)
+
+    @staticmethod
+    def load(outdir, key):
+        """Load predictions saved under `outdir` if they match the `key`.
+
+        Returns
+        -------
+        PredictionCache or None
+            Memory-mapped predictions. None, if there are no saved
+            predictions or they were saved with a different `key`.
+        """
+        path = os.path.join(outdir, CACHE_SUBDIR)
+
+        try:
+            with open(os.path.join(path, CACHE_META), 'rt') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if meta.get('key') != key:
+            LOGGER.info("Cached predictions %s are outdated", path)
+            return None
+
+        try:
+            arrays = [
+                np.load(os.path.join(path, name + '.npy'), mmap_mode = 'r')
+                    for name in CACHE_ARRAYS
+            ]
+        except (OSError, ValueError) as e:
+            LOGGER.warning("Failed to load cached predictions: %s", e)
+            return None
+
+        if any(len(x) != meta['n_samples'] for x in arrays):
+            LOGGER.warning("Cached predictions %s are corrupted", path)
+            return None
+
+        LOGGER.info("Loaded cached predictions from %s", path)
+
+        return PredictionCache(*arrays)
+
@@ -0,0 +1,281 @@
+"""
+Definition of a standalone batched scorer of `slice_lid` models.
+"""
+
+import logging
+import math
+import os
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from lstm_ee.data.data_loader.dict_loader import DictLoader
+
+from slice_lid.consts import DEF_MASK
+from slice_lid.data.data_generator.funcs_packed import (
+    calc_varr_lengths, pack_varr_arrays, pad_packed_arrays
+)
+
+LOGGER = logging.getLogger('slice_lid.eval.predictor')
+
+NUMPY_SUBDIR = 'numpy'
+
+def calc_truth_labels(data_loader, var_pdg, var_iscc, pdg_iscc_list):
+    """Calculate true target indices of samples of `data_loader`.
+
+    Samples are assigned to targets following the same rules as the ones used
+    by the `DataGenerator`, i.e. the sample matching pair
+    (pdg_i, iscc_i) = `pdg_iscc_list`[i] gets the target index i + 1, and the
+    samples that do not match any pair get the target index 0.
+
+    Returns
+    -------
+    ndarray, shape (len(data_loader),)
+        Array of true target indices.
+    """
+    pdg    = np.abs(data_loader.get(var_pdg, None))
+    iscc   = data_loader.get(var_iscc, None)
+    result = np.zeros(len(pdg), dtype = int)
+
+    for idx,(pdg_value, iscc_value) in reversed(
+        list(enumerate(pdg_iscc_list))
+    ):
+        result[(pdg == pdg_value) & (iscc == iscc_value)] = idx + 1
+
+    return result
+
+class SliceLIDPredictor:
+    """Batched scorer of a `slice_lid` model.
+
+    `SliceLIDPredictor` scores samples of a DataLoader or of raw column
+    arrays directly, without constructing DataGenerators and targets.
+    Samples are sorted by their number of 3D prongs, such that each batch is
+    padded only up to similar lengths. Then, they are scored in large
+    fixed-size batches by `model.predict_on_batch` (which avoids per call
+    overhead of `model.predict`), optionally by multiple threads.
+
+    Parameters
+    ----------
+    model : keras.Model or NumpyModel
+        Model to score samples with.
+    args : Args
+        Configuration of the `model`.
+    batch_size : int, optional
+        Number of samples to score in a single `model` call. Default: 8192.
+    workers : int or None, optional
+        If not None and greater than 1, then batches will be prepared and
+        scored in a pool of `workers` threads. Default: None.
+    sort : bool, optional
+        Whether to sort samples by their number of 3D prongs before
+        batching. Default: True.
+
+    See Also
+    --------
+    SliceLIDPredictor.from_savedir
+    SliceLIDPredictor.from_numpy_savedir
+    """
+
+    def __init__(
+        self, model, args,
+        batch_size = 8192,
+        workers    = None,
+        sort       = True,
+    ):
+        self._model      = model
+        self._args       = args
+        self._batch_size = batch_size
+        self._workers    = workers
+        self._sort       = sort
+
+        self._prong_lengths = ('input_png3d_len' in model.input_names)
+        self._prong_steps   = None
+
+        # Models with a fixed prong dimension need batches of that size
+        if 'input_png3d' in model.input_names:
+            index = model.input_names.index('input_png3d')
+            self._prong_steps = model.inputs[index].shape[1]
+
+    @staticmethod
+    def from_savedir(savedir, **kwargs):
+        """Load model saved under `savedir` and create its predictor.
+
+        Parameters
+        ----------
+        savedir : str
+            Directory of the saved model.
+        kwargs : dict
+            Parameters that will be passed to the `SliceLIDPredictor`
+            constructor.
+        """
+        # pylint: disable=import-outside-toplevel
+        # Import lazily, so that the predictor is usable without `keras`
+        from slice_lid.utils.io import load_model
+
+        args, model = load_model(savedir, compile = False)
+        return SliceLIDPredictor(model, args, **kwargs)
+
+    @staticmethod
+    def from_numpy_savedir(savedir, **kwargs):
+        """Create predictor of the NumPy export of model saved in `savedir`.
+
+        The model is expected to be exported to the NumPy format under the
+        "numpy" subdirectory of `savedir`. Neither TensorFlow nor `keras` are
+        imported. C.f. `slice_lid.export.export_numpy_model`.
+
+        Parameters
+        ----------
+        savedir : str
+            Directory of the saved model.
+        kwargs : dict
+            Parameters that will be passed to the `SliceLIDPredictor`
+            constructor.
+        """
+        # pylint: disable=import-outside-toplevel
+        from slice_lid.args   import Args
+        from slice_lid.export import NumpyModel
+
+        args  = Args.load(savedir = savedir)
+        model = NumpyModel.load(os.path.join(savedir, NUMPY_SUBDIR))
+
+        return SliceLIDPredictor(model, args, **kwargs)
+
+    @property
+    def model(self):
+        """Model used to score samples"""
+        return self._model
+
+    @property
+    def args(self):
+        """Configuration of the model"""
+        return self._args
+
+    @property
+    def n_targets(self):
+        """Number of targets the model scores"""
+        return len(self._args.target_pdg_iscc_list) + 1
+
+    def make_inputs(self, data_loader, index):
+        """Make batch of `model` inputs from samples `index` of `data_loader`.
+
+        NaN inputs are replaced by the `DEF_MASK` value, like the training
+        DataGenerators do. C.f. `DataNANMask`.
+        """
+        inputs = {}
+
+        if self._args.vars_input_slice is not None:
+            inputs['input_slice'] = np.stack(
+                [
+                    data_loader.get(vname, index)
+                        for vname in self._args.vars_input_slice
+                ],
+                axis = 1
+            ).astype(np.float32)
+
+        if self._args.vars_input_png3d is not None:
+            values, lengths = pack_varr_arrays(
+                data_loader, self._args.vars_input_png3d, index,
+                self._args.max_prongs
+            )
+
+            inputs['input_png3d'] = pad_packed_arrays(
+                values, lengths, max_length = self._prong_steps
+            )
+
+            if self._prong_lengths:
+                inputs['input_png3d_len'] = lengths.reshape((-1, 1))
+
+        for data in inputs.values():
+            data[np.isnan(data)] = DEF_MASK
+
+        return inputs
+
+    def _calc_order(self, data_loader):
+        """Find order of samples in which they will be batched together"""
+        if (not self._sort) or (self._args.vars_input_png3d is None):
+            return np.arange(len(data_loader))
+
+        lengths = calc_varr_lengths(
+            data_loader, self._args.vars_input_png3d[0], None
+        )
+
+        return np.argsort(lengths, kind = 'stable')
+
+    def predict_data_loader(self, data_loader):
+        """Score samples of `data_loader`.
+
+        Parameters
+        ----------
+        data_loader : IDataLoader
+            DataLoader with the model input variables.
+
+        Returns
+        -------
+        ndarray, shape (len(data_loader), N_TARGETS)
+            Predicted target scores in the order of `data_loader` samples.
+        """
+        n_samples = len(data_loader)
+        result    = np.empty((n_samples, self.n_targets), dtype = np.float32)
+
+        if n_samples == 0:
+            return result
+
+        order   = self._calc_order(data_loader)
+        batches = [
+            order[start:start + self._batch_size]
+                for start in range(0, n_samples, self._batch_size)
+        ]
+
+        def predict_batch(index):
+            inputs = self.make_inputs(data_loader, index)
+            result[index] = np.asarray(self._model.predict_on_batch(inputs))
+
+        if (self._workers is not None) and (self._workers > 1):
+            with ThreadPoolExecutor(self._workers) as executor:
+                for _ in executor.map(predict_batch, batches):
+                    pass
+        else:
+            for index in batches:
+                predict_batch(index)
+
+        LOGGER.debug(
+            "Scored %d samples in %d batches", n_samples,
+            math.ceil(n_samples / self._batch_size)
+        )
+
+        return result
+
+    def predict_columns(self, columns):
+        """Score samples given as raw column arrays.
+
+        Parameters
+        ----------
+        columns : dict
+            Dictionary of the form { VAR : ARRAY } with values of the model
+            input variables. Values of the 3D prong variables are expected to
+            be sequences of variable length arrays.
+
+        Returns
+        -------
+        ndarray, shape (N_SAMPLES, N_TARGETS)
+            Predicted target scores.
+        """
+        return self.predict_data_loader(DictLoader(columns))
+
+    def predict(self, data):
+        """Score samples of a DataLoader or of a dict of column arrays"""
+        if isinstance(data, dict):
+            return self.predict_columns(data)
+
+        return self.predict_data_loader(data)
+
+    def calc_truth(self, data_loader):
+        """Calculate true target indices of `data_loader` samples.
+
+        C.f. `calc_truth_labels`.
+        """
+        return calc_truth_labels(
+            data_loader, self._args.var_target_pdg, self._args.var_target_iscc,
+            self._args.target_pdg_iscc_list
+        )
+
@@ -0,0 +1,194 @@
+"""
+Exact figures of merit and ROC curves without binning of the scores.
+
+Histogram based FOMs (c.f. `calc_sgn_bkg_cumsums`) can only place cuts at
+the bin edges, such that precision of the optimal cut is limited by the bin
+width. Functions of this module sort samples by the predicted score instead
+and evaluate FOMs and ROC curves at every distinct score value.
+"""
+
+import numpy as np
+
+def fom_efficiency(sgn, _bkg):
+    """Efficiency"""
+    return sgn / sgn[-1]
+
+def fom_purity(sgn, bkg):
+    """Purity"""
+    return sgn / (sgn + bkg)
+
+def fom_selection(sgn, bkg):
+    """FOM = S / sqrt(S + B)"""
+    return sgn / np.sqrt(sgn + bkg)
+
+EXACT_FOM_SPEC_DICT = {
+    'efficiency' : fom_efficiency,
+    'purity'     : fom_purity,
+    'selection'  : fom_selection,
+}
+
+def downsample_index(size, max_points):
+    """Select at most `max_points` evenly spaced indices out of `size`.
+
+    The first and the last indices are always selected.
+    """
+    if size <= max_points:
+        return np.arange(size)
+
+    return np.unique(
+        np.linspace(0, size - 1, max_points).round().astype(np.int64)
+    )
+
+class ExactCurves:
+    """Signal and background sums of selections by a cut on a score.
+
+    Selection by a cut `thresholds[i]` keeps samples with
+    (score >= `thresholds[i]`).
+
+    Attributes
+    ----------
+    thresholds : ndarray, shape (N_THRESHOLDS,)
+        Distinct values of the score in the descending order.
+    sgn : ndarray, shape (N_THRESHOLDS,)
+        Sums of weights of signal samples that pass the selections.
+    bkg : ndarray, shape (N_THRESHOLDS,)
+        Sums of weights of background samples that pass the selections.
+    """
+
+    def __init__(self, thresholds, sgn, bkg):
+        self.thresholds = thresholds
+        self.sgn        = sgn
+        self.bkg        = bkg
+
+    @staticmethod
+    def from_scores(is_sgn, scores, weights):
+        """Calculate selection sums by sorting samples by `scores`.
+
+        Parameters
+        ----------
+        is_sgn : ndarray of bool, shape (N_SAMPLES,)
+            Mask of the signal samples.
+        scores : ndarray, shape (N_SAMPLES,)
+            Scores to cut on. Samples with NaN scores are ignored.
+        weights : ndarray, shape (N_SAMPLES,)
+            Sample weights.
+
+        Returns
+        -------
+        ExactCurves
+        """
+        scores  = np.asarray(scores)
+        weights = np.asarray(weights, dtype = np.float64)
+        mask    = ~np.isnan(scores)
+
+        if not np.all(mask):
+            is_sgn, scores, weights = is_sgn[mask], scores[mask], weights[mask]
+
+        # Order of samples with equal scores does not matter, since they
+        # are grouped together below
+        order  = np.argsort(scores)[::-1]
+        scores = scores[order]
+        is_sgn = is_sgn[order]
+        w      = weights[order]
+
+        sgn = np.cumsum(np.where(is_sgn, w, 0))
+        bkg = np.cumsum(np.where(is_sgn, 0, w))
+
+        # Last sample of each group of samples with equal scores
+        last = np.append(np.nonzero(np.diff(scores))[0], len(scores) - 1)
+
+        if len(scores) == 0:
+            last = last[:0]
+
+        return ExactCurves(scores[last], sgn[last], bkg[last])
+
+    def __len__(self):
+        return len(self.thresholds)
+
+    def calc_fom(self, fom_label):
+        """Calculate FOM `fom_label` at every threshold.
+
+        C.f. `EXACT_FOM_SPEC_DICT`.
+        """
+        with np.errstate(divide = 'ignore', invalid = 'ignore'):
+            return EXACT_FOM_SPEC_DICT[fom_label](self.sgn, self.bkg)
+
+    def calc_roc(self):
+        """Calculate ROC curve.
+
+        Returns
+        -------
+        fpr : ndarray, shape (N_THRESHOLDS + 1,)
+            False positive rates, i.e. background efficiencies.
+        tpr : ndarray, shape (N_THRESHOLDS + 1,)
+            True positive rates, i.e. signal efficiencies.
+        """
+        with np.errstate(divide = 'ignore', invalid = 'ignore'):
+            fpr = np.append(0, self.bkg / self.bkg[-1])
+            tpr = np.append(0, self.sgn / self.sgn[-1])
+
+        return (fpr, tpr)
+
+    def calc_auc(self):
+        """Calculate area under the ROC curve.
+
+        Samples with equal scores contribute as if they were ordered
+        randomly.
+        """
+        if len(self) == 0:
+            return np.nan
+
+        fpr, tpr = self.calc_roc()
+        return float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2))
+
+    def find_best_cut(self, fom_label):
+        """Find cut on the score that maximizes FOM `fom_label`.
+
+        Returns
+        -------
+        cut : float
+            Value of the cut that maximizes FOM.
+        fom : float
+            Maximum value of FOM.
+        """
+        fom = np.nan_to_num(self.calc_fom(fom_label))
+        idx = int(np.argmax(fom))
+
+        return (float(self.thresholds[idx]), float(fom[idx]))
+
+    def downsample(self, max_points):
+        """Select at most `max_points` thresholds, e.g. for plotting"""
+        index = downsample_index(len(self), max_points)
+
+        return ExactCurves(
+            self.thresholds[index], self.sgn[index], self.bkg[index]
+        )
+
+def calc_exact_curves(truth, preds, weights):
+    """Calculate `ExactCurves` of each target.
+
+    Parameters
+    ----------
+    truth : ndarray, shape (N_SAMPLES,)
+        Array of true targets.
+    preds : ndarray, shape (N_SAMPLES, N_TARGETS)
+        Array of predicted target scores.
+    weights : ndarray, shape (N_SAMPLES,)
+        Sample weights.
+
+    Returns
+    -------
+    list of ExactCurves, len(N_TARGETS)
+        Curves of cuts on the score of each target, where signal samples are
+        the samples of the same true target.
+    """
+    truth   = np.asarray(truth)
+    weights = np.asarray(weights)
+
+    return [
+        ExactCurves.from_scores(
+            (truth == pred_idx), preds[:, pred_idx], weights
+        )
+            for pred_idx in range(preds.shape[1])
+    ]
+
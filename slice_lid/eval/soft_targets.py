@@ -0,0 +1,79 @@
+"""
+Functions to calculate and cache soft targets of a teacher network.
+"""
+
+import hashlib
+import json
+import logging
+import os
+
+import numpy as np
+
+from slice_lid.utils.io import calc_model_hash
+from .predictor         import SliceLIDPredictor
+
+LOGGER = logging.getLogger('slice_lid.eval.soft_targets')
+
+SOFT_TARGETS_SUBDIR = 'soft_targets'
+
+def calc_soft_targets_key(model_hash, **kwargs):
+    """Calculate key that uniquely identifies soft targets of a dataset.
+
+    The key includes hash `model_hash` of the teacher model file, such that
+    soft targets of a retrained teacher are never taken from the cache.
+    C.f. `calc_model_hash`.
+    """
+    spec = json.dumps(
+        {
+            'model_hash' : model_hash,
+            **kwargs
+        },
+        sort_keys = True
+    )
+
+    return hashlib.sha1(spec.encode()).hexdigest()
+
+def load_soft_targets(teacher, data_loader, **kwargs):
+    """Load or calculate soft targets of `data_loader` samples.
+
+    Soft targets are predictions of the `teacher` network. Once calculated,
+    they are cached under the "soft_targets" subdirectory of the `teacher`
+    directory, and reused by subsequent calls with the same arguments and
+    the same teacher model file.
+
+    Parameters
+    ----------
+    teacher : str
+        Directory of the trained teacher network.
+    data_loader : IDataLoader
+        DataLoader to calculate soft targets of.
+    kwargs : dict
+        Dictionary that uniquely specifies `data_loader`, e.g. dataset,
+        seed and split parameters.
+
+    Returns
+    -------
+    ndarray, shape (len(data_loader), N_TARGET)
+        Soft targets.
+    """
+
+    key   = calc_soft_targets_key(calc_model_hash(teacher), **kwargs)
+    fname = os.path.join(teacher, SOFT_TARGETS_SUBDIR, key + '.npy')
+
+    if os.path.exists(fname):
+        result = np.load(fname)
+
+        if len(result) == len(data_loader):
+            LOGGER.info("Loaded cached soft targets from %s", fname)
+            return result
+
+        LOGGER.warning("Cached soft targets %s are stale", fname)
+
+    LOGGER.info("Calculating soft targets of teacher %s", teacher)
+    predictor = SliceLIDPredictor.from_savedir(teacher)
+    result    = predictor.predict_data_loader(data_loader)
+
+    os.makedirs(os.path.dirname(fname), exist_ok = True)
+    np.save(fname, result)
+
+    return result
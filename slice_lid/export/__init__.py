@@ -0,0 +1,8 @@
+"""
+Export of trained `slice_lid` models to formats usable for deployment.
+"""
+
+from .numpy_export import NumpyExportError, export_numpy_model
+from .numpy_model  import NumpyModel
+
+__all__ = [ 'NumpyExportError', 'NumpyModel', 'export_numpy_model' ]
@@ -0,0 +1,441 @@
+"""
+Export of `keras` models to the pure NumPy format.
+
+The exported model is stored in two files:
+    - "model.json" holds the model topology: a list of operations in the
+      order of their evaluation, where each operation is described by a dict
+      { 'name' : NAME, 'op' : OP, 'inputs' : [ NAME, ... ], 'params' : {} }.
+    - "model.npz" holds operation weights under the keys "NAME/WEIGHT".
+
+Batch Normalization layers are converted into affine operations, that are
+folded into the neighboring Dense or LSTM layers whenever possible.
+
+C.f. `slice_lid.export.numpy_model.NumpyModel` for the runtime.
+"""
+
+import json
+import logging
+import os
+
+import numpy as np
+
+LOGGER = logging.getLogger('slice_lid.export.numpy_export')
+
+TOPOLOGY_FNAME = 'model.json'
+WEIGHTS_FNAME  = 'model.npz'
+
+SUPPORTED_ACTIVATIONS = [
+    'linear', 'relu', 'tanh', 'sigmoid', 'hard_sigmoid', 'softmax', 'elu',
+    'selu', 'softplus',
+]
+
+class NumpyExportError(ValueError):
+    """Error raised when a `keras` model cannot be exported to NumPy"""
+
+def _check_activation(name, activation):
+    if activation not in SUPPORTED_ACTIVATIONS:
+        raise NumpyExportError(
+            "Layer %s: unsupported activation '%s'" % (name, activation)
+        )
+
+    return activation
+
+def _get_inbound_names(layer_spec):
+    """Get names of the layers that feed `layer_spec` layer"""
+    inbound_nodes = layer_spec.get('inbound_nodes', [])
+
+    if len(inbound_nodes) > 1:
+        raise NumpyExportError(
+            "Layer %s: shared layers are not supported" % (layer_spec['name'])
+        )
+
+    if not inbound_nodes:
+        return []
+
+    return [ x[0] for x in inbound_nodes[0] ]
+
+def _convert_dense(name, config, weights):
+    params = {
+        'activation' : _check_activation(name, config['activation']),
+    }
+
+    kernel = weights[0]
+    bias   = weights[1] if config['use_bias'] else np.zeros(kernel.shape[1])
+
+    return ('dense', params, { 'kernel' : kernel, 'bias' : bias })
+
+def _convert_batchnorm(name, config, weights):
+    axis = config['axis']
+    if isinstance(axis, (list, tuple)):
+        axis = axis[0] if len(axis) == 1 else axis
+
+    if axis not in [ -1, 1, 2 ]:
+        raise NumpyExportError(
+            "Layer %s: unsupported batch normalization axis %s" % (name, axis)
+        )
+
+    weights = list(weights)
+    gamma   = weights.pop(0) if config['scale']  else None
+    beta    = weights.pop(0) if config['center'] else None
+    mean, var = weights
+
+    scale = 1 / np.sqrt(var + config['epsilon'])
+    if gamma is not None:
+        scale = gamma * scale
+
+    shift = -mean * scale
+    if beta is not None:
+        shift = shift + beta
+
+    return ('affine', {}, { 'scale' : scale, 'shift' : shift })
+
+def _convert_lstm(name, config, weights):
+    if config.get('stateful', False) or config.get('unroll', False):
+        raise NumpyExportError(
+            "Layer %s: stateful/unrolled LSTMs are not supported" % (name)
+        )
+
+    if config.get('return_state', False):
+        raise NumpyExportError(
+            "Layer %s: LSTMs returning states are not supported" % (name)
+        )
+
+    units  = config['units']
+    kernel = weights[0]
+    bias   = weights[2] if config['use_bias'] else np.zeros(4 * units)
+
+    params = {
+        'units'                : units,
+        'activation'           : _check_activation(
+            name, config['activation']
+        ),
+        'recurrent_activation' : _check_activation(
+            name, config['recurrent_activation']
+        ),
+        'go_backwards'         : config.get('go_backwards', False),
+        'return_sequences'     : config.get('return_sequences', False),
+    }
+
+    return (
+        'lstm', params,
+        { 'kernel' : kernel, 'recurrent_kernel' : weights[1], 'bias' : bias }
+    )
+
+def _convert_bidirectional(name, config, weights):
+    inner = config['layer']
+
+    if inner['class_name'] != 'LSTM':
+        raise NumpyExportError(
+            "Layer %s: unsupported bidirectional layer %s" % (
+                name, inner['class_name']
+            )
+        )
+
+    half = len(weights) // 2
+    _, fwd_params, fwd_weights = _convert_lstm(
+        name, inner['config'], weights[:half]
+    )
+    _, bwd_params, bwd_weights = _convert_lstm(
+        name, inner['config'], weights[half:]
+    )
+
+    bwd_params['go_backwards'] = not fwd_params['go_backwards']
+
+    params  = {
+        'merge_mode' : config.get('merge_mode', 'concat'),
+        'forward'    : fwd_params,
+        'backward'   : bwd_params,
+    }
+
+    weights = {
+        **{ 'forward_'  + k : v for (k, v) in fwd_weights.items() },
+        **{ 'backward_' + k : v for (k, v) in bwd_weights.items() },
+    }
+
+    return ('bidirectional', params, weights)
+
+def _convert_layer(layer_spec, layer):
+    """Convert `keras` layer into (op, params, weights) triple"""
+    # pylint: disable=too-many-return-statements
+    class_name = layer_spec['class_name']
+    config     = layer_spec['config']
+    name       = layer_spec['name']
+    weights    = layer.get_weights()
+
+    if class_name == 'InputLayer':
+        shape = config.get('batch_input_shape', config.get('batch_shape'))
+        dtype = config.get('dtype', 'float32')
+        return ('input', { 'shape' : list(shape), 'dtype' : dtype }, {})
+
+    if class_name == 'TimeDistributed':
+        # Layers below act on the last axis, so they are time distributed
+        class_name = config['layer']['class_name']
+        config     = config['layer']['config']
+
+        if class_name not in [
+            'Dense', 'BatchNormalization', 'Activation', 'Dropout'
+        ]:
+            raise NumpyExportError(
+                "Layer %s: unsupported time distributed layer %s" % (
+                    name, class_name
+                )
+            )
+
+    if class_name == 'Dense':
+        return _convert_dense(name, config, weights)
+
+    if class_name == 'BatchNormalization':
+        return _convert_batchnorm(name, config, weights)
+
+    if class_name == 'Activation':
+        activation = _check_activation(name, config['activation'])
+        return ('activation', { 'activation' : activation }, {})
+
+    if class_name in [ 'Dropout', 'SpatialDropout1D', 'GaussianNoise' ]:
+        return ('identity', {}, {})
+
+    if class_name == 'Masking':
+        return ('masking', { 'mask_value' : config['mask_value'] }, {})
+
+    if class_name == 'LengthMask':
+        return ('length_mask', {}, {})
+
+    if class_name == 'MaskedPooling':
+        return ('masked_pooling', { 'mode' : config['mode'] }, {})
+
+    if class_name == 'LSTM':
+        return _convert_lstm(name, config, weights)
+
+    if class_name == 'Bidirectional':
+        return _convert_bidirectional(name, config, weights)
+
+    if class_name == 'Concatenate':
+        return ('concatenate', { 'axis' : config.get('axis', -1) }, {})
+
+    if class_name == 'Add':
+        return ('add', {}, {})
+
+    if class_name == 'Average':
+        return ('average', {}, {})
+
+    raise NumpyExportError(
+        "Layer %s: unsupported layer type %s" % (name, class_name)
+    )
+
+def convert_model(model):
+    """Convert `keras` functional model into NumPy topology and weights.
+
+    Parameters
+    ----------
+    model : keras.Model
+        Functional model to convert.
+
+    Returns
+    -------
+    (dict, dict)
+        Pair of topology and weights. The topology has the form
+            {
+                'inputs'  : [ NAME, ... ],
+                'outputs' : [ NAME, ... ],
+                'nodes'   : [ NODE, ... ],
+            }
+        where each NODE is a dict
+            { 'name' : NAME, 'op' : OP, 'inputs' : [...], 'params' : {...} }.
+        Weights is a dict of the form { NAME : { WEIGHT_NAME : ndarray } }.
+
+    Raises
+    ------
+    NumpyExportError
+        If the model contains unsupported layers.
+    """
+
+    config  = model.get_config()
+    nodes   = []
+    weights = {}
+
+    for layer_spec in config['layers']:
+        name = layer_spec['name']
+        op, params, layer_weights = _convert_layer(
+            layer_spec, model.get_layer(name)
+        )
+
+        nodes.append({
+            'name'   : name,
+            'op'     : op,
+            'inputs' : _get_inbound_names(layer_spec),
+            'params' : params,
+        })
+
+        weights[name] = {
+            k : np.asarray(v, dtype = np.float32)
+                for (k, v) in layer_weights.items()
+        }
+
+    topology = {
+        'inputs'  : [ x[0] for x in config['input_layers']  ],
+        'outputs' : [ x[0] for x in config['output_layers'] ],
+        'nodes'   : nodes,
+    }
+
+    return (topology, weights)
+
+def _find_consumers(nodes):
+    result = { node['name'] : [] for node in nodes }
+
+    for node in nodes:
+        for name in node['inputs']:
+            result[name].append(node)
+
+    return result
+
+def _fold_affine_forward(node, affine, weights):
+    """Fold affine `x * scale + shift` into the following Dense/LSTM node"""
+    scale = weights[affine['name']]['scale']
+    shift = weights[affine['name']]['shift']
+
+    if node['op'] == 'bidirectional':
+        keys = [
+            ('forward_kernel',  'forward_bias'),
+            ('backward_kernel', 'backward_bias'),
+        ]
+    else:
+        keys = [ ('kernel', 'bias') ]
+
+    for (key_kernel, key_bias) in keys:
+        kernel = weights[node['name']][key_kernel]
+        bias   = weights[node['name']][key_bias]
+
+        weights[node['name']][key_bias]   = bias + shift @ kernel
+        weights[node['name']][key_kernel] = scale[:, np.newaxis] * kernel
+
+def _fold_affine_backward(node, affine, weights):
+    """Fold affine `x * scale + shift` into the preceding linear Dense node"""
+    scale = weights[affine['name']]['scale']
+    shift = weights[affine['name']]['shift']
+
+    kernel = weights[node['name']]['kernel']
+    bias   = weights[node['name']]['bias']
+
+    weights[node['name']]['kernel'] = kernel * scale[np.newaxis, :]
+    weights[node['name']]['bias']   = bias * scale + shift
+
+def _remove_node(nodes, weights, removed):
+    """Remove node `removed` replacing its output by its input"""
+    source = removed['inputs'][0]
+
+    for node in nodes:
+        node['inputs'] = [
+            source if x == removed['name'] else x for x in node['inputs']
+        ]
+
+    nodes.remove(removed)
+    weights.pop(removed['name'], None)
+
+def fold_affine_nodes(topology, weights):
+    """Fold affine (Batch Normalization) nodes into Dense and LSTM nodes.
+
+    An affine node is folded into the preceding Dense node with a linear
+    activation if the affine node is its only consumer. Otherwise, it is
+    folded into the following Dense/LSTM nodes if they are the only consumers
+    of the affine node. Identity nodes are removed.
+
+    Parameters
+    ----------
+    topology : dict
+        Model topology. C.f. `convert_model`. Modified in place.
+    weights : dict
+        Model weights. C.f. `convert_model`. Modified in place.
+
+    Returns
+    -------
+    int
+        Number of affine nodes folded.
+    """
+
+    nodes   = topology['nodes']
+    outputs = set(topology['outputs'])
+
+    for node in [ x for x in nodes if x['op'] == 'identity' ]:
+        if node['name'] not in outputs:
+            _remove_node(nodes, weights, node)
+
+    n_folded = 0
+
+    for affine in [ x for x in nodes if x['op'] == 'affine' ]:
+        if affine['name'] in outputs:
+            continue
+
+        nodes_dict = { x['name'] : x for x in nodes }
+        consumers  = _find_consumers(nodes)
+        producer   = nodes_dict[affine['inputs'][0]]
+
+        if (
+                (producer['op'] == 'dense')
+            and (producer['params']['activation'] == 'linear')
+            and (len(consumers[producer['name']]) == 1)
+            and (producer['name'] not in outputs)
+        ):
+            _fold_affine_backward(producer, affine, weights)
+
+        elif consumers[affine['name']] and all(
+            x['op'] in [ 'dense', 'lstm', 'bidirectional' ]
+                for x in consumers[affine['name']]
+        ):
+            for node in consumers[affine['name']]:
+                _fold_affine_forward(node, affine, weights)
+
+        else:
+            continue
+
+        _remove_node(nodes, weights, affine)
+        n_folded += 1
+
+    return n_folded
+
+def export_numpy_model(model, outdir, fold = True):
+    """Export `keras` model to the NumPy format into `outdir` directory.
+
+    Parameters
+    ----------
+    model : keras.Model
+        Functional model to export.
+    outdir : str
+        Directory where "model.json" and "model.npz" will be saved.
+    fold : bool, optional
+        Whether to fold Batch Normalization into Dense/LSTM layers.
+        Default: True.
+
+    Returns
+    -------
+    dict
+        Exported model topology.
+
+    See Also
+    --------
+    convert_model
+    fold_affine_nodes
+    slice_lid.export.numpy_model.NumpyModel
+    """
+
+    topology, weights = convert_model(model)
+
+    if fold:
+        n_folded = fold_affine_nodes(topology, weights)
+        LOGGER.info("Folded %d batch normalization layers", n_folded)
+
+    os.makedirs(outdir, exist_ok = True)
+
+    with open(os.path.join(outdir, TOPOLOGY_FNAME), 'wt') as f:
+        json.dump(topology, f, indent = 4)
+
+    np.savez(
+        os.path.join(outdir, WEIGHTS_FNAME),
+        **{
+            '%s/%s' % (name, key) : value
+                for (name, layer_weights) in weights.items()
+                for (key, value) in layer_weights.items()
+        }
+    )
+
+    return topology
+
@@ -0,0 +1,356 @@
+"""
+Pure NumPy runtime of the models exported by `export_numpy_model`.
+
+This module depends only on NumPy, so that it can be used to score models
+without importing TensorFlow or `keras`.
+"""
+
+import json
+import os
+
+from collections import namedtuple
+
+import numpy as np
+
+from .numpy_export import TOPOLOGY_FNAME, WEIGHTS_FNAME
+
+# Description of a model input that mimics `keras` input tensors
+NumpyInput = namedtuple('NumpyInput', [ 'name', 'shape', 'dtype' ])
+
+def sigmoid(x):
+    # pylint: disable=missing-function-docstring
+    return 0.5 * (np.tanh(0.5 * x) + 1)
+
+def hard_sigmoid(x):
+    # pylint: disable=missing-function-docstring
+    return np.clip(0.2 * x + 0.5, 0, 1)
+
+def softmax(x):
+    # pylint: disable=missing-function-docstring
+    result = np.exp(x - np.max(x, axis = -1, keepdims = True))
+    return result / np.sum(result, axis = -1, keepdims = True)
+
+def elu(x):
+    # pylint: disable=missing-function-docstring
+    return np.where(x > 0, x, np.expm1(np.minimum(x, 0)))
+
+def selu(x):
+    # pylint: disable=missing-function-docstring
+    alpha = 1.6732632423543772848170429916717
+    scale = 1.0507009873554804934193349852946
+    return scale * np.where(x > 0, x, alpha * np.expm1(np.minimum(x, 0)))
+
+ACTIVATIONS = {
+    'linear'       : lambda x : x,
+    'relu'         : lambda x : np.maximum(x, 0),
+    'tanh'         : np.tanh,
+    'sigmoid'      : sigmoid,
+    'hard_sigmoid' : hard_sigmoid,
+    'softmax'      : softmax,
+    'elu'          : elu,
+    'selu'         : selu,
+    'softplus'     : lambda x : np.logaddexp(x, 0),
+}
+
+def combine_masks(masks):
+    """Combine masks of merged tensors. None stands for no mask"""
+    masks = [ x for x in masks if x is not None ]
+
+    if not masks:
+        return None
+
+    return np.logical_and.reduce(masks)
+
+def run_lstm(
+    x, mask, params, kernel, recurrent_kernel, bias,
+    zero_output_for_mask = False
+):
+    """Run LSTM over a batch of sequences.
+
+    The input projection is calculated for all samples and steps at once,
+    then the recurrence is calculated by a single batched matrix
+    multiplication per step. The semantics of masks, `go_backwards` and
+    `return_sequences` follow `keras`.
+
+    Parameters
+    ----------
+    x : ndarray, shape (N_SAMPLE, N_STEPS, N_FEATURES)
+        Batch of input sequences.
+    mask : ndarray, shape (N_SAMPLE, N_STEPS) or None
+        Mask of valid steps. Masked steps do not update the LSTM state.
+    params : dict
+        LSTM parameters. C.f. `numpy_export._convert_lstm`.
+    kernel, recurrent_kernel, bias : ndarray
+        LSTM weights in the `keras` format.
+    zero_output_for_mask : bool, optional
+        If True, the output sequence will have zeros at masked steps.
+        Otherwise, the output of the previous step is repeated (`keras`
+        default). Default: False.
+
+    Returns
+    -------
+    ndarray
+        Last output of shape (N_SAMPLE, UNITS) or the output sequence of
+        shape (N_SAMPLE, N_STEPS, UNITS) if `return_sequences` is True.
+    """
+
+    units      = params['units']
+    activation = ACTIVATIONS[params['activation']]
+    recurrent_activation = ACTIVATIONS[params['recurrent_activation']]
+
+    n_samples, n_steps = x.shape[:2]
+
+    if params['go_backwards']:
+        x = x[:, ::-1]
+        if mask is not None:
+            mask = mask[:, ::-1]
+
+    projection = x @ kernel + bias
+
+    h = np.zeros((n_samples, units), dtype = x.dtype)
+    c = np.zeros((n_samples, units), dtype = x.dtype)
+
+    if params['return_sequences']:
+        outputs = np.zeros((n_samples, n_steps, units), dtype = x.dtype)
+
+    for step in range(n_steps):
+        z = projection[:, step] + h @ recurrent_kernel
+
+        i = recurrent_activation(z[:, :units])
+        f = recurrent_activation(z[:, units:2*units])
+        o = recurrent_activation(z[:, 3*units:])
+
+        c_new = f * c + i * activation(z[:, 2*units:3*units])
+        h_new = o * activation(c_new)
+
+        if mask is not None:
+            valid = mask[:, step, np.newaxis]
+            c     = np.where(valid, c_new, c)
+            h     = np.where(valid, h_new, h)
+        else:
+            c = c_new
+            h = h_new
+
+        if params['return_sequences']:
+            if zero_output_for_mask and (mask is not None):
+                outputs[:, step] = np.where(valid, h, 0)
+            else:
+                outputs[:, step] = h
+
+    if params['return_sequences']:
+        return outputs
+
+    return h
+
+def merge_bidirectional(forward, backward, merge_mode):
+    """Merge outputs of the forward and backward LSTMs"""
+    if merge_mode == 'concat':
+        return np.concatenate([ forward, backward ], axis = -1)
+
+    if merge_mode == 'sum':
+        return forward + backward
+
+    if merge_mode == 'ave':
+        return (forward + backward) / 2
+
+    if merge_mode == 'mul':
+        return forward * backward
+
+    raise ValueError("Unsupported merge mode: %s" % (merge_mode))
+
+def masked_pooling(x, mask, mode):
+    """Pool `x` over valid steps. C.f. `slice_lid.keras.layers.MaskedPooling`"""
+    if mask is None:
+        mask = np.ones(x.shape[:2], dtype = bool)
+
+    valid = mask[..., np.newaxis]
+
+    if mode == 'max':
+        result = np.max(np.where(valid, x, -1e4), axis = 1)
+        return np.where(np.any(mask, axis = 1, keepdims = True), result, 0)
+
+    result = np.sum(x * valid, axis = 1)
+
+    if mode == 'mean':
+        result /= np.maximum(np.sum(valid, axis = 1), 1)
+
+    return result
+
+class NumpyModel:
+    """Pure NumPy runtime of a model exported by `export_numpy_model`.
+
+    `NumpyModel` mimics the parts of the `keras.Model` interface that are
+    used for scoring (`input_names`, `inputs`, `predict_on_batch`), so it can
+    be used in place of a `keras` model, e.g. by the `SliceLIDPredictor`.
+
+    Parameters
+    ----------
+    topology : dict
+        Model topology. C.f. `convert_model`.
+    weights : dict
+        Model weights of the form { NAME : { WEIGHT_NAME : ndarray } }.
+
+    See Also
+    --------
+    NumpyModel.load
+    slice_lid.export.numpy_export.export_numpy_model
+    """
+
+    def __init__(self, topology, weights):
+        self._nodes   = topology['nodes']
+        self._outputs = topology['outputs']
+        self._weights = weights
+
+        nodes_dict = { node['name'] : node for node in self._nodes }
+
+        self.input_names = list(topology['inputs'])
+        self.inputs      = [
+            NumpyInput(
+                name,
+                tuple(nodes_dict[name]['params']['shape']),
+                nodes_dict[name]['params']['dtype']
+            )
+                for name in self.input_names
+        ]
+
+    @staticmethod
+    def load(path):
+        """Load model exported to the directory `path`"""
+        with open(os.path.join(path, TOPOLOGY_FNAME), 'rt') as f:
+            topology = json.load(f)
+
+        weights = {}
+
+        with np.load(os.path.join(path, WEIGHTS_FNAME)) as npz:
+            for key in npz.files:
+                name, weight = key.rsplit('/', 1)
+                weights.setdefault(name, {})[weight] = npz[key]
+
+        return NumpyModel(topology, weights)
+
+    def _eval_node(self, node, args, masks):
+        """Evaluate `node` on `args` with `masks`. Return (value, mask)"""
+        # pylint: disable=too-many-return-statements
+        op      = node['op']
+        params  = node['params']
+        weights = self._weights.get(node['name'], {})
+
+        if op == 'dense':
+            value = args[0] @ weights['kernel'] + weights['bias']
+            return (ACTIVATIONS[params['activation']](value), masks[0])
+
+        if op == 'affine':
+            return (args[0] * weights['scale'] + weights['shift'], masks[0])
+
+        if op == 'activation':
+            return (ACTIVATIONS[params['activation']](args[0]), masks[0])
+
+        if op == 'identity':
+            return (args[0], masks[0])
+
+        if op == 'masking':
+            mask = np.any(args[0] != params['mask_value'], axis = -1)
+            return (args[0] * mask[..., np.newaxis], mask)
+
+        if op == 'length_mask':
+            x, lengths = args
+            mask = (
+                np.arange(x.shape[1])[np.newaxis, :]
+                < np.reshape(lengths, (-1, 1))
+            )
+            return (np.where(mask[..., np.newaxis], x, 0), mask)
+
+        if op == 'masked_pooling':
+            return (masked_pooling(args[0], masks[0], params['mode']), None)
+
+        if op == 'lstm':
+            value = run_lstm(args[0], masks[0], params, **weights)
+            return (value, masks[0] if params['return_sequences'] else None)
+
+        if op == 'bidirectional':
+            return self._eval_bidirectional(params, weights, args, masks)
+
+        if op == 'concatenate':
+            value = np.concatenate(args, axis = params['axis'])
+            return (value, combine_masks(masks))
+
+        if op == 'add':
+            return (sum(args[1:], args[0]), combine_masks(masks))
+
+        if op == 'average':
+            return (sum(args[1:], args[0]) / len(args), combine_masks(masks))
+
+        raise ValueError("Unknown operation: %s" % (op))
+
+    @staticmethod
+    def _eval_bidirectional(params, weights, args, masks):
+        """Evaluate bidirectional LSTM node. Return (value, mask)"""
+        return_sequences = params['forward']['return_sequences']
+        outputs = []
+
+        for direction in [ 'forward', 'backward' ]:
+            prefix = direction + '_'
+            output = run_lstm(
+                args[0], masks[0], params[direction],
+                zero_output_for_mask = return_sequences,
+                **{
+                    k[len(prefix):] : v for (k, v) in weights.items()
+                        if k.startswith(prefix)
+                }
+            )
+
+            if (direction == 'backward') and return_sequences:
+                output = output[:, ::-1]
+
+            outputs.append(output)
+
+        value = merge_bidirectional(*outputs, params['merge_mode'])
+        mask  = masks[0] if return_sequences else None
+
+        return (value, mask)
+
+    def predict_on_batch(self, inputs):
+        """Evaluate model on a batch of `inputs`.
+
+        Parameters
+        ----------
+        inputs : dict or list of ndarray
+            Batch of model inputs, either as a dict { INPUT_NAME : ndarray }
+            or as a list of arrays in the order of `input_names`.
+
+        Returns
+        -------
+        ndarray or list of ndarray
+            Model outputs. A list is returned if the model has multiple
+            outputs.
+        """
+
+        if not isinstance(inputs, dict):
+            inputs = dict(zip(self.input_names, inputs))
+
+        values = {}
+        masks  = {}
+
+        for node in self._nodes:
+            name = node['name']
+
+            if node['op'] == 'input':
+                values[name] = np.asarray(
+                    inputs[name], dtype = node['params']['dtype']
+                )
+                masks[name]  = None
+                continue
+
+            values[name], masks[name] = self._eval_node(
+                node,
+                [ values[x] for x in node['inputs'] ],
+                [ masks[x]  for x in node['inputs'] ],
+            )
+
+        outputs = [ values[name] for name in self._outputs ]
+
+        if len(outputs) == 1:
+            return outputs[0]
+
+        return outputs
+
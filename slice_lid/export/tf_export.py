@@ -0,0 +1,431 @@
+"""
+Export of `keras` models to the TensorFlow v2 deployment formats.
+
+The model is exported into a directory with the following artifacts:
+    - "saved_model/" is a TF2 SavedModel with a "serving_default" signature.
+    - "model.pb" is a frozen (variables converted to constants) and
+      grappler optimized graph of the serving function.
+    - "model_{float32,float16,int8}.tflite" are optional TFLite conversions
+      of the model. "int8" refers to the dynamic range quantization.
+    - "config.json" holds names of the input variables and names of the
+      input/output graph nodes.
+
+Prior to the export, Batch Normalization layers are folded into the
+following Dense/LSTM layers whenever possible. C.f. `fold_batchnorm`.
+"""
+
+import json
+import logging
+import os
+
+import numpy as np
+
+from slice_lid.utils.lazy import LazyModule
+from .numpy_export import _get_inbound_names
+from .tflite_model import TFLiteModel
+
+# Import TensorFlow on the first use, so that the constants of this module
+# can be used without it
+keras = LazyModule('keras')
+tf    = LazyModule('tensorflow')
+
+LOGGER = logging.getLogger('slice_lid.export.tf_export')
+
+SAVED_MODEL_SUBDIR   = 'saved_model'
+FROZEN_GRAPH_FNAME   = 'model.pb'
+TFLITE_FNAME         = 'model_%s.tflite'
+CONFIG_FNAME         = 'config.json'
+TFLITE_QUANTIZATIONS = [ 'float32', 'float16', 'int8' ]
+
+GRAPPLER_OPTIMIZERS = [
+    'pruning', 'constfold', 'arithmetic', 'dependency', 'function',
+]
+
+def _get_bias_kernel_indices(layer):
+    """Find indices of (kernel, bias) weight pairs of a layer to fold into"""
+    if isinstance(layer, keras.layers.TimeDistributed):
+        layer = layer.layer
+
+    if isinstance(layer, keras.layers.Dense) and layer.use_bias:
+        return [ (0, 1) ]
+
+    if isinstance(layer, keras.layers.LSTM) and layer.use_bias:
+        return [ (0, 2) ]
+
+    if (
+            isinstance(layer, keras.layers.Bidirectional)
+        and isinstance(layer.forward_layer, keras.layers.LSTM)
+        and layer.forward_layer.use_bias
+    ):
+        return [ (0, 2), (3, 5) ]
+
+    return None
+
+def _get_batchnorm_affine(layer):
+    """Convert batch normalization into affine `x * scale + shift`"""
+    weights  = layer.get_weights()
+    mean     = weights[-2]
+    variance = weights[-1]
+    gamma    = weights[0] if layer.scale else np.ones_like(mean)
+    beta     = weights[int(layer.scale)] if layer.center else 0
+
+    scale = gamma / np.sqrt(variance + layer.epsilon)
+    shift = beta - mean * scale
+
+    return (scale, shift)
+
+def _set_batchnorm_identity(layer):
+    """Set batch normalization parameters to make it an identity"""
+    weights = layer.get_weights()
+    size    = weights[-1].shape
+
+    identity = []
+
+    if layer.scale:
+        identity.append(np.ones(size))
+
+    if layer.center:
+        identity.append(np.zeros(size))
+
+    identity += [ np.zeros(size), np.full(size, 1 - layer.epsilon) ]
+
+    layer.set_weights(identity)
+
+def _is_last_axis(layer):
+    """Check whether batch normalization `layer` is over the last axis"""
+    axis = np.ravel(layer.axis)
+    rank = len(layer.input.shape)
+
+    return (len(axis) == 1) and (axis[0] in [ -1, rank - 1 ])
+
+def _find_consumers(model):
+    """Find names of the layers that consume outputs of each model layer"""
+    config = model.get_config()
+    result = { spec['name'] : [] for spec in config['layers'] }
+
+    for spec in config['layers']:
+        for name in _get_inbound_names(spec):
+            result[name].append(spec['name'])
+
+    return result
+
+def fold_batchnorm(model):
+    """Fold Batch Normalization layers into the following Dense/LSTM layers.
+
+    In the inference mode, the Batch Normalization is an affine transform
+    `x * scale + shift`, that can be absorbed by the kernel and bias of the
+    following Dense (possibly wrapped by TimeDistributed), LSTM or
+    Bidirectional LSTM layers. The folding is performed only if all
+    consumers of the batch normalization output are such layers. The folded
+    Batch Normalization layers are turned into identities, which are removed
+    from the graph by the constant folding during the graph freezing.
+
+    Parameters
+    ----------
+    model : keras.Model
+        Functional model to fold batch normalization of. It is not modified.
+
+    Returns
+    -------
+    (keras.Model, int)
+        Copy of `model` with folded batch normalization and the number of
+        folded Batch Normalization layers.
+    """
+    # pylint: disable=import-outside-toplevel
+    from slice_lid.keras.layers import get_custom_objects
+
+    with keras.utils.custom_object_scope(get_custom_objects()):
+        result = keras.models.clone_model(model)
+
+    result.set_weights(model.get_weights())
+
+    consumers = _find_consumers(result)
+    n_folded  = 0
+
+    for layer in result.layers:
+        if (
+               (not isinstance(layer, keras.layers.BatchNormalization))
+            or (not _is_last_axis(layer))
+            or (not consumers[layer.name])
+        ):
+            continue
+
+        targets = [ result.get_layer(x) for x in consumers[layer.name] ]
+        indices = [ _get_bias_kernel_indices(x) for x in targets ]
+
+        if any(x is None for x in indices):
+            continue
+
+        scale, shift = _get_batchnorm_affine(layer)
+
+        for (target, target_indices) in zip(targets, indices):
+            weights = target.get_weights()
+
+            for (idx_kernel, idx_bias) in target_indices:
+                kernel = weights[idx_kernel]
+                weights[idx_bias]   = weights[idx_bias] + shift @ kernel
+                weights[idx_kernel] = scale[:, np.newaxis] * kernel
+
+            target.set_weights(weights)
+
+        _set_batchnorm_identity(layer)
+        n_folded += 1
+
+    return (result, n_folded)
+
+def make_serving_function(model):
+    """Make concrete serving function of `model`.
+
+    The function takes model inputs as keyword arguments named after the
+    model input layers and returns a dict { OUTPUT_NAME : TENSOR }.
+    """
+    signature = [
+        tf.TensorSpec(x.shape, x.dtype, name = name)
+            for (name, x) in zip(model.input_names, model.inputs)
+    ]
+
+    @tf.function(input_signature = signature)
+    def serve(*inputs):
+        outputs = model(list(inputs), training = False)
+
+        if not isinstance(outputs, (list, tuple)):
+            outputs = [ outputs ]
+
+        return dict(zip(model.output_names, outputs))
+
+    return serve.get_concrete_function()
+
+def optimize_graph_def(func, graph_def):
+    """Optimize graph of a frozen concrete function `func` with grappler"""
+    # pylint: disable=import-outside-toplevel
+    # TF does not provide a public API to run grappler on a graph
+    from tensorflow.core.protobuf import config_pb2, meta_graph_pb2
+    from tensorflow.python.grappler import tf_optimizer
+    from tensorflow.python.training.saver import export_meta_graph
+
+    meta_graph = export_meta_graph(graph_def = graph_def, graph = func.graph)
+
+    fetch_collection = meta_graph_pb2.CollectionDef()
+    for tensor in func.inputs + func.outputs:
+        fetch_collection.node_list.value.append(tensor.name)
+
+    meta_graph.collection_def['train_op'].CopyFrom(fetch_collection)
+
+    config = config_pb2.ConfigProto()
+    config.graph_options.rewrite_options.optimizers.extend(
+        GRAPPLER_OPTIMIZERS
+    )
+
+    return tf_optimizer.OptimizeGraph(config, meta_graph)
+
+def freeze_serving_function(func, optimize = True):
+    """Freeze concrete function `func` into a constant graph.
+
+    Returns
+    -------
+    (ConcreteFunction, tf.compat.v1.GraphDef)
+        Frozen concrete function and its (optimized) graph definition.
+    """
+    # pylint: disable=import-outside-toplevel
+    from tensorflow.python.framework.convert_to_constants import (
+        convert_variables_to_constants_v2
+    )
+
+    frozen    = convert_variables_to_constants_v2(func)
+    graph_def = frozen.graph.as_graph_def()
+
+    if optimize:
+        graph_def = optimize_graph_def(frozen, graph_def)
+
+    return (frozen, graph_def)
+
+def convert_tflite(model, quantization = 'float32'):
+    """Convert `model` to TFLite with optional post-training quantization.
+
+    Parameters
+    ----------
+    model : keras.Model
+        Model to convert.
+    quantization : { 'float32', 'float16', 'int8' }, optional
+        Quantization to apply. 'float16' stores weights in half precision,
+        'int8' applies the dynamic range quantization (int8 weights, float
+        activations). Default: 'float32'.
+
+    Returns
+    -------
+    bytes
+        Serialized TFLite model.
+    """
+
+    if quantization not in TFLITE_QUANTIZATIONS:
+        raise ValueError("Unknown TFLite quantization: %s" % (quantization))
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+
+    # Masked LSTMs are not fully covered by the TFLite builtin ops
+    converter.target_spec.supported_ops = [
+        tf.lite.OpsSet.TFLITE_BUILTINS, tf.lite.OpsSet.SELECT_TF_OPS
+    ]
+
+    if quantization != 'float32':
+        converter.optimizations = [ tf.lite.Optimize.DEFAULT ]
+
+    if quantization == 'float16':
+        converter.target_spec.supported_types = [ tf.float16 ]
+
+    return converter.convert()
+
+def create_tf_config(args, model, frozen):
+    """
+    Create evaluation configuration that holds input variables and graph nodes
+    """
+    config_tf = {
+        'vars_slice' : args.vars_input_slice,
+        'vars_png3d' : args.vars_input_png3d,
+    }
+
+    config_tf.update({
+        name : tensor.name.split(':')[0]
+            for (name, tensor) in zip(model.input_names, frozen.inputs)
+    })
+
+    outputs = frozen.structured_outputs
+    config_tf.update({
+        name : outputs[name].name.split(':')[0] for name in model.output_names
+    })
+
+    return config_tf
+
+def export_tf_model(
+    model, args, outdir,
+    fold     = True,
+    optimize = True,
+    tflite   = None,
+):
+    """Export `keras` model to the TF2 deployment formats into `outdir`.
+
+    Parameters
+    ----------
+    model : keras.Model
+        Model to export.
+    args : Args
+        Configuration of the `model`.
+    outdir : str
+        Directory to save exported artifacts to.
+    fold : bool, optional
+        Whether to fold batch normalization. Default: True.
+    optimize : bool, optional
+        Whether to optimize frozen graph with grappler. Default: True.
+    tflite : list of str or None, optional
+        List of TFLite quantizations to export. C.f. `convert_tflite`.
+        If None, TFLite export is skipped. Default: None.
+
+    Returns
+    -------
+    dict
+        Evaluation configuration saved into "config.json".
+    """
+
+    if fold:
+        model, n_folded = fold_batchnorm(model)
+        LOGGER.info("Folded %d batch normalization layers", n_folded)
+
+    os.makedirs(outdir, exist_ok = True)
+
+    func = make_serving_function(model)
+
+    tf.saved_model.save(
+        model, os.path.join(outdir, SAVED_MODEL_SUBDIR),
+        signatures = { 'serving_default' : func }
+    )
+
+    frozen, graph_def = freeze_serving_function(func, optimize)
+    tf.io.write_graph(graph_def, outdir, FROZEN_GRAPH_FNAME, as_text = False)
+
+    for quantization in (tflite or []):
+        fname = os.path.join(outdir, TFLITE_FNAME % quantization)
+
+        with open(fname, 'wb') as f:
+            f.write(convert_tflite(model, quantization))
+
+    config_tf = create_tf_config(args, model, frozen)
+
+    with open(os.path.join(outdir, CONFIG_FNAME), "wt") as f:
+        json.dump(config_tf, f, indent = 4, sort_keys = True)
+
+    return config_tf
+
+def load_saved_model_function(outdir):
+    """Load serving function of the exported SavedModel.
+
+    Returns
+    -------
+    callable
+        Function that maps dict { INPUT_NAME : ndarray } to the array of
+        predictions of the first model output.
+    """
+    loaded = tf.saved_model.load(os.path.join(outdir, SAVED_MODEL_SUBDIR))
+    func   = loaded.signatures['serving_default']
+
+    def predict(inputs):
+        outputs = func(**{ k : tf.constant(v) for (k, v) in inputs.items() })
+        return next(iter(outputs.values())).numpy()
+
+    predict.loaded = loaded
+    return predict
+
+def load_frozen_graph_function(outdir):
+    """Load function of the exported frozen graph.
+
+    Returns
+    -------
+    callable
+        Function that maps dict { INPUT_NAME : ndarray } to the array of
+        predictions of the first model output.
+    """
+    with open(os.path.join(outdir, CONFIG_FNAME), 'rt') as f:
+        config_tf = json.load(f)
+
+    graph_def = tf.compat.v1.GraphDef()
+    with open(os.path.join(outdir, FROZEN_GRAPH_FNAME), 'rb') as f:
+        graph_def.ParseFromString(f.read())
+
+    wrapped = tf.compat.v1.wrap_function(
+        lambda : tf.compat.v1.import_graph_def(graph_def, name = ''), []
+    )
+
+    input_names = [
+        x for x in config_tf if x.startswith('input_')
+    ]
+
+    func = wrapped.prune(
+        [ wrapped.graph.get_tensor_by_name(config_tf[x] + ':0')
+            for x in input_names ],
+        wrapped.graph.get_tensor_by_name(config_tf['target'] + ':0')
+    )
+
+    def predict(inputs):
+        return func(*[ tf.constant(inputs[x]) for x in input_names ]).numpy()
+
+    return predict
+
+def load_tflite_function(outdir, quantization = 'float32'):
+    """Load function of the exported TFLite model.
+
+    Returns
+    -------
+    callable
+        Function that maps dict { INPUT_NAME : ndarray } to the array of
+        predictions of the first model output.
+    """
+    model = TFLiteModel(os.path.join(outdir, TFLITE_FNAME % quantization))
+
+    def predict(inputs):
+        outputs = model.predict_on_batch(inputs)
+
+        if isinstance(outputs, list):
+            return outputs[0]
+
+        return outputs
+
+    return predict
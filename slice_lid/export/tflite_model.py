@@ -0,0 +1,105 @@
+"""
+Wrapper of TFLite models that mimics the `keras.Model` scoring interface.
+"""
+
+import threading
+
+from collections import namedtuple
+
+import numpy as np
+
+from slice_lid.utils.lazy import LazyModule
+
+tf = LazyModule('tensorflow')
+
+TFLiteInput = namedtuple('TFLiteInput', [ 'name', 'shape', 'dtype' ])
+
+class TFLiteModel:
+    """TFLite model with the `keras.Model` like scoring interface.
+
+    `TFLiteModel` mimics the parts of the `keras.Model` interface that are
+    used for scoring (`input_names`, `inputs`, `predict_on_batch`), so it can
+    be used in place of a `keras` model by the `SliceLIDPredictor`.
+
+    Parameters
+    ----------
+    path : str
+        Path to the TFLite model file.
+    num_threads : int or None, optional
+        Number of threads used by the TFLite interpreter. Default: None.
+    signature : str, optional
+        Name of the model signature to evaluate. Default: 'serving_default'.
+
+    Notes
+    -----
+    TFLite interpreter is not thread safe, therefore each thread that calls
+    `predict_on_batch` gets its own interpreter of the model.
+    """
+
+    def __init__(self, path, num_threads = None, signature = None):
+        self._path        = path
+        self._num_threads = num_threads
+        self._signature   = signature
+        self._local       = threading.local()
+
+        details = self._get_runner().get_input_details()
+
+        self.input_names = list(details.keys())
+        self.inputs      = [
+            TFLiteInput(
+                name,
+                tuple(
+                    None if x < 0 else int(x)
+                        for x in details[name]['shape_signature']
+                ),
+                np.dtype(details[name]['dtype']).name
+            )
+                for name in self.input_names
+        ]
+
+    def _get_runner(self):
+        """Get signature runner of the interpreter of the current thread"""
+        runner = getattr(self._local, 'runner', None)
+
+        if runner is None:
+            interpreter = tf.lite.Interpreter(
+                model_path = self._path, num_threads = self._num_threads
+            )
+            runner = interpreter.get_signature_runner(self._signature)
+
+            self._local.interpreter = interpreter
+            self._local.runner      = runner
+
+        return runner
+
+    def predict_on_batch(self, inputs):
+        """Evaluate model on a batch of `inputs`.
+
+        Parameters
+        ----------
+        inputs : dict or list of ndarray
+            Batch of model inputs, either as a dict { INPUT_NAME : ndarray }
+            or as a list of arrays in the order of `input_names`.
+
+        Returns
+        -------
+        ndarray or list of ndarray
+            Model outputs. A list is returned if the model has multiple
+            outputs.
+        """
+        if not isinstance(inputs, dict):
+            inputs = dict(zip(self.input_names, inputs))
+
+        inputs = {
+            x.name : np.asarray(inputs[x.name], dtype = x.dtype)
+                for x in self.inputs
+        }
+
+        outputs = self._get_runner()(**inputs)
+
+        outputs = [ outputs[name] for name in sorted(outputs) ]
+
+        if len(outputs) == 1:
+            return outputs[0]
+
+        return outputs
@@ -0,0 +1,65 @@
+"""
+Definitions of custom `keras` attention layers.
+
+These layers rely on `MultiHeadAttention` and `LayerNormalization` that are
+available only in `tf.keras` >= 2.4. They are kept separate from
+`slice_lid.keras.layers`, such that models that do not use attention can be
+built with older `keras` versions.
+"""
+
+from keras.layers import Layer, LayerNormalization, MultiHeadAttention
+
+from slice_lid.utils.lazy import LazyModule
+
+tf = LazyModule('tensorflow')
+
+class MaskedSelfAttention(Layer):
+    """Multi-head self-attention block over a masked sequence batch.
+
+    The block applies multi-head self-attention, where each sequence step
+    attends only to the valid (non-masked) steps, followed by a residual
+    connection and a layer normalization. The output has the same shape as
+    the input, and the input mask is propagated.
+
+    Parameters
+    ----------
+    num_heads : int
+        Number of attention heads.
+    key_dim : int
+        Size of each attention head.
+    """
+
+    def __init__(self, num_heads, key_dim, **kwargs):
+        super(MaskedSelfAttention, self).__init__(**kwargs)
+
+        self.num_heads = num_heads
+        self.key_dim   = key_dim
+        self.supports_masking = True
+
+        self._attention = MultiHeadAttention(num_heads, key_dim)
+        self._norm      = LayerNormalization()
+
+    def call(self, inputs, mask = None):
+        # pylint: disable=arguments-differ
+        attention_mask = None
+        if mask is not None:
+            attention_mask = mask[:, tf.newaxis, :]
+
+        result = self._attention(
+            inputs, inputs, attention_mask = attention_mask
+        )
+
+        return self._norm(inputs + result)
+
+    def compute_mask(self, inputs, mask = None):
+        return mask
+
+    def compute_output_shape(self, input_shape):
+        return input_shape
+
+    def get_config(self):
+        config = super(MaskedSelfAttention, self).get_config()
+        config['num_heads'] = self.num_heads
+        config['key_dim']   = self.key_dim
+        return config
+
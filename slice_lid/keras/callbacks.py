@@ -0,0 +1,129 @@
+"""
+Definitions of `keras` callbacks.
+"""
+
+import json
+import logging
+import os
+import time
+
+from keras.callbacks import Callback
+
+LOGGER = logging.getLogger('slice_lid.keras.callbacks')
+
+class FullValidation(Callback):
+    """Evaluate model on the full validation set at the decision epochs.
+
+    If validation passes during the training are run only on a subsample of
+    the validation set, the validation metrics used by the early stopping and
+    model checkpointing are noisy. If `epochs` are specified, this callback
+    renames the subsample 'val_*' metrics of every epoch to 'val_subsample_*'
+    and evaluates the model on the full validation set at the end of each of
+    the `epochs`, such that only the full set metrics are reported as
+    'val_*'. Therefore, this callback must precede the callbacks that use
+    validation metrics.
+
+    The model is also evaluated on the full validation set when the training
+    stops (either because of the early stopping decision or because the
+    epoch budget was exhausted), unless it was just evaluated. The last
+    results are saved to "`savedir`/val_full.json".
+
+    Parameters
+    ----------
+    dgen : keras.utils.Sequence
+        Full validation dataset.
+    savedir : str
+        Directory where evaluation results will be saved.
+    epochs : list of int or None, optional
+        List of (1-indexed) epochs after which the full validation will be
+        run. If None, the full validation is run only once the training
+        ends. C.f. `slice_lid.train.setup.get_validation_epochs`.
+        Default: None.
+    **kwargs : dict
+        Extra arguments passed to the `keras.Model.evaluate_generator`.
+    """
+
+    FNAME = 'val_full.json'
+
+    def __init__(self, dgen, savedir, epochs = None, **kwargs):
+        super(FullValidation, self).__init__()
+
+        self._dgen         = dgen
+        self._savedir      = savedir
+        self._epochs       = None if epochs is None else set(epochs)
+        self._kwargs       = kwargs
+        self._epoch        = None
+        self._result_epoch = None
+        self.result        = None
+
+    def _evaluate(self):
+        values = self.model.evaluate_generator(self._dgen, **self._kwargs)
+
+        if not isinstance(values, list):
+            values = [ values ]
+
+        return {
+            'val_%s' % (name) : float(value)
+                for (name, value) in zip(self.model.metrics_names, values)
+        }
+
+    def on_epoch_end(self, epoch, logs = None):
+        self._epoch = epoch
+
+        if self._epochs is None:
+            return
+
+        if logs is not None:
+            for key in [ x for x in logs if x.startswith('val_') ]:
+                logs['val_subsample_' + key[len('val_'):]] = logs.pop(key)
+
+        if (epoch + 1) not in self._epochs:
+            return
+
+        self.result        = self._evaluate()
+        self._result_epoch = epoch
+
+        if logs is not None:
+            logs.update(self.result)
+
+    def on_train_end(self, logs = None):
+        if (self.result is None) or (self._result_epoch != self._epoch):
+            self.result        = self._evaluate()
+            self._result_epoch = self._epoch
+
+        self.result['epoch']      = self._result_epoch
+        self.result['early_stop'] = bool(self.model.stop_training)
+
+        LOGGER.info("Full validation results: %s", self.result)
+
+        with open(os.path.join(self._savedir, self.FNAME), 'wt') as f:
+            json.dump(self.result, f, sort_keys = True, indent = 4)
+
+class EpochTimer(Callback):
+    """Measure wall time of each training epoch.
+
+    The epoch time is also added to the epoch logs as 'epoch_time', so that
+    it is recorded by the callbacks that follow `EpochTimer` (e.g. History).
+
+    Attributes
+    ----------
+    times : list of float
+        Wall times (in seconds) of the completed epochs.
+    """
+
+    def __init__(self):
+        super(EpochTimer, self).__init__()
+        self._start = None
+        self.times  = []
+
+    def on_epoch_begin(self, epoch, logs = None):
+        self._start = time.perf_counter()
+
+    def on_epoch_end(self, epoch, logs = None):
+        self.times.append(time.perf_counter() - self._start)
+
+        if logs is not None:
+            logs['epoch_time'] = self.times[-1]
+
+        LOGGER.debug("Epoch %d took %.2f s", epoch, self.times[-1])
+
@@ -0,0 +1,65 @@
+"""
+Functions to construct ensembles of `keras` models.
+"""
+
+from keras import backend as K
+from keras.layers import Activation, Average, Input
+from keras.models import Model
+
+from slice_lid.consts import ENSEMBLE_TARGET
+
+def make_ensemble_model(towers):
+    """Join `towers` into a single model with shared inputs.
+
+    Parameters
+    ----------
+    towers : list of keras.Model
+        Models with identical inputs to be joined.
+
+    Returns
+    -------
+    keras.Model
+        Model that feeds its inputs to each of the `towers`. The output of
+        the i-th tower is named according to the `ENSEMBLE_TARGET` template.
+    """
+
+    inputs = [
+        Input(batch_shape = K.int_shape(x), dtype = x.dtype, name = name)
+            for (x, name) in zip(towers[0].inputs, towers[0].input_names)
+    ]
+
+    # Keep outputs in float32, c.f. `make_output_layer`
+    outputs = [
+        Activation(
+            'linear', name = ENSEMBLE_TARGET % i, dtype = 'float32'
+        )(tower(inputs))
+            for (i, tower) in enumerate(towers)
+    ]
+
+    return Model(inputs = inputs, outputs = outputs)
+
+def get_ensemble_size(model):
+    """Return number of towers in an ensemble `model`"""
+    return len(model.outputs)
+
+def extract_tower(model, index):
+    """Extract tower `index` from an ensemble `model` as a standalone model"""
+    output = model.get_layer(ENSEMBLE_TARGET % index).output
+    return Model(inputs = model.inputs, outputs = [ output ])
+
+def make_average_model(model):
+    """Make model that averages predictions of the ensemble `model` towers.
+
+    The output of the resulting model is named 'target' and kept in float32,
+    so that the model can be used in place of a single network.
+    """
+
+    if len(model.outputs) == 1:
+        output = Activation(
+            'linear', name = 'target', dtype = 'float32'
+        )(model.outputs[0])
+    else:
+        output = Average(name = 'target', dtype = 'float32')(model.outputs)
+
+    return Model(inputs = model.inputs, outputs = [ output ])
+
@@ -0,0 +1,128 @@
+"""
+Definitions of custom `keras` layers.
+"""
+
+from keras.layers import Layer
+
+from slice_lid.utils.lazy import LazyModule
+
+tf = LazyModule('tensorflow')
+
+class LengthMask(Layer):
+    """Attach mask to a padded sequence batch based on explicit lengths.
+
+    This layer takes a pair [ sequences, lengths ], where `sequences` is a
+    padded batch of shape (N_SAMPLE, N_STEPS, N_FEATURES) and `lengths` is a
+    batch of sequence lengths of shape (N_SAMPLE, 1). It returns `sequences`
+    with padded steps zeroed and with a mask that marks first `lengths` steps
+    of each sample as valid.
+
+    Unlike `keras.layers.Masking` the mask does not depend on the values of
+    the sequence elements. Therefore, sequence elements that happen to be
+    equal to a mask value are not masked by accident.
+    """
+
+    def __init__(self, **kwargs):
+        super(LengthMask, self).__init__(**kwargs)
+        self.supports_masking = True
+
+    @staticmethod
+    def _make_mask(sequences, lengths):
+        lengths = tf.reshape(lengths, (-1,))
+        return tf.sequence_mask(lengths, maxlen = tf.shape(sequences)[1])
+
+    def call(self, inputs, mask = None):
+        # pylint: disable=arguments-differ
+        sequences, lengths = inputs
+        mask = self._make_mask(sequences, lengths)
+
+        return tf.where(
+            mask[..., tf.newaxis], sequences, tf.zeros_like(sequences)
+        )
+
+    def compute_mask(self, inputs, mask = None):
+        sequences, lengths = inputs
+        return self._make_mask(sequences, lengths)
+
+    def compute_output_shape(self, input_shape):
+        return input_shape[0]
+
+class MaskedPooling(Layer):
+    """Pool masked sequence batch over the sequence dimension.
+
+    Parameters
+    ----------
+    mode : { 'sum', 'mean', 'max' }
+        Pooling operation. Masked steps are ignored by all operations.
+        Sequences without any valid steps are pooled into zeros.
+    """
+
+    MODES = [ 'sum', 'mean', 'max' ]
+
+    def __init__(self, mode = 'mean', **kwargs):
+        super(MaskedPooling, self).__init__(**kwargs)
+
+        if mode not in self.MODES:
+            raise ValueError("Unknown pooling mode: %s" % (mode))
+
+        self.mode = mode
+        self.supports_masking = True
+
+    def call(self, inputs, mask = None):
+        # pylint: disable=arguments-differ
+        if mask is None:
+            mask = tf.ones(tf.shape(inputs)[:2], dtype = tf.bool)
+
+        valid = tf.cast(mask, inputs.dtype)[..., tf.newaxis]
+
+        if self.mode == 'max':
+            result = tf.reduce_max(
+                tf.where(valid > 0, inputs, tf.fill(tf.shape(inputs), -1e4)),
+                axis = 1
+            )
+            return tf.where(
+                tf.reduce_any(mask, axis = 1, keepdims = True),
+                result, tf.zeros_like(result)
+            )
+
+        result = tf.reduce_sum(inputs * valid, axis = 1)
+
+        if self.mode == 'mean':
+            result /= tf.maximum(tf.reduce_sum(valid, axis = 1), 1)
+
+        return result
+
+    def compute_mask(self, inputs, mask = None):
+        return None
+
+    def compute_output_shape(self, input_shape):
+        return (input_shape[0], input_shape[2])
+
+    def get_config(self):
+        config = super(MaskedPooling, self).get_config()
+        config['mode'] = self.mode
+        return config
+
+CUSTOM_OBJECTS = {
+    'LengthMask'    : LengthMask,
+    'MaskedPooling' : MaskedPooling,
+}
+
+def get_custom_objects():
+    """Get custom layers required to load saved `slice_lid` models.
+
+    Layers of `slice_lid.keras.attention` require `tf.keras` >= 2.4. They are
+    included only if the installed `keras` provides them, such that models
+    without attention can still be loaded with older `keras` versions.
+    """
+    result = dict(CUSTOM_OBJECTS)
+
+    try:
+        # pylint: disable=import-outside-toplevel
+        from .attention import MaskedSelfAttention
+    except ImportError:
+        return result
+
+    result['MaskedSelfAttention'] = MaskedSelfAttention
+    return result
+
@@ -2,7 +2,9 @@
 Definitions of `keras` models.
 """
 
-from keras.layers import Concatenate, Dense
+from keras.layers import (
+    Concatenate, Dense, Dropout, Input, LSTM, TimeDistributed
+)
 from keras.models import Model
 
 from lstm_ee.keras.models.funcs import get_inputs, modify_layer
@@ -13,7 +15,16 @@ from lstm_ee.keras.models.models_lstm import (
     make_stacked_lstm_branch
 )
 
-from slice_lid.consts import DEF_MASK
+from slice_lid.consts       import DEF_MASK
+from slice_lid.keras.layers import LengthMask, MaskedPooling
+
+def make_output_layer(n, name):
+    """Create softmax output layer with `n` units.
+
+    The output is kept in float32 for the numerical stability under the
+    mixed precision policy.
+    """
+    return Dense(n, activation = 'softmax', name = name, dtype = 'float32')
 
 def model_lstm_standard(
     lstm_units           = 16,
@@ -88,10 +99,8 @@ def model_lstm_standard(
         layer_merged, layers_post, batchnorm, dropout, reg, n_resblocks
     )
 
-    output = Dense(
-        len(target_pdg_iscc_list) + 1,
-        activation = 'softmax',
-        name       = 'target',
+    output = make_output_layer(
+        len(target_pdg_iscc_list) + 1, 'target'
     )(layer_post)
 
     model = Model(inputs = inputs, outputs = [ output ])
@@ -177,10 +186,308 @@ def model_lstm_stack(
         layer_merged, layers_post, batchnorm, dropout, reg, n_resblocks
     )
 
-    output = Dense(
-        len(target_pdg_iscc_list) + 1,
-        activation = 'softmax',
-        name       = 'target',
+    output = make_output_layer(
+        len(target_pdg_iscc_list) + 1, 'target'
+    )(layer_post)
+
+    model = Model(inputs = inputs, outputs = [ output ])
+
+    return model
+
+def make_prong_inputs(vars_input_slice, vars_input_png3d):
+    """Create slice, 3D prong and 3D prong length inputs.
+
+    The prong dimension of the 3D prong input is dynamic, such that batches
+    can be padded only up to the longest slice in the batch.
+    """
+    input_slice     = Input(
+        shape = (len(vars_input_slice),), name = 'input_slice'
+    )
+    input_png3d     = Input(
+        shape = (None, len(vars_input_png3d)), name = 'input_png3d'
+    )
+    input_png3d_len = Input(
+        shape = (1,), dtype = 'int32', name = 'input_png3d_len'
+    )
+
+    return [ input_slice, input_png3d, input_png3d_len ]
+
+def make_masked_prong_encoder(
+    input_png3d, input_png3d_len, layers_pre, batchnorm, dropout, reg
+):
+    """Mask prongs by their explicit lengths and encode them by Dense layers.
+
+    The Dense layers are shared between prongs, i.e. each prong is encoded
+    independently of the others.
+    """
+    layer = LengthMask(name = 'length_mask_png3d')(
+        [ input_png3d, input_png3d_len ]
+    )
+
+    for (idx, units) in enumerate(layers_pre):
+        name  = 'hidden_png3d_%d' % (idx)
+        layer = TimeDistributed(
+            Dense(units, activation = 'relu', kernel_regularizer = reg),
+            name = name
+        )(layer)
+        layer = modify_layer(layer, name, batchnorm)
+
+        if dropout is not None:
+            layer = Dropout(dropout)(layer)
+
+    return layer
+
+def make_packed_lstm_branch(
+    input_png3d, input_png3d_len, layers_pre, lstm_units, batchnorm, dropout,
+    reg
+):
+    """Create LSTM branch that masks prongs by their explicit lengths.
+
+    C.f. `make_standard_lstm_branch` from `lstm_ee` that masks prongs by
+    comparing their values to a mask value.
+    """
+    layer = make_masked_prong_encoder(
+        input_png3d, input_png3d_len, layers_pre, batchnorm, dropout, reg
+    )
+
+    return LSTM(
+        lstm_units,
+        kernel_regularizer    = reg,
+        recurrent_regularizer = reg,
+        name                  = 'lstm_png3d',
+    )(layer)
+
+def model_lstm_packed(
+    lstm_units           = 16,
+    layers_pre           = [],
+    layers_post          = [],
+    n_resblocks          = 0,
+    max_prongs           = None,
+    reg                  = None,
+    batchnorm            = True,
+    dropout              = None,
+    vars_input_slice     = None,
+    vars_input_png3d     = None,
+    target_pdg_iscc_list = None,
+):
+    """Create the SliceLID network that takes explicit numbers of prongs.
+
+    This network is equivalent to the `model_lstm_standard` network, but
+    instead of masking 3D prongs by their values (c.f. `DEF_MASK`) it takes
+    the number of 3D prongs of each slice as an additional input
+    'input_png3d_len' and masks everything beyond it. Prongs with features
+    that happen to be equal to the `DEF_MASK` value are not masked, and
+    batches can be padded only up to the longest slice in the batch.
+
+    Parameters
+    ----------
+    C.f. `model_lstm_standard`. The `max_prongs` parameter is accepted for
+    compatibility, but the prong dimension of the inputs is always dynamic.
+
+    Returns
+    -------
+    keras.Model
+        Model that defines the network.
+
+    See Also
+    --------
+    model_lstm_standard
+    slice_lid.keras.layers.LengthMask
+    """
+
+    # pylint: disable=dangerous-default-value
+    # pylint: disable=unused-argument
+    inputs = make_prong_inputs(vars_input_slice, vars_input_png3d)
+    # pylint: disable=unbalanced-tuple-unpacking
+    input_slice, input_png3d, input_png3d_len = inputs
+
+    branch_png3d = make_packed_lstm_branch(
+        input_png3d, input_png3d_len, layers_pre, lstm_units, batchnorm,
+        dropout, reg
+    )
+
+    layer_merged = Concatenate()([ branch_png3d, input_slice ])
+    layer_merged = modify_layer(layer_merged, 'layer_merged', batchnorm)
+    layer_post   = make_standard_postprocess_branch(
+        layer_merged, layers_post, batchnorm, dropout, reg, n_resblocks
+    )
+
+    output = make_output_layer(
+        len(target_pdg_iscc_list) + 1, 'target'
+    )(layer_post)
+
+    model = Model(inputs = inputs, outputs = [ output ])
+
+    return model
+
+def model_deepsets(
+    layers_pre           = [],
+    pooling              = [ 'sum', 'mean', 'max' ],
+    attention            = None,
+    layers_post          = [],
+    n_resblocks          = 0,
+    max_prongs           = None,
+    reg                  = None,
+    batchnorm            = True,
+    dropout              = None,
+    vars_input_slice     = None,
+    vars_input_png3d     = None,
+    target_pdg_iscc_list = None,
+):
+    """Create the permutation invariant (DeepSets) SliceLID network.
+
+    Each 3D prong is encoded by Dense layers shared between prongs. Then,
+    the prong encodings are optionally mixed by multi-head self-attention
+    blocks and pooled over the prongs into a fixed size slice encoding.
+    Unlike the LSTM networks, this network does not depend on the order of
+    prongs and all prongs are processed in parallel.
+
+    Like the `model_lstm_packed` network, this network masks prongs by the
+    explicit number of prongs input 'input_png3d_len'.
+
+    Parameters
+    ----------
+    layers_pre : list of int
+        List of Dense layer sizes that will be used to encode prongs.
+    pooling : list of str
+        List of pooling operations, which outputs will be concatenated to
+        form the slice encoding. C.f. `MaskedPooling` for available
+        operations. Default: [ 'sum', 'mean', 'max' ].
+    attention : dict or None, optional
+        If not None, then the self-attention blocks will be added after the
+        prong encoder. `attention` is expected to have the form
+            { 'blocks' : N_BLOCKS, 'heads' : N_HEADS, 'key_dim' : KEY_DIM }.
+        C.f. `MaskedSelfAttention`. Default: None.
+    layers_post : list of int
+        List of Dense layer sizes that will be used to postprocess pooled
+        prong encodings.
+
+    Other parameters are the same as the ones of `model_lstm_standard`.
+    The `max_prongs` parameter is accepted for compatibility, but the prong
+    dimension of the inputs is always dynamic.
+
+    Returns
+    -------
+    keras.Model
+        Model that defines the network.
+
+    See Also
+    --------
+    model_lstm_packed
+    slice_lid.keras.layers.MaskedPooling
+    slice_lid.keras.attention.MaskedSelfAttention
+    """
+
+    # pylint: disable=dangerous-default-value
+    # pylint: disable=unused-argument
+    inputs = make_prong_inputs(vars_input_slice, vars_input_png3d)
+    # pylint: disable=unbalanced-tuple-unpacking
+    input_slice, input_png3d, input_png3d_len = inputs
+
+    layer_png3d = make_masked_prong_encoder(
+        input_png3d, input_png3d_len, layers_pre, batchnorm, dropout, reg
+    )
+
+    if attention is not None:
+        # Attention layers require tf.keras >= 2.4
+        # pylint: disable=import-outside-toplevel
+        from slice_lid.keras.attention import MaskedSelfAttention
+
+        for idx in range(attention.get('blocks', 1)):
+            layer_png3d = MaskedSelfAttention(
+                attention['heads'], attention['key_dim'],
+                name = 'attention_png3d_%d' % (idx)
+            )(layer_png3d)
+
+    pooled = [
+        MaskedPooling(mode, name = 'pool_png3d_%s' % (mode))(layer_png3d)
+            for mode in pooling
+    ]
+
+    layer_merged = Concatenate()(pooled + [ input_slice ])
+    layer_merged = modify_layer(layer_merged, 'layer_merged', batchnorm)
+    layer_post   = make_standard_postprocess_branch(
+        layer_merged, layers_post, batchnorm, dropout, reg, n_resblocks
+    )
+
+    output = make_output_layer(
+        len(target_pdg_iscc_list) + 1, 'target'
+    )(layer_post)
+
+    model = Model(inputs = inputs, outputs = [ output ])
+
+    return model
+
+def model_pooled_dense(
+    pooling              = [ 'mean', 'max' ],
+    layers_post          = [ 32 ],
+    n_resblocks          = 0,
+    max_prongs           = None,
+    reg                  = None,
+    batchnorm            = True,
+    dropout              = None,
+    vars_input_slice     = None,
+    vars_input_png3d     = None,
+    target_pdg_iscc_list = None,
+):
+    """Create a cheap SliceLID network of slice and pooled prong inputs.
+
+    Raw 3D prong inputs are masked by the explicit number of prongs
+    'input_png3d_len' and pooled over the prongs into fixed size prong
+    summaries, without encoding individual prongs. The summaries are
+    concatenated with the slice inputs and processed by Dense layers.
+
+    This network is much cheaper to evaluate than the LSTM networks and is
+    intended to be used as the first stage of a cascade classifier.
+    C.f. `slice_lid.eval.cascade`.
+
+    Parameters
+    ----------
+    pooling : list of str
+        List of pooling operations, which outputs will be concatenated to
+        form the prong summaries. C.f. `MaskedPooling` for available
+        operations. Default: [ 'mean', 'max' ].
+    layers_post : list of int
+        List of Dense layer sizes that will be used to postprocess slice
+        inputs and prong summaries. Default: [ 32 ].
+
+    Other parameters are the same as the ones of `model_lstm_standard`.
+    The `max_prongs` parameter is accepted for compatibility, but the prong
+    dimension of the inputs is always dynamic.
+
+    Returns
+    -------
+    keras.Model
+        Model that defines the network.
+
+    See Also
+    --------
+    model_deepsets
+    """
+
+    # pylint: disable=dangerous-default-value
+    # pylint: disable=unused-argument
+    inputs = make_prong_inputs(vars_input_slice, vars_input_png3d)
+    # pylint: disable=unbalanced-tuple-unpacking
+    input_slice, input_png3d, input_png3d_len = inputs
+
+    layer_png3d = LengthMask(name = 'length_mask_png3d')(
+        [ input_png3d, input_png3d_len ]
+    )
+
+    pooled = [
+        MaskedPooling(mode, name = 'pool_png3d_%s' % (mode))(layer_png3d)
+            for mode in pooling
+    ]
+
+    layer_merged = Concatenate()(pooled + [ input_slice ])
+    layer_merged = modify_layer(layer_merged, 'layer_merged', batchnorm)
+    layer_post   = make_standard_postprocess_branch(
+        layer_merged, layers_post, batchnorm, dropout, reg, n_resblocks
+    )
+
+    output = make_output_layer(
+        len(target_pdg_iscc_list) + 1, 'target'
     )(layer_post)
 
     model = Model(inputs = inputs, outputs = [ output ])
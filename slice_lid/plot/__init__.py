@@ -13,12 +13,13 @@ Otherwise, the plot style will be adjusted to look nice in presentations.
 
 import os
 
-import matplotlib.style
-import matplotlib as mpl
-
-from cycler import cycler
-
 if 'BORING_STYLE' in os.environ:
+    # Import matplotlib only when the style needs to be modified, so that
+    # importing `slice_lid.plot` submodules stays cheap
+    # pylint: disable=import-outside-toplevel
+    import matplotlib as mpl
+    from cycler import cycler
+
     mpl.rcParams['axes.prop_cycle'] = cycler(color = 'krgbcmy')
     mpl.rcParams['font.size']        = 12
     mpl.rcParams['legend.fontsize']  = 'medium'
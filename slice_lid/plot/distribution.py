@@ -1,32 +1,25 @@
 """Functions to make plots of PID histograms"""
 
 import os
-import matplotlib.pyplot as plt
 
-from cafplot.rhist.rhist1d import RHist1D
-from cafplot.plot          import plot_rhist1d, plot_rhist1d_error, save_fig
+from slice_lid.eval.distribution import get_score_rhist
+from slice_lid.eval.hist         import ScoreHistogram
+from slice_lid.utils.lazy        import LazyModule
 
-def plot_single_distribution(
-    ax, truth_idx, truth, preds, weights, bins, labels, **kwargs
-):
+plt          = LazyModule('matplotlib.pyplot')
+cafplot_plot = LazyModule('cafplot.plot')
+
+def plot_single_distribution(ax, rhist, label, **kwargs):
     """Plot distribution of predicted PID values for a single true component.
 
     Parameters
     ----------
     ax : matplotlib.Axes
         Axes where histogram will be plotted.
-    truth_idx : int
-        Value of the true component to be plotted.
-    truth : ndarray, shape (N_SAMPLES,)
-        Array of true targets.
-    preds : ndarray, shape (N_SAMPLES,)
-        Array of predicted target scores.
-    weights : ndarray, shape (N_SAMPLES,)
-        Sample weights.
-    bins : int
-        Number of bins of the hist plots.
-    labels : list of str, len(N_TARGETS)
-        List of labels for each target.
+    rhist : RHist1D
+        Histogram of predicted target scores of the true component.
+    label : str
+        Label of the true component.
     kwargs : dict
         Parameters that will be passed to the histogram plot functions.
 
@@ -36,33 +29,22 @@ def plot_single_distribution(
     plot_rhist1d_error
     """
 
-    truth_mask = (truth == truth_idx)
-
-    rhist = RHist1D.from_data(
-        preds[truth_mask], weights = weights[truth_mask],
-        bins = bins, range = (0, 1)
-    )
-
-    plot_rhist1d(ax, rhist, labels[truth_idx], histtype = 'step', **kwargs)
-    plot_rhist1d_error(
+    cafplot_plot.plot_rhist1d(ax, rhist, label, histtype = 'step', **kwargs)
+    cafplot_plot.plot_rhist1d_error(
         ax, rhist, err_type = 'bar', err = 'normal', sigma = 1, **kwargs
     )
 
 def plot_detailed_distributions(
-    truth, preds, weights, bins, labels, log_scale, x_label
+    score_hist, pred_idx, labels, log_scale, x_label
 ):
     """Plot distribution of predicted PID values for each true component.
 
     Parameters
     ----------
-    truth : ndarray, shape (N_SAMPLES,)
-        Array of true targets.
-    preds : ndarray, shape (N_SAMPLES,)
-        Array of predicted target scores.
-    weights : ndarray, shape (N_SAMPLES,)
-        Sample weights.
-    bins : int
-        Number of bins of the hist plots.
+    score_hist : ScoreHistogram
+        Histograms of predicted target scores.
+    pred_idx : int
+        Index of the target to plot scores of.
     labels : list of str, len(N_TARGETS)
         List of labels for each target.
     log_scale : bool
@@ -85,8 +67,8 @@ def plot_detailed_distributions(
 
     for truth_idx in range(len(labels)):
         plot_single_distribution(
-            ax, truth_idx, truth, preds, weights, bins, labels,
-            color = 'C%d' % (truth_idx, )
+            ax, get_score_rhist(score_hist, truth_idx, pred_idx),
+            labels[truth_idx], color = 'C%d' % (truth_idx, )
         )
 
     ax.set_xlabel(x_label)
@@ -97,6 +79,33 @@ def plot_detailed_distributions(
 
     return f, ax
 
+def plot_hist_distributions(score_hist, labels, plotdir, ext):
+    """Make and save plots of hists of pred PID values for each true component.
+
+    Parameters
+    ----------
+    score_hist : ScoreHistogram
+        Histograms of predicted target scores.
+    labels : list of str, len(N_TARGETS)
+        List of labels for each target.
+    plotdir : str
+        Directory where plots will be saved.
+    ext : str or list of str
+        Extension of the plots. If list then the plots will be saved in
+        multiple formats.
+    """
+
+    for pred_idx,x_label in enumerate(labels):
+        for log_scale in [ True, False ]:
+            label = labels[pred_idx]
+
+            f, _ax = plot_detailed_distributions(
+                score_hist, pred_idx, labels, log_scale, x_label
+            )
+
+            fname = 'distrib_%s_log(%s)' % (label, log_scale)
+            cafplot_plot.save_fig(f, os.path.join(plotdir, fname), ext)
+
 def plot_distributions(truth, preds, weights, bins, labels, plotdir, ext):
     """Make and save plots of hists of pred PID values for each true component.
 
@@ -117,17 +126,12 @@ def plot_distributions(truth, preds, weights, bins, labels, plotdir, ext):
     ext : str or list of str
         Extension of the plots. If list then the plots will be saved in
         multiple formats.
-    """
-
-    for pred_idx,x_label in enumerate(labels):
-        for log_scale in [ True, False ]:
-            label = labels[pred_idx]
 
-            f, _ax = plot_detailed_distributions(
-                truth, preds[:, pred_idx], weights, bins, labels, log_scale,
-                x_label
-            )
+    See Also
+    --------
+    plot_hist_distributions
+    """
 
-            fname = 'distrib_%s_log(%s)' % (label, log_scale)
-            save_fig(f, os.path.join(plotdir, fname), ext)
+    score_hist = ScoreHistogram.from_arrays(truth, preds, weights, bins)
+    plot_hist_distributions(score_hist, labels, plotdir, ext)
 
@@ -4,11 +4,13 @@ Functions to make plots of error (confusion) matrices.
 
 import os
 
-import matplotlib.pyplot as plt
 import numpy as np
 
-from cafplot.plot import save_fig
 from slice_lid.eval.error_matrix import normalize_error_matrix
+from slice_lid.utils.lazy        import LazyModule
+
+plt          = LazyModule('matplotlib.pyplot')
+cafplot_plot = LazyModule('cafplot.plot')
 
 def pplot_matrix_values(ax, mat):
     """Print error matrix values in readable color"""
@@ -66,7 +68,7 @@ def plot_error_matrix_base(err_mat, labels, by_truth, fname, ext):
             ax.set_title('Normalized by Preds')
 
     f.colorbar(im)
-    save_fig(f, fname, ext)
+    cafplot_plot.save_fig(f, fname, ext)
 
 def plot_error_matrix(err_mat, labels, plotdir, ext):
     """Make and save plots of an error matrix with different normalizations.
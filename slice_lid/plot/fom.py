@@ -1,10 +1,12 @@
 """Functions to make plots of various Figures Of Merit."""
 
 import os
-import matplotlib.pyplot as plt
 import numpy as np
 
-from cafplot.plot import plot_rhist1d, save_fig
+from slice_lid.utils.lazy import LazyModule
+
+plt          = LazyModule('matplotlib.pyplot')
+cafplot_plot = LazyModule('cafplot.plot')
 
 def decorate_fom_axes(ax, x_label):
     """Adjust style of FOM plot axes"""
@@ -39,7 +41,7 @@ def plot_single_fom(rhist_fom, label, fom_label, **kwargs):
     """
     f, ax = plt.subplots()
 
-    plot_rhist1d(ax, rhist_fom, None, histtype = 'step', **kwargs)
+    cafplot_plot.plot_rhist1d(ax, rhist_fom, None, histtype = 'step', **kwargs)
     decorate_fom_axes(ax, label)
 
     ax.set_title('%s for %s' % (fom_label.capitalize(), label.capitalize()))
@@ -89,7 +91,7 @@ def plot_separate_foms(rhist_fom_list, labels, fom_label, plotdir, ext):
         ax.legend()
 
         fname = 'fom_%s_%s' % (fom_label, x_label)
-        save_fig(f, os.path.join(plotdir, fname), ext)
+        cafplot_plot.save_fig(f, os.path.join(plotdir, fname), ext)
         plt.close(f)
 
 def plot_overlayed_foms(fom_dict, foms_to_overlay, labels, plotdir, ext):
@@ -123,7 +125,7 @@ def plot_overlayed_foms(fom_dict, foms_to_overlay, labels, plotdir, ext):
             rhist_fom = fom_dict[fom_label][pred_idx]
 
             rhist_fom.scale(1 / np.max(rhist_fom.hist))
-            plot_rhist1d(
+            cafplot_plot.plot_rhist1d(
                 ax, rhist_fom, fom_label.capitalize(), histtype = 'step',
                 color = 'C%d' % (fom_idx,)
             )
@@ -135,6 +137,6 @@ def plot_overlayed_foms(fom_dict, foms_to_overlay, labels, plotdir, ext):
         ax.legend()
 
         fname = 'overlayed_foms_%s' % (x_label,)
-        save_fig(f, os.path.join(plotdir, fname), ext)
+        cafplot_plot.save_fig(f, os.path.join(plotdir, fname), ext)
         plt.close(f)
 
@@ -4,13 +4,15 @@ Functions to make plots of error matrix components vs training parameter(-s).
 
 from textwrap import wrap
 
-import matplotlib.pyplot as plt
 import numpy as np
 
-from cafplot.plot import save_fig
-from lstm_ee.plot.profile import get_x_scales, prepare_x_var
+from slice_lid.utils.lazy import LazyModule
 from .labels import convert_targets_to_labels
 
+plt             = LazyModule('matplotlib.pyplot')
+cafplot_plot    = LazyModule('cafplot.plot')
+lstm_ee_profile = LazyModule('lstm_ee.plot.profile')
+
 def plot_profile_base(x, y_dict, label_x, label_y, categorical, scale_x):
     """Make a plot of error matrix components `y_dict` vs training param `x`"""
     f, ax = plt.subplots()
@@ -110,7 +112,7 @@ def plot_profile(
         Extension of the plots. If list then the plots will be saved in
         multiple formats.
     """
-    x      = prepare_x_var(var_list, categorical)
+    x      = lstm_ee_profile.prepare_x_var(var_list, categorical)
     labels = convert_targets_to_labels(target_pdg_iscc_list)
 
     y_dict = {
@@ -122,7 +124,7 @@ def plot_profile(
     )
 
     x, y_dict    = sort_data(x, y_dict, sort_type, 'Average')
-    scale_x_list = get_x_scales(x, categorical)
+    scale_x_list = lstm_ee_profile.get_x_scales(x, categorical)
 
     for scale_x in scale_x_list:
         f, _ = plot_profile_base(
@@ -131,6 +133,6 @@ def plot_profile(
 
         fullname = "%s_xs(%s)" % (fname, scale_x)
 
-        save_fig(f, fullname, ext)
+        cafplot_plot.save_fig(f, fullname, ext)
         plt.close(f)
 
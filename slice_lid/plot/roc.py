@@ -0,0 +1,111 @@
+"""Functions to make plots of ROC curves and exact Figures Of Merit."""
+
+import os
+
+from slice_lid.utils.lazy import LazyModule
+from .fom                 import decorate_fom_axes, plot_maxval_line
+
+plt          = LazyModule('matplotlib.pyplot')
+cafplot_plot = LazyModule('cafplot.plot')
+
+def plot_roc_curves(curves_list, labels, plotdir, ext, max_points = 1000):
+    """Make and save plots of ROC curves of each target.
+
+    ROC curves of all targets are overlayed on a single plot, which is saved
+    in both linear and logarithmic x axis scales.
+
+    Parameters
+    ----------
+    curves_list : list of ExactCurves
+        Curves of each target. C.f. `calc_exact_curves`.
+    labels : list of str
+        List of target names. One for each item in `curves_list`.
+    plotdir : str
+        Directory where plots will be saved.
+    ext : str or list of str
+        Extension of the plots. If list then the plots will be saved in
+        multiple formats.
+    max_points : int, optional
+        Maximum number of points of each curve. Default: 1000.
+    """
+
+    for log_scale in [ True, False ]:
+        f, ax = plt.subplots()
+
+        for pred_idx,label in enumerate(labels):
+            curves   = curves_list[pred_idx]
+            fpr, tpr = curves.downsample(max_points).calc_roc()
+
+            ax.plot(
+                fpr, tpr, color = 'C%d' % (pred_idx,),
+                label = '%s. AUC: %.4f' % (label, curves.calc_auc())
+            )
+
+        if log_scale:
+            ax.set_xscale('log')
+        else:
+            ax.plot([ 0, 1 ], [ 0, 1 ], color = 'k', linestyle = 'dotted')
+            ax.set_xlim((0, 1))
+
+        ax.set_ylim((0, 1))
+        ax.set_xlabel('Background Efficiency')
+        ax.set_ylabel('Signal Efficiency')
+        ax.set_title('ROC Curves')
+
+        ax.grid(True, which = 'major', linestyle = 'dashed', linewidth = 1.0)
+        ax.legend()
+
+        fname = 'roc_curves_log(%s)' % (log_scale,)
+        cafplot_plot.save_fig(f, os.path.join(plotdir, fname), ext)
+        plt.close(f)
+
+def plot_exact_foms(
+    curves_list, labels, fom_label, plotdir, ext, max_points = 1000
+):
+    """Make and save separate plots of exact FOMs vs cut on the score.
+
+    Parameters
+    ----------
+    curves_list : list of ExactCurves
+        Curves of each target. C.f. `calc_exact_curves`.
+    labels : list of str
+        List of x axis labels. One for each item in `curves_list`.
+    fom_label : str
+        Name of the FOM. C.f. `EXACT_FOM_SPEC_DICT`.
+    plotdir : str
+        Directory where plots will be saved.
+    ext : str or list of str
+        Extension of the plots. If list then the plots will be saved in
+        multiple formats.
+    max_points : int, optional
+        Maximum number of points of each curve. Default: 1000.
+
+    See Also
+    --------
+    plot_separate_foms
+    """
+
+    for pred_idx,x_label in enumerate(labels):
+        curves  = curves_list[pred_idx]
+        sampled = curves.downsample(max_points)
+
+        f, ax = plt.subplots()
+
+        ax.plot(
+            sampled.thresholds, sampled.calc_fom(fom_label),
+            drawstyle = 'steps-post', color = 'C0'
+        )
+
+        max_pos, max_val = curves.find_best_cut(fom_label)
+        plot_maxval_line(ax, max_pos, max_val, color = 'C1')
+
+        decorate_fom_axes(ax, x_label)
+
+        ax.set_title('%s for %s' % (fom_label.capitalize(), x_label))
+        ax.set_ylabel(fom_label.capitalize())
+        ax.legend()
+
+        fname = 'fom_exact_%s_%s' % (fom_label, x_label)
+        cafplot_plot.save_fig(f, os.path.join(plotdir, fname), ext)
+        plt.close(f)
+
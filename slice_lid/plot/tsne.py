@@ -0,0 +1,225 @@
+"""Functions to make plots of the t-SNE embedding of the predicted scores"""
+
+import os
+
+import numpy as np
+
+from slice_lid.utils.lazy import LazyModule
+
+mpl           = LazyModule('matplotlib')
+plt           = LazyModule('matplotlib.pyplot')
+mpatches      = LazyModule('matplotlib.patches')
+cafplot_plot  = LazyModule('cafplot.plot')
+manifold      = LazyModule('sklearn.manifold')
+preprocessing = LazyModule('sklearn.preprocessing')
+
+def calc_embedding(data, perplexity, dims):
+    """Calculate t-SNE embedding coordinates"""
+    tsne = manifold.TSNE(
+        perplexity = perplexity, n_components = dims, verbose = 10
+    )
+
+    return tsne.fit_transform(data)
+
+def plot_2d_embedding_scatter(truth, preds, labels, fname_base, ext):
+    """Make a scatterplot of embedded data"""
+    classes = np.arange(len(labels))
+
+    f, ax = plt.subplots()
+
+    # To make points visible and avoid clutter
+    if len(truth) >= 20000:
+        alpha = 0.25
+    elif len(truth) >= 10000:
+        alpha = 0.50
+    else:
+        alpha = 0.75
+
+    for class_idx in classes:
+        truth_mask = (truth == class_idx)
+        preds_idx  = preds[truth_mask, :]
+        color      = 'C%d' % (class_idx,)
+
+        ax.scatter(
+            preds_idx[:, 0], preds_idx[:, 1], label = labels[class_idx],
+            marker = ',', color = color, alpha = alpha
+        )
+
+    add_nice_legend(ax)
+    cafplot_plot.save_fig(f, fname_base + "_scatter", ext)
+
+def normalize_alpha_channel(hist2d_rgba):
+    """Event out alpha channel of 2D array of RGBA colors."""
+
+    brightness = hist2d_rgba[...,3].reshape(
+        (hist2d_rgba.shape[0] * hist2d_rgba.shape[1], 1)
+    )
+
+    brightness[brightness == 0]      = np.nan
+    brightness = preprocessing.quantile_transform(brightness)
+    brightness[np.isnan(brightness)] = 0
+
+    hist2d_rgba[...,3] = brightness.reshape(
+        (hist2d_rgba.shape[0], hist2d_rgba.shape[1])
+    )
+
+def mix_density_hists(hists):
+    """Mix 2D arrays of RGBA colors.
+
+    This function receives a list of 2D arrays of RGBA colors as input.
+    It mixes these arrays together to produce a single 2D array of mixed RGBA
+    colors.
+    """
+    result    = np.zeros(hists[0].shape + (4,))
+    alpha_sum = np.zeros(hists[0].shape)
+
+    result[...,3] = 1
+
+    for idx,hist in enumerate(hists):
+        alpha = mpl.colors.Normalize(vmin = 0, vmax = 1)(hist)
+        color = mpl.colors.to_rgb('C%d' % (idx,))
+
+        result[...,0] += alpha * color[0]
+        result[...,1] += alpha * color[1]
+        result[...,2] += alpha * color[2]
+        result[...,3] *= (1 - alpha)
+
+        alpha_sum     += alpha
+
+    result[...,0] /= alpha_sum
+    result[...,1] /= alpha_sum
+    result[...,2] /= alpha_sum
+    result[...,3] = 1 - result[...,3]
+
+    # make colors more bright
+    normalize_alpha_channel(result)
+
+    return result
+
+def find_values_range(values, margin = 0.05):
+    # pylint: disable=missing-function-docstring
+    a = np.min(values)
+    b = np.max(values)
+
+    values_range = (b - a)
+
+    return [a - margin * values_range, b + margin * values_range]
+
+def get_color_hist(truth, preds, labels, bins):
+    """Get a 2D array of RGBA colors representing density of true classes.
+
+    Parameters
+    ----------
+    truth : ndarray, shape (N_SAMPLES,)
+        True labels (classes) of samples.
+    preds : ndarray, shape (N_SAMPLES, 2)
+        Embedded coordinates of predicted scores of targets (classes).
+    labels : list of str
+        Names of the classes.
+    bins : int
+        Number of bins in each histogram dimension.
+
+    Returns
+    -------
+    mixed_hist : ndarray, shape (`bins`, `bins`, 4)
+        2D array of RGBA colors representing density of classes.
+    xbins : ndarray, shape (`bins+1, )
+        Bin edges in the x coordinate.
+    ybins : ndarray, shape (`bins+1, )
+        Bin edges in the y coordinate.
+    """
+    classes = np.arange(len(labels))
+
+    xlim  = find_values_range(preds[:,0])
+    ylim  = find_values_range(preds[:,1])
+    hists = []
+
+    for class_idx in classes:
+        mask = (truth == class_idx)
+
+        class_hist, xbins, ybins = np.histogram2d(
+            preds[mask, 0], preds[mask, 1],
+            bins    = bins,
+            range   = [xlim, ylim],
+            density = True
+        )
+        class_hist[np.isnan(class_hist)] = 0
+        hists.append(class_hist)
+
+    mixed_hist = mix_density_hists(hists)
+
+    return (mixed_hist, xbins, ybins)
+
+def add_nice_legend(ax, **kwargs):
+    """Add legend on top of plot"""
+    ax.legend(
+        bbox_to_anchor = (0.0, 1.01, 1.0, 1.11), fancybox = True,
+        loc = 'lower left', mode = 'expand', ncol = 5,
+        **kwargs
+    )
+
+def plot_2d_embedding_density(truth, preds, labels, bins, fname_base, ext):
+    """Make a density plot of embedded coordinates."""
+    color_hist, xbins, ybins = get_color_hist(truth, preds, labels, bins)
+    f, ax = plt.subplots()
+
+    ax.imshow(
+        np.transpose(color_hist, (1, 0, 2)),
+        interpolation = 'nearest',
+        origin        = 'lower',
+        extent        = [xbins[0], xbins[-1], ybins[0], ybins[-1]]
+    )
+
+    ax.set_aspect('auto')
+
+    handles = [
+        mpatches.Patch(color = 'C%d' % (idx), label = label)
+            for idx,label in enumerate(labels)
+    ]
+
+    add_nice_legend(ax, handles = handles)
+    cafplot_plot.save_fig(f, fname_base + "_density", ext)
+
+def plot_tsne(
+    truth, preds, labels, limit, perplexity, dims, bins, plotdir, ext
+):
+    """Make and save plots of the t-SNE embedding of the predicted scores.
+
+    Parameters
+    ----------
+    truth : ndarray, shape (N_SAMPLES,)
+        True labels (classes) of samples.
+    preds : ndarray, shape (N_SAMPLES, N_TARGETS)
+        Predicted target scores.
+    labels : list of str
+        Names of the classes.
+    limit : int
+        Number of first samples to calculate embedding of.
+    perplexity : float
+        Perplexity value for the t-SNE embedding.
+    dims : int
+        Number of dimensions of the embedding manifold. Plots are made
+        only for the 2D embeddings.
+    bins : int
+        Number of bins of the density plot.
+    plotdir : str
+        Directory where plots will be saved.
+    ext : str or list of str
+        Extension of the plots.
+    """
+    truth = truth[:limit]
+    preds = preds[:limit, :]
+
+    embedded_preds = calc_embedding(preds, perplexity, dims)
+
+    fname_base = 'tsne_%d_perp(%e)_lim(%d)' % (dims, perplexity, limit)
+    fname_base = os.path.join(plotdir, fname_base)
+
+    if dims == 2:
+        plot_2d_embedding_scatter(
+            truth, embedded_preds, labels, fname_base, ext
+        )
+        plot_2d_embedding_density(
+            truth, embedded_preds, labels, bins, fname_base, ext
+        )
+
@@ -0,0 +1,11 @@
+"""Local inference server of `slice_lid` models with micro-batching"""
+
+from .batcher import MicroBatcher
+from .client  import SliceLIDClient
+from .metrics import ServingMetrics
+from .server  import make_server, serve
+
+__all__ = [
+    'MicroBatcher', 'ServingMetrics', 'SliceLIDClient', 'make_server', 'serve'
+]
+
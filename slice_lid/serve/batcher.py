@@ -0,0 +1,213 @@
+"""
+Micro-batching of concurrent scoring requests.
+"""
+
+import itertools
+import logging
+import queue
+import threading
+import time
+
+from collections        import namedtuple
+from concurrent.futures import Future
+
+import numpy as np
+
+from .codec   import make_varr_column
+from .metrics import ServingMetrics
+
+LOGGER = logging.getLogger('slice_lid.serve.batcher')
+
+Request = namedtuple(
+    'Request', [ 'columns', 'n_samples', 'future', 'submitted' ]
+)
+
+def get_n_samples(columns):
+    """Get number of samples in a dict of column arrays `columns`"""
+    return len(next(iter(columns.values())))
+
+def concat_column(values):
+    """Concatenate column arrays or sequences of variable length arrays"""
+    if all(isinstance(x, np.ndarray) for x in values):
+        return np.concatenate(values)
+
+    values = list(itertools.chain(*values))
+
+    if all(np.ndim(x) == 0 for x in values):
+        return np.array(values, dtype = np.float32)
+
+    return make_varr_column(values)
+
+def merge_columns(columns_list):
+    """Concatenate dicts of column arrays sample-wise"""
+    if len(columns_list) == 1:
+        return columns_list[0]
+
+    return {
+        k : concat_column([ x[k] for x in columns_list ])
+            for k in columns_list[0]
+    }
+
+class MicroBatcher:
+    """Group concurrent scoring requests into micro-batches.
+
+    Requests are queued and scored by a single worker thread. The worker
+    takes the oldest request and waits up to `max_latency` seconds after its
+    submission for more requests, until the micro-batch accumulates
+    `max_batch_size` samples. Then, the whole micro-batch is scored by a
+    single `predict` call and the scores are split between the requests.
+
+    Parameters
+    ----------
+    predict : callable
+        Function that takes a dict of column arrays and returns an array of
+        scores of shape (N_SAMPLES, N_TARGETS), e.g.
+        `SliceLIDPredictor.predict_columns`.
+    max_batch_size : int, optional
+        Number of samples after which a micro-batch is scored without
+        waiting for more requests. Default: 1024.
+    max_latency : float, optional
+        Maximum time [s] a request waits for other requests to be batched
+        with. Default: 0.005.
+    metrics : ServingMetrics or None, optional
+        Metrics accumulator. If None, a new one will be created.
+        Default: None.
+
+    Notes
+    -----
+    The worker thread is started by `start` and stopped by `stop`, or by
+    using `MicroBatcher` as a context manager.
+    """
+
+    def __init__(
+        self, predict,
+        max_batch_size = 1024,
+        max_latency    = 0.005,
+        metrics        = None,
+    ):
+        self._predict        = predict
+        self._max_batch_size = max_batch_size
+        self._max_latency    = max_latency
+        self._metrics        = metrics or ServingMetrics()
+        self._queue          = queue.Queue()
+        self._thread         = None
+
+    @property
+    def metrics(self):
+        """Metrics accumulator of the batcher"""
+        return self._metrics
+
+    def start(self):
+        """Start the worker thread"""
+        if self._thread is not None:
+            return
+
+        self._thread = threading.Thread(
+            target = self._run, name = 'slice_lid-batcher', daemon = True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Score pending requests and stop the worker thread"""
+        if self._thread is None:
+            return
+
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def submit(self, columns):
+        """Submit samples for scoring.
+
+        Parameters
+        ----------
+        columns : dict
+            Dictionary of the form { VAR : ARRAY } with values of the model
+            input variables. C.f. `SliceLIDPredictor.predict_columns`.
+
+        Returns
+        -------
+        concurrent.futures.Future
+            Future that resolves to the scores of `columns` samples.
+        """
+        future = Future()
+        self._queue.put(Request(
+            columns, get_n_samples(columns), future, time.perf_counter()
+        ))
+
+        return future
+
+    def predict(self, columns, timeout = None):
+        """Score samples `columns` and wait for the result"""
+        return self.submit(columns).result(timeout)
+
+    def _collect_batch(self):
+        """Collect micro-batch of requests. Returns None on stop."""
+        request = self._queue.get()
+        if request is None:
+            return None
+
+        batch     = [ request ]
+        n_samples = request.n_samples
+        deadline  = request.submitted + self._max_latency
+
+        while n_samples < self._max_batch_size:
+            timeout = deadline - time.perf_counter()
+
+            try:
+                if timeout > 0:
+                    request = self._queue.get(timeout = timeout)
+                else:
+                    request = self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+            if request is None:
+                # Score collected requests first, then stop
+                self._queue.put(None)
+                break
+
+            batch.append(request)
+            n_samples += request.n_samples
+
+        return batch
+
+    def _score_batch(self, batch):
+        start = time.perf_counter()
+
+        try:
+            scores = self._predict(merge_columns([ x.columns for x in batch ]))
+        except Exception as e:                # pylint: disable=broad-except
+            LOGGER.exception("Failed to score micro-batch")
+            self._metrics.record_error(len(batch))
+
+            for request in batch:
+                request.future.set_exception(e)
+
+            return
+
+        end     = time.perf_counter()
+        offsets = np.cumsum([ 0 ] + [ x.n_samples for x in batch ])
+
+        for (idx, request) in enumerate(batch):
+            request.future.set_result(scores[offsets[idx]:offsets[idx + 1]])
+
+        self._metrics.record_batch(
+            [ end - x.submitted for x in batch ], int(offsets[-1]), end - start
+        )
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            if batch is None:
+                break
+
+            self._score_batch(batch)
+
@@ -0,0 +1,109 @@
+"""
+Client of the `slice_lid` inference server.
+"""
+
+import http.client
+import json
+import socket
+
+from .codec import (
+    CONTENT_TYPE_BINARY, CONTENT_TYPE_JSON, decode_response,
+    encode_binary_request, encode_json_request
+)
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP connection over a Unix socket `path`"""
+
+    def __init__(self, path, timeout = None):
+        super().__init__('localhost', timeout = timeout)
+        self._path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+        if self.timeout is not None:
+            self.sock.settimeout(self.timeout)
+
+        self.sock.connect(self._path)
+
+class SliceLIDClient:
+    """Client of the inference server that keeps its connection alive.
+
+    The client is not thread safe, each thread should use its own client.
+
+    Parameters
+    ----------
+    host : str, optional
+        Host of the server. Default: '127.0.0.1'.
+    port : int, optional
+        TCP port of the server. Default: 8080.
+    path : str or None, optional
+        If not None, then the client will connect to the Unix socket `path`
+        instead of a TCP port. Default: None.
+    binary : bool, optional
+        Whether to use the binary request format instead of JSON.
+        Default: False.
+    vars_input_png3d : list of str or None, optional
+        Names of the 3D prong variables, needed to encode requests.
+        Default: None.
+    timeout : float or None, optional
+        Connection timeout [s]. Default: None.
+    """
+
+    def __init__(
+        self,
+        host             = '127.0.0.1',
+        port             = 8080,
+        path             = None,
+        binary           = False,
+        vars_input_png3d = None,
+        timeout          = None,
+    ):
+        if path is not None:
+            self._conn = UnixHTTPConnection(path, timeout = timeout)
+        else:
+            self._conn = http.client.HTTPConnection(
+                host, port, timeout = timeout
+            )
+
+        self._binary     = binary
+        self._vars_png3d = list(vars_input_png3d or [])
+
+    def _request(self, method, url, body = None, headers = None):
+        self._conn.request(method, url, body = body, headers = headers or {})
+        response = self._conn.getresponse()
+        data     = response.read()
+
+        if response.status != 200:
+            raise RuntimeError(
+                "Server returned %d: %s" % (response.status, data.decode())
+            )
+
+        return (data, response.getheader('Content-Type'))
+
+    def predict(self, columns):
+        """Score samples `columns` by the server.
+
+        C.f. `SliceLIDPredictor.predict_columns`.
+        """
+        if self._binary:
+            body         = encode_binary_request(columns, self._vars_png3d)
+            content_type = CONTENT_TYPE_BINARY
+        else:
+            body         = encode_json_request(columns, self._vars_png3d)
+            content_type = CONTENT_TYPE_JSON
+
+        data, content_type = self._request(
+            'POST', '/predict', body, { 'Content-Type' : content_type }
+        )
+
+        return decode_response(data, content_type)
+
+    def metrics(self):
+        """Retrieve server metrics"""
+        return json.loads(self._request('GET', '/metrics')[0])
+
+    def close(self):
+        """Close connection to the server"""
+        self._conn.close()
+
@@ -0,0 +1,161 @@
+"""
+Encoding and decoding of the inference server requests and responses.
+
+Two request formats are supported:
+
+JSON (content type 'application/json')
+    An object { "columns" : { VAR : VALUES } }, where VALUES of the slice
+    variables are lists of numbers (one per sample), and VALUES of the 3D
+    prong variables are lists of lists of numbers (one list per sample).
+
+Binary (content type 'application/octet-stream')
+    A NumPy `.npz` archive of arrays. Slice variables are arrays of shape
+    (N_SAMPLES,). Prong variables are packed: values of all samples are
+    concatenated into a single array, and the number of prongs of each
+    sample is stored in an additional array named "__lengths__".
+
+Responses are either a JSON object { "scores" : [ [ SCORE, ... ], ... ] }
+or a `.npz` archive with an array "scores" of shape (N_SAMPLES, N_TARGETS),
+matching the request format.
+"""
+
+import io
+import json
+
+import numpy as np
+
+CONTENT_TYPE_JSON   = 'application/json'
+CONTENT_TYPE_BINARY = 'application/octet-stream'
+LENGTHS_KEY         = '__lengths__'
+
+def make_varr_column(values):
+    """Convert sequence of variable length arrays into a 1D object array"""
+    result = np.empty(len(values), dtype = object)
+
+    for (idx, x) in enumerate(values):
+        result[idx] = np.asarray(x, dtype = np.float32)
+
+    return result
+
+def _check_lengths(columns):
+    lengths = set(len(x) for x in columns.values())
+
+    if len(lengths) != 1:
+        raise ValueError("Columns have different numbers of samples")
+
+def decode_json_request(body, vars_slice, vars_png3d):
+    """Decode JSON request `body` into a dict of column arrays.
+
+    Raises
+    ------
+    ValueError
+        If request is malformed or lacks any of the model input variables.
+    """
+    try:
+        columns = json.loads(body)['columns']
+    except (KeyError, TypeError) as e:
+        raise ValueError("Request has no 'columns' object") from e
+
+    try:
+        result = {
+            **{
+                k : np.asarray(columns[k], dtype = np.float32).reshape(-1)
+                    for k in vars_slice
+            },
+            **{ k : make_varr_column(columns[k]) for k in vars_png3d },
+        }
+    except KeyError as e:
+        raise ValueError("Request lacks variable %s" % (e)) from e
+    except TypeError as e:
+        raise ValueError("Request has malformed columns") from e
+
+    _check_lengths(result)
+    return result
+
+def decode_binary_request(body, vars_slice, vars_png3d):
+    """Decode binary (`.npz`) request `body` into a dict of column arrays.
+
+    Raises
+    ------
+    ValueError
+        If request is malformed or lacks any of the model input variables.
+    """
+    try:
+        with np.load(io.BytesIO(body), allow_pickle = False) as f:
+            arrays = { k : f[k] for k in f.files }
+    except (AttributeError, EOFError, OSError, TypeError) as e:
+        raise ValueError("Request is not a valid npz archive") from e
+
+    try:
+        result = {
+            k : arrays[k].astype(np.float32).reshape(-1) for k in vars_slice
+        }
+
+        if vars_png3d:
+            splits = np.cumsum(arrays[LENGTHS_KEY])[:-1]
+
+            for k in vars_png3d:
+                result[k] = make_varr_column(
+                    np.split(arrays[k].astype(np.float32), splits)
+                )
+    except KeyError as e:
+        raise ValueError("Request lacks array %s" % (e)) from e
+
+    _check_lengths(result)
+    return result
+
+def encode_binary_request(columns, vars_png3d):
+    """Encode dict of column arrays into a binary (`.npz`) request"""
+    arrays = {}
+
+    for (k, v) in columns.items():
+        if k in vars_png3d:
+            arrays[k] = np.concatenate(
+                [ np.asarray(x, dtype = np.float32) for x in v ]
+                + [ np.empty(0, dtype = np.float32) ]
+            )
+            arrays[LENGTHS_KEY] = np.array([ len(x) for x in v ])
+        else:
+            arrays[k] = np.asarray(v, dtype = np.float32)
+
+    f = io.BytesIO()
+    np.savez(f, **arrays)
+
+    return f.getvalue()
+
+def encode_json_request(columns, vars_png3d):
+    """Encode dict of column arrays into a JSON request"""
+    return json.dumps({
+        'columns' : {
+            k : (
+                [ np.asarray(x).tolist() for x in v ]
+                if k in vars_png3d else np.asarray(v).tolist()
+            )
+                for (k, v) in columns.items()
+        }
+    }).encode()
+
+def encode_response(scores, content_type):
+    """Encode `scores` into a response of the `content_type` format"""
+    if content_type == CONTENT_TYPE_BINARY:
+        f = io.BytesIO()
+        np.savez(f, scores = scores)
+        return f.getvalue()
+
+    return json.dumps({ 'scores' : scores.tolist() }).encode()
+
+def decode_response(body, content_type):
+    """Decode response `body` of the `content_type` format into scores"""
+    if content_type == CONTENT_TYPE_BINARY:
+        with np.load(io.BytesIO(body), allow_pickle = False) as f:
+            return f['scores']
+
+    return np.array(json.loads(body)['scores'], dtype = np.float32)
+
+def decode_request(body, content_type, vars_slice, vars_png3d):
+    """Decode request `body` of the `content_type` format"""
+    if content_type == CONTENT_TYPE_BINARY:
+        return decode_binary_request(body, vars_slice, vars_png3d)
+
+    return decode_json_request(body, vars_slice, vars_png3d)
+
@@ -0,0 +1,85 @@
+"""
+Thread-safe throughput and latency metrics of the inference server.
+"""
+
+import collections
+import threading
+import time
+
+import numpy as np
+
+class ServingMetrics:
+    """Accumulator of the inference server metrics.
+
+    Parameters
+    ----------
+    window : int, optional
+        Number of the most recent requests to calculate latency percentiles
+        over. Default: 10000.
+    """
+
+    PERCENTILES = [ 50, 90, 99 ]
+
+    def __init__(self, window = 10000):
+        self._lock       = threading.Lock()
+        self._start      = time.perf_counter()
+        self._latencies  = collections.deque(maxlen = window)
+        self._n_requests = 0
+        self._n_samples  = 0
+        self._n_batches  = 0
+        self._n_errors   = 0
+        self._busy_time  = 0
+
+    def record_batch(self, latencies, n_samples, duration):
+        """Record a scored micro-batch.
+
+        Parameters
+        ----------
+        latencies : list of float
+            Latencies [s] of the batched requests, from their submission to
+            the availability of their scores.
+        n_samples : int
+            Total number of samples in the micro-batch.
+        duration : float
+            Time [s] spent scoring the micro-batch.
+        """
+        with self._lock:
+            self._latencies.extend(latencies)
+            self._n_requests += len(latencies)
+            self._n_samples  += n_samples
+            self._n_batches  += 1
+            self._busy_time  += duration
+
+    def record_error(self, n_requests = 1):
+        """Record `n_requests` failed requests"""
+        with self._lock:
+            self._n_errors += n_requests
+
+    def snapshot(self):
+        """Return a dictionary of current metric values"""
+        with self._lock:
+            elapsed   = time.perf_counter() - self._start
+            latencies = np.array(self._latencies)
+
+            result = {
+                'uptime'          : elapsed,
+                'n_requests'      : self._n_requests,
+                'n_samples'       : self._n_samples,
+                'n_batches'       : self._n_batches,
+                'n_errors'        : self._n_errors,
+                'throughput'      : self._n_samples / elapsed,
+                'mean_batch_size' : (
+                    self._n_samples / max(self._n_batches, 1)
+                ),
+                'utilization'     : self._busy_time / elapsed,
+            }
+
+        result['latency'] = {
+            'p%d' % p : (
+                float(np.percentile(latencies, p)) if len(latencies) else None
+            )
+                for p in self.PERCENTILES
+        }
+
+        return result
+
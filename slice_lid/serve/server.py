@@ -0,0 +1,211 @@
+"""
+HTTP inference server of `slice_lid` models.
+
+The server listens either on a localhost TCP port or on a Unix socket, and
+exposes the following endpoints:
+
+POST /predict
+    Score samples of a JSON or binary request. C.f. `slice_lid.serve.codec`.
+GET /metrics
+    Return throughput and latency metrics as JSON. C.f. `ServingMetrics`.
+GET /health
+    Return { "status" : "ok" }.
+
+Concurrent requests are scored together in micro-batches by a
+`MicroBatcher`, which amortizes per call overhead of the model.
+"""
+
+import json
+import logging
+import os
+import socketserver
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .batcher import MicroBatcher
+from .codec   import (
+    CONTENT_TYPE_BINARY, CONTENT_TYPE_JSON, decode_request, encode_response
+)
+
+LOGGER = logging.getLogger('slice_lid.serve.server')
+
+class SliceLIDRequestHandler(BaseHTTPRequestHandler):
+    """Handler of the inference server HTTP requests"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def address_string(self):
+        # Unix socket clients have no address
+        if not self.client_address:
+            return 'unix'
+
+        return super().address_string()
+
+    def log_message(self, format, *args):
+        # pylint: disable=redefined-builtin
+        LOGGER.debug("%s - %s", self.address_string(), format % args)
+
+    def _send(self, code, body, content_type = CONTENT_TYPE_JSON):
+        self.send_response(code)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, code, obj):
+        self._send(code, json.dumps(obj).encode())
+
+    def do_GET(self):
+        # pylint: disable=missing-function-docstring
+        # pylint: disable=invalid-name
+        if self.path == '/metrics':
+            self._send_json(200, self.server.batcher.metrics.snapshot())
+        elif self.path == '/health':
+            self._send_json(200, { 'status' : 'ok' })
+        else:
+            self._send_json(404, { 'error' : 'Unknown path %s' % self.path })
+
+    def do_POST(self):
+        # pylint: disable=missing-function-docstring
+        # pylint: disable=invalid-name
+        length = int(self.headers.get('Content-Length', 0))
+        body   = self.rfile.read(length)
+
+        if self.path != '/predict':
+            self._send_json(404, { 'error' : 'Unknown path %s' % self.path })
+            return
+
+        content_type = self.headers.get('Content-Type', CONTENT_TYPE_JSON)
+        if content_type != CONTENT_TYPE_BINARY:
+            content_type = CONTENT_TYPE_JSON
+
+        try:
+            columns = decode_request(
+                body, content_type,
+                self.server.vars_input_slice, self.server.vars_input_png3d
+            )
+        except ValueError as e:
+            self.server.batcher.metrics.record_error()
+            self._send_json(400, { 'error' : str(e) })
+            return
+
+        try:
+            scores = self.server.batcher.predict(columns)
+        except Exception as e:                # pylint: disable=broad-except
+            self._send_json(500, { 'error' : str(e) })
+            return
+
+        self._send(200, encode_response(scores, content_type), content_type)
+
+class _ServerMixin:
+    """Mixin that holds the model configuration and batcher of a server"""
+
+    daemon_threads = True
+
+    def setup_service(self, batcher, args):
+        # pylint: disable=missing-function-docstring
+        # pylint: disable=attribute-defined-outside-init
+        self.batcher          = batcher
+        self.vars_input_slice = list(args.vars_input_slice or [])
+        self.vars_input_png3d = list(args.vars_input_png3d or [])
+
+class SliceLIDHTTPServer(_ServerMixin, ThreadingHTTPServer):
+    """Threaded inference server listening on a TCP port"""
+
+class SliceLIDUnixServer(
+    _ServerMixin, socketserver.ThreadingMixIn, socketserver.UnixStreamServer
+):
+    """Threaded inference server listening on a Unix socket"""
+
+def make_server(batcher, args, host = '127.0.0.1', port = 8080, path = None):
+    """Create inference server.
+
+    Parameters
+    ----------
+    batcher : MicroBatcher
+        Batcher to score requests with.
+    args : Args
+        Configuration of the served model.
+    host : str, optional
+        Host to listen on. Default: '127.0.0.1'.
+    port : int, optional
+        TCP port to listen on. Default: 8080.
+    path : str or None, optional
+        If not None, then the server will listen on a Unix socket `path`
+        instead of a TCP port. Stale socket file is removed. Default: None.
+
+    Returns
+    -------
+    socketserver.BaseServer
+        Inference server.
+    """
+    if path is not None:
+        if os.path.exists(path):
+            os.unlink(path)
+
+        server = SliceLIDUnixServer(path, SliceLIDRequestHandler)
+    else:
+        server = SliceLIDHTTPServer((host, port), SliceLIDRequestHandler)
+
+    server.setup_service(batcher, args)
+    return server
+
+def serve(
+    savedir,
+    host           = '127.0.0.1',
+    port           = 8080,
+    path           = None,
+    max_batch_size = 1024,
+    max_latency    = 0.005,
+    numpy          = False,
+):
+    """Load model saved in `savedir` and serve it until interrupted.
+
+    Parameters
+    ----------
+    savedir : str
+        Directory of the saved model.
+    host, port, path
+        Address to listen on. C.f. `make_server`.
+    max_batch_size, max_latency
+        Micro-batching parameters. C.f. `MicroBatcher`.
+    numpy : bool, optional
+        If True, the NumPy export of the model will be served instead of the
+        `keras` model. C.f. `SliceLIDPredictor.from_numpy_savedir`.
+        Default: False.
+    """
+    # pylint: disable=import-outside-toplevel
+    from slice_lid.eval.predictor import SliceLIDPredictor
+
+    if numpy:
+        predictor = SliceLIDPredictor.from_numpy_savedir(
+            savedir, batch_size = max_batch_size
+        )
+    else:
+        predictor = SliceLIDPredictor.from_savedir(
+            savedir, batch_size = max_batch_size
+        )
+
+    batcher = MicroBatcher(
+        predictor.predict_columns,
+        max_batch_size = max_batch_size,
+        max_latency    = max_latency,
+    )
+
+    with batcher:
+        server = make_server(batcher, predictor.args, host, port, path)
+        LOGGER.info(
+            "Serving %s on %s", savedir,
+            path if path is not None else ('%s:%d' % (host, port))
+        )
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+
+            if path is not None:
+                os.unlink(path)
+
@@ -2,6 +2,14 @@
 This module contains functions to initialize and train `keras` models.
 """
 
-from .train import create_and_train_model
+from .train       import create_and_train_model
+from .search      import run_search
+from .halving     import run_successive_halving
+from .distributed import train_distributed
+from .kfold       import run_kfold
+from .distill     import distill_model
 
-__all__ = [ 'create_and_train_model' ]
+__all__ = [
+    'create_and_train_model', 'distill_model', 'run_kfold', 'run_search',
+    'run_successive_halving', 'train_distributed',
+]
@@ -0,0 +1,154 @@
+"""
+Knowledge distillation of a trained teacher network into a student network.
+
+The student is trained on targets blended with the soft targets predicted
+by the teacher (c.f. `distillation` parameter of `slice_lid.args.Config`).
+This module provides a convenience wrapper to train such a student and
+functions to compare the student against its teacher.
+"""
+
+import logging
+import time
+
+import numpy as np
+
+from slice_lid.data.data         import load_data
+from slice_lid.eval.error_matrix import (
+    calc_error_matrix, normalize_error_matrix
+)
+from slice_lid.eval.predictor    import SliceLIDPredictor
+
+from .train import create_and_train_model
+
+LOGGER = logging.getLogger('slice_lid.train.distill')
+
+def distill_model(
+    teacher,
+    alpha        = 0.5,
+    extra_kwargs = None,
+    **kwargs
+):
+    """Train a student network on the soft targets of the `teacher`.
+
+    Parameters
+    ----------
+    teacher : str
+        Directory of the trained teacher network (relative to
+        "${SLICE_LID_OUTDIR}" unless it is an absolute path).
+    alpha : float, optional
+        Weight of the soft targets. Default: 0.5.
+    extra_kwargs : dict or None, optional
+        Extra kwargs that will be passed to the `Args` constructor.
+    kwargs : dict
+        Student configuration that will be passed to the `Args` constructor.
+
+    Returns
+    -------
+    dict
+        Training summary. C.f. `create_and_train_model`.
+    """
+
+    distillation = {
+        'teacher' : teacher,
+        'alpha'   : alpha,
+    }
+
+    return create_and_train_model(
+        extra_kwargs = extra_kwargs, distillation = distillation, **kwargs
+    )
+
+def measure_latency(predictor, data_loader, n_samples):
+    """Measure median time to score a single sample of `data_loader`"""
+    times = []
+
+    for idx in range(min(n_samples, len(data_loader))):
+        inputs = predictor.make_inputs(data_loader, [ idx ])
+
+        start = time.perf_counter()
+        predictor.model.predict_on_batch(inputs)
+        times.append(time.perf_counter() - start)
+
+    # Skip first call, that includes graph construction
+    return float(np.median(times[1:] or times))
+
+def evaluate_model(predictor, data_loader, n_latency):
+    """Evaluate latency, throughput and error matrix of a model"""
+    start   = time.perf_counter()
+    preds   = predictor.predict_data_loader(data_loader)
+    elapsed = time.perf_counter() - start
+
+    truth   = predictor.calc_truth(data_loader)
+    err_mat = calc_error_matrix(truth, preds, predictor.n_targets)
+
+    return {
+        'n_params'   : int(predictor.model.count_params()),
+        'latency'    : measure_latency(predictor, data_loader, n_latency),
+        'throughput' : len(data_loader) / elapsed,
+        'err_mat'    : normalize_error_matrix(err_mat).tolist(),
+    }
+
+def evaluate_distillation(teacher, student, n_latency = 200):
+    """Compare student network against its teacher on the student test set.
+
+    The teacher is evaluated on the test set of the student, therefore, it
+    must have been trained with the same `seed` and test split parameters
+    as the student. Otherwise, the teacher will be evaluated on samples it
+    was trained on.
+
+    Parameters
+    ----------
+    teacher : str
+        Directory of the trained teacher network.
+    student : str
+        Directory of the trained student network.
+    n_latency : int, optional
+        Number of single sample calls to measure latency on. Default: 200.
+
+    Returns
+    -------
+    dict
+        Dictionary with 'teacher' and 'student' evaluation results (number
+        of parameters, latency [s], throughput [1/s] and error matrix
+        normalized by truth), and the difference of the student and teacher
+        error matrices 'err_mat_delta'.
+    """
+
+    predictor_student = SliceLIDPredictor.from_savedir(student)
+    predictor_teacher = SliceLIDPredictor.from_savedir(teacher)
+
+    args       = predictor_student.args
+    args.cache = False
+
+    _, dgen     = load_data(args)
+    data_loader = dgen.data_loader
+
+    result = {
+        'teacher' : evaluate_model(predictor_teacher, data_loader, n_latency),
+        'student' : evaluate_model(predictor_student, data_loader, n_latency),
+    }
+
+    result['err_mat_delta'] = (
+          np.array(result['student']['err_mat'])
+        - np.array(result['teacher']['err_mat'])
+    ).tolist()
+
+    return result
+
+def format_distillation_report(report, labels):
+    """Format distillation report into a human readable table"""
+    lines = [
+        "%10s %10s %14s %16s  %s" % (
+            "Model", "Params", "Latency [ms]", "Throughput [1/s]",
+            "Err. Mat. Diag (%s)" % (", ".join(labels))
+        )
+    ]
+
+    for name in [ 'teacher', 'student' ]:
+        result = report[name]
+        lines.append("%10s %10d %14.3f %16.0f  %s" % (
+            name, result['n_params'], 1000 * result['latency'],
+            result['throughput'],
+            " ".join("%.4f" % x for x in np.diag(result['err_mat']))
+        ))
+
+    return "\n".join(lines)
@@ -0,0 +1,364 @@
+"""
+Data parallel training of `slice_lid` models in multiple local processes.
+
+Each worker process trains a replica of the model on its own disjoint shard
+of the training batches. Gradients of the replicas are synchronized after
+each step by a synchronous all-reduce over localhost, that is performed by
+the `tf.distribute.MultiWorkerMirroredStrategy`. The first worker (chief)
+saves the trained model and its training log to `savedir`, just like
+`create_and_train_model` does.
+
+Notes
+-----
+This module requires `keras` backed by tensorflow v2 (i.e. `tf.keras`).
+Workers are started with the 'spawn' multiprocessing method, therefore,
+scripts that use `train_distributed` should guard their entry point by
+`if __name__ == '__main__'`.
+"""
+
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import shutil
+import socket
+import tempfile
+import traceback
+
+import numpy as np
+
+from slice_lid.args.args           import Args
+from slice_lid.data.data           import load_data
+from slice_lid.data.data_generator import DataEpochCursor, DataShard
+from slice_lid.keras.callbacks     import EpochTimer, FullValidation
+from slice_lid.utils.cpu           import limit_cpu_resources, split_cores
+
+from .setup import ArgsOverride, get_callbacks, get_validation_epochs
+from .train import compile_model, create_model, return_training_stats
+
+LOGGER = logging.getLogger('slice_lid.train.distributed')
+
+def find_free_ports(n):
+    """Find `n` free TCP ports on localhost"""
+    sockets = []
+
+    try:
+        for _ in range(n):
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.bind(('localhost', 0))
+            sockets.append(sock)
+
+        return [ sock.getsockname()[1] for sock in sockets ]
+
+    finally:
+        for sock in sockets:
+            sock.close()
+
+def make_tf_config(ports, index):
+    """Make TF_CONFIG cluster specification for the worker `index`"""
+    return {
+        'cluster' : {
+            'worker' : [ 'localhost:%d' % (port) for port in ports ]
+        },
+        'task'    : { 'type' : 'worker', 'index' : index },
+    }
+
+def to_keras_batch(batch):
+    """Convert batch of `IDataGenerator` to the (x, y, sample_weight) form"""
+    inputs, targets, weights = batch
+    return (inputs, targets, dict(zip(targets.keys(), weights)))
+
+def make_dataset(dgen, repeat):
+    """Wrap `IDataGenerator` into `tf.data.Dataset`.
+
+    Parameters
+    ----------
+    dgen : IDataGenerator
+        DataGenerator to be wrapped.
+    repeat : bool
+        If True, then the dataset will iterate over `dgen` indefinitely,
+        calling `dgen.on_epoch_end` after each pass.
+
+    Returns
+    -------
+    tf.data.Dataset
+        Dataset of batches produced by `dgen`.
+    """
+    # pylint: disable=import-outside-toplevel
+    import tensorflow as tf
+
+    def get_spec(x):
+        x = np.asarray(x)
+        return tf.TensorSpec(
+            (None,) * (x.ndim - 1) + x.shape[-1:], tf.as_dtype(x.dtype)
+        )
+
+    signature = tf.nest.map_structure(get_spec, to_keras_batch(dgen[0]))
+
+    def generator():
+        while True:
+            for index in range(len(dgen)):
+                yield to_keras_batch(dgen[index])
+
+            dgen.on_epoch_end()
+
+            if not repeat:
+                break
+
+    return tf.data.Dataset.from_generator(
+        generator, output_signature = signature
+    ).prefetch(1)
+
+def distribute_dgen(strategy, dgen, steps_per_epoch = None, seed = None):
+    """Distribute batches of `dgen` between workers of the `strategy`.
+
+    Each worker receives its own disjoint shard of the `dgen` batches.
+    If `steps_per_epoch` is not None, then the worker dataset iterates over
+    its shard indefinitely with an epoch spanning cursor (c.f.
+    `DataEpochCursor`). Otherwise, it makes a single pass over the shard.
+    """
+
+    def dataset_fn(input_context):
+        shard = DataShard(
+            dgen,
+            input_context.input_pipeline_id,
+            input_context.num_input_pipelines
+        )
+
+        if steps_per_epoch is None:
+            return make_dataset(shard, repeat = False)
+
+        return make_dataset(
+            DataEpochCursor(shard, steps_per_epoch, seed), repeat = True
+        )
+
+    return strategy.distribute_datasets_from_function(dataset_fn)
+
+def fit_model_distributed(strategy, args, savedir, n_workers, timer):
+    """Create, compile and train model in a worker of the `strategy` cluster.
+
+    Parameters
+    ----------
+    strategy : tf.distribute.MultiWorkerMirroredStrategy
+        Distribution strategy of the worker.
+    args : Args
+        Specification of the model and training setup.
+    savedir : str
+        Directory where this worker will save the model checkpoints and logs.
+    n_workers : int
+        Total number of workers.
+    timer : EpochTimer
+        Callback to measure epoch times.
+
+    Returns
+    -------
+    keras.History
+        Training history.
+    """
+    # Each worker generates 1 / n_workers fraction of the global batch.
+    # Disk cache is disabled to avoid concurrent cache writes by workers.
+    data_args = ArgsOverride(
+        args,
+        batch_size      = max(1, args.batch_size // n_workers),
+        steps_per_epoch = None,
+        disk_cache      = False,
+    )
+
+    dgen_train, dgen_test, dgen_val = load_data(data_args, val = True)
+
+    steps = len(dgen_train) // n_workers
+    if args.steps_per_epoch is not None:
+        steps = min(args.steps_per_epoch, steps)
+
+    with strategy.scope():
+        model = create_model(args)
+        compile_model(model, args)
+
+    validation_freq = 1
+    if args.val_freq is not None:
+        validation_freq = get_validation_epochs(args.val_freq, args.epochs)
+
+    callbacks = get_callbacks(ArgsOverride(args, savedir = savedir))
+    callbacks.append(timer)
+
+    if dgen_val is not dgen_test:
+        # Full validation must precede callbacks that use validation metrics
+        callbacks.insert(0, FullValidation(
+            distribute_dgen(strategy, dgen_test), savedir,
+            epochs = None if args.val_freq is None else validation_freq,
+            steps  = len(dgen_test) // n_workers
+        ))
+
+        # Subsample metrics are only monitored, so they are cheap to have
+        # every epoch
+        validation_freq = 1
+
+    return model.fit(
+        distribute_dgen(strategy, dgen_train, steps, args.seed),
+        epochs           = args.epochs,
+        steps_per_epoch  = steps,
+        validation_data  = distribute_dgen(strategy, dgen_val),
+        validation_steps = len(dgen_val) // n_workers,
+        validation_freq  = validation_freq,
+        callbacks        = callbacks,
+        verbose          = 2,
+    )
+
+def _distributed_worker(
+    index, ports, cores, kwargs, extra_kwargs, result_queue
+):
+    """Train model as a worker `index` of the localhost cluster"""
+    limit_cpu_resources(cores)
+    os.environ['TF_CONFIG'] = json.dumps(make_tf_config(ports, index))
+
+    logging.basicConfig(
+        level  = logging.INFO,
+        format = '[worker %d] %%(levelname)s %%(name)s: %%(message)s' % (index)
+    )
+
+    tmpdir = None
+
+    try:
+        # pylint: disable=import-outside-toplevel
+        import tensorflow as tf
+        strategy = tf.distribute.MultiWorkerMirroredStrategy()
+
+        args    = Args(extra_kwargs = extra_kwargs, **kwargs)
+        savedir = args.savedir
+
+        if index != 0:
+            tmpdir  = tempfile.mkdtemp(prefix = 'slice_lid_worker_')
+            savedir = tmpdir
+
+        timer     = EpochTimer()
+        train_log = fit_model_distributed(
+            strategy, args, savedir, len(ports), timer
+        )
+
+        result = None
+
+        if index == 0:
+            result = return_training_stats(train_log, args.savedir)
+            result['epoch_times'] = timer.times
+            result['n_workers']   = len(ports)
+
+        result_queue.put((index, True, result))
+
+    except Exception: # pylint: disable=broad-except
+        result_queue.put((index, False, traceback.format_exc()))
+        raise
+
+    finally:
+        if tmpdir is not None:
+            shutil.rmtree(tmpdir, ignore_errors = True)
+
+def _collect_results(processes, result_queue, poll = 10):
+    """Wait for all workers to finish and return result of the chief"""
+    results = {}
+
+    while len(results) < len(processes):
+        try:
+            index, success, payload = result_queue.get(timeout = poll)
+        except queue.Empty:
+            for (index, process) in enumerate(processes):
+                if (index not in results) and (process.exitcode is not None):
+                    raise RuntimeError(
+                        "Worker %d died with exit code %d" % (
+                            index, process.exitcode
+                        )
+                    )
+            continue
+
+        if not success:
+            raise RuntimeError(
+                "Worker %d failed with exception:\n%s" % (index, payload)
+            )
+
+        results[index] = payload
+
+    return results[0]
+
+def train_distributed(n_workers, extra_kwargs = None, cores = None, **kwargs):
+    """Create and train `keras` model with data parallel local workers.
+
+    This function spawns `n_workers` local processes that form a
+    localhost `tf.distribute.MultiWorkerMirroredStrategy` cluster.
+    Each worker is pinned to its own group of CPU cores and trains on its
+    own disjoint shard of the training batches with 1 / `n_workers` of the
+    batch size, such that the global batch size stays `batch_size`.
+    Gradients are all-reduced synchronously after each step.
+
+    Parameters
+    ----------
+    n_workers : int
+        Number of worker processes.
+    extra_kwargs : dict or None, optional
+        Extra kwargs that will be passed to the `Args` constructor.
+    cores : list of int or None, optional
+        CPU cores to distribute between workers. If None, all cores
+        available to this process will be used. Default: None.
+    kwargs : dict
+        Parameters that will be passed to the `Args` constructor.
+
+    Returns
+    -------
+    dict
+        Dictionary with training summary returned by `return_training_stats`
+        with additional fields 'epoch_times' (list of epoch wall times) and
+        'n_workers'.
+
+    See Also
+    --------
+    create_and_train_model
+    slice_lid.data.data_generator.DataShard
+    """
+
+    core_groups = split_cores(n_workers, cores)
+
+    if len(core_groups) < n_workers:
+        raise ValueError(
+            "Not enough CPU cores (%d) for %d workers" % (
+                len(core_groups), n_workers
+            )
+        )
+
+    ports        = find_free_ports(n_workers)
+    context      = multiprocessing.get_context('spawn')
+    result_queue = context.Queue()
+
+    LOGGER.info(
+        "Starting %d distributed workers on ports %s", n_workers, ports
+    )
+
+    processes = [
+        context.Process(
+            target = _distributed_worker,
+            args   = (
+                index, ports, core_groups[index], kwargs, extra_kwargs,
+                result_queue
+            )
+        )
+        for index in range(n_workers)
+    ]
+
+    for process in processes:
+        process.start()
+
+    try:
+        result = _collect_results(processes, result_queue)
+    except BaseException:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+        raise
+
+    for process in processes:
+        process.join(timeout = 60)
+        if process.is_alive():
+            process.terminate()
+            process.join()
+
+    return result
+
@@ -0,0 +1,148 @@
+"""
+Functions to train ensembles of seed replicas of a `slice_lid` network.
+
+All replicas of an ensemble are trained simultaneously as parallel towers of
+a single `keras` model. Therefore, the dataset loading, filtering and batch
+caching is done only once for the entire ensemble, and each batch is used
+to train all replicas.
+
+Notes
+-----
+The towers are trained on the sum of their losses. They do not share any
+weights, but they share the optimizer, the learning rate schedule and the
+early stopping decision. The gradient norm clipping (if any) is also
+performed jointly for all towers.
+"""
+
+import json
+import logging
+import os
+
+import keras
+import numpy as np
+
+from slice_lid.args.config         import Config
+from slice_lid.consts              import ENSEMBLE_TARGET
+from slice_lid.data.data_generator import DataEnsembleTargets
+from slice_lid.data.data_generator.keras_sequence import KerasSequence
+from slice_lid.keras.ensemble      import (
+    extract_tower, make_average_model, make_ensemble_model
+)
+from slice_lid.keras.layers        import get_custom_objects
+
+from .setup import apply_warm_start, select_model
+
+LOGGER = logging.getLogger('slice_lid.train.ensemble')
+
+SEED_SUBDIR  = 'seed_%d'
+TOWERS_FNAME = 'model_towers.h5'
+
+def create_ensemble_model(args):
+    """Create ensemble model with a tower for each of `args.ensemble_seeds`"""
+    towers = []
+
+    for seed in args.ensemble_seeds:
+        np.random.seed(seed)
+        tower = select_model(args)
+
+        if args.warm_start is not None:
+            apply_warm_start(tower, args.warm_start, args.root_outdir)
+
+        towers.append(tower)
+
+    return make_ensemble_model(towers)
+
+def wrap_ensemble_dgens(dgen_list, n_towers):
+    """Replicate targets of DataGenerators from `dgen_list` for each tower.
+
+    Identical DataGenerators in `dgen_list` remain identical after wrapping.
+    """
+    wrapped = {}
+
+    for dgen in dgen_list:
+        if id(dgen) not in wrapped:
+            wrapped[id(dgen)] = KerasSequence(
+                DataEnsembleTargets(dgen, n_towers)
+            )
+
+    return [ wrapped[id(dgen)] for dgen in dgen_list ]
+
+def save_ensemble(args):
+    """Split trained ensemble into replicas and save the averaged model.
+
+    This function moves the trained ensemble model "`savedir`/model.h5" to
+    "`savedir`/model_towers.h5". Then, it saves each tower i with its
+    configuration into "`savedir`/seed_`ensemble_seeds[i]`/", and replaces
+    "`savedir`/model.h5" by a model that averages predictions of the towers.
+    Such that both individual replicas and the ensemble can be evaluated by
+    the standard evaluation scripts.
+
+    Parameters
+    ----------
+    args : Args
+        Specification of the trained ensemble.
+
+    Returns
+    -------
+    list of str
+        Directories where the replicas have been saved.
+    """
+
+    savedir     = args.savedir
+    towers_path = os.path.join(savedir, TOWERS_FNAME)
+
+    os.replace(os.path.join(savedir, 'model.h5'), towers_path)
+    model = keras.models.load_model(
+        towers_path, compile = False, custom_objects = get_custom_objects()
+    )
+
+    make_average_model(model).save(os.path.join(savedir, 'model.h5'))
+
+    result = []
+
+    for (index, seed) in enumerate(args.ensemble_seeds):
+        subdir = os.path.join(savedir, SEED_SUBDIR % (seed))
+        os.makedirs(subdir, exist_ok = True)
+
+        config = Config.load(savedir)
+        config.ensemble_seeds = [ seed ]
+        config.save(subdir)
+
+        extra_kwargs = dict(args.extra_kwargs or {})
+        extra_kwargs['ensemble_seeds'] = [ seed ]
+
+        with open(os.path.join(subdir, 'extra.json'), 'wt') as f:
+            json.dump(extra_kwargs, f, sort_keys = True, indent = 4)
+
+        extract_tower(model, index).save(os.path.join(subdir, 'model.h5'))
+        result.append(subdir)
+
+    LOGGER.info("Saved ensemble replicas to: %s", result)
+
+    return result
+
+def return_ensemble_stats(train_log, args):
+    """Return a dict with a summary of the ensemble training results.
+
+    The 'val_loss' is the mean validation loss of the towers at the epoch
+    with the best total validation loss. Validation losses of individual
+    replicas are stored in 'val_loss_seeds'.
+    """
+    history  = train_log.history
+    n_towers = len(args.ensemble_seeds)
+    best_idx = int(np.argmin(history['val_loss']))
+
+    return {
+        'val_loss'       : history['val_loss'][best_idx] / n_towers,
+        'val_loss_seeds' : {
+            seed : history[
+                'val_%s_loss' % (ENSEMBLE_TARGET % index)
+            ][best_idx]
+                for (index, seed) in enumerate(args.ensemble_seeds)
+        },
+        'val_loss_hist'  : [
+            float(x) / n_towers for x in history['val_loss']
+        ],
+        'savedir'        : args.savedir,
+    }
+
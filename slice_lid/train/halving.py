@@ -0,0 +1,339 @@
+"""
+Successive halving scheduler that terminates unpromising trials early.
+
+All trials are first trained for a small budget of epochs. Then only the
+best fraction (by validation loss) of them is promoted to the next rung,
+where their training is resumed from the saved checkpoints with an increased
+budget of epochs. The remaining trials are pruned.
+"""
+
+import logging
+import os
+import numpy as np
+
+from slice_lid.args.args     import Args
+from slice_lid.data.data     import load_data, preload_search_dataset
+from slice_lid.utils.cpu     import split_cores
+from slice_lid.utils.io      import load_keras_model
+
+from .parallel  import run_trials_parallel
+from .train     import (
+    compile_model, create_model, fit_model, return_training_stats
+)
+from .trials_db import (
+    TrialsDB, DECISION_PROMOTED, DECISION_PRUNED,
+    STATUS_DONE, STATUS_PRUNED
+)
+
+LOGGER = logging.getLogger('slice_lid.train.halving')
+
+def calc_rung_budgets(min_epochs, max_epochs, eta):
+    """Calculate total number of training epochs at each rung.
+
+    Parameters
+    ----------
+    min_epochs : int
+        Number of epochs at the first rung.
+    max_epochs : int
+        Maximum number of epochs a trial can be trained for.
+    eta : int
+        Budget multiplication factor between consecutive rungs.
+
+    Returns
+    -------
+    list of int
+        Cumulative epoch budgets: [ min_epochs, min_epochs * eta, ...,
+        max_epochs ].
+    """
+    result = []
+    epochs = min_epochs
+
+    while epochs < max_epochs:
+        result.append(epochs)
+        epochs *= eta
+
+    result.append(max_epochs)
+
+    return result
+
+def train_to_budget(args, epochs, initial_epoch):
+    """Train model up to `epochs` epochs resuming from checkpoint if possible.
+
+    Parameters
+    ----------
+    args : Args
+        Specification of the model and training setup.
+    epochs : int
+        Index of the epoch at which training will be stopped.
+    initial_epoch : int
+        Index of the epoch at which training will be started. If it is greater
+        than 0, then the training will be resumed from the checkpoint saved
+        in `args.savedir`.
+
+    Returns
+    -------
+    dict
+        Training summary (c.f. `return_training_stats`) with an additional
+        'rung_val_loss' field holding the best validation loss achieved
+        during this training.
+    """
+    dgen_train, dgen_test, dgen_val = load_data(args, val = True)
+    checkpoint = os.path.join(args.savedir, 'model.h5')
+
+    if (initial_epoch > 0) and os.path.exists(checkpoint):
+        LOGGER.info("Resuming training from %s", checkpoint)
+        model = load_keras_model(args.savedir, compile = True)
+    else:
+        if initial_epoch > 0:
+            LOGGER.warning(
+                "Checkpoint %s not found. Starting from scratch.", checkpoint
+            )
+
+        model = create_model(args)
+        compile_model(model, args)
+
+    train_log = fit_model(
+        args, model, dgen_train, dgen_test,
+        epochs = epochs, initial_epoch = initial_epoch, dgen_val = dgen_val
+    )
+
+    result = return_training_stats(train_log, args.savedir)
+    result['rung_val_loss'] = float(np.min(train_log.history['val_loss']))
+
+    return result
+
+def select_survivors(val_losses, eta):
+    """Select trials to be promoted to the next rung.
+
+    Parameters
+    ----------
+    val_losses : dict
+        Dictionary { trial_id : val_loss }. Failed trials should have
+        val_loss equal to None.
+    eta : int
+        Only 1/`eta` fraction of the best trials will survive.
+
+    Returns
+    -------
+    list of int
+        IDs of the trials that survived.
+    """
+    completed = [ (v, k) for (k, v) in val_losses.items() if v is not None ]
+    n_keep    = max(1, len(completed) // eta)
+
+    return [ k for (_, k) in sorted(completed)[:n_keep] ]
+
+def get_resume_state(trials_db, trials, budgets):
+    """Find the rung to resume successive halving of `trials` from.
+
+    Trials promoted at the last rung recorded in the `trials_db` survive
+    and continue from the next rung. Unfinished trials without a promotion
+    at that rung (e.g. trials that failed at it) are not resumed.
+
+    Parameters
+    ----------
+    trials_db : TrialsDB
+        Trials database of the search.
+    trials : list of (int, dict)
+        List of pairs (trial_id, extra_kwargs) of the unfinished trials.
+        C.f. `TrialsDB.add_trials`.
+    budgets : list of int
+        Cumulative epoch budgets of the rungs. C.f. `calc_rung_budgets`.
+
+    Returns
+    -------
+    start_rung : int
+        Index of the rung to start from.
+    survivors : list of (int, dict)
+        Trials to train at the `start_rung`.
+    best_val_loss : dict
+        Dictionary { trial_id : val_loss } of the best validation losses of
+        `survivors` achieved so far.
+    """
+    last_rung, rung_results = trials_db.get_last_rung(
+        [ trial_id for (trial_id, _) in trials ]
+    )
+
+    if last_rung is None:
+        return (0, trials, { trial_id : None for (trial_id, _) in trials })
+
+    if (
+           (last_rung >= len(budgets))
+        or any(x['epochs'] != budgets[last_rung] for x in rung_results)
+    ):
+        raise RuntimeError(
+            "Cannot resume successive halving from rung %d. Epoch budgets"
+            " %s differ from the recorded ones." % (last_rung, budgets)
+        )
+
+    best_val_loss = {
+        x['trial_id'] : x['val_loss'] for x in rung_results
+            if x['decision'] == DECISION_PROMOTED
+    }
+
+    survivors = [ x for x in trials if x[0] in best_val_loss ]
+
+    LOGGER.info(
+        "Resuming successive halving after rung %d with %d trials",
+        last_rung, len(survivors)
+    )
+
+    return (last_rung + 1, survivors, best_val_loss)
+
+def run_successive_halving(
+    config, search_space, db_path,
+    min_epochs = 10,
+    eta        = 3,
+    max_epochs = None,
+    workers    = None,
+    cores      = None,
+    timeout    = None,
+):
+    """Run hyperparameter search with successive halving of trials.
+
+    This scheduler trains all trials for `min_epochs` epochs and promotes
+    only the best 1/`eta` of them (according to the best achieved
+    `val_loss`) to the next rung. At each next rung the budget of epochs
+    is multiplied by `eta` and the training of the promoted trials is resumed
+    from their checkpoints. The procedure is repeated until `max_epochs`
+    budget is reached.
+
+    Trials at each rung are trained in parallel forked processes sharing a
+    single copy of the dataset (c.f. `run_search`). Results and pruning
+    decisions are recorded to the trials database. If the search is
+    restarted, then it is resumed after the last recorded rung
+    (c.f. `get_resume_state`).
+
+    Parameters
+    ----------
+    config : dict
+        Base training configuration. C.f. `slice_lid.args.Args`.
+    search_space : list of dict
+        List of `extra_kwargs` that will be applied on top of `config` to
+        construct each trial.
+    db_path : str
+        Path to the trials database. C.f. `TrialsDB`.
+    min_epochs : int, optional
+        Number of epochs at the first rung. Default: 10.
+    eta : int, optional
+        Pruning rate. Default: 3.
+    max_epochs : int or None, optional
+        Maximum number of training epochs. If None, then `config['epochs']`
+        will be used. Default: None.
+    workers : int or None, optional
+        Maximum number of trials to train concurrently. If None, then all
+        trials of a rung will be trained concurrently. Default: None.
+    cores : list of int or None, optional
+        CPU cores to distribute between trials. Default: None.
+    timeout : float or None, optional
+        Maximum training time of a trial at a single rung. Default: None.
+
+    Returns
+    -------
+    list of dict
+        List of all trials in the trials database. C.f. `TrialsDB.get_trials`.
+
+    See Also
+    --------
+    run_search
+    TrialsDB
+    """
+    # pylint: disable=too-many-locals
+    if max_epochs is None:
+        max_epochs = config['epochs']
+
+    trials_db = TrialsDB(db_path)
+    budgets   = calc_rung_budgets(min_epochs, max_epochs, eta)
+
+    start_rung, survivors, best_val_loss = get_resume_state(
+        trials_db, trials_db.add_trials(search_space), budgets
+    )
+
+    LOGGER.info(
+        "Running successive halving of %d trials with epoch budgets: %s",
+        len(survivors), budgets[start_rung:]
+    )
+
+    preload_search_dataset(config, search_space)
+
+    initial_epoch = budgets[start_rung - 1] if start_rung > 0 else 0
+
+    for rung in range(start_rung, len(budgets)):
+        epochs = budgets[rung]
+
+        if not survivors:
+            break
+
+        n_workers   = len(survivors) if workers is None else workers
+        core_groups = split_cores(min(n_workers, len(survivors)), cores)
+
+        for (trial_id, _) in survivors:
+            trials_db.set_running(trial_id)
+
+        # pylint: disable=cell-var-from-loop
+        results = run_trials_parallel(
+            lambda extra_kwargs : train_to_budget(
+                Args(extra_kwargs = extra_kwargs, **config),
+                epochs, initial_epoch
+            ),
+            survivors, core_groups, None, timeout
+        )
+
+        for (trial_id, _) in survivors:
+            status, result = results[trial_id]
+            if status != STATUS_DONE:
+                trials_db.set_finished(trial_id, status, result)
+                best_val_loss[trial_id] = None
+                continue
+
+            prev_loss = best_val_loss[trial_id]
+            val_loss  = result['rung_val_loss']
+
+            if (prev_loss is not None) and (prev_loss < val_loss):
+                val_loss = prev_loss
+
+            best_val_loss[trial_id] = val_loss
+
+        is_last_rung = (rung == len(budgets) - 1)
+
+        if is_last_rung:
+            promoted = [ trial_id for (trial_id, _) in survivors ]
+        else:
+            promoted = select_survivors(
+                { trial_id : best_val_loss[trial_id]
+                    for (trial_id, _) in survivors },
+                eta
+            )
+
+        for (trial_id, _) in survivors:
+            status, result = results[trial_id]
+            if status != STATUS_DONE:
+                continue
+
+            decision = (
+                DECISION_PROMOTED if trial_id in promoted else DECISION_PRUNED
+            )
+
+            trials_db.add_rung_result(
+                trial_id, rung, epochs, best_val_loss[trial_id],
+                None if is_last_rung else decision
+            )
+
+            result['val_loss_best'] = best_val_loss[trial_id]
+            result['epochs_trained'] = epochs
+
+            if is_last_rung:
+                trials_db.set_finished(trial_id, STATUS_DONE, result)
+            elif decision == DECISION_PRUNED:
+                trials_db.set_finished(trial_id, STATUS_PRUNED, result)
+
+        LOGGER.info(
+            "Rung %d (%d epochs) complete. Promoted trials: %s",
+            rung, epochs, promoted
+        )
+
+        survivors     = [ x for x in survivors if x[0] in promoted ]
+        initial_epoch = epochs
+
+    return trials_db.get_trials()
+
@@ -0,0 +1,244 @@
+"""
+K-fold cross-validation of `slice_lid` models.
+
+The dataset is loaded, transformed and shuffled once by the parent process.
+Then each fold is trained (and evaluated on its validation part) in a
+separate forked process that shares the loaded dataset (c.f. `run_search`).
+Finally, error matrices and figures of merit are aggregated across folds.
+"""
+
+import json
+import logging
+import os
+
+import numpy as np
+
+from slice_lid.consts            import ROOT_OUTDIR
+from slice_lid.data.data         import load_data
+from slice_lid.eval.distribution import get_truth_preds_arrays
+from slice_lid.eval.error_matrix import (
+    calc_error_matrix, normalize_error_matrix
+)
+from slice_lid.eval.fom          import (
+    calc_foms, calc_sgn_bkg_cumsums, find_best_cut, FOM_SPEC_DICT
+)
+from slice_lid.eval.predictor    import SliceLIDPredictor
+from slice_lid.plot.labels       import convert_targets_to_labels
+
+from .search    import run_search
+from .train     import create_and_train_model
+from .trials_db import STATUS_DONE
+
+LOGGER = logging.getLogger('slice_lid.train.kfold')
+
+def evaluate_fold(savedir, bins = 100):
+    """Evaluate trained model on the validation part of its fold.
+
+    Parameters
+    ----------
+    savedir : str
+        Directory of the trained model.
+    bins : int, optional
+        Number of bins used to calculate FOMs. Default: 100.
+
+    Returns
+    -------
+    dict
+        Dictionary with the error matrix normalized by truth ('err_mat') and
+        for each target and FOM the best cut and the FOM value at that cut
+        ('foms' : { FOM_NAME : [ (cut, fom), ... ] }).
+    """
+
+    predictor  = SliceLIDPredictor.from_savedir(savedir)
+    args       = predictor.args
+    args.cache = False
+
+    _, dgen = load_data(args)
+
+    truth, preds = get_truth_preds_arrays(dgen, predictor)
+
+    err_mat         = calc_error_matrix(truth, preds, preds.shape[1])
+    sgn_bkg_cumsums = calc_sgn_bkg_cumsums(truth, preds, dgen.weights, bins)
+
+    foms = {
+        name : [
+            find_best_cut(rhist) for rhist in calc_foms(sgn_bkg_cumsums, func)
+        ]
+        for (name, func) in FOM_SPEC_DICT.items()
+    }
+
+    return {
+        'err_mat' : normalize_error_matrix(err_mat).tolist(),
+        'foms'    : foms,
+    }
+
+def train_and_evaluate_fold(extra_kwargs = None, bins = 100, **kwargs):
+    """Train model on a fold and evaluate it on the fold validation part.
+
+    Returns
+    -------
+    dict
+        Training summary returned by `create_and_train_model` with the
+        evaluation results (c.f. `evaluate_fold`) added to the 'eval' field.
+    """
+    result = create_and_train_model(extra_kwargs = extra_kwargs, **kwargs)
+    result['eval'] = evaluate_fold(result['savedir'], bins)
+
+    return result
+
+def aggregate_folds(fold_results):
+    """Calculate mean and standard deviation of evaluation results.
+
+    Parameters
+    ----------
+    fold_results : list of dict
+        Evaluation results of the folds (c.f. `evaluate_fold`).
+
+    Returns
+    -------
+    dict
+        Dictionary with mean and standard deviation of the normalized error
+        matrices ('err_mat_mean', 'err_mat_std'), and for each FOM the mean
+        and standard deviation of the best FOM values
+        ('foms' : { FOM_NAME : { 'mean' : [...], 'std' : [...] } }).
+    """
+
+    err_mats = np.array([ x['err_mat'] for x in fold_results ])
+
+    result = {
+        'n_folds'      : len(fold_results),
+        'err_mat_mean' : err_mats.mean(axis = 0).tolist(),
+        'err_mat_std'  : err_mats.std(axis = 0).tolist(),
+        'foms'         : {},
+    }
+
+    for name in FOM_SPEC_DICT:
+        values = np.array([
+            [ fom for (_cut, fom) in x['foms'][name] ] for x in fold_results
+        ])
+
+        result['foms'][name] = {
+            'mean' : values.mean(axis = 0).tolist(),
+            'std'  : values.std(axis = 0).tolist(),
+        }
+
+    return result
+
+def format_kfold_report(report, labels = None):
+    """Format aggregated k-fold results as a human readable text table"""
+    err_mean = np.array(report['err_mat_mean'])
+    err_std  = np.array(report['err_mat_std'])
+
+    if labels is None:
+        labels = [ str(i) for i in range(len(err_mean)) ]
+
+    lines = [
+        "K-Fold report over %d folds" % (report['n_folds']),
+        "",
+        "Error matrix normalized by truth (rows: truth, cols: predicted):",
+    ]
+
+    for (label, row_mean, row_std) in zip(labels, err_mean, err_std):
+        lines.append("%12s " % label + " ".join(
+            "%.4f +- %.4f" % (m, s) for (m, s) in zip(row_mean, row_std)
+        ))
+
+    for (name, values) in report['foms'].items():
+        lines += [ "", "Best %s:" % (name) ]
+        lines += [
+            "%12s %.4f +- %.4f" % (label, m, s) for (label, m, s) in
+                zip(labels, values['mean'], values['std'])
+        ]
+
+    return "\n".join(lines)
+
+def run_kfold(
+    config, k,
+    db_path = None,
+    workers = None,
+    cores   = None,
+    timeout = None,
+    bins    = 100,
+):
+    """Run k-fold cross-validation of a model specified by `config`.
+
+    Parameters
+    ----------
+    config : dict
+        Training configuration. C.f. `slice_lid.args.Args`.
+    k : int
+        Number of folds.
+    db_path : str or None, optional
+        Path to the trials database that keeps track of trained folds.
+        If None, it will be placed into the `config` outdir. Default: None.
+    workers : int or None, optional
+        Number of folds to train concurrently. If None, all folds will be
+        trained concurrently. Default: None.
+    cores : list of int or None, optional
+        CPU cores to distribute between folds. Default: None.
+    timeout : float or None, optional
+        Maximum training time of a single fold. Default: None.
+    bins : int, optional
+        Number of bins used to calculate FOMs. Default: 100.
+
+    Returns
+    -------
+    dict
+        Aggregated evaluation results (c.f. `aggregate_folds`). The report is
+        also saved into "kfold_report.json" and "kfold_report.txt" files of
+        the `config` outdir.
+
+    See Also
+    --------
+    run_search
+    slice_lid.data.data.kfold_split
+    """
+
+    root_outdir = config.get('root_outdir', None) or ROOT_OUTDIR
+    outdir      = os.path.join(root_outdir, config['outdir'])
+
+    if db_path is None:
+        db_path = os.path.join(outdir, 'kfold_%d.db' % (k))
+
+    search_space = [
+        { 'kfold' : { 'k' : k, 'fold' : fold } } for fold in range(k)
+    ]
+
+    # Shuffled and transformed dataset index is built once by `run_search`,
+    # since folds differ only by the train/test split
+    trials = run_search(
+        config, search_space, db_path,
+        workers  = workers,
+        cores    = cores,
+        timeout  = timeout,
+        train_fn = lambda **kwargs : train_and_evaluate_fold(
+            bins = bins, **kwargs
+        ),
+    )
+
+    fold_results = [
+        x['result']['eval'] for x in trials
+            if (x['status'] == STATUS_DONE) and ('eval' in x['result'])
+    ]
+
+    if not fold_results:
+        raise RuntimeError("None of the %d folds has been completed" % (k))
+
+    if len(fold_results) < k:
+        LOGGER.warning(
+            "Only %d out of %d folds have been completed",
+            len(fold_results), k
+        )
+
+    report = aggregate_folds(fold_results)
+
+    with open(os.path.join(outdir, 'kfold_report.json'), 'wt') as f:
+        json.dump(report, f, sort_keys = True, indent = 4)
+
+    with open(os.path.join(outdir, 'kfold_report.txt'), 'wt') as f:
+        f.write(format_kfold_report(
+            report, convert_targets_to_labels(config['target_pdg_iscc_list'])
+        ) + "\n")
+
+    return report
+
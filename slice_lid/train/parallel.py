@@ -0,0 +1,145 @@
+"""
+Functions to evaluate training trials in parallel forked processes.
+"""
+
+import logging
+import multiprocessing
+import multiprocessing.connection
+import time
+import traceback
+
+from slice_lid.utils.cpu import limit_cpu_resources
+
+from .trials_db import STATUS_DONE, STATUS_FAILED, STATUS_TIMEOUT
+
+LOGGER = logging.getLogger('slice_lid.train.parallel')
+
+def _trial_worker(func, kwargs, cores, conn):
+    """Run a single trial `func(kwargs)` and send its result over `conn`"""
+    limit_cpu_resources(cores)
+
+    try:
+        result = func(kwargs)
+        conn.send((STATUS_DONE, result))
+    # pylint: disable=broad-except
+    except Exception:
+        conn.send((STATUS_FAILED, traceback.format_exc()))
+    finally:
+        conn.close()
+
+def _finish_trial(trials_db, trial_id, status, result, results):
+    """Record result of the trial `trial_id`"""
+    if status == STATUS_DONE:
+        LOGGER.info("Trial %d finished: %s", trial_id, result)
+    else:
+        LOGGER.error("Trial %d %s: %s", trial_id, status, result)
+
+    results[trial_id] = (status, result)
+
+    if trials_db is not None:
+        trials_db.set_finished(trial_id, status, result)
+
+def run_trials_parallel(
+    func, trials, core_groups, trials_db = None, timeout = None, poll = 10
+):
+    """Evaluate `func` for each trial in forked processes.
+
+    At most `len(core_groups)` trials are run concurrently. Each trial process
+    is pinned to one of the `core_groups`.
+
+    Parameters
+    ----------
+    func : callable
+        Function that takes trial `extra_kwargs` and returns trial result.
+    trials : list of (int, dict)
+        List of pairs (trial_id, extra_kwargs) to evaluate.
+    core_groups : list of list of int
+        Groups of CPU cores to run trials on. C.f. `split_cores`.
+    trials_db : TrialsDB or None, optional
+        If not None, trial statuses and results will be recorded to it.
+    timeout : float or None, optional
+        Maximum trial run time in seconds. Trials that exceed it will be
+        terminated. If None, trials run without time limit. Default: None.
+    poll : float, optional
+        Interval in seconds to check trial timeouts. Default: 10.
+
+    Returns
+    -------
+    dict
+        Dictionary { trial_id : (status, result) }.
+
+    Notes
+    -----
+    Trial processes are created with `fork`, so `func` does not need to be
+    picklable. Tensorflow runtime should not be initialized in the parent
+    process before calling this function.
+    """
+    # pylint: disable=too-many-locals
+    ctx      = multiprocessing.get_context('fork')
+    queue    = list(trials)
+    free     = list(range(len(core_groups)))
+    running  = {}
+    results  = {}
+
+    while queue or running:
+        while queue and free:
+            group_idx        = free.pop(0)
+            trial_id, kwargs = queue.pop(0)
+
+            conn_recv, conn_send = ctx.Pipe(duplex = False)
+            proc = ctx.Process(
+                target = _trial_worker,
+                args   = (func, kwargs, core_groups[group_idx], conn_send)
+            )
+
+            LOGGER.info(
+                "Starting trial %d on cores %s: %s",
+                trial_id, core_groups[group_idx], kwargs
+            )
+
+            if trials_db is not None:
+                trials_db.set_running(trial_id)
+
+            proc.start()
+            conn_send.close()
+
+            running[conn_recv] = (trial_id, proc, group_idx, time.time())
+
+        ready = multiprocessing.connection.wait(
+            list(running.keys()), timeout = poll
+        )
+
+        for conn in ready:
+            trial_id, proc, group_idx, _ = running.pop(conn)
+
+            try:
+                status, result = conn.recv()
+            except EOFError:
+                status, result = (STATUS_FAILED, "Trial process died")
+
+            conn.close()
+            proc.join()
+            free.append(group_idx)
+
+            _finish_trial(trials_db, trial_id, status, result, results)
+
+        if timeout is None:
+            continue
+
+        for conn, (trial_id, proc, group_idx, start) in list(running.items()):
+            if time.time() - start < timeout:
+                continue
+
+            proc.terminate()
+            proc.join()
+            conn.close()
+
+            del running[conn]
+            free.append(group_idx)
+
+            _finish_trial(
+                trials_db, trial_id, STATUS_TIMEOUT, "Trial timed out", results
+            )
+
+    return results
+
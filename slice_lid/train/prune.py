@@ -0,0 +1,319 @@
+"""
+Structured magnitude pruning of the Dense layers of trained networks.
+
+Pruning removes entire units of Dense layers, rather than zeroing individual
+weights, and rebuilds the network with narrower layers. Therefore, the pruned
+network is smaller and faster without any sparse kernels support.
+
+A Dense layer (optionally wrapped by TimeDistributed) can be pruned if its
+output feeds a single Dense/LSTM layer, possibly through a chain of
+element-wise layers (BatchNormalization, Dropout, Activation). Dense layers
+that feed Concatenate or Add layers, and the output layers, are not pruned.
+"""
+
+import copy
+import json
+import logging
+import os
+
+import keras
+import numpy as np
+
+from slice_lid.args.args           import Args
+from slice_lid.data.data           import load_data
+from slice_lid.export.numpy_export import _get_inbound_names
+from slice_lid.keras.layers        import get_custom_objects
+from slice_lid.utils.io            import load_model
+
+from .train import compile_model, fit_model
+
+LOGGER = logging.getLogger('slice_lid.train.prune')
+
+PRUNED_SUBDIR = 'pruned_%g'
+PRUNING_FNAME = 'pruning.json'
+
+ELEMENTWISE_LAYERS = [
+    'Activation', 'BatchNormalization', 'Dropout', 'GaussianNoise',
+    'SpatialDropout1D',
+]
+
+CONSUMER_LAYERS = [ 'Bidirectional', 'Dense', 'LSTM' ]
+
+def _get_class_name(spec):
+    """Get class name of a layer unwrapping TimeDistributed layers"""
+    if spec['class_name'] == 'TimeDistributed':
+        return spec['config']['layer']['class_name']
+
+    return spec['class_name']
+
+def find_prunable_groups(model):
+    """Find Dense layers that can be pruned together with their consumers.
+
+    Returns
+    -------
+    list of dict
+        List of groups of the form
+            {
+                'dense'       : NAME,
+                'elementwise' : [ NAME, ... ],
+                'consumer'    : NAME,
+            }
+        where 'dense' is a layer to be pruned, 'elementwise' are the layers
+        between the 'dense' layer and its 'consumer'.
+    """
+    config    = model.get_config()
+    specs     = { spec['name'] : spec for spec in config['layers'] }
+    outputs   = set(x[0] for x in config['output_layers'])
+    consumers = { name : [] for name in specs }
+
+    for spec in config['layers']:
+        for name in _get_inbound_names(spec):
+            consumers[name].append(spec['name'])
+
+    result = []
+
+    for spec in config['layers']:
+        if (_get_class_name(spec) != 'Dense') or (spec['name'] in outputs):
+            continue
+
+        current     = spec['name']
+        elementwise = []
+
+        while (
+                (len(consumers[current]) == 1)
+            and (
+                _get_class_name(specs[consumers[current][0]])
+                in ELEMENTWISE_LAYERS
+            )
+        ):
+            current = consumers[current][0]
+            elementwise.append(current)
+
+        if (
+               (current in outputs)
+            or (len(consumers[current]) != 1)
+            or (
+                _get_class_name(specs[consumers[current][0]])
+                not in CONSUMER_LAYERS
+            )
+        ):
+            continue
+
+        result.append({
+            'dense'       : spec['name'],
+            'elementwise' : elementwise,
+            'consumer'    : consumers[current][0],
+        })
+
+    return result
+
+def _get_input_kernel_indices(layer):
+    """Get indices of the kernels of `layer` that act on its inputs"""
+    if isinstance(layer, keras.layers.Bidirectional):
+        half = len(layer.get_weights()) // 2
+        return [ 0, half ]
+
+    return [ 0 ]
+
+def calc_unit_scores(model, group):
+    """Calculate importance scores of units of the pruned Dense layer.
+
+    The score of a unit is a product of the L2 norms of its input weights
+    and output weights (the rows of the consumer kernel), where the output
+    weights are scaled by the Batch Normalization (if any) in between.
+    """
+    kernel = model.get_layer(group['dense']).get_weights()[0]
+    score  = np.linalg.norm(kernel, axis = 0)
+
+    for name in group['elementwise']:
+        layer = model.get_layer(name)
+
+        if isinstance(layer, keras.layers.TimeDistributed):
+            layer = layer.layer
+
+        if isinstance(layer, keras.layers.BatchNormalization) and layer.scale:
+            weights = layer.get_weights()
+            score  *= np.abs(
+                weights[0] / np.sqrt(weights[-1] + layer.epsilon)
+            )
+
+    consumer = model.get_layer(group['consumer'])
+    weights  = consumer.get_weights()
+
+    score *= np.sqrt(sum(
+        np.sum(weights[idx]**2, axis = 1)
+            for idx in _get_input_kernel_indices(consumer)
+    ))
+
+    return score
+
+def _set_units(spec, units):
+    if spec['class_name'] == 'TimeDistributed':
+        spec['config']['layer']['config']['units'] = units
+    else:
+        spec['config']['units'] = units
+
+def prune_model(model, sparsity):
+    """Remove a fraction `sparsity` of units of each prunable Dense layer.
+
+    Parameters
+    ----------
+    model : keras.Model
+        Functional model to be pruned. It is not modified.
+    sparsity : float
+        Fraction of units to remove, 0 <= `sparsity` < 1. At least one unit
+        of each layer is kept.
+
+    Returns
+    -------
+    (keras.Model, dict)
+        Pruned model and a dictionary { LAYER_NAME : (UNITS_BEFORE,
+        UNITS_AFTER) } of pruned layers.
+
+    See Also
+    --------
+    find_prunable_groups
+    calc_unit_scores
+    """
+
+    config  = model.get_config()
+    specs   = { spec['name'] : spec for spec in config['layers'] }
+    weights = { x.name : x.get_weights() for x in model.layers }
+    groups  = find_prunable_groups(model)
+    result  = {}
+
+    for group in groups:
+        scores = calc_unit_scores(model, group)
+        units  = len(scores)
+        n_keep = max(1, int(round(units * (1 - sparsity))))
+        keep   = np.sort(np.argsort(scores)[::-1][:n_keep])
+
+        _set_units(specs[group['dense']], n_keep)
+        result[group['dense']] = (units, n_keep)
+
+        dense = weights[group['dense']]
+        dense[0] = dense[0][:, keep]
+        if len(dense) > 1:
+            dense[1] = dense[1][keep]
+
+        for name in group['elementwise']:
+            weights[name] = [ x[keep] for x in weights[name] ]
+
+        consumer = weights[group['consumer']]
+        indices  = _get_input_kernel_indices(
+            model.get_layer(group['consumer'])
+        )
+
+        for idx in indices:
+            consumer[idx] = consumer[idx][keep]
+
+    pruned = keras.Model.from_config(
+        copy.deepcopy(config), custom_objects = get_custom_objects()
+    )
+
+    for layer in pruned.layers:
+        layer.set_weights(weights[layer.name])
+
+    LOGGER.info(
+        "Pruned model from %d to %d parameters",
+        model.count_params(), pruned.count_params()
+    )
+
+    return (pruned, result)
+
+def save_pruned_args(args, savedir):
+    """Save configuration `args` of the pruned model into `savedir`"""
+    os.makedirs(savedir, exist_ok = True)
+    args.config.save(savedir)
+
+    with open(os.path.join(savedir, 'extra.json'), 'wt') as f:
+        json.dump(args.extra_kwargs, f, sort_keys = True, indent = 4)
+
+    return Args.load(savedir)
+
+def prune_and_finetune(savedir, sparsity, epochs = 10, steps = 1):
+    """Prune trained model saved in `savedir` and finetune it.
+
+    The pruning is performed gradually in `steps` steps, where after each
+    step the model is finetuned for `epochs` epochs. The final model is
+    saved into "`savedir`/pruned_`sparsity`/" and can be evaluated by the
+    standard evaluation scripts.
+
+    Parameters
+    ----------
+    savedir : str
+        Directory of the trained model.
+    sparsity : float
+        Target fraction of units to remove from the prunable Dense layers.
+    epochs : int, optional
+        Number of finetuning epochs after each pruning step. Default: 10.
+    steps : int, optional
+        Number of pruning steps. Default: 1.
+
+    Returns
+    -------
+    dict
+        Dictionary with the pruning summary: directory of the pruned model
+        'savedir', numbers of parameters before and after the pruning
+        'n_params', and pruned layers 'layers'.
+    """
+
+    args, model = load_model(savedir, compile = False)
+    n_params    = model.count_params()
+
+    outdir = os.path.join(savedir, PRUNED_SUBDIR % (sparsity))
+    args   = save_pruned_args(args, outdir)
+
+    dgen_train, dgen_test, dgen_val = load_data(args, val = True)
+    layers = {}
+    fname  = os.path.join(outdir, 'model.h5')
+
+    for step in range(1, steps + 1):
+        units_before = {
+            k : v[0] for (k, v) in layers.items()
+        }
+
+        # Sparsity of each step is relative to the units of the current model
+        step_sparsity = 1 - (1 - sparsity * step / steps) / (
+            1 - sparsity * (step - 1) / steps
+        )
+
+        LOGGER.info(
+            "Pruning step %d/%d, sparsity: %.3f", step, steps,
+            sparsity * step / steps
+        )
+
+        model, pruned_layers = prune_model(model, step_sparsity)
+        layers = {
+            k : (units_before.get(k, v[0]), v[1])
+                for (k, v) in pruned_layers.items()
+        }
+
+        compile_model(model, args)
+
+        # Remove checkpoint of a previous run or of a previous pruning step,
+        # such that only the checkpoint of the current model can be found
+        if os.path.exists(fname):
+            os.remove(fname)
+
+        if epochs > 0:
+            fit_model(
+                args, model, dgen_train, dgen_test,
+                epochs = epochs, dgen_val = dgen_val
+            )
+
+    # Keep the best checkpoint if it was saved by the last finetuning
+    if not os.path.exists(fname):
+        model.save(fname)
+
+    result = {
+        'savedir'  : outdir,
+        'sparsity' : sparsity,
+        'n_params' : (n_params, model.count_params()),
+        'layers'   : layers,
+    }
+
+    with open(os.path.join(outdir, PRUNING_FNAME), 'wt') as f:
+        json.dump(result, f, sort_keys = True, indent = 4)
+
+    return result
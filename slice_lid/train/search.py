@@ -0,0 +1,107 @@
+"""
+Functions to run hyperparameter searches in parallel local processes.
+
+The dataset is loaded once by the parent process. Trials are run in processes
+forked from the parent, such that they share the loaded dataset in a
+copy-on-write fashion. Each trial process is pinned to its own group of CPU
+cores.
+"""
+
+import logging
+
+from slice_lid.data.data import preload_search_dataset
+from slice_lid.utils.cpu import split_cores
+
+from .halving   import run_successive_halving
+from .parallel  import run_trials_parallel
+from .train     import create_and_train_model
+from .trials_db import TrialsDB
+
+LOGGER = logging.getLogger('slice_lid.train.search')
+
+def run_search(
+    config, search_space, db_path,
+    workers  = None,
+    cores    = None,
+    timeout  = None,
+    train_fn = create_and_train_model,
+    halving  = None,
+):
+    """Run hyperparameter search with trials trained in parallel processes.
+
+    This function loads dataset specified by `config` once and then trains
+    each trial from the `search_space` in a separate forked process.
+    Trial processes share a single copy of the dataset and each of them is
+    pinned to its own group of CPU cores.
+
+    Parameters
+    ----------
+    config : dict
+        Base training configuration. C.f. `slice_lid.args.Args`.
+    search_space : list of dict
+        List of `extra_kwargs` that will be applied on top of `config` to
+        construct each trial.
+    db_path : str
+        Path to the trials database. C.f. `TrialsDB`.
+    workers : int or None, optional
+        Number of trials to train concurrently. If None, then all trials will
+        be run concurrently (limited by the number of available cores).
+        Default: None.
+    cores : list of int or None, optional
+        CPU cores to distribute between trials. If None, all cores available
+        to this process will be used. Default: None.
+    timeout : float or None, optional
+        Maximum training time of a single trial in seconds. Default: None.
+    train_fn : callable, optional
+        Training function with signature of `create_and_train_model`.
+    halving : dict or None, optional
+        If not None, then unpromising trials will be terminated early by the
+        successive halving scheduler. In this case `halving` is a dict of
+        scheduler parameters, e.g. { 'min_epochs' : 10, 'eta' : 3 }, and
+        `train_fn` is ignored. C.f. `run_successive_halving`. Default: None.
+
+    Returns
+    -------
+    list of dict
+        List of all trials in the trials database. C.f. `TrialsDB.get_trials`.
+
+    See Also
+    --------
+    TrialsDB
+    run_trials_parallel
+    run_successive_halving
+    slice_lid.data.data.preload_search_dataset
+    """
+
+    if halving is not None:
+        return run_successive_halving(
+            config, search_space, db_path,
+            workers = workers, cores = cores, timeout = timeout, **halving
+        )
+
+    trials_db = TrialsDB(db_path)
+    trials    = trials_db.add_trials(search_space)
+
+    if not trials:
+        LOGGER.info("All trials are complete. Nothing to do.")
+        return trials_db.get_trials()
+
+    if workers is None:
+        workers = len(trials)
+
+    core_groups = split_cores(min(workers, len(trials)), cores)
+
+    LOGGER.info(
+        "Running %d trials with %d concurrent workers",
+        len(trials), len(core_groups)
+    )
+
+    preload_search_dataset(config, search_space)
+
+    run_trials_parallel(
+        lambda extra_kwargs : train_fn(**config, extra_kwargs = extra_kwargs),
+        trials, core_groups, trials_db, timeout
+    )
+
+    return trials_db.get_trials()
+
@@ -2,8 +2,18 @@
 A collection of functions to setup keras training.
 """
 
-from lstm_ee.train.setup import get_regularizer
-from slice_lid.keras.models import model_lstm_standard, model_lstm_stack
+import logging
+import math
+import os
+
+from lstm_ee.train.setup import get_default_callbacks, get_regularizer
+from slice_lid.keras.models import (
+    model_deepsets, model_lstm_packed, model_lstm_standard, model_lstm_stack,
+    model_pooled_dense
+)
+from slice_lid.utils.io     import load_keras_model
+
+LOGGER = logging.getLogger('slice_lid.train.setup')
 
 def select_model(args):
     """Get `keras` model for the `slice_lid` training.
@@ -42,5 +52,275 @@ def select_model(args):
     if name == 'stack_lstm':
         return model_lstm_stack(**kwargs)
 
+    if name == 'lstm_packed':
+        return model_lstm_packed(**kwargs)
+
+    if name == 'deepsets':
+        return model_deepsets(**kwargs)
+
+    if name == 'pooled_dense':
+        return model_pooled_dense(**kwargs)
+
     raise ValueError("Unknown model name: %s" % (name))
 
+
+def get_weighted_layers(model):
+    """Return a list of `model` layers that have weights"""
+    return [ layer for layer in model.layers if layer.get_weights() ]
+
+def match_layers_by_name(model, source):
+    """Pair layers of `model` and `source` that have the same names"""
+    source_layers = { layer.name : layer for layer in source.layers }
+
+    return [
+        (layer, source_layers[layer.name])
+            for layer in get_weighted_layers(model)
+            if layer.name in source_layers
+    ]
+
+def match_layers_by_order(model, source):
+    """Pair layers of `model` and `source` by their order.
+
+    The N-th layer of a given type in `model` is paired with the N-th layer
+    of the same type in `source`. This matching does not rely on the layer
+    names, but it pairs unrelated layers if `model` lacks some of the
+    `source` layers (e.g. when a whole input branch is removed). Therefore,
+    it should be used only for models of identical architectures.
+    """
+    source_layers = {}
+
+    for layer in get_weighted_layers(source):
+        source_layers.setdefault(type(layer).__name__, []).append(layer)
+
+    result   = []
+    counters = {}
+
+    for layer in get_weighted_layers(model):
+        layer_type = type(layer).__name__
+        idx        = counters.get(layer_type, 0)
+        candidates = source_layers.get(layer_type, [])
+
+        counters[layer_type] = idx + 1
+
+        if idx < len(candidates):
+            result.append((layer, candidates[idx]))
+
+    return result
+
+def apply_warm_start(model, warm_start, root_outdir):
+    """Initialize `model` weights from a previously trained model.
+
+    The weights are copied for each pair of matched layers which weight
+    shapes are identical. Layers that have no match in the source model, or
+    whose weight shapes differ (e.g. layers that depend on the number of
+    inputs), keep their random initialization.
+
+    Parameters
+    ----------
+    model : keras.Model
+        Model to be initialized.
+    warm_start : dict
+        Warm start configuration of the form
+            { 'savedir' : SAVEDIR, 'match' : MATCH }
+        where SAVEDIR is a directory of the trained source model (relative
+        to `root_outdir` unless it is an absolute path), and MATCH is a
+        layer matching strategy: 'name' (default) or 'order'.
+        C.f. `match_layers_by_order` and `match_layers_by_name`.
+    root_outdir : str
+        Parent directory where all trained models are saved.
+
+    Returns
+    -------
+    list of str
+        Names of the `model` layers that were left with random
+        initialization.
+    """
+
+    savedir = os.path.join(root_outdir, warm_start['savedir'])
+    match   = warm_start.get('match', 'name')
+
+    LOGGER.info("Warm starting model from %s", savedir)
+    source = load_keras_model(savedir)
+
+    if match == 'order':
+        pairs = match_layers_by_order(model, source)
+    elif match == 'name':
+        pairs = match_layers_by_name(model, source)
+    else:
+        raise ValueError("Unknown warm start layer matching: %s" % (match))
+
+    copied = set()
+
+    for (layer, source_layer) in pairs:
+        weights = source_layer.get_weights()
+        shapes  = [ w.shape for w in layer.get_weights() ]
+
+        if [ w.shape for w in weights ] == shapes:
+            LOGGER.info(
+                "Warm start: copying weights of '%s' into '%s'",
+                source_layer.name, layer.name
+            )
+            layer.set_weights(weights)
+            copied.add(layer.name)
+        else:
+            LOGGER.info(
+                "Warm start: shapes of '%s' and '%s' differ. Skipping",
+                source_layer.name, layer.name
+            )
+
+    reinit = [
+        layer.name for layer in get_weighted_layers(model)
+            if layer.name not in copied
+    ]
+
+    LOGGER.info(
+        "Warm start: copied weights of %d layers. Reinitialized layers: %s",
+        len(copied), reinit
+    )
+
+    return reinit
+
+class ArgsOverride:
+    """Proxy around `Args` that overrides values of some of its attributes"""
+
+    def __init__(self, args, **overrides):
+        self._args      = args
+        self._overrides = overrides
+
+    def __getattr__(self, name):
+        overrides = self.__dict__['_overrides']
+
+        if name in overrides:
+            return overrides[name]
+
+        return getattr(self.__dict__['_args'], name)
+
+def scale_patience(config, val_freq):
+    """Rescale patience and cooldown of a callback `config` by `val_freq`.
+
+    Parameters
+    ----------
+    config : dict or None
+        Callback configuration of the form { 'name' : NAME, 'kwargs' : KWARGS }
+        C.f. `slice_lid.args.Config.early_stop`.
+    val_freq : int
+        Number of epochs between consecutive validation passes.
+
+    Returns
+    -------
+    dict or None
+        Copy of `config` where 'patience' and 'cooldown' are expressed in
+        the number of validation passes instead of epochs.
+    """
+
+    if (config is None) or ('kwargs' not in config):
+        return config
+
+    kwargs = dict(config['kwargs'])
+
+    for key in [ 'patience', 'cooldown' ]:
+        if kwargs.get(key, None):
+            kwargs[key] = max(1, int(math.ceil(kwargs[key] / val_freq)))
+
+    return { **config, 'kwargs' : kwargs }
+
+def get_validation_epochs(val_freq, epochs, initial_epoch = 0):
+    """Return a list of (1-indexed) epochs after which validation will be run.
+
+    Validation is run every `val_freq` epochs, and also after the first and
+    the last epochs, such that validation metrics are available for logging
+    right from the start and at the end of the training.
+    """
+
+    return [
+        epoch for epoch in range(initial_epoch + 1, epochs + 1)
+            if (epoch == initial_epoch + 1)
+            or (epoch % val_freq == 0)
+            or (epoch == epochs)
+    ]
+
+def get_callbacks(args):
+    """Get default `keras` callbacks adjusted for the validation frequency.
+
+    If `args.val_freq` is set, then the validation metrics are available
+    only every `args.val_freq` epochs. Early stopping and learning rate
+    schedule callbacks count patience in the number of epochs with the
+    validation metrics, therefore, their patience (and cooldown) is rescaled
+    to keep the same meaning in terms of training epochs.
+
+    See Also
+    --------
+    lstm_ee.train.setup.get_default_callbacks
+    scale_patience
+    """
+
+    val_freq = args.val_freq
+
+    if (val_freq is None) or (val_freq <= 1):
+        return get_default_callbacks(args)
+
+    return get_default_callbacks(ArgsOverride(
+        args,
+        early_stop = scale_patience(args.early_stop, val_freq),
+        schedule   = scale_patience(args.schedule,   val_freq),
+    ))
+
+def cpu_supports_bf16(cpuinfo = '/proc/cpuinfo'):
+    """Check whether CPU supports bfloat16 arithmetics natively"""
+    try:
+        with open(cpuinfo, 'rt') as f:
+            flags = set(f.read().split())
+    except IOError:
+        return False
+
+    return bool(flags & { 'avx512_bf16', 'amx_bf16' })
+
+def get_mixed_precision_policy(mixed_precision):
+    """Get name of the `keras` dtype policy for the `mixed_precision` option.
+
+    Parameters
+    ----------
+    mixed_precision : { None, 'auto', 'mixed_bfloat16', 'mixed_float16' }
+        Mixed precision configuration. C.f. `slice_lid.args.Config`.
+
+    Returns
+    -------
+    str
+        Name of the `keras` dtype policy.
+    """
+
+    if mixed_precision is None:
+        return 'float32'
+
+    if mixed_precision == 'auto':
+        if cpu_supports_bf16():
+            return 'mixed_bfloat16'
+
+        LOGGER.info("CPU does not support bfloat16. Using float32 policy.")
+        return 'float32'
+
+    if mixed_precision in [ 'mixed_bfloat16', 'mixed_float16' ]:
+        return mixed_precision
+
+    raise ValueError("Unknown mixed precision policy: %s" % (mixed_precision))
+
+def set_mixed_precision_policy(mixed_precision):
+    """Set global `keras` dtype policy according to `mixed_precision`.
+
+    The policy is always set explicitly (even to float32), such that a
+    policy of one training does not leak into the following trainings run in
+    the same process.
+    """
+    policy = get_mixed_precision_policy(mixed_precision)
+
+    try:
+        # pylint: disable=import-outside-toplevel
+        from keras import mixed_precision as keras_mixed_precision
+    except ImportError:
+        if policy == 'float32':
+            return
+        raise
+
+    LOGGER.info("Using %s dtype policy", policy)
+    keras_mixed_precision.set_global_policy(policy)
+
@@ -2,16 +2,24 @@
 Functions to train `slice_lid` models.
 """
 
+import json
 import logging
+import os
 import numpy as np
 
-from lstm_ee.train.setup import (
-    get_default_callbacks, get_optimizer, get_keras_concurrency_kwargs
-)
+from lstm_ee.train.setup import get_optimizer, get_keras_concurrency_kwargs
 
-from slice_lid.args.args   import Args
-from slice_lid.data.data   import load_data
-from slice_lid.train.setup import select_model
+from slice_lid.args.args        import Args
+from slice_lid.data.data        import load_data
+from slice_lid.keras.callbacks  import EpochTimer, FullValidation
+from slice_lid.train.setup      import (
+    apply_warm_start, get_callbacks, get_validation_epochs, select_model,
+    set_mixed_precision_policy
+)
+from slice_lid.train.ensemble   import (
+    create_ensemble_model, return_ensemble_stats, save_ensemble,
+    wrap_ensemble_dgens
+)
 
 LOGGER = logging.getLogger('slice_lid.train')
 
@@ -38,11 +46,136 @@ def return_training_stats(train_log, savedir):
         'val_acc '  : train_log.history['val_categorical_accuracy'][best_idx],
         'val_wacc ' :
             train_log.history['val_categorical_accuracy_1'][best_idx],
+        'val_loss_hist' : [ float(x) for x in train_log.history['val_loss'] ],
         'savedir'   : savedir,
     }
 
+    if 'epoch_time' in train_log.history:
+        result['epoch_times'] = train_log.history['epoch_time']
+
+    fname = os.path.join(savedir, FullValidation.FNAME)
+    if os.path.exists(fname):
+        with open(fname, 'rt') as f:
+            result['val_full'] = json.load(f)
+
     return result
 
+def create_model(args):
+    """Create `keras` model and initialize its weights according to `args`"""
+    set_mixed_precision_policy(args.mixed_precision)
+
+    if args.ensemble_seeds is not None:
+        return create_ensemble_model(args)
+
+    np.random.seed(args.seed)
+
+    model = select_model(args)
+
+    if args.warm_start is not None:
+        apply_warm_start(model, args.warm_start, args.root_outdir)
+
+    return model
+
+def compile_model(model, args):
+    """Compile `keras` model with the optimizer specified by `args`"""
+    optimizer = get_optimizer(args.optimizer)
+
+    kwargs = {}
+    if args.jit_compile:
+        kwargs['jit_compile'] = True
+
+    model.compile(
+        loss             = 'categorical_crossentropy',
+        metrics          = [ 'categorical_accuracy' ],
+        weighted_metrics = [
+            'categorical_accuracy', 'categorical_crossentropy'
+        ],
+        optimizer        = optimizer,
+        **kwargs
+    )
+
+def fit_model(
+    args, model, dgen_train, dgen_test,
+    epochs        = None,
+    initial_epoch = 0,
+    dgen_val      = None,
+):
+    """Train compiled `keras` model.
+
+    Parameters
+    ----------
+    args : Args
+        Specification of the training setup.
+    model : keras.Model
+        Compiled model to be trained.
+    dgen_train : keras.utils.Sequence
+        Training dataset.
+    dgen_test : keras.utils.Sequence
+        Validation dataset.
+    epochs : int or None, optional
+        Index of the epoch at which training will be stopped. If None, then
+        `args.epochs` will be used. Default: None.
+    initial_epoch : int, optional
+        Index of the epoch at which training will be started. Useful for
+        resuming training. Default: 0.
+    dgen_val : keras.utils.Sequence or None, optional
+        Dataset used for the validation passes during the training. If it
+        differs from `dgen_test`, then the model will be evaluated on the
+        full `dgen_test` once the training ends. If `args.val_freq` is set,
+        then `dgen_val` will be evaluated every epoch, while the early
+        stopping and checkpointing decisions will be made on the full
+        `dgen_test` evaluated every `args.val_freq` epochs.
+        C.f. `FullValidation`. If None, `dgen_test` will be used.
+        Default: None.
+
+    Return
+    ------
+    keras.History
+        Training history.
+    """
+
+    if epochs is None:
+        epochs = args.epochs
+
+    if dgen_val is None:
+        dgen_val = dgen_test
+
+    validation_freq = 1
+    if args.val_freq is not None:
+        validation_freq = get_validation_epochs(
+            args.val_freq, epochs, initial_epoch
+        )
+
+    callbacks = get_callbacks(args) + [ EpochTimer() ]
+
+    if dgen_val is not dgen_test:
+        # Full validation must precede callbacks that use validation metrics
+        callbacks.insert(0, FullValidation(
+            dgen_test, args.savedir,
+            epochs = None if args.val_freq is None else validation_freq,
+            **get_keras_concurrency_kwargs(args)
+        ))
+
+        # Subsample metrics are only monitored, so they are cheap to have
+        # every epoch
+        validation_freq = 1
+
+    steps_per_epoch = args.steps_per_epoch
+    if steps_per_epoch is not None:
+        steps_per_epoch = min(steps_per_epoch, len(dgen_train))
+
+    return model.fit_generator(
+        dgen_train,
+        epochs          = epochs,
+        initial_epoch   = initial_epoch,
+        validation_data = dgen_val,
+        validation_freq = validation_freq,
+        callbacks       = callbacks,
+        steps_per_epoch = steps_per_epoch,
+        shuffle         = True,
+        **get_keras_concurrency_kwargs(args)
+    )
+
 def create_and_train_model(args = None, extra_kwargs = None, **kwargs):
     """Creates and trains `keras` model specified by arguments.
 
@@ -77,41 +210,28 @@ def create_and_train_model(args = None, extra_kwargs = None, **kwargs):
     )
 
     LOGGER.info("Loading data...")
-    dgen_train, dgen_test = load_data(args)
+    dgen_train, dgen_test, dgen_val = load_data(args, val = True)
 
-    LOGGER.info("Creating model...")
-    np.random.seed(args.seed)
+    if args.ensemble_seeds is not None:
+        dgen_train, dgen_test, dgen_val = wrap_ensemble_dgens(
+            [ dgen_train, dgen_test, dgen_val ], len(args.ensemble_seeds)
+        )
 
-    model     = select_model(args)
-    callbacks = get_default_callbacks(args)
-    optimizer = get_optimizer(args.optimizer)
+    LOGGER.info("Creating model...")
+    model = create_model(args)
 
     LOGGER.info("Compiling model...")
-    model.compile(
-        loss             = 'categorical_crossentropy',
-        metrics          = [ 'categorical_accuracy' ],
-        weighted_metrics = [
-            'categorical_accuracy', 'categorical_crossentropy'
-        ],
-        optimizer        = optimizer,
-    )
-
-    steps_per_epoch = args.steps_per_epoch
-    if steps_per_epoch is not None:
-        steps_per_epoch = min(steps_per_epoch, len(dgen_train))
+    compile_model(model, args)
 
     LOGGER.info("Training model...")
-    train_log = model.fit_generator(
-        dgen_train,
-        epochs          = args.epochs,
-        validation_data = dgen_test,
-        callbacks       = callbacks,
-        steps_per_epoch = steps_per_epoch,
-        shuffle         = True,
-        **get_keras_concurrency_kwargs(args)
+    train_log = fit_model(
+        args, model, dgen_train, dgen_test, dgen_val = dgen_val
     )
 
     LOGGER.info("Training Complete")
 
-    return return_training_stats(train_log, args.savedir)
+    if args.ensemble_seeds is not None:
+        save_ensemble(args)
+        return return_ensemble_stats(train_log, args)
 
+    return return_training_stats(train_log, args.savedir)
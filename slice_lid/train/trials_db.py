@@ -0,0 +1,251 @@
+"""
+Definition of a `TrialsDB` that keeps track of hyperparameter search trials.
+"""
+
+import contextlib
+import json
+import os
+import sqlite3
+import time
+
+STATUS_PENDING = 'pending'
+STATUS_RUNNING = 'running'
+STATUS_DONE    = 'done'
+STATUS_FAILED  = 'failed'
+STATUS_TIMEOUT = 'timeout'
+STATUS_PRUNED  = 'pruned'
+
+DECISION_PROMOTED = 'promoted'
+DECISION_PRUNED   = 'pruned'
+
+def json_default(obj):
+    """Convert numpy scalars and other unknown objects to JSON values"""
+    if hasattr(obj, 'item'):
+        return obj.item()
+
+    return str(obj)
+
+def encode_json(obj):
+    """Serialize `obj` into a canonical JSON string"""
+    return json.dumps(obj, sort_keys = True, default = json_default)
+
+class TrialsDB:
+    """Storage of the hyperparameter search trials backed by sqlite database.
+
+    Each trial is identified by its `extra_kwargs` dict (c.f. `Args`).
+    For each trial `TrialsDB` stores its status, training summary and
+    timing information. If the search is restarted, then only the trials that
+    have not been completed (or pruned) will be run again.
+
+    In addition, `TrialsDB` keeps a log of early termination decisions made
+    by the successive halving scheduler (c.f. `run_successive_halving`).
+
+    Parameters
+    ----------
+    path : str
+        Path to the sqlite database file. It will be created if it does not
+        exist.
+    """
+
+    TABLE       = 'slice_lid_trials'
+    TABLE_RUNGS = 'slice_lid_rungs'
+
+    def __init__(self, path):
+        self._path = path
+
+        dirname = os.path.dirname(path)
+        if dirname:
+            os.makedirs(dirname, exist_ok = True)
+
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS %s ("
+                "    id         INTEGER PRIMARY KEY AUTOINCREMENT,"
+                "    kwargs     TEXT UNIQUE NOT NULL,"
+                "    status     TEXT NOT NULL,"
+                "    result     TEXT,"
+                "    start_time REAL,"
+                "    end_time   REAL"
+                ")" % (self.TABLE)
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS %s ("
+                "    trial_id   INTEGER NOT NULL,"
+                "    rung       INTEGER NOT NULL,"
+                "    epochs     INTEGER NOT NULL,"
+                "    val_loss   REAL,"
+                "    decision   TEXT,"
+                "    time       REAL,"
+                "    PRIMARY KEY (trial_id, rung)"
+                ")" % (self.TABLE_RUNGS)
+            )
+
+    @contextlib.contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self._path, timeout = 60)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @property
+    def path(self):
+        """Path to the sqlite database file"""
+        return self._path
+
+    def add_trials(self, search_space):
+        """Register trials from `search_space` and return unfinished ones.
+
+        Parameters
+        ----------
+        search_space : list of dict
+            List of `extra_kwargs` that define trials.
+
+        Returns
+        -------
+        list of (int, dict)
+            List of pairs (trial_id, extra_kwargs) of the trials from
+            `search_space` that have been neither completed nor pruned.
+        """
+        result = []
+
+        with self._connect() as conn:
+            for kwargs in search_space:
+                key = encode_json(kwargs)
+
+                conn.execute(
+                    "INSERT OR IGNORE INTO %s (kwargs, status) VALUES (?, ?)"
+                    % (self.TABLE), (key, STATUS_PENDING)
+                )
+
+                trial_id, status = conn.execute(
+                    "SELECT id, status FROM %s WHERE kwargs = ?"
+                    % (self.TABLE), (key,)
+                ).fetchone()
+
+                if status not in (STATUS_DONE, STATUS_PRUNED):
+                    result.append((trial_id, kwargs))
+
+        return result
+
+    def set_running(self, trial_id):
+        """Mark trial `trial_id` as running"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE %s SET status = ?, start_time = ?, end_time = NULL"
+                " WHERE id = ?" % (self.TABLE),
+                (STATUS_RUNNING, time.time(), trial_id)
+            )
+
+    def set_finished(self, trial_id, status, result = None):
+        """Mark trial `trial_id` as finished with `status` and `result`"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE %s SET status = ?, result = ?, end_time = ?"
+                " WHERE id = ?" % (self.TABLE),
+                (status, encode_json(result), time.time(), trial_id)
+            )
+
+    def add_rung_result(self, trial_id, rung, epochs, val_loss, decision):
+        """Record result and scheduler decision of the trial at rung `rung`
+
+        Parameters
+        ----------
+        trial_id : int
+            Trial ID.
+        rung : int
+            Index of the successive halving rung.
+        epochs : int
+            Total number of epochs the trial was trained for at this rung.
+        val_loss : float or None
+            Best validation loss achieved by the trial so far.
+        decision : { 'promoted', 'pruned', None }
+            Scheduler decision about the trial.
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO %s"
+                " (trial_id, rung, epochs, val_loss, decision, time)"
+                " VALUES (?, ?, ?, ?, ?, ?)" % (self.TABLE_RUNGS),
+                (trial_id, rung, epochs, val_loss, decision, time.time())
+            )
+
+    def get_rung_results(self, trial_id = None):
+        """Return a list of recorded rung results (as dicts)"""
+        query = (
+            "SELECT trial_id, rung, epochs, val_loss, decision FROM %s"
+            % (self.TABLE_RUNGS)
+        )
+        params = ()
+
+        if trial_id is not None:
+            query += " WHERE trial_id = ?"
+            params = (trial_id,)
+
+        with self._connect() as conn:
+            rows = conn.execute(
+                query + " ORDER BY rung, trial_id", params
+            ).fetchall()
+
+        return [
+            dict(zip(
+                [ 'trial_id', 'rung', 'epochs', 'val_loss', 'decision' ], row
+            ))
+            for row in rows
+        ]
+
+    def get_last_rung(self, trial_ids):
+        """Find the last rung recorded for any of the trials `trial_ids`.
+
+        Parameters
+        ----------
+        trial_ids : list of int
+            IDs of the trials to consider.
+
+        Returns
+        -------
+        (int, list of dict) or (None, [])
+            Index of the last recorded rung and the results of the trials
+            `trial_ids` at this rung. C.f. `get_rung_results`. If none of
+            the trials has a recorded rung result, (None, []) is returned.
+        """
+        trial_ids = set(trial_ids)
+        results   = [
+            x for x in self.get_rung_results() if x['trial_id'] in trial_ids
+        ]
+
+        if not results:
+            return (None, [])
+
+        rung = max(x['rung'] for x in results)
+
+        return (rung, [ x for x in results if x['rung'] == rung ])
+
+    def get_trials(self, status = None):
+        """Return a list of trials (as dicts) optionally filtered by `status`"""
+        query = (
+            "SELECT id, kwargs, status, result, start_time, end_time FROM %s"
+            % (self.TABLE)
+        )
+        params = ()
+
+        if status is not None:
+            query += " WHERE status = ?"
+            params = (status,)
+
+        with self._connect() as conn:
+            rows = conn.execute(query + " ORDER BY id", params).fetchall()
+
+        return [
+            {
+                'id'         : row[0],
+                'kwargs'     : json.loads(row[1]),
+                'status'     : row[2],
+                'result'     : None if row[3] is None else json.loads(row[3]),
+                'start_time' : row[4],
+                'end_time'   : row[5],
+            }
+            for row in rows
+        ]
+
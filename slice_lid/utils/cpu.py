@@ -0,0 +1,89 @@
+"""Functions to distribute CPU cores between concurrent processes."""
+
+import logging
+import os
+import numpy as np
+
+from slice_lid.utils.lazy import LazyModule
+
+tf = LazyModule('tensorflow')
+
+LOGGER = logging.getLogger('slice_lid.utils.cpu')
+
+def get_available_cores():
+    """Return a sorted list of CPU cores this process is allowed to run on"""
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+
+    return list(range(os.cpu_count() or 1))
+
+def split_cores(n_groups, cores = None):
+    """Split CPU cores into `n_groups` disjoint groups of (almost) equal size.
+
+    Parameters
+    ----------
+    n_groups : int
+        Number of groups to split cores into. If `n_groups` exceeds the
+        number of available cores, then the number of groups will be reduced
+        to match the number of cores.
+    cores : list of int or None, optional
+        List of cores to split. If None, then all cores available to this
+        process will be used. Default: None.
+
+    Returns
+    -------
+    list of list of int
+        List of core groups.
+    """
+
+    if cores is None:
+        cores = get_available_cores()
+
+    n_groups = max(1, min(n_groups, len(cores)))
+
+    return [ [ int(x) for x in g ] for g in np.array_split(cores, n_groups) ]
+
+def limit_tf_threads(intra_threads, inter_threads):
+    """Limit sizes of the thread pools of already imported tensorflow.
+
+    Thread pool environment variables may be ignored by tensorflow that
+    was imported before they were set, e.g. in a process forked from a
+    parent that has already imported tensorflow. Therefore, thread pools
+    of the imported tensorflow are set explicitly. This has no effect if
+    the tensorflow runtime is already initialized.
+    """
+    if not tf.is_loaded():
+        return
+
+    try:
+        tf.config.threading.set_intra_op_parallelism_threads(intra_threads)
+        tf.config.threading.set_inter_op_parallelism_threads(inter_threads)
+    except (AttributeError, RuntimeError) as e:
+        LOGGER.warning("Failed to limit tensorflow thread pools: %s", e)
+
+def limit_cpu_resources(cores):
+    """Restrict current process to run on `cores` only.
+
+    This function pins the current process to the CPU `cores` and limits the
+    size of the OpenMP and tensorflow thread pools accordingly.
+
+    Notes
+    -----
+    Thread pools of tensorflow are limited via environment variables, if
+    tensorflow is not imported yet, and via `tf.config.threading` otherwise.
+    Either way, this function has effect on the tensorflow thread pools only
+    if it is called before the tensorflow runtime is initialized.
+    """
+
+    if hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, cores)
+
+    intra_threads = len(cores)
+    inter_threads = min(2, len(cores))
+
+    os.environ['OMP_NUM_THREADS']        = str(intra_threads)
+    os.environ['TF_NUM_INTRAOP_THREADS'] = str(intra_threads)
+    os.environ['TF_NUM_INTEROP_THREADS'] = str(inter_threads)
+
+    limit_tf_threads(intra_threads, inter_threads)
+
@@ -2,16 +2,24 @@
 A collection of evaluation routines.
 """
 
+import logging
 import os
 import numpy as np
 
-from cafplot.plot.funcs import make_plotdir
 from lstm_ee.utils.eval import make_eval_outdir, modify_concurrency_args
 
 from slice_lid.args import Args
 from slice_lid.data import load_data
+from slice_lid.eval.predictor  import SliceLIDPredictor
+from slice_lid.eval.pred_cache import PredictionCache, make_pred_cache_key
 from .eval_config   import EvalConfig
-from .io            import load_model
+from .io            import calc_model_hash, load_model
+from .lazy          import LazyModule
+
+LOGGER = logging.getLogger('slice_lid.utils.eval')
+
+# cafplot plotting functions import matplotlib
+cafplot_funcs = LazyModule('cafplot.plot.funcs')
 
 DEFAULT_RECO_MAP = {
     None    : 'cvn.ncid',
@@ -22,43 +30,95 @@ DEFAULT_RECO_MAP = {
 }
 
 def standard_eval_prologue(cmdargs):
-    """Standard evaluation prologue"""
+    """Standard evaluation prologue.
+
+    Returns
+    -------
+    (dgen, args, predictor, outdir, plotdir)
+        Test dataset, model configuration, `SliceLIDPredictor` of the model,
+        evaluation output directory and plot directory.
+    """
     args, model = load_model(cmdargs.outdir, compile = False)
     eval_config = EvalConfig.from_cmdargs(cmdargs)
 
     eval_config.modify_eval_args(args)
     modify_concurrency_args(args, cmdargs)
 
+    # Predictor scores the dataset directly, batches need not be cached
+    predictor  = SliceLIDPredictor(model, args, workers = args.workers)
+    args.cache = False
+
     _, dgen    = load_data(args)
     outdir     = make_eval_outdir(cmdargs.outdir, eval_config)
-    plotdir    = make_plotdir(outdir)
+    plotdir    = cafplot_funcs.make_plotdir(outdir)
 
-    return (dgen, args, model, outdir, plotdir)
+    return (dgen, args, predictor, outdir, plotdir)
 
-def get_reco_preds(args, dgen, reco_map = None):
-    """Get reco values from the dataset
+def cached_eval_prologue(cmdargs):
+    """Evaluation prologue that reuses cached model predictions if possible.
+
+    If predictions of the model on the evaluation dataset were already saved
+    by a previous evaluation, and neither the model nor the evaluation data
+    selection have changed since, then they are loaded from the cache.
+    Otherwise, the dataset is scored and predictions are saved into the cache.
+    C.f. `PredictionCache`.
+
+    Returns
+    -------
+    (preds_cache, args, outdir, plotdir)
+        `PredictionCache` of the model predictions, model configuration,
+        evaluation output directory and plot directory.
+    """
+    args        = Args.load(cmdargs.outdir)
+    eval_config = EvalConfig.from_cmdargs(cmdargs)
+    eval_config.modify_eval_args(args)
+
+    outdir = make_eval_outdir(cmdargs.outdir, eval_config)
+    key    = make_pred_cache_key(calc_model_hash(cmdargs.outdir), eval_config)
+
+    preds_cache = None
+
+    if not cmdargs.recompute:
+        preds_cache = PredictionCache.load(outdir, key)
+
+    if preds_cache is not None:
+        plotdir = cafplot_funcs.make_plotdir(outdir)
+        return (preds_cache, args, outdir, plotdir)
+
+    dgen, args, predictor, outdir, plotdir = standard_eval_prologue(cmdargs)
+
+    LOGGER.info("Scoring evaluation dataset")
+    preds_cache = PredictionCache.from_data_loader(
+        dgen.data_loader, dgen.weights, predictor
+    )
+    preds_cache.save(outdir, key)
+
+    return (preds_cache, args, outdir, plotdir)
+
+def calc_reco_preds(args, data_loader, reco_map = None):
+    """Get reco values of the `data_loader` samples.
 
     Parameters
     ----------
     args : Args
         Parameters of the network.
-    dgen : IDataGenerator
-        Dataset.
+    data_loader : IDataLoader
+        DataLoader with the reconstructed variables.
     reco_map : dict
         Dictionary where keys are (int, bool) pairs specifying (pdg, iscc)
-        values and targets are the variable names in `dgen` corresponding
-        to the reconstructed values for these (pdg, iscc) pairs.
+        values and targets are the variable names in `data_loader`
+        corresponding to the reconstructed values for these (pdg, iscc) pairs.
 
     Returns
     -------
-    ndarray, shape (len(dgen.data_loader), len(reco_map))
-        Reconstructed values loaded from the dataset.
+    ndarray, shape (len(data_loader), len(reco_map))
+        Reconstructed values loaded from the `data_loader`.
     """
 
     if reco_map is None:
         reco_map = DEFAULT_RECO_MAP
 
-    reco_pred_map = { k : dgen.data_loader.get(v) for k,v in reco_map.items() }
+    reco_pred_map = { k : data_loader.get(v) for k,v in reco_map.items() }
 
     result = {}
     result[None] = reco_pred_map[None]
@@ -75,6 +135,25 @@ def get_reco_preds(args, dgen, reco_map = None):
 
     return np.vstack([ result[None], ] + [ result[k] for k in targets ]).T
 
+def get_reco_preds(args, dgen, reco_map = None):
+    """Get reco values from the dataset
+
+    Parameters
+    ----------
+    args : Args
+        Parameters of the network.
+    dgen : IDataGenerator
+        Dataset.
+    reco_map : dict
+        C.f. `calc_reco_preds`.
+
+    Returns
+    -------
+    ndarray, shape (len(dgen.data_loader), len(reco_map))
+        Reconstructed values loaded from the dataset.
+    """
+    return calc_reco_preds(args, dgen.data_loader, reco_map)
+
 def reco_eval_prologue(cmdargs, reco_map = None):
     """Evaluation prologue that loads reco values from the dataset"""
     args = Args.load(cmdargs.outdir)
@@ -85,7 +164,7 @@ def reco_eval_prologue(cmdargs, reco_map = None):
     _, dgen    = load_data(args)
     outdir     = make_eval_outdir(cmdargs.outdir, eval_config)
     outdir     = os.path.join(outdir, 'reco(%s)' % (reco_map))
-    plotdir    = make_plotdir(outdir)
+    plotdir    = cafplot_funcs.make_plotdir(outdir)
 
     reco_preds = get_reco_preds(args, dgen, reco_map)
 
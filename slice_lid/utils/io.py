@@ -1,16 +1,38 @@
 """Functions to save/load trained networks."""
 
-import keras
-from slice_lid.args import Args
+import hashlib
 
-def load_model(savedir, compile = False):
-    """Load trained network and its configuration saved under `savedir`"""
+from slice_lid.args       import Args
+from slice_lid.utils.lazy import LazyModule
+
+keras = LazyModule('keras')
+
+def load_keras_model(savedir, compile = False):
+    """Load `keras` model saved under `savedir`"""
     # pylint: disable=redefined-builtin
-    args = Args.load(savedir = savedir)
+    # pylint: disable=import-outside-toplevel
+    from slice_lid.keras.layers import get_custom_objects
 
-    model = keras.models.load_model(
-        "%s/model.h5" % (savedir), compile = compile
+    return keras.models.load_model(
+        "%s/model.h5" % (savedir), compile = compile,
+        custom_objects = get_custom_objects()
     )
 
+def load_model(savedir, compile = False):
+    """Load trained network and its configuration saved under `savedir`"""
+    # pylint: disable=redefined-builtin
+    args  = Args.load(savedir = savedir)
+    model = load_keras_model(savedir, compile = compile)
+
     return (args, model)
 
+def calc_model_hash(savedir, chunk_size = 1 << 20):
+    """Calculate SHA-256 hex digest of the model file saved under `savedir`"""
+    result = hashlib.sha256()
+
+    with open("%s/model.h5" % (savedir), 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            result.update(chunk)
+
+    return result.hexdigest()
+
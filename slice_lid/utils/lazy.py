@@ -0,0 +1,52 @@
+"""
+Lazy import of heavy modules.
+
+Importing TensorFlow, `keras` or `matplotlib` takes seconds, which dominates
+the startup time of command line tools that may not need them at all (e.g.
+when called with `--help`). `LazyModule` postpones such imports until the
+module is actually used.
+"""
+
+import importlib
+import sys
+import types
+
+class LazyModule(types.ModuleType):
+    """Proxy of a module that is imported on the first attribute access.
+
+    Parameters
+    ----------
+    name : str
+        Full name of the module, e.g. 'matplotlib.pyplot'.
+
+    Examples
+    --------
+    >>> plt = LazyModule('matplotlib.pyplot')
+    >>> f, ax = plt.subplots()     # matplotlib is imported here
+    """
+
+    def __init__(self, name):
+        super().__init__(name)
+        self._lazy_module = None
+
+    def _load(self):
+        if self._lazy_module is None:
+            self._lazy_module = importlib.import_module(self.__name__)
+
+        return self._lazy_module
+
+    def __getattr__(self, attr):
+        # Called only for attributes that are not found on the proxy itself
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = 'loaded' if self.is_loaded() else 'not loaded'
+        return "<LazyModule '%s' (%s)>" % (self.__name__, state)
+
+    def is_loaded(self):
+        """Check whether the module was imported, by the proxy or elsewhere"""
+        return (self._lazy_module is not None) or (self.__name__ in sys.modules)
+
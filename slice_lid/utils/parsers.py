@@ -87,3 +87,13 @@ def add_basic_eval_args(parser):
 
     add_data_mods_parser(parser)
 
+def add_pred_cache_parser(parser):
+    """Create cmdargs parser of the prediction cache options"""
+
+    parser.add_argument(
+        '--recompute',
+        action  = 'store_true',
+        dest    = 'recompute',
+        help    = 'Ignore cached predictions and score the dataset again',
+    )
+
@@ -0,0 +1,43 @@
+"""
+Test that `DataShard` splits batches into disjoint shards of equal length
+"""
+
+import unittest
+
+from slice_lid.data.data_generator.data_shard import DataShard
+
+from .tests_epoch_cursor import IndexGenerator
+
+class TestDataShard(unittest.TestCase):
+    """Test `DataShard` decorator"""
+
+    def test_disjoint_shards(self):
+        """Test that shards are disjoint and have equal length"""
+        n_batches = 11
+        n_shards  = 3
+
+        shards = [
+            DataShard(IndexGenerator(n_batches), shard, n_shards)
+                for shard in range(n_shards)
+        ]
+
+        batches = [ [ s[i] for i in range(len(s)) ] for s in shards ]
+
+        self.assertEqual([ len(x) for x in batches ], [ 3, 3, 3 ])
+        self.assertEqual(sorted(sum(batches, [])), list(range(9)))
+
+    def test_single_shard(self):
+        """Test that a single shard contains all batches"""
+        dgen = DataShard(IndexGenerator(5), 0, 1)
+
+        self.assertEqual([ dgen[i] for i in range(len(dgen)) ], list(range(5)))
+
+    def test_invalid_shard(self):
+        """Test that out of range shard index raises an error"""
+        with self.assertRaises(ValueError):
+            DataShard(IndexGenerator(5), 2, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
+
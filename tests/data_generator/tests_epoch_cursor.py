@@ -0,0 +1,91 @@
+"""
+Test correctness of the batch iteration order of the `DataEpochCursor`
+"""
+
+import unittest
+
+from slice_lid.data.data_generator.idata_generator   import IDataGenerator
+from slice_lid.data.data_generator.data_epoch_cursor import DataEpochCursor
+
+class IndexGenerator(IDataGenerator):
+    """Simple `IDataGenerator` that returns batch index as a batch"""
+
+    def __init__(self, n_batches):
+        super(IndexGenerator, self).__init__()
+        self._n_batches = n_batches
+
+    def __len__(self):
+        return self._n_batches
+
+    def __getitem__(self, index):
+        return index
+
+class TestEpochCursor(unittest.TestCase):
+    """Test `DataEpochCursor` decorator"""
+
+    @staticmethod
+    def _run_epochs(dgen, n_epochs):
+        result = []
+
+        for _ in range(n_epochs):
+            result.append([ dgen[i] for i in range(len(dgen)) ])
+            dgen.on_epoch_end()
+
+        return result
+
+    def test_len(self):
+        """Test that epoch length is limited by steps_per_epoch"""
+        self.assertEqual(len(DataEpochCursor(IndexGenerator(10), 3)), 3)
+        self.assertEqual(len(DataEpochCursor(IndexGenerator(2),  3)), 2)
+
+    def test_first_pass_continues(self):
+        """Test that epochs continue where the previous one stopped"""
+        dgen   = DataEpochCursor(IndexGenerator(9), 3)
+        epochs = TestEpochCursor._run_epochs(dgen, 3)
+
+        self.assertEqual(epochs, [ [ 0, 1, 2 ], [ 3, 4, 5 ], [ 6, 7, 8 ] ])
+
+    def test_even_coverage(self):
+        """Test that all batches are visited evenly"""
+        n_batches = 10
+        dgen      = DataEpochCursor(IndexGenerator(n_batches), 5, seed = 1)
+        epochs    = TestEpochCursor._run_epochs(dgen, 8)
+
+        batches = sum(epochs, [])
+
+        for cycle in range(4):
+            self.assertEqual(
+                sorted(batches[cycle * n_batches:(cycle + 1) * n_batches]),
+                list(range(n_batches))
+            )
+
+    def test_wrap_around_partial_epoch(self):
+        """Test wrap around when steps_per_epoch does not divide batches"""
+        n_batches = 7
+        dgen      = DataEpochCursor(IndexGenerator(n_batches), 3, seed = 0)
+        epochs    = TestEpochCursor._run_epochs(dgen, 7)
+
+        batches = sum(epochs, [])
+
+        self.assertEqual(batches[:n_batches], list(range(n_batches)))
+
+        for cycle in range(1, 3):
+            self.assertEqual(
+                sorted(batches[cycle * n_batches:(cycle + 1) * n_batches]),
+                list(range(n_batches))
+            )
+
+    def test_reshuffle(self):
+        """Test that consecutive passes use different permutations"""
+        n_batches = 20
+        dgen      = DataEpochCursor(IndexGenerator(n_batches), 10, seed = 0)
+        epochs    = TestEpochCursor._run_epochs(dgen, 6)
+
+        batches = sum(epochs, [])
+
+        self.assertNotEqual(batches[20:40], batches[40:60])
+
+
+if __name__ == '__main__':
+    unittest.main()
+
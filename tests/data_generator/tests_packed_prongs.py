@@ -0,0 +1,109 @@
+"""Tests of the prong batching by a `DataGenerator` with prong lengths"""
+
+import unittest
+import numpy as np
+
+from ..data import X_PNG3D_1, X_PNG3D_2
+from .tests_data_generator_base import (
+    TestsDataGeneratorBase, make_data_generator
+)
+
+TARGET_PDG_ISCC_LIST = [ (0,1), (5,6) ]
+LENGTHS = [ 3, 1, 0, 1, 2 ]
+
+class TestsPackedProngs(TestsDataGeneratorBase, unittest.TestCase):
+    """Test `DataGenerator` batching of prongs with explicit lengths"""
+
+    def _compare_to_unpacked(self, batch_size, max_prongs = None):
+        dgen_null = make_data_generator(
+            batch_size           = batch_size,
+            max_prongs           = max_prongs,
+            target_pdg_iscc_list = TARGET_PDG_ISCC_LIST,
+        )
+
+        dgen_test = make_data_generator(
+            batch_size           = batch_size,
+            max_prongs           = max_prongs,
+            target_pdg_iscc_list = TARGET_PDG_ISCC_LIST,
+            prong_lengths        = True,
+        )
+
+        lengths = np.array(LENGTHS)
+        if max_prongs is not None:
+            lengths = np.minimum(lengths, max_prongs)
+
+        self.assertEqual(len(dgen_test), len(dgen_null))
+
+        for i in range(len(dgen_test)):
+            inputs_test, targets_test = dgen_test[i][:2]
+            inputs_null, targets_null = dgen_null[i][:2]
+
+            self._compare_np_arrays('input_slice', i, inputs_test, inputs_null)
+            self._compare_np_arrays('input_png3d', i, inputs_test, inputs_null)
+            self._compare_np_arrays('target', i, targets_test, targets_null)
+
+            self._compare_np_arrays(
+                'input_png3d_len', i, inputs_test,
+                {
+                    'input_png3d_len' : lengths[
+                        i * batch_size:(i + 1) * batch_size, np.newaxis
+                    ]
+                }
+            )
+
+    def test_batch_size_1(self):
+        """Test packed prongs batching with batch_size=1"""
+        self._compare_to_unpacked(1)
+
+    def test_batch_size_2(self):
+        """Test packed prongs batching with batch_size=2"""
+        self._compare_to_unpacked(2)
+
+    def test_batch_size_3(self):
+        """Test packed prongs batching with batch_size=3"""
+        self._compare_to_unpacked(3)
+
+    def test_batch_size_5(self):
+        """Test packed prongs batching with batch_size=5"""
+        self._compare_to_unpacked(5)
+
+    def test_max_prongs_1(self):
+        """Test packed prongs batching with truncation of prongs"""
+        batch_data = [
+            {
+                'input_png3d'     : [
+                    [ [X_PNG3D_1[0][0], X_PNG3D_2[0][0]], ],
+                    [ [X_PNG3D_1[1][0], X_PNG3D_2[1][0]], ],
+                    [ [np.nan,          np.nan],          ],
+                ],
+                'input_png3d_len' : [ [1], [1], [0] ],
+            },
+            {
+                'input_png3d'     : [
+                    [ [X_PNG3D_1[3][0], X_PNG3D_2[3][0]], ],
+                    [ [X_PNG3D_1[4][0], X_PNG3D_2[4][0]], ],
+                ],
+                'input_png3d_len' : [ [1], [1] ],
+            },
+        ]
+
+        dgen = make_data_generator(
+            batch_size           = 3,
+            max_prongs           = 1,
+            target_pdg_iscc_list = TARGET_PDG_ISCC_LIST,
+            prong_lengths        = True,
+        )
+
+        self.assertEqual(len(dgen), len(batch_data))
+
+        for (i, batch_null) in enumerate(batch_data):
+            inputs_test = dgen[i][0]
+
+            self._compare_np_arrays('input_png3d', i, inputs_test, batch_null)
+            self._compare_np_arrays(
+                'input_png3d_len', i, inputs_test, batch_null
+            )
+
+if __name__ == '__main__':
+    unittest.main()
+
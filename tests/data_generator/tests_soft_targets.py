@@ -0,0 +1,84 @@
+"""Tests of the `DataSoftTargets` blending of targets with soft targets"""
+
+import unittest
+import numpy as np
+
+from slice_lid.data.data import add_class_weights_decorators
+from slice_lid.data.data_generator.data_soft_targets import DataSoftTargets
+from slice_lid.data.data_generator.weights.class_weights import (
+    equal_class_weights
+)
+from .tests_data_generator_base import make_data_generator
+
+TARGET_PDG_ISCC_LIST = [ (0,1), (5,6) ]
+
+class TestsSoftTargets(unittest.TestCase):
+    """Test `DataSoftTargets` decorator"""
+
+    def _test_blend(self, batch_size, alpha):
+        dgen = make_data_generator(
+            batch_size           = batch_size,
+            target_pdg_iscc_list = TARGET_PDG_ISCC_LIST,
+        )
+
+        hard = dgen.get_target_data(None)
+        soft = np.random.default_rng(0).dirichlet(
+            np.ones(hard.shape[1]), size = len(hard)
+        )
+
+        dgen_test = DataSoftTargets(dgen, soft, alpha, batch_size)
+        targets   = np.concatenate([
+            dgen_test[i][1]['target'] for i in range(len(dgen_test))
+        ])
+
+        self.assertEqual(len(dgen_test), len(dgen))
+        self.assertTrue(
+            np.allclose(targets, (1 - alpha) * hard + alpha * soft)
+        )
+        self.assertTrue(np.allclose(targets.sum(axis = 1), 1))
+
+    def test_blend_single_batch(self):
+        """Test blending of targets within a single batch"""
+        self._test_blend(100, 0.5)
+
+    def test_blend_multiple_batches(self):
+        """Test blending of targets split into uneven batches"""
+        self._test_blend(2, 0.3)
+
+    def test_alpha_zero(self):
+        """Test that hard targets are unchanged if `alpha` is zero"""
+        self._test_blend(3, 0)
+
+    def test_class_weights_of_true_targets(self):
+        """Test that class weights are calculated from the hard targets"""
+        batch_size = 2
+        alpha      = 0.9
+
+        dgen = make_data_generator(
+            batch_size           = batch_size,
+            target_pdg_iscc_list = TARGET_PDG_ISCC_LIST,
+        )
+
+        hard = dgen.get_target_data(None)
+
+        # Teacher that is confidently wrong on every sample
+        soft = np.roll(hard, 1, axis = 1)
+
+        dgen_list = add_class_weights_decorators([ dgen ], 'equal')
+        dgen_test = DataSoftTargets(dgen_list[0], soft, alpha, batch_size)
+
+        batches = [ dgen_test[i] for i in range(len(dgen_test)) ]
+        targets = np.concatenate([ x[1]['target'] for x in batches ])
+        weights = np.concatenate([ x[2][0]        for x in batches ])
+
+        class_weights = equal_class_weights(hard)
+
+        self.assertTrue(
+            np.allclose(targets, (1 - alpha) * hard + alpha * soft)
+        )
+        self.assertTrue(
+            np.allclose(weights, class_weights[hard.argmax(axis = 1)])
+        )
+
+if __name__ == '__main__':
+    unittest.main()
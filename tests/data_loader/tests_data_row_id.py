@@ -0,0 +1,55 @@
+"""Test `IDataLoader` row indexing by a `DataRowId` decorator"""
+
+import unittest
+
+from lstm_ee.data.data_loader.data_slice  import DataSlice
+from lstm_ee.data.data_loader.dict_loader import DictLoader
+
+from slice_lid.consts                       import VAR_ROW_ID
+from slice_lid.data.data_loader.data_filter import DataFilter
+from slice_lid.data.data_loader.data_row_id import DataRowId
+
+from .tests_data_loader_base import FuncsDataLoaderBase
+
+class TestsDataRowId(unittest.TestCase, FuncsDataLoaderBase):
+    """Test `DataRowId` decorator"""
+
+    data = {
+        'pdg'  : [ 1, 2, 0, 1, 2 ],
+        'iscc' : [ 0, 1, 0, 1, 0 ],
+        'idx'  : [ 0, 1, 2, 3, 4 ],
+    }
+
+    def test_passthrough(self):
+        """Test that variables of the decorated object are not modified"""
+        data_loader = DataRowId(DictLoader(self.data))
+
+        self.assertEqual(len(data_loader), len(self.data['idx']))
+        self._compare_scalar_vars(self.data, data_loader, 'idx')
+        self._compare_scalar_vars(self.data, data_loader, 'pdg')
+
+    def test_row_ids(self):
+        """Test row indices of the undecorated dataset"""
+        data_loader = DataRowId(DictLoader(self.data))
+
+        self.assertEqual(
+            list(data_loader.get(VAR_ROW_ID)), self.data['idx']
+        )
+        self.assertEqual(
+            list(data_loader.get(VAR_ROW_ID, [ 3, 1 ])), [ 3, 1 ]
+        )
+
+    def test_row_ids_decorated(self):
+        """Test that row indices survive filtering and slicing"""
+        data_loader = DataRowId(DictLoader(self.data))
+        data_loader = DataFilter(data_loader, 'pdg', 'iscc', [ (2, None) ])
+        data_loader = DataSlice(data_loader, [ 1, 0 ])
+
+        self.assertEqual(list(data_loader.get(VAR_ROW_ID)), [ 4, 1 ])
+        self.assertEqual(
+            list(data_loader.get(VAR_ROW_ID)), list(data_loader.get('idx'))
+        )
+
+if __name__ == '__main__':
+    unittest.main()
+
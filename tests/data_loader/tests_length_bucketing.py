@@ -0,0 +1,49 @@
+"""Test `IDataLoader` data reordered by a `LengthBucketing` decorator"""
+
+import unittest
+
+from lstm_ee.data.data_loader.dict_loader        import DictLoader
+from slice_lid.data.data_loader.length_bucketing import LengthBucketing
+
+from .tests_data_loader_base import FuncsDataLoaderBase
+
+class TestsLengthBucketing(unittest.TestCase, FuncsDataLoaderBase):
+    """Test `LengthBucketing` decorator"""
+
+    DATA = {
+        'png' : [ [1,2,3], [4], [], [5,6], [7], [8,9,10,11], [12,13] ],
+        'idx' : [ 0, 1, 2, 3, 4, 5, 6 ],
+    }
+
+    def _check_order(self, window, idx):
+        data_loader = LengthBucketing(DictLoader(self.DATA), 'png', window)
+
+        self._compare_scalar_vars(
+            { 'idx' : idx }, data_loader, 'idx'
+        )
+
+    def test_window_1(self):
+        """Test bucketing with unit window that preserves order"""
+        self._check_order(1, [ 0, 1, 2, 3, 4, 5, 6 ])
+
+    def test_window_3(self):
+        """Test bucketing with window that does not divide dataset size"""
+        self._check_order(3, [ 2, 1, 0, 4, 3, 5, 6 ])
+
+    def test_window_full(self):
+        """Test bucketing with window covering the entire dataset"""
+        self._check_order(10, [ 2, 1, 4, 3, 6, 0, 5 ])
+
+    def test_window_prongs(self):
+        """Test that prongs follow the reordered samples"""
+        data_loader = LengthBucketing(DictLoader(self.DATA), 'png', 3)
+        prongs      = data_loader.get('png', None)
+
+        self.assertEqual(
+            [ list(x) for x in prongs ],
+            [ [], [4], [1,2,3], [7], [5,6], [8,9,10,11], [12,13] ]
+        )
+
+if __name__ == '__main__':
+    unittest.main()
+
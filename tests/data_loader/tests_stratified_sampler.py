@@ -0,0 +1,153 @@
+"""Test `IDataLoader` data subsampled by a `StratifiedSampler` decorator"""
+
+import unittest
+import numpy as np
+
+from lstm_ee.data.data_loader.dict_loader          import DictLoader
+from slice_lid.data.data_loader.stratified_sampler import StratifiedSampler
+
+from .tests_data_loader_base import FuncsDataLoaderBase
+
+class TestsStratifiedSampler(unittest.TestCase, FuncsDataLoaderBase):
+    """Test `StratifiedSampler` decorator"""
+
+    @staticmethod
+    def make_stratified_sampler(data, pdg_iscc_list, size, seed = 0):
+        """Construct simple `StratifiedSampler` from dict data"""
+        return StratifiedSampler(
+            DictLoader(data), 'pdg', 'iscc', pdg_iscc_list, size, seed
+        )
+
+    def _check_target_counts(self, data_loader, pdg_iscc_list, counts):
+        pdg  = np.abs(data_loader.get('pdg',  None))
+        iscc = data_loader.get('iscc', None)
+
+        for (pdg_value, iscc_value), count in zip(pdg_iscc_list, counts):
+            self.assertEqual(
+                np.sum((pdg == pdg_value) & (iscc == iscc_value)), count
+            )
+
+    def test_sampler_full_size(self):
+        """Test sampler that selects the entire dataset"""
+        data = {
+            'pdg'  : [ 1, 2, 0, 1, 2 ],
+            'iscc' : [ 0, 1, 0, 1, 0 ],
+            'idx'  : [ 0, 1, 2, 3, 4 ],
+        }
+
+        data_loader = TestsStratifiedSampler.make_stratified_sampler(
+            data, [ (1, 0) ], 5
+        )
+
+        self._compare_scalar_vars(data, data_loader, 'idx')
+
+    def test_sampler_oversized(self):
+        """Test sampler with size exceeding dataset size"""
+        data = {
+            'pdg'  : [ 1, 2, 0, 1, 2 ],
+            'iscc' : [ 0, 1, 0, 1, 0 ],
+            'idx'  : [ 0, 1, 2, 3, 4 ],
+        }
+
+        data_loader = TestsStratifiedSampler.make_stratified_sampler(
+            data, [ (1, 0) ], 100
+        )
+
+        self._compare_scalar_vars(data, data_loader, 'idx')
+
+    def test_sampler_proportions(self):
+        """Test that sampler preserves target fractions"""
+        data = {
+            'pdg'  : [ 1 ] * 60 + [ 2 ] * 30 + [ 0 ] * 10,
+            'iscc' : [ 1 ] * 60 + [ 1 ] * 30 + [ 0 ] * 10,
+            'idx'  : list(range(100)),
+        }
+        pdg_iscc_list = [ (1, 1), (2, 1), (0, 0) ]
+
+        data_loader = TestsStratifiedSampler.make_stratified_sampler(
+            data, pdg_iscc_list, 10
+        )
+
+        self.assertEqual(len(data_loader), 10)
+        self._check_target_counts(data_loader, pdg_iscc_list, [ 6, 3, 1 ])
+
+    def test_sampler_fraction(self):
+        """Test sampler with size specified as a fraction"""
+        data = {
+            'pdg'  : [ 1 ] * 60 + [ -2 ] * 40,
+            'iscc' : [ 1 ] * 60 + [  1 ] * 40,
+            'idx'  : list(range(100)),
+        }
+        pdg_iscc_list = [ (1, 1), (2, 1) ]
+
+        data_loader = TestsStratifiedSampler.make_stratified_sampler(
+            data, pdg_iscc_list, 0.5
+        )
+
+        self.assertEqual(len(data_loader), 50)
+        self._check_target_counts(data_loader, pdg_iscc_list, [ 30, 20 ])
+
+    def test_sampler_unmatched_target(self):
+        """Test that samples not matching any target are also stratified"""
+        data = {
+            'pdg'  : [ 1 ] * 50 + [ 5 ] * 50,
+            'iscc' : [ 1 ] * 50 + [ 0 ] * 50,
+            'idx'  : list(range(100)),
+        }
+
+        data_loader = TestsStratifiedSampler.make_stratified_sampler(
+            data, [ (1, 1) ], 20
+        )
+
+        self._check_target_counts(
+            data_loader, [ (1, 1), (5, 0) ], [ 10, 10 ]
+        )
+
+    def test_sampler_seed(self):
+        """Test that sampler is reproducible for a given seed"""
+        data = {
+            'pdg'  : [ 1, 2 ] * 50,
+            'iscc' : [ 1, 1 ] * 50,
+            'idx'  : list(range(100)),
+        }
+
+        data_loader_1 = TestsStratifiedSampler.make_stratified_sampler(
+            data, [ (1, 1) ], 10, seed = 1
+        )
+        data_loader_2 = TestsStratifiedSampler.make_stratified_sampler(
+            data, [ (1, 1) ], 10, seed = 1
+        )
+
+        self.assertTrue(np.all(
+            data_loader_1.get('idx', None) == data_loader_2.get('idx', None)
+        ))
+
+    def test_sampler_complement(self):
+        """Test that complement holds exactly the non-selected samples"""
+        data = {
+            'pdg'  : [ 1, 2 ] * 50,
+            'iscc' : [ 1, 1 ] * 50,
+            'idx'  : list(range(100)),
+        }
+
+        data_loader = TestsStratifiedSampler.make_stratified_sampler(
+            data, [ (1, 1) ], 30
+        )
+        complement  = data_loader.get_complement()
+
+        idx_selected   = data_loader.get('idx', None)
+        idx_complement = complement.get('idx', None)
+
+        self.assertEqual(len(complement), 70)
+        self.assertEqual(
+            len(np.intersect1d(idx_selected, idx_complement)), 0
+        )
+        self.assertTrue(np.all(
+            np.sort(np.concatenate([ idx_selected, idx_complement ]))
+                == np.arange(100)
+        ))
+
+
+if __name__ == '__main__':
+    unittest.main()
+
@@ -0,0 +1,47 @@
+"""Tests of the bounded memory dataset streaming helpers"""
+
+import unittest
+import numpy as np
+
+from slice_lid.data.stream import parse_varr, prefetch
+
+class TestsParseVarr(unittest.TestCase):
+    """Test parsing of variable length arrays of CSV cells"""
+
+    def test_values(self):
+        self.assertTrue(np.allclose(parse_varr('1,2.5,-3'), [ 1, 2.5, -3 ]))
+
+    def test_brackets(self):
+        self.assertTrue(np.allclose(parse_varr('[1, 2]'), [ 1, 2 ]))
+
+    def test_empty(self):
+        self.assertEqual(len(parse_varr('')),     0)
+        self.assertEqual(len(parse_varr('[]')),   0)
+        self.assertEqual(len(parse_varr(np.nan)), 0)
+
+class TestsPrefetch(unittest.TestCase):
+    """Test background prefetching of iterables"""
+
+    def test_order(self):
+        self.assertEqual(list(prefetch(range(100), 3)), list(range(100)))
+
+    def test_exception(self):
+        def failing():
+            yield 1
+            raise RuntimeError("Failed")
+
+        result = prefetch(failing(), 2)
+
+        self.assertEqual(next(result), 1)
+        with self.assertRaises(RuntimeError):
+            next(result)
+
+    def test_early_stop(self):
+        result = prefetch(iter(range(1000)), 2)
+
+        self.assertEqual(next(result), 0)
+        result.close()
+
+if __name__ == '__main__':
+    unittest.main()
+
@@ -0,0 +1,105 @@
+"""Tests of the threshold selection of a two-stage cascade"""
+
+import types
+import unittest
+
+import numpy as np
+
+from lstm_ee.data.data_loader.dict_loader import DictLoader
+
+from slice_lid.args.args                           import Args
+from slice_lid.data.data_loader.stratified_sampler import StratifiedSampler
+from slice_lid.eval.cascade import evaluate_cascade, format_cascade_report
+
+N_SAMPLES     = 400
+PDG_ISCC_LIST = [ (1, 1), (2, 1) ]
+
+class FakePredictor:
+    """Predictor that looks up precomputed scores by the sample 'idx'"""
+
+    def __init__(self, preds, truth):
+        self._preds = preds
+        self._truth = truth
+        self.args   = types.SimpleNamespace(
+            target_pdg_iscc_list = PDG_ISCC_LIST
+        )
+
+    @property
+    def n_targets(self):
+        """Number of targets"""
+        return self._preds.shape[1]
+
+    def predict_data_loader(self, data_loader):
+        """Get scores of `data_loader` samples"""
+        return self._preds[data_loader.get('idx', None)].copy()
+
+    def calc_truth(self, data_loader):
+        """Get true targets of `data_loader` samples"""
+        return self._truth[data_loader.get('idx', None)]
+
+def make_cascade_data(seed = 0):
+    """Make dataset, and predictors of an accurate and a noisy models"""
+    prg   = np.random.default_rng(seed)
+    truth = prg.integers(0, len(PDG_ISCC_LIST) + 1, size = N_SAMPLES)
+
+    pdg  = np.array([ 0 ] + [ x[0] for x in PDG_ISCC_LIST ])[truth]
+    iscc = np.array([ 0 ] + [ x[1] for x in PDG_ISCC_LIST ])[truth]
+
+    preds2 = np.full((N_SAMPLES, 3), 0.05)
+    preds2[np.arange(N_SAMPLES), truth] = 0.9
+
+    # Noisy scores with confidence below 0.6
+    preds1 = 0.2 + 0.4 * prg.dirichlet(np.ones(3), size = N_SAMPLES)
+    confident = (prg.uniform(size = N_SAMPLES) < 0.5)
+    preds1[confident] = preds2[confident]
+
+    data = { 'pdg' : pdg, 'iscc' : iscc, 'idx' : np.arange(N_SAMPLES) }
+
+    return (
+        DictLoader(data),
+        FakePredictor(preds1, truth),
+        FakePredictor(preds2, truth),
+    )
+
+class TestsCascade(unittest.TestCase):
+    """Test `evaluate_cascade` on a validation subsample and its complement"""
+
+    def test_val_size_override(self):
+        """Test that validation size can be set on the loaded `Args`"""
+        args = Args(loaded = True)
+        args.config.val_size = 0.5
+
+        self.assertEqual(args.val_size, 0.5)
+
+    def test_evaluate_cascade(self):
+        """Test threshold selection on a subsample and report on the rest"""
+        data_loader, stage1, stage2 = make_cascade_data()
+
+        data_loader_val  = StratifiedSampler(
+            data_loader, 'pdg', 'iscc', PDG_ISCC_LIST, 0.5, 0
+        )
+        data_loader_test = data_loader_val.get_complement()
+
+        idx_val  = data_loader_val .get('idx', None)
+        idx_test = data_loader_test.get('idx', None)
+
+        self.assertEqual(len(np.intersect1d(idx_val, idx_test)), 0)
+
+        _cascade, report = evaluate_cascade(
+            stage1, stage2, data_loader_val, data_loader_test, 0, 20
+        )
+
+        self.assertEqual(report['n_samples_val'],  len(idx_val))
+        self.assertEqual(report['n_samples_test'], len(idx_test))
+        self.assertEqual(len(idx_val) + len(idx_test), N_SAMPLES)
+
+        # Confident first-stage predictions are exact, so they need not be
+        # rescored, while the noisy ones must be
+        self.assertGreater(report['fraction_stage1'], 0)
+        self.assertLess(report['fraction_stage1'], 1)
+        self.assertEqual(report['max_delta'], 0)
+
+        self.assertIn('Samples val / test', format_cascade_report(report))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+"""Tests of the cache of model predictions"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from slice_lid.eval.pred_cache import (
+    CACHE_META, CACHE_SUBDIR, PredictionCache
+)
+
+KEY = { 'model_hash' : 'abc', 'eval_subdir' : 'data_same' }
+
+def make_preds_cache():
+    """Make small `PredictionCache`"""
+    return PredictionCache(
+        truth   = np.array([ 0, 1, 2, 1 ]),
+        preds   = np.array([
+            [ 0.7, 0.2, 0.1 ],
+            [ 0.1, 0.8, 0.1 ],
+            [ 0.3, 0.3, 0.4 ],
+            [ 0.5, 0.4, 0.1 ],
+        ], dtype = np.float32),
+        weights = np.array([ 1.0, 0.5, 2.0, 1.0 ]),
+        row_ids = np.array([ 7, 3, 0, 5 ]),
+    )
+
+class TestsPredictionCache(unittest.TestCase):
+    """Test saving and loading of `PredictionCache`"""
+
+    def setUp(self):
+        self.outdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.outdir)
+
+    def _compare_caches(self, cache, test_cache):
+        for name in [ 'truth', 'preds', 'weights', 'row_ids' ]:
+            self.assertTrue(np.array_equal(
+                getattr(cache, name), getattr(test_cache, name)
+            ))
+
+    def test_save_load(self):
+        """Test that saved predictions are loaded unmodified"""
+        cache = make_preds_cache()
+        cache.save(self.outdir, KEY)
+
+        test_cache = PredictionCache.load(self.outdir, dict(KEY))
+
+        self.assertIsNotNone(test_cache)
+        self.assertIsInstance(test_cache.preds, np.memmap)
+        self._compare_caches(cache, test_cache)
+
+    def test_missing(self):
+        """Test that missing cache is not loaded"""
+        self.assertIsNone(PredictionCache.load(self.outdir, KEY))
+
+    def test_key_mismatch(self):
+        """Test that cache saved with a different key is not loaded"""
+        make_preds_cache().save(self.outdir, KEY)
+
+        for (k, v) in [ ('model_hash', 'def'), ('eval_subdir', 'data_a') ]:
+            key    = dict(KEY)
+            key[k] = v
+
+            self.assertIsNone(PredictionCache.load(self.outdir, key))
+
+    def test_partial_save(self):
+        """Test that cache without the key file is not loaded"""
+        make_preds_cache().save(self.outdir, KEY)
+        os.remove(os.path.join(self.outdir, CACHE_SUBDIR, CACHE_META))
+
+        self.assertIsNone(PredictionCache.load(self.outdir, KEY))
+
+    def test_overwrite(self):
+        """Test that cache can be overwritten by new predictions"""
+        make_preds_cache().save(self.outdir, KEY)
+
+        cache = make_preds_cache()
+        cache.preds = cache.preds[:, ::-1]
+
+        key = dict(KEY)
+        key['model_hash'] = 'def'
+
+        cache.save(self.outdir, key)
+        test_cache = PredictionCache.load(self.outdir, key)
+
+        self.assertIsNotNone(test_cache)
+        self._compare_caches(cache, test_cache)
+
+if __name__ == '__main__':
+    unittest.main()
+
@@ -0,0 +1,135 @@
+"""Tests of the exact figures of merit and ROC curves"""
+
+import unittest
+
+import numpy as np
+
+from slice_lid.eval.roc import (
+    calc_exact_curves, downsample_index, ExactCurves
+)
+
+def make_preds(n_samples, n_targets, seed = 0):
+    """Make random (truth, preds, weights) arrays with tied scores"""
+    prg = np.random.default_rng(seed)
+
+    truth   = prg.integers(0, n_targets, size = n_samples)
+    preds   = prg.integers(0, 20, size = (n_samples, n_targets)) / 20
+    weights = prg.random(size = n_samples)
+
+    return (truth, preds, weights)
+
+def calc_brute_force_auc(is_sgn, scores, weights):
+    """Calculate AUC as a weighted probability of correct pair ordering"""
+    s_scores, s_weights = scores[is_sgn],  weights[is_sgn]
+    b_scores, b_weights = scores[~is_sgn], weights[~is_sgn]
+
+    pair_weights = s_weights[:, np.newaxis] * b_weights[np.newaxis, :]
+    pair_scores  = (
+          (s_scores[:, np.newaxis] >  b_scores[np.newaxis, :])
+        + (s_scores[:, np.newaxis] == b_scores[np.newaxis, :]) * 0.5
+    )
+
+    return np.sum(pair_weights * pair_scores) / np.sum(pair_weights)
+
+class TestsExactCurves(unittest.TestCase):
+    """Test `ExactCurves` calculation"""
+
+    def test_selection_sums(self):
+        """Compare selection sums to the brute force ones"""
+        truth, preds, weights = make_preds(500, 3)
+        curves_list = calc_exact_curves(truth, preds, weights)
+
+        for (pred_idx, curves) in enumerate(curves_list):
+            scores = preds[:, pred_idx]
+            is_sgn = (truth == pred_idx)
+
+            self.assertTrue(np.array_equal(
+                curves.thresholds, np.unique(scores)[::-1]
+            ))
+
+            for (cut, sgn, bkg) in zip(
+                curves.thresholds, curves.sgn, curves.bkg
+            ):
+                mask = (scores >= cut)
+
+                self.assertTrue(np.isclose(sgn, weights[mask & is_sgn].sum()))
+                self.assertTrue(np.isclose(bkg, weights[mask & ~is_sgn].sum()))
+
+    def test_best_cut(self):
+        """Compare best cuts to the brute force scan"""
+        truth, preds, weights = make_preds(500, 2, seed = 1)
+        curves = calc_exact_curves(truth, preds, weights)[1]
+        is_sgn = (truth == 1)
+
+        best_fom = -np.inf
+        best_cut = None
+
+        for cut in np.unique(preds[:, 1]):
+            mask = (preds[:, 1] >= cut)
+            sgn  = weights[mask & is_sgn].sum()
+            bkg  = weights[mask & ~is_sgn].sum()
+            fom  = sgn / np.sqrt(sgn + bkg)
+
+            if fom > best_fom:
+                best_fom, best_cut = fom, cut
+
+        cut, fom = curves.find_best_cut('selection')
+
+        self.assertEqual(cut, best_cut)
+        self.assertTrue(np.isclose(fom, best_fom))
+
+    def test_auc(self):
+        """Compare AUC to the brute force pair counting"""
+        truth, preds, weights = make_preds(300, 3, seed = 2)
+
+        for (pred_idx, curves) in enumerate(
+            calc_exact_curves(truth, preds, weights)
+        ):
+            auc = calc_brute_force_auc(
+                (truth == pred_idx), preds[:, pred_idx], weights
+            )
+
+            self.assertTrue(np.isclose(curves.calc_auc(), auc))
+
+    def test_auc_limits(self):
+        """Test AUC of perfect, inverted and random classifiers"""
+        is_sgn  = np.array([ True, True, False, False ])
+        weights = np.ones(4)
+
+        for (scores, auc) in [
+            ([ 0.9, 0.8, 0.2, 0.1 ], 1.0),
+            ([ 0.1, 0.2, 0.8, 0.9 ], 0.0),
+            ([ 0.5, 0.5, 0.5, 0.5 ], 0.5),
+        ]:
+            curves = ExactCurves.from_scores(is_sgn, np.array(scores), weights)
+            self.assertTrue(np.isclose(curves.calc_auc(), auc))
+
+    def test_nan_scores(self):
+        """Test that samples with NaN scores are ignored"""
+        curves = ExactCurves.from_scores(
+            np.array([ True, False, True ]), np.array([ 0.5, np.nan, 0.2 ]),
+            np.ones(3)
+        )
+
+        self.assertEqual(list(curves.thresholds), [ 0.5, 0.2 ])
+        self.assertEqual(list(curves.sgn), [ 1, 2 ])
+        self.assertEqual(list(curves.bkg), [ 0, 0 ])
+
+    def test_downsample(self):
+        """Test that downsampling keeps the curve end points"""
+        truth, preds, weights = make_preds(2000, 2, seed = 3)
+        preds  = preds + np.random.default_rng(0).random(preds.shape) / 100
+        curves = calc_exact_curves(truth, preds, weights)[0]
+
+        sampled = curves.downsample(50)
+
+        self.assertLessEqual(len(sampled), 50)
+        self.assertEqual(sampled.thresholds[0],  curves.thresholds[0])
+        self.assertEqual(sampled.thresholds[-1], curves.thresholds[-1])
+        self.assertEqual(sampled.sgn[-1], curves.sgn[-1])
+
+        self.assertTrue(np.array_equal(downsample_index(5, 10), np.arange(5)))
+
+if __name__ == '__main__':
+    unittest.main()
+
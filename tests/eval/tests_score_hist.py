@@ -0,0 +1,120 @@
+"""Tests of the streaming histograms of the predicted scores"""
+
+import unittest
+
+import numpy as np
+
+from slice_lid.eval.hist import ScoreHistogram
+
+N_SAMPLES = 1000
+N_TARGETS = 3
+BINS      = 7
+
+def make_preds(seed = 0):
+    """Make random (truth, preds, weights) arrays"""
+    prg = np.random.default_rng(seed)
+
+    truth   = prg.integers(0, N_TARGETS, size = N_SAMPLES)
+    preds   = prg.random(size = (N_SAMPLES, N_TARGETS))
+    weights = prg.random(size = N_SAMPLES)
+
+    # Values at the bin edges
+    preds[:BINS + 1, 0] = np.linspace(0, 1, BINS + 1)
+
+    return (truth, preds, weights)
+
+class TestsScoreHistogram(unittest.TestCase):
+    """Test `ScoreHistogram` accumulation"""
+
+    def _compare_to_numpy(self, score_hist, truth, preds, weights):
+        for truth_idx in range(N_TARGETS):
+            mask = (truth == truth_idx)
+
+            for pred_idx in range(N_TARGETS):
+                hist, bins = np.histogram(
+                    preds[mask, pred_idx], bins = BINS, range = (0, 1),
+                    weights = weights[mask]
+                )
+                err_sq, _  = np.histogram(
+                    preds[mask, pred_idx], bins = BINS, range = (0, 1),
+                    weights = weights[mask]**2
+                )
+
+                self.assertTrue(np.allclose(score_hist.bins, bins))
+                self.assertTrue(np.allclose(
+                    score_hist.hist[truth_idx, pred_idx], hist
+                ))
+                self.assertTrue(np.allclose(
+                    score_hist.err_sq[truth_idx, pred_idx], err_sq
+                ))
+
+    def test_single_batch(self):
+        """Compare histograms of a single batch to `numpy.histogram`"""
+        truth, preds, weights = make_preds()
+
+        score_hist = ScoreHistogram(N_TARGETS, BINS)
+        score_hist.update(truth, preds, weights)
+
+        self._compare_to_numpy(score_hist, truth, preds, weights)
+
+    def test_batches(self):
+        """Test that batched accumulation matches single batch one"""
+        truth, preds, weights = make_preds()
+
+        for chunk_size in [ 1, 13, 256, N_SAMPLES, 2 * N_SAMPLES ]:
+            score_hist = ScoreHistogram.from_arrays(
+                truth, preds, weights, BINS, chunk_size = chunk_size
+            )
+
+            self._compare_to_numpy(score_hist, truth, preds, weights)
+
+    def test_out_of_range(self):
+        """Test that scores outside of the histogram range are ignored"""
+        score_hist = ScoreHistogram(2, BINS)
+        score_hist.update(
+            np.array([ 0, 1, 1 ]),
+            np.array([ [ -0.1, 0.5 ], [ 1.1, 0.5 ], [ np.nan, 1.0 ] ]),
+            np.ones(3)
+        )
+
+        self.assertEqual(score_hist.hist[:, 0].sum(), 0)
+        self.assertEqual(score_hist.hist[:, 1].sum(), 3)
+        self.assertEqual(score_hist.hist[1, 1, -1], 1)
+
+    def test_sgn_bkg(self):
+        """Test that signal and background histograms split all samples"""
+        truth, preds, weights = make_preds()
+        score_hist = ScoreHistogram.from_arrays(truth, preds, weights, BINS)
+
+        for pred_idx in range(N_TARGETS):
+            (sgn, sgn_err_sq), (bkg, bkg_err_sq) = \
+                score_hist.get_sgn_bkg(pred_idx)
+
+            sgn_mask = (truth == pred_idx)
+
+            self.assertTrue(np.isclose(sgn.sum(), weights[sgn_mask].sum()))
+            self.assertTrue(np.isclose(bkg.sum(), weights[~sgn_mask].sum()))
+            self.assertTrue(np.isclose(
+                sgn_err_sq.sum() + bkg_err_sq.sum(), (weights**2).sum()
+            ))
+
+    def test_merge(self):
+        """Test merging of histograms of separate batches"""
+        truth, preds, weights = make_preds()
+        half = N_SAMPLES // 2
+
+        score_hist = ScoreHistogram.from_arrays(
+            truth[:half], preds[:half], weights[:half], BINS
+        )
+        score_hist.merge(ScoreHistogram.from_arrays(
+            truth[half:], preds[half:], weights[half:], BINS
+        ))
+
+        self._compare_to_numpy(score_hist, truth, preds, weights)
+
+        with self.assertRaises(ValueError):
+            score_hist.merge(ScoreHistogram(N_TARGETS, BINS + 1))
+
+if __name__ == '__main__':
+    unittest.main()
+
@@ -0,0 +1 @@
+"""Various `slice_lid.export` tests"""
@@ -0,0 +1,150 @@
+"""Tests of the pure NumPy model runtime"""
+
+import copy
+import unittest
+import numpy as np
+
+from slice_lid.export.numpy_export import fold_affine_nodes
+from slice_lid.export.numpy_model  import NumpyModel, sigmoid
+
+N_VARS  = 3
+N_UNITS = 4
+LENGTHS = [ 3, 1, 0, 2 ]
+
+def make_topology():
+    """Make topology of a small masked LSTM network"""
+    return {
+        'inputs'  : [ 'input_png3d', 'input_png3d_len' ],
+        'outputs' : [ 'target' ],
+        'nodes'   : [
+            {
+                'name'   : 'input_png3d',
+                'op'     : 'input',
+                'inputs' : [],
+                'params' : { 'shape' : [ None, None, N_VARS ],
+                             'dtype' : 'float32' },
+            },
+            {
+                'name'   : 'input_png3d_len',
+                'op'     : 'input',
+                'inputs' : [],
+                'params' : { 'shape' : [ None, 1 ], 'dtype' : 'int32' },
+            },
+            {
+                'name'   : 'mask',
+                'op'     : 'length_mask',
+                'inputs' : [ 'input_png3d', 'input_png3d_len' ],
+                'params' : {},
+            },
+            {
+                'name'   : 'norm',
+                'op'     : 'affine',
+                'inputs' : [ 'mask' ],
+                'params' : {},
+            },
+            {
+                'name'   : 'lstm',
+                'op'     : 'lstm',
+                'inputs' : [ 'norm' ],
+                'params' : {
+                    'units'                : N_UNITS,
+                    'activation'           : 'tanh',
+                    'recurrent_activation' : 'sigmoid',
+                    'go_backwards'         : False,
+                    'return_sequences'     : False,
+                },
+            },
+            {
+                'name'   : 'target',
+                'op'     : 'dense',
+                'inputs' : [ 'lstm' ],
+                'params' : { 'activation' : 'softmax' },
+            },
+        ],
+    }
+
+def make_weights(prg):
+    """Make random weights of the network of `make_topology`"""
+    def rand(*shape):
+        return prg.normal(size = shape).astype(np.float32)
+
+    return {
+        'norm'   : { 'scale' : rand(N_VARS), 'shift' : rand(N_VARS) },
+        'lstm'   : {
+            'kernel'           : rand(N_VARS, 4 * N_UNITS),
+            'recurrent_kernel' : rand(N_UNITS, 4 * N_UNITS),
+            'bias'             : rand(4 * N_UNITS),
+        },
+        'target' : { 'kernel' : rand(N_UNITS, 2), 'bias' : rand(2) },
+    }
+
+def naive_predict(weights, sequence):
+    """Evaluate network of `make_topology` on a single unpadded sequence"""
+    h = np.zeros(N_UNITS)
+    c = np.zeros(N_UNITS)
+
+    for x in sequence:
+        x = x * weights['norm']['scale'] + weights['norm']['shift']
+        z = (
+              x @ weights['lstm']['kernel']
+            + h @ weights['lstm']['recurrent_kernel']
+            + weights['lstm']['bias']
+        )
+
+        i, f, g, o = np.split(z, 4)
+        c = sigmoid(f) * c + sigmoid(i) * np.tanh(g)
+        h = sigmoid(o) * np.tanh(c)
+
+    logits = h @ weights['target']['kernel'] + weights['target']['bias']
+    return np.exp(logits) / np.sum(np.exp(logits))
+
+class TestsNumpyModel(unittest.TestCase):
+    """Test `NumpyModel` evaluation against a naive per sample evaluation"""
+
+    def setUp(self):
+        prg = np.random.default_rng(0)
+
+        self.weights = make_weights(prg)
+        self.inputs  = {
+            'input_png3d'     : prg.normal(
+                size = (len(LENGTHS), max(LENGTHS), N_VARS)
+            ).astype(np.float32),
+            'input_png3d_len' : np.array(LENGTHS, dtype = np.int32)[:, None],
+        }
+
+        self.expected = np.array([
+            naive_predict(self.weights, x[:l])
+                for (x, l) in zip(self.inputs['input_png3d'], LENGTHS)
+        ])
+
+    def test_predict(self):
+        """Test prediction of a masked LSTM network"""
+        model = NumpyModel(make_topology(), self.weights)
+        preds = model.predict_on_batch(self.inputs)
+
+        self.assertTrue(np.allclose(preds, self.expected, atol = 1e-5))
+
+    def test_predict_folded(self):
+        """Test prediction of a network with folded affine nodes"""
+        topology = make_topology()
+        weights  = copy.deepcopy(self.weights)
+
+        self.assertEqual(fold_affine_nodes(topology, weights), 1)
+        self.assertNotIn('norm', [ x['name'] for x in topology['nodes'] ])
+
+        model = NumpyModel(topology, weights)
+        preds = model.predict_on_batch(self.inputs)
+
+        self.assertTrue(np.allclose(preds, self.expected, atol = 1e-5))
+
+    def test_inputs(self):
+        """Test that model inputs mimic `keras` model inputs"""
+        model = NumpyModel(make_topology(), self.weights)
+
+        self.assertEqual(
+            model.input_names, [ 'input_png3d', 'input_png3d_len' ]
+        )
+        self.assertEqual(model.inputs[0].shape, (None, None, N_VARS))
+
+if __name__ == '__main__':
+    unittest.main()
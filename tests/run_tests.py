@@ -12,10 +12,32 @@ import unittest
 
 import tests.data_loader.tests_balanced_sampler
 import tests.data_loader.tests_data_filter
+import tests.data_loader.tests_data_row_id
+import tests.data_loader.tests_length_bucketing
+import tests.data_loader.tests_stratified_sampler
+import tests.data_loader.tests_stream
 
 import tests.data_generator.tests_batch_split
 import tests.data_generator.tests_class_weights_calc
 import tests.data_generator.tests_class_weights
+import tests.data_generator.tests_epoch_cursor
+import tests.data_generator.tests_data_shard
+import tests.data_generator.tests_packed_prongs
+import tests.data_generator.tests_soft_targets
+
+import tests.eval.tests_cascade
+import tests.eval.tests_pred_cache
+import tests.eval.tests_roc
+import tests.eval.tests_score_hist
+
+import tests.export.tests_numpy_model
+
+import tests.serve.tests_micro_batcher
+
+import tests.train.tests_halving
+import tests.train.tests_prune
+
+import tests.utils.tests_lazy
 
 def suite():
     """Construct test suite"""
@@ -28,6 +50,18 @@ def suite():
     result.addTest(loader.loadTestsFromModule(
         tests.data_loader.tests_data_filter
     ))
+    result.addTest(loader.loadTestsFromModule(
+        tests.data_loader.tests_data_row_id
+    ))
+    result.addTest(loader.loadTestsFromModule(
+        tests.data_loader.tests_length_bucketing
+    ))
+    result.addTest(loader.loadTestsFromModule(
+        tests.data_loader.tests_stratified_sampler
+    ))
+    result.addTest(loader.loadTestsFromModule(
+        tests.data_loader.tests_stream
+    ))
     result.addTest(loader.loadTestsFromModule(
         tests.data_generator.tests_batch_split
     ))
@@ -37,6 +71,45 @@ def suite():
     result.addTest(loader.loadTestsFromModule(
         tests.data_generator.tests_class_weights
     ))
+    result.addTest(loader.loadTestsFromModule(
+        tests.data_generator.tests_epoch_cursor
+    ))
+    result.addTest(loader.loadTestsFromModule(
+        tests.data_generator.tests_data_shard
+    ))
+    result.addTest(loader.loadTestsFromModule(
+        tests.data_generator.tests_packed_prongs
+    ))
+    result.addTest(loader.loadTestsFromModule(
+        tests.data_generator.tests_soft_targets
+    ))
+    result.addTest(loader.loadTestsFromModule(
+        tests.eval.tests_cascade
+    ))
+    result.addTest(loader.loadTestsFromModule(
+        tests.eval.tests_pred_cache
+    ))
+    result.addTest(loader.loadTestsFromModule(
+        tests.eval.tests_roc
+    ))
+    result.addTest(loader.loadTestsFromModule(
+        tests.eval.tests_score_hist
+    ))
+    result.addTest(loader.loadTestsFromModule(
+        tests.export.tests_numpy_model
+    ))
+    result.addTest(loader.loadTestsFromModule(
+        tests.serve.tests_micro_batcher
+    ))
+    result.addTest(loader.loadTestsFromModule(
+        tests.train.tests_halving
+    ))
+    result.addTest(loader.loadTestsFromModule(
+        tests.train.tests_prune
+    ))
+    result.addTest(loader.loadTestsFromModule(
+        tests.utils.tests_lazy
+    ))
 
     return result
 
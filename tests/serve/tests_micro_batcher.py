@@ -0,0 +1,127 @@
+"""Tests of the micro-batching of concurrent scoring requests"""
+
+import threading
+import unittest
+import numpy as np
+
+from slice_lid.serve.batcher import MicroBatcher
+from slice_lid.serve.codec   import (
+    decode_binary_request, decode_json_request, encode_binary_request,
+    encode_json_request
+)
+
+VARS_SLICE = [ 'slice' ]
+VARS_PNG3D = [ 'png3d' ]
+
+def predict(columns):
+    """Score samples by the sum of their slice and prong values"""
+    return np.stack(
+        [
+            columns['slice'],
+            [ np.sum(x) for x in columns['png3d'] ],
+        ],
+        axis = 1
+    )
+
+def make_columns(value, n_samples):
+    """Make request of `n_samples` samples with distinct values"""
+    return {
+        'slice' : value + np.arange(n_samples, dtype = np.float32),
+        'png3d' : [ np.full(idx, value, dtype = np.float32)
+                    for idx in range(n_samples) ],
+    }
+
+class TestsMicroBatcher(unittest.TestCase):
+    """Test that concurrent requests are batched and scored correctly"""
+
+    def _run_concurrent(self, batcher, n_requests, n_samples):
+        results = [ None ] * n_requests
+
+        def submit(idx):
+            results[idx] = batcher.predict(
+                make_columns(100 * idx, n_samples)
+            )
+
+        threads = [
+            threading.Thread(target = submit, args = (idx,))
+                for idx in range(n_requests)
+        ]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        return results
+
+    def test_scores(self):
+        with MicroBatcher(predict, max_latency = 0.05) as batcher:
+            results = self._run_concurrent(batcher, 10, 3)
+
+        for (idx, scores) in enumerate(results):
+            columns = make_columns(100 * idx, 3)
+            self.assertTrue(np.allclose(scores, predict(columns)))
+
+    def test_batching(self):
+        with MicroBatcher(predict, max_latency = 0.5) as batcher:
+            self._run_concurrent(batcher, 8, 2)
+
+        metrics = batcher.metrics.snapshot()
+
+        self.assertEqual(metrics['n_requests'], 8)
+        self.assertEqual(metrics['n_samples'],  16)
+        self.assertLess(metrics['n_batches'], 8)
+
+    def test_max_batch_size(self):
+        with MicroBatcher(
+            predict, max_batch_size = 4, max_latency = 0.5
+        ) as batcher:
+            self._run_concurrent(batcher, 8, 2)
+
+        self.assertGreaterEqual(batcher.metrics.snapshot()['n_batches'], 4)
+
+    def test_error(self):
+        def fail(columns):
+            raise RuntimeError("Failed")
+
+        with MicroBatcher(fail) as batcher:
+            with self.assertRaises(RuntimeError):
+                batcher.predict(make_columns(0, 2))
+
+        self.assertEqual(batcher.metrics.snapshot()['n_errors'], 1)
+
+class TestsCodec(unittest.TestCase):
+    """Test encoding and decoding of the server requests"""
+
+    def _check_columns(self, columns, expected):
+        self.assertTrue(np.allclose(columns['slice'], expected['slice']))
+
+        for (x, y) in zip(columns['png3d'], expected['png3d']):
+            self.assertTrue(np.allclose(x, y))
+
+        self.assertEqual(len(columns['png3d']), len(expected['png3d']))
+
+    def test_json(self):
+        columns = make_columns(1, 4)
+        result  = decode_json_request(
+            encode_json_request(columns, VARS_PNG3D), VARS_SLICE, VARS_PNG3D
+        )
+
+        self._check_columns(result, columns)
+
+    def test_binary(self):
+        columns = make_columns(1, 4)
+        result  = decode_binary_request(
+            encode_binary_request(columns, VARS_PNG3D), VARS_SLICE, VARS_PNG3D
+        )
+
+        self._check_columns(result, columns)
+
+    def test_missing_variable(self):
+        with self.assertRaises(ValueError):
+            decode_json_request(b'{ "columns" : {} }', VARS_SLICE, VARS_PNG3D)
+
+if __name__ == '__main__':
+    unittest.main()
+
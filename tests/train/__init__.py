@@ -0,0 +1,2 @@
+"""Various `slice_lid.train` tests"""
+
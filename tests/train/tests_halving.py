@@ -0,0 +1,99 @@
+"""Tests of resuming the successive halving from the trials database"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from slice_lid.train.halving   import get_resume_state
+from slice_lid.train.trials_db import (
+    TrialsDB, DECISION_PROMOTED, DECISION_PRUNED, STATUS_DONE, STATUS_PRUNED
+)
+
+BUDGETS      = [ 1, 3, 9 ]
+SEARCH_SPACE = [ { 'lr' : x } for x in [ 0.1, 0.2, 0.3, 0.4, 0.5, 0.6 ] ]
+
+class TestsHalvingResume(unittest.TestCase):
+    """Test `get_resume_state`"""
+
+    def setUp(self):
+        self.tmpdir    = tempfile.mkdtemp()
+        self.trials_db = TrialsDB(os.path.join(self.tmpdir, 'trials.db'))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _record_rung(self, rung, val_losses, promoted):
+        for (trial_id, val_loss) in val_losses.items():
+            if trial_id in promoted:
+                decision = DECISION_PROMOTED
+            else:
+                decision = DECISION_PRUNED
+                self.trials_db.set_finished(trial_id, STATUS_PRUNED)
+
+            self.trials_db.add_rung_result(
+                trial_id, rung, BUDGETS[rung], val_loss, decision
+            )
+
+    def test_fresh_search(self):
+        """Test that a new search starts from the first rung"""
+        trials = self.trials_db.add_trials(SEARCH_SPACE)
+
+        start_rung, survivors, best_val_loss = get_resume_state(
+            self.trials_db, trials, BUDGETS
+        )
+
+        self.assertEqual(start_rung, 0)
+        self.assertEqual(survivors, trials)
+        self.assertEqual(best_val_loss, { x[0] : None for x in trials })
+
+    def test_resume_after_rung(self):
+        """Test that only promoted trials resume from the next rung"""
+        trials   = self.trials_db.add_trials(SEARCH_SPACE)
+        ids      = [ x[0] for x in trials ]
+        promoted = ids[:2]
+
+        self._record_rung(
+            0, { x : float(i) for (i, x) in enumerate(ids) }, promoted
+        )
+
+        start_rung, survivors, best_val_loss = get_resume_state(
+            self.trials_db, self.trials_db.add_trials(SEARCH_SPACE), BUDGETS
+        )
+
+        self.assertEqual(start_rung, 1)
+        self.assertEqual([ x[0] for x in survivors ], promoted)
+        self.assertEqual(best_val_loss, { ids[0] : 0.0, ids[1] : 1.0 })
+
+    def test_resume_after_last_rung(self):
+        """Test that a finished search has nothing to resume"""
+        trials = self.trials_db.add_trials(SEARCH_SPACE)
+        ids    = [ x[0] for x in trials ]
+
+        self._record_rung(0, { x : 1.0 for x in ids }, ids[:2])
+        self._record_rung(1, { x : 1.0 for x in ids[:2] }, ids[:1])
+
+        self.trials_db.add_rung_result(ids[0], 2, BUDGETS[2], 0.5, None)
+        self.trials_db.set_finished(ids[0], STATUS_DONE)
+
+        _, survivors, _ = get_resume_state(
+            self.trials_db, self.trials_db.add_trials(SEARCH_SPACE), BUDGETS
+        )
+
+        self.assertEqual(survivors, [])
+
+    def test_budgets_mismatch(self):
+        """Test that resuming with different budgets is refused"""
+        trials = self.trials_db.add_trials(SEARCH_SPACE)
+        ids    = [ x[0] for x in trials ]
+
+        self._record_rung(0, { x : 1.0 for x in ids }, ids[:2])
+
+        with self.assertRaises(RuntimeError):
+            get_resume_state(
+                self.trials_db, self.trials_db.add_trials(SEARCH_SPACE),
+                [ 2, 6 ]
+            )
+
+if __name__ == '__main__':
+    unittest.main()
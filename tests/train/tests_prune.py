@@ -0,0 +1,110 @@
+"""Tests of the structured pruning of Dense layers"""
+
+import unittest
+
+import keras
+import numpy as np
+
+from slice_lid.train.prune import find_prunable_groups, prune_model
+
+N_INPUTS = 4
+N_UNITS  = 6
+N_OUTPUT = 3
+EPSILON  = 1e-3
+
+def make_model(seed = 0):
+    """Make small Dense -> BatchNormalization -> Dense model"""
+    prg = np.random.default_rng(seed)
+
+    inputs = keras.layers.Input(shape = (N_INPUTS,), name = 'input')
+    layer  = keras.layers.Dense(
+        N_UNITS, activation = 'relu', name = 'dense'
+    )(inputs)
+    layer  = keras.layers.BatchNormalization(
+        epsilon = EPSILON, name = 'bn'
+    )(layer)
+    output = keras.layers.Dense(N_OUTPUT, name = 'target')(layer)
+
+    model = keras.models.Model(inputs = inputs, outputs = [ output ])
+
+    for layer in model.layers:
+        weights = [ prg.normal(size = x.shape) for x in layer.get_weights() ]
+
+        if layer.name == 'bn':
+            # Moving variance must be positive
+            weights[-1] = prg.uniform(0.5, 2.0, size = weights[-1].shape)
+
+        layer.set_weights(weights)
+
+    return model
+
+def calc_reference(model, x, keep):
+    """Evaluate `model` with units `keep` of the 'dense' layer by hand"""
+    kernel, bias                = model.get_layer('dense').get_weights()
+    gamma, beta, mean, variance = model.get_layer('bn').get_weights()
+    kernel_out, bias_out        = model.get_layer('target').get_weights()
+
+    layer = np.maximum(x @ kernel[:, keep] + bias[keep], 0)
+    layer = (
+          gamma[keep] * (layer - mean[keep])
+        / np.sqrt(variance[keep] + EPSILON)
+        + beta[keep]
+    )
+
+    return layer @ kernel_out[keep] + bias_out
+
+def calc_keep(model, n_keep):
+    """Find indices of `n_keep` most important units of the 'dense' layer"""
+    kernel                = model.get_layer('dense').get_weights()[0]
+    gamma, _, _, variance = model.get_layer('bn').get_weights()
+    kernel_out            = model.get_layer('target').get_weights()[0]
+
+    scores = (
+          np.linalg.norm(kernel, axis = 0)
+        * np.abs(gamma / np.sqrt(variance + EPSILON))
+        * np.linalg.norm(kernel_out, axis = 1)
+    )
+
+    return np.sort(np.argsort(scores)[::-1][:n_keep])
+
+class TestsPrune(unittest.TestCase):
+    """Test `find_prunable_groups` and `prune_model`"""
+
+    def test_find_prunable_groups(self):
+        """Test that only the hidden Dense layer is prunable"""
+        groups = find_prunable_groups(make_model())
+
+        self.assertEqual(groups, [{
+            'dense'       : 'dense',
+            'elementwise' : [ 'bn' ],
+            'consumer'    : 'target',
+        }])
+
+    def _test_pruned_outputs(self, sparsity, n_keep):
+        model = make_model()
+        x     = np.random.default_rng(1).normal(size = (16, N_INPUTS))
+
+        pruned, layers = prune_model(model, sparsity)
+
+        self.assertEqual(layers, { 'dense' : (N_UNITS, n_keep) })
+        self.assertEqual(pruned.get_layer('dense').units, n_keep)
+
+        preds = np.asarray(pruned.predict_on_batch(x.astype(np.float32)))
+        null  = calc_reference(model, x, calc_keep(model, n_keep))
+
+        self.assertTrue(np.allclose(preds, null, rtol = 1e-4, atol = 1e-4))
+
+    def test_prune_half(self):
+        """Test outputs of the model with half of the units pruned"""
+        self._test_pruned_outputs(0.5, 3)
+
+    def test_prune_none(self):
+        """Test that the model with no units pruned is unchanged"""
+        self._test_pruned_outputs(0, N_UNITS)
+
+    def test_prune_keeps_one_unit(self):
+        """Test that at least one unit is kept"""
+        self._test_pruned_outputs(0.99, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+"""Tests of the lazy import of modules"""
+
+import sys
+import unittest
+
+from slice_lid.utils.lazy import LazyModule
+
+# Small standard library module that is not imported by the interpreter
+MODULE = 'colorsys'
+
+class TestsLazyModule(unittest.TestCase):
+    """Test that modules are imported only on the first attribute access"""
+
+    def setUp(self):
+        sys.modules.pop(MODULE, None)
+
+    def test_not_imported(self):
+        module = LazyModule(MODULE)
+
+        self.assertNotIn(MODULE, sys.modules)
+        self.assertFalse(module.is_loaded())
+
+    def test_import_on_access(self):
+        module = LazyModule(MODULE)
+        result = module.rgb_to_hsv(1, 0, 0)
+
+        self.assertIn(MODULE, sys.modules)
+        self.assertTrue(module.is_loaded())
+        self.assertEqual(result, (0, 1, 1))
+
+    def test_missing_attribute(self):
+        module = LazyModule(MODULE)
+
+        with self.assertRaises(AttributeError):
+            _ = module.missing_attribute
+
+    def test_missing_module(self):
+        module = LazyModule('slice_lid_missing_module')
+
+        with self.assertRaises(ImportError):
+            _ = module.attribute
+
+if __name__ == '__main__':
+    unittest.main()
+